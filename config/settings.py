@@ -92,6 +92,9 @@ THUMBNAIL_CACHE_SIZE = 500
 # Czas ważności signed URL (sekundy) - 24h
 URL_CACHE_TTL = 86400
 
+# Magazyn resztek materiału po nestingu (lokalna baza SQLite)
+REMNANTS_DB = Path(os.getenv("REMNANTS_DB", Path.home() / ".newerp" / "remnants.db"))
+
 # ============================================================
 # GUI - USTAWIENIA INTERFEJSU
 # ============================================================
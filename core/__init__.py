@@ -15,6 +15,14 @@ from core.supabase_client import (
     get_auth_client
 )
 
+# Service locator (leniwe repozytoria i klienci)
+from core.service_locator import (
+    ServiceLocator,
+    get_locator,
+    get_service,
+    try_get_service,
+)
+
 # Exceptions
 from core.exceptions import (
     NewERPError,
@@ -62,6 +70,8 @@ from core.filters import (
     Filter,
     Sort,
     Pagination,
+    KeysetPagination,
+    KeysetPage,
     QueryParams,
     QueryBuilder,
     create_query_params,
@@ -92,6 +102,12 @@ __all__ = [
     'ensure_authenticated',
     'get_auth_client',
     
+    # Service locator
+    'ServiceLocator',
+    'get_locator',
+    'get_service',
+    'try_get_service',
+    
     # Exceptions
     'NewERPError',
     'DatabaseError',
@@ -134,6 +150,8 @@ __all__ = [
     'Filter',
     'Sort',
     'Pagination',
+    'KeysetPagination',
+    'KeysetPage',
     'QueryParams',
     'QueryBuilder',
     'create_query_params',
@@ -7,12 +7,13 @@ Kto, kiedy, co zmienił - pełna historia.
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
 from enum import Enum
 import json
 import logging
 
-from supabase import Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
@@ -117,7 +118,7 @@ class AuditService:
         "updated_at",  # zawsze się zmienia, nie ma sensu logować
     }
     
-    def __init__(self, client: Client, default_user_id: str = None):
+    def __init__(self, client: 'Client', default_user_id: str = None):
         self.client = client
         self.default_user_id = default_user_id
         self._enabled = True
@@ -7,10 +7,11 @@ Wszystkie repozytoria dziedziczą po tej klasie.
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, TYPE_CHECKING
 import logging
 
-from supabase import Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 from core.exceptions import (
     RecordNotFoundError,
@@ -18,7 +19,9 @@ from core.exceptions import (
     OptimisticLockError,
     DatabaseError
 )
-from core.filters import QueryParams, QueryBuilder, Filter, FilterOperator
+from core.filters import (
+    QueryParams, QueryBuilder, Filter, FilterOperator, KeysetPagination, KeysetPage
+)
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +46,9 @@ class BaseRepository(ABC):
             
             # Opcjonalnie - pola do wyszukiwania
             SEARCH_FIELDS = ["name", "idx_code", "description"]
+            
+            # Opcjonalnie - kolumny widoku listy (bez ciężkich kolumn JSON)
+            LIST_COLUMNS = ["id", "name", "idx_code", "created_at"]
     """
     
     # Subklasy muszą zdefiniować
@@ -52,6 +58,8 @@ class BaseRepository(ABC):
     # Opcjonalne konfiguracje
     SEARCH_FIELDS: List[str] = []
     UNIQUE_FIELDS: List[str] = []  # Pola z unique constraint
+    LIST_COLUMNS: List[str] = []  # Projekcja dla list_page (pusta = wszystkie kolumny)
+    KEYSET_COLUMNS: Tuple[str, ...] = ("created_at", "id")  # Klucz paginacji (NOT NULL, ostatnia unikalna)
     
     # Domyślne kolumny
     ID_COLUMN = "id"
@@ -61,7 +69,7 @@ class BaseRepository(ABC):
     CREATED_AT_COLUMN = "created_at"
     UPDATED_AT_COLUMN = "updated_at"
     
-    def __init__(self, client: Client):
+    def __init__(self, client: 'Client'):
         self.client = client
         
         # Walidacja
@@ -341,6 +349,50 @@ class BaseRepository(ABC):
         builder = QueryBuilder(self.client, self.TABLE_NAME)
         return builder.apply(params).execute()
     
+    def list_page(
+        self,
+        params: QueryParams = None,
+        cursor: str = None,
+        limit: int = 100,
+        columns: List[str] = None,
+        count: str = None,
+        include_deleted: bool = False
+    ) -> KeysetPage:
+        """
+        Pobierz stronę rekordów z paginacją po kluczu (KEYSET_COLUMNS, malejąco).
+        
+        Args:
+            params: Parametry zapytania (filtry, wyszukiwanie; sortowanie i
+                paginację wyznacza klucz)
+            cursor: next_cursor poprzedniej strony (None = pierwsza strona)
+            limit: Rozmiar strony
+            columns: Projekcja (domyślnie LIST_COLUMNS, pusta = wszystkie)
+            count: Strategia liczenia ('exact', 'planned', 'estimated') -
+                tylko na pierwszej stronie, w tym samym zapytaniu
+            include_deleted: Czy włączyć soft-deleted
+        
+        Returns:
+            KeysetPage: (items, next_cursor, total)
+        
+        Raises:
+            ValueError: Uszkodzony kursor
+        """
+        if params is None:
+            params = QueryParams()
+        
+        params.include_deleted = include_deleted
+        params.select_fields = list(columns if columns is not None else self.LIST_COLUMNS)
+        params.count = count
+        params.pagination = KeysetPagination(
+            limit=limit, cursor=cursor, columns=tuple(self.KEYSET_COLUMNS)
+        )
+        
+        if params.search and not params.search_fields:
+            params.search_fields = self.SEARCH_FIELDS
+        
+        builder = QueryBuilder(self.client, self.TABLE_NAME)
+        return builder.apply(params).execute_page()
+    
     def find_one(self, **kwargs) -> Optional[Dict[str, Any]]:
         """
         Znajdź jeden rekord po polach.
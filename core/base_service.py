@@ -7,12 +7,13 @@ Wszystkie serwisy dziedziczą po tej klasie.
 
 from abc import ABC
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, TYPE_CHECKING
 from contextlib import contextmanager
 import uuid
 import logging
 
-from supabase import Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 from core.base_repository import BaseRepository
 from core.events import EventBus, Event, EventType, create_event
@@ -70,7 +71,7 @@ class BaseService(ABC):
     
     def __init__(
         self, 
-        client: Client,
+        client: 'Client',
         event_bus: EventBus = None,
         audit_service: AuditService = None
     ):
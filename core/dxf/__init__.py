@@ -9,6 +9,9 @@ Główne komponenty:
 - DXFPart: Kompletny detal z geometrią
 - DXFContour: Zamknięty kontur (zewnętrzny lub otwór)
 - DXFEntity: Pojedyncza entity DXF
+- ParsedDXF: Jeden odczyt pliku, z którego wyliczane są kontur, wielokąt
+  nestingu, statystyki ścieżki, grawer i miniatura
+- BatchDXFLoader: Równoległe wczytywanie folderu plików (pula procesów)
 
 Użycie:
     from core.dxf import UnifiedDXFReader
@@ -57,6 +60,17 @@ from .reader import (
     load_dxf,
 )
 
+from .parsed import (
+    ParsedDXF,
+    parse_dxf,
+)
+
+from .batch_loader import (
+    DXFGeometry,
+    extract_geometry,
+    BatchDXFLoader,
+)
+
 
 __all__ = [
     # Entities
@@ -90,4 +104,13 @@ __all__ = [
     # Reader
     'UnifiedDXFReader',
     'load_dxf',
+
+    # Single-pass parse
+    'ParsedDXF',
+    'parse_dxf',
+
+    # Batch import
+    'DXFGeometry',
+    'extract_geometry',
+    'BatchDXFLoader',
 ]
@@ -0,0 +1,217 @@
+"""
+Batch DXF Loader - równoległy import folderu plików DXF
+=======================================================
+Folder klienta to często kilkaset plików; wczytywanie ich po kolei w wątku
+GUI trwa minuty. BatchDXFLoader rozdziela pliki na pulę procesów i zwraca
+wyniki w kolejności ukończenia (strumieniowo), z postępem i przerwaniem.
+
+Pamięć: w procesie roboczym każdy plik jest czytany raz (ParsedDXF),
+dokument ezdxf jest zwalniany zaraz po wyliczeniu danych, a do procesu
+głównego wraca tylko wynik (DXFGeometry). Liczba zadań w toku jest
+ograniczona (2 × liczba procesów), więc nieodebrane wyniki się nie piętrzą.
+
+Użycie:
+    loader = BatchDXFLoader(thumbnail_size=(150, 150))
+    for path, geometry in loader.load(paths, progress=on_progress):
+        ...
+    # z innego wątku: loader.stop()
+"""
+
+import os
+import logging
+import threading
+from dataclasses import dataclass
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Optional, Callable, Iterable, Iterator, Tuple, Any, Union
+
+from .entities import DXFPart
+
+logger = logging.getLogger(__name__)
+
+# Zadania w toku na proces roboczy
+PENDING_PER_WORKER = 2
+
+
+@dataclass
+class DXFGeometry:
+    """Dane wyliczone z jednego pliku DXF (wynik procesu roboczego)"""
+    filepath: str
+    part: Optional[DXFPart] = None
+    polygon: Optional[object] = None
+    engraving: Optional[object] = None
+    toolpath_stats: Optional[object] = None
+    thumbnail: Optional[object] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.part is not None
+
+
+def extract_geometry(filepath: str, arc_resolution: int = 8,
+                     with_polygon: bool = True, with_engraving: bool = True,
+                     with_toolpath: bool = False,
+                     thumbnail_size: Optional[Tuple[int, int]] = None,
+                     thumbnail_colors: Tuple[str, str] = ('#1a1a1a', '#8b5cf6')) -> DXFGeometry:
+    """
+    Wczytaj plik raz i wylicz wybrane dane (funkcja procesu roboczego).
+
+    Błędy nie są rzucane - opis trafia do DXFGeometry.error.
+    """
+    from .parsed import parse_dxf
+
+    geometry = DXFGeometry(filepath=str(filepath))
+    parsed = parse_dxf(filepath, arc_resolution=arc_resolution)
+    if not parsed.is_valid:
+        geometry.error = parsed.error
+        return geometry
+
+    try:
+        geometry.part = parsed.part
+        if geometry.part is None:
+            geometry.error = "Could not build contour"
+        if with_polygon:
+            geometry.polygon = parsed.polygon
+        if with_engraving:
+            geometry.engraving = parsed.engraving_info()
+        if with_toolpath:
+            geometry.toolpath_stats = parsed.toolpath_stats()
+        if thumbnail_size:
+            geometry.thumbnail = parsed.thumbnail(thumbnail_size, *thumbnail_colors)
+    except Exception as e:
+        geometry.error = str(e)
+    finally:
+        parsed.release()
+
+    return geometry
+
+
+class BatchDXFLoader:
+    """
+    Równoległe wczytywanie wielu plików DXF.
+
+    `extractor` to funkcja (ścieżka) -> wynik uruchamiana w procesie
+    roboczym; musi dać się zserializować pickle (funkcja modułu lub
+    functools.partial). Domyślnie extract_geometry z opcjami konstruktora.
+    """
+
+    def __init__(self, workers: Optional[int] = None,
+                 extractor: Optional[Callable[[str], Any]] = None,
+                 **options):
+        """
+        Args:
+            workers: Liczba procesów (domyślnie liczba CPU; 1 = bez puli)
+            extractor: Własna funkcja wczytująca plik
+            **options: Opcje extract_geometry (arc_resolution, with_polygon,
+                with_engraving, with_toolpath, thumbnail_size, thumbnail_colors)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.extractor = extractor or partial(extract_geometry, **options)
+        self.stop_flag = threading.Event()
+        self.errors: dict = {}
+
+    def stop(self) -> None:
+        """
+        Przerwij wczytywanie (nieuruchomione pliki są pomijane).
+
+        Działa też przed load() - flaga zostaje ustawiona do reset().
+        """
+        self.stop_flag.set()
+
+    def reset(self) -> None:
+        """Skasuj flagę stop przed ponownym użyciem loadera"""
+        self.stop_flag.clear()
+
+    def load(self, paths: Iterable[Union[str, Path]],
+             progress: Optional[Callable[[int, int, str], None]] = None
+             ) -> Iterator[Tuple[str, Any]]:
+        """
+        Wczytaj pliki, zwracając (ścieżka, wynik) w kolejności ukończenia.
+
+        Wyjątek extractora => wynik None, opis w self.errors[ścieżka].
+
+        Args:
+            paths: Ścieżki plików DXF
+            progress: callback(gotowe, wszystkie, ścieżka) po każdym pliku
+        """
+        paths = [str(p) for p in paths]
+        self.errors = {}
+
+        workers = min(self.workers, len(paths))
+        if workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable, loading sequentially: {e}")
+                executor = None
+        else:
+            executor = None
+
+        if executor is None:
+            yield from self._load_sequential(paths, progress)
+        else:
+            logger.info(f"→ Batch DXF import: {len(paths)} files, {workers} workers")
+            yield from self._load_parallel(executor, workers, paths, progress)
+
+    def _load_sequential(self, paths, progress) -> Iterator[Tuple[str, Any]]:
+        for done, path in enumerate(paths, 1):
+            if self.stop_flag.is_set():
+                return
+            try:
+                result = self.extractor(path)
+            except Exception as e:
+                result = self._failed(path, e)
+            if progress:
+                progress(done, len(paths), path)
+            yield path, result
+
+    def _load_parallel(self, executor: ProcessPoolExecutor, workers: int,
+                       paths, progress) -> Iterator[Tuple[str, Any]]:
+        queue = iter(paths)
+        pending = {}
+        done = 0
+
+        def submit_next() -> bool:
+            path = next(queue, None)
+            if path is None:
+                return False
+            pending[executor.submit(self.extractor, path)] = path
+            return True
+
+        try:
+            for _ in range(workers * PENDING_PER_WORKER):
+                if not submit_next():
+                    break
+
+            while pending and not self.stop_flag.is_set():
+                finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    path = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = self._failed(path, e)
+                    done += 1
+                    if progress:
+                        progress(done, len(paths), path)
+                    yield path, result
+                    if self.stop_flag.is_set():
+                        break
+                    submit_next()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _failed(self, path: str, error: Exception) -> Optional[Any]:
+        """Zapisz błąd pliku; zwraca wynik dla nieudanego pliku (None)"""
+        logger.error(f"Error loading DXF {path}: {error}")
+        self.errors[path] = str(error)
+        return None
+
+
+__all__ = [
+    'DXFGeometry',
+    'extract_geometry',
+    'BatchDXFLoader',
+]
@@ -0,0 +1,200 @@
+"""
+Parsed DXF - jeden odczyt pliku dla wszystkich modułów
+======================================================
+Import folderu potrzebuje z każdego DXF: konturu i otworów (DXFPart),
+wielokąta do nestingu, statystyk ścieżki cięcia, informacji o grawerze
+i miniatury. Dotąd każdy z tych modułów wołał ezdxf.readfile osobno
+(4-5 odczytów tego samego pliku).
+
+ParsedDXF wczytuje dokument raz i wylicza z niego wszystkie dane na
+żądanie (wyniki zapamiętywane). Po zebraniu potrzebnych danych release()
+zwalnia dokument ezdxf - wyliczone dane zostają.
+
+Użycie:
+    parsed = ParsedDXF.load("detal.dxf")
+    part = parsed.part
+    stats = parsed.toolpath_stats()
+    thumb = parsed.thumbnail((150, 150))
+    parsed.release()
+"""
+
+import os
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Union
+
+from .entities import DXFPart
+from .converters import HAS_EZDXF
+from .reader import UnifiedDXFReader
+
+logger = logging.getLogger(__name__)
+
+if HAS_EZDXF:
+    import ezdxf
+
+
+class ParsedDXF:
+    """
+    Wczytany dokument DXF z zapamiętywanymi danymi pochodnymi.
+
+    Dane zależne od parametrów (statystyki, miniatury) zapamiętywane są
+    osobno dla każdego zestawu parametrów.
+    """
+
+    def __init__(self, filepath: Union[str, Path], doc=None,
+                 reader: Optional[UnifiedDXFReader] = None):
+        """
+        Args:
+            filepath: Ścieżka do pliku DXF
+            doc: Już wczytany dokument ezdxf (None = wczytaj przy pierwszym użyciu)
+            reader: UnifiedDXFReader z własnymi tolerancjami (domyślny gdy None)
+        """
+        self.filepath = str(filepath)
+        self._doc = doc
+        self._released = False
+        self._reader = reader or UnifiedDXFReader()
+        self._derived: Dict[Any, Any] = {}
+        self.error: Optional[str] = None
+
+    @classmethod
+    def load(cls, filepath: Union[str, Path],
+             reader: Optional[UnifiedDXFReader] = None) -> 'ParsedDXF':
+        """Wczytaj plik od razu (błąd odczytu zapisany w .error)"""
+        parsed = cls(filepath, reader=reader)
+        _ = parsed.doc
+        return parsed
+
+    # ------------------------------------------------------------------
+    # Dokument
+    # ------------------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        return Path(self.filepath).stem
+
+    @property
+    def doc(self):
+        """Dokument ezdxf (None gdy odczyt się nie udał)"""
+        if self._doc is None and self.error is None:
+            if self._released:
+                raise RuntimeError(f"ParsedDXF released: {self.filepath}")
+            self._doc = self._read()
+        return self._doc
+
+    @property
+    def is_valid(self) -> bool:
+        return self.doc is not None
+
+    def _read(self):
+        if not HAS_EZDXF:
+            self.error = "ezdxf not installed"
+            return None
+        if not os.path.exists(self.filepath):
+            self.error = f"File not found: {self.filepath}"
+            return None
+        try:
+            return ezdxf.readfile(self.filepath)
+        except Exception as e:
+            self.error = f"Cannot read DXF file: {e}"
+            logger.error(f"Error reading DXF {self.filepath}: {e}")
+            return None
+
+    def release(self) -> None:
+        """Zwolnij dokument ezdxf; wyliczone dane pozostają dostępne"""
+        self._doc = None
+        self._released = True
+
+    def _derive(self, key, compute):
+        """Wynik zapamiętany pod kluczem lub wyliczony z dokumentu"""
+        if key in self._derived:
+            return self._derived[key]
+        doc = self.doc
+        value = compute(doc) if doc is not None else None
+        self._derived[key] = value
+        return value
+
+    # ------------------------------------------------------------------
+    # Dane pochodne
+    # ------------------------------------------------------------------
+
+    @property
+    def part(self) -> Optional[DXFPart]:
+        """Detal (kontur zewnętrzny, otwory, warstwy) - jak UnifiedDXFReader.read"""
+        return self._derive('part', lambda doc: self._reader.read_document(doc, self.filepath))
+
+    @property
+    def polygon(self):
+        """Główny wielokąt dla nestingu NFP (DXFPolygon) - jak get_dxf_polygon"""
+        def compute(doc):
+            from quotations.nesting.dxf_polygon import DXFPolygonExtractor
+            polygon = DXFPolygonExtractor().extract_from_document(doc, self.filepath)
+            if polygon is not None:
+                polygon.source_file = self.filepath
+            return polygon
+        return self._derive('polygon', compute)
+
+    def toolpath_stats(self, ignore_layers=None, marking_keywords=None,
+                       tolerance_mm: float = 0.2):
+        """Statystyki ścieżki cięcia (ToolpathStats)"""
+        key = ('toolpath_stats', _freeze(ignore_layers), _freeze(marking_keywords), tolerance_mm)
+
+        def compute(doc):
+            from costing.toolpath.dxf_extractor import extract_toolpath_stats
+            return extract_toolpath_stats(self.filepath, ignore_layers, marking_keywords,
+                                          tolerance_mm, doc=doc)
+        return self._derive(key, compute)
+
+    def motion_segments(self, ignore_layers=None, tolerance_mm: float = 0.2):
+        """Segmenty ruchu do planowania dynamiki (List[MotionSegment])"""
+        key = ('motion_segments', _freeze(ignore_layers), tolerance_mm)
+
+        def compute(doc):
+            from costing.toolpath.dxf_extractor import extract_motion_segments
+            return extract_motion_segments(self.filepath, ignore_layers, tolerance_mm, doc=doc)
+        return self._derive(key, compute)
+
+    def engraving_info(self, marking_keywords=None):
+        """Informacje o grawerze (EngravingInfo)"""
+        key = ('engraving_info', _freeze(marking_keywords))
+
+        def compute(doc):
+            from costing.toolpath.dxf_extractor import extract_engraving_info
+            return extract_engraving_info(self.filepath, marking_keywords, doc=doc)
+        return self._derive(key, compute)
+
+    def thumbnail(self, img_size: Tuple[int, int] = (150, 150),
+                  bg_color: str = '#1a1a1a', line_color: str = '#8b5cf6'):
+        """Miniatura (PIL.Image) - jak generate_thumbnail"""
+        key = ('thumbnail', tuple(img_size), bg_color, line_color)
+
+        def compute(doc):
+            from quotations.utils.dxf_thumbnail import generate_thumbnail
+            return generate_thumbnail(self.filepath, img_size, bg_color, line_color, doc=doc)
+        return self._derive(key, compute)
+
+
+def _freeze(value):
+    """Parametr (zbiór warstw/słów kluczowych) jako klucz słownika"""
+    if value is None:
+        return None
+    return tuple(sorted(value))
+
+
+def parse_dxf(filepath: Union[str, Path], arc_resolution: int = 8) -> ParsedDXF:
+    """
+    Wczytaj DXF raz - punkt wejścia wspólnego potoku.
+
+    Args:
+        filepath: Ścieżka do pliku DXF
+        arc_resolution: Rozdzielczość łuków konturu
+
+    Returns:
+        ParsedDXF (przy błędzie odczytu is_valid == False, opis w .error)
+    """
+    return ParsedDXF.load(filepath, reader=UnifiedDXFReader(arc_resolution=arc_resolution))
+
+
+__all__ = [
+    'ParsedDXF',
+    'parse_dxf',
+]
@@ -74,6 +74,28 @@ class UnifiedDXFReader:
 
         try:
             doc = ezdxf.readfile(filepath)
+        except Exception as e:
+            logger.error(f"Error reading DXF {filepath}: {e}")
+            return None
+
+        return self.read_document(doc, filepath)
+
+    def read_document(self, doc, filepath: str) -> Optional[DXFPart]:
+        """
+        Zbuduj detal z już wczytanego dokumentu ezdxf.
+
+        Pozwala współdzielić jeden odczyt pliku (patrz ParsedDXF).
+
+        Args:
+            doc: Dokument ezdxf
+            filepath: Ścieżka pliku (nazwa detalu i metadane)
+
+        Returns:
+            DXFPart lub None w przypadku błędu
+        """
+        filepath = str(filepath)
+
+        try:
             msp = doc.modelspace()
 
             # Zbierz wszystkie entities pogrupowane po warstwach
@@ -5,8 +5,10 @@ Uniwersalny system filtrowania i wyszukiwania dla wszystkich modułów.
 """
 
 from dataclasses import dataclass, field
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from enum import Enum
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -105,6 +107,109 @@ class Pagination:
         return cls(limit=page_size, offset=(page - 1) * page_size)
 
 
+@dataclass
+class KeysetPagination:
+    """
+    Paginacja po kluczu (keyset / cursor) zamiast offsetu.
+
+    Strona N+1 to rekordy "za" ostatnim rekordem strony N w porządku
+    `columns` - zapytanie korzysta z indeksu i nie przechodzi przez
+    pominięte wiersze jak range(offset, ...). Kolumny klucza muszą być
+    NOT NULL, a ostatnia unikalna (domyślnie created_at, id).
+
+    Examples:
+        KeysetPagination(limit=50)                        # pierwsza strona
+        KeysetPagination(limit=50, cursor=page.next_cursor)
+    """
+    limit: int = 100
+    cursor: Optional[str] = None
+    columns: Tuple[str, ...] = ('created_at', 'id')
+    desc: bool = True
+
+
+@dataclass
+class KeysetPage:
+    """Strona wyników paginacji po kluczu"""
+    items: List[dict] = field(default_factory=list)
+    next_cursor: Optional[str] = None      # None = ostatnia strona
+    total: Optional[int] = None            # tylko gdy zażądano count (pierwsza strona)
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(row: Dict[str, Any], columns: Sequence[str]) -> str:
+    """Kursor (nieprzezroczysty napis) z wartości kolumn klucza rekordu"""
+    values = [row.get(column) for column in columns]
+    raw = json.dumps(values, default=str, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str, columns: Sequence[str]) -> List[Any]:
+    """
+    Wartości kolumn klucza z kursora.
+
+    Raises:
+        ValueError: Uszkodzony kursor lub inna liczba kolumn
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(values, list) or len(values) != len(columns) or None in values:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return values
+
+
+def _quote_value(value: Any) -> str:
+    """Wartość w filtrze logicznym PostgREST (cudzysłów chroni , . : ( ))"""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_condition(columns: Sequence[str], values: Sequence[Any], desc: bool = True) -> str:
+    """
+    Warunek "za kursorem" dla or_() PostgREST.
+
+    (created_at, id) malejąco:
+        created_at.lt.X,and(created_at.eq.X,id.lt.Y)
+    """
+    op = 'lt' if desc else 'gt'
+    branches = []
+    for i, column in enumerate(columns):
+        parts = [f"{columns[j]}.eq.{_quote_value(values[j])}" for j in range(i)]
+        parts.append(f"{column}.{op}.{_quote_value(values[i])}")
+        branches.append(parts[0] if len(parts) == 1 else f"and({','.join(parts)})")
+    return ','.join(branches)
+
+
+def apply_keyset(query, pagination: KeysetPagination):
+    """Dodaj do zapytania porządek klucza, warunek kursora i limit (+1 do wykrycia kolejnej strony)"""
+    if pagination.cursor:
+        values = decode_cursor(pagination.cursor, pagination.columns)
+        query = query.or_(keyset_condition(pagination.columns, values, pagination.desc))
+    for column in pagination.columns:
+        query = query.order(column, desc=pagination.desc)
+    return query.limit(pagination.limit + 1)
+
+
+def keyset_page(rows: List[dict], pagination: KeysetPagination,
+                total: Optional[int] = None) -> KeysetPage:
+    """Strona z wyniku apply_keyset (limit + 1 wierszy)"""
+    rows = rows or []
+    next_cursor = None
+    if len(rows) > pagination.limit:
+        rows = rows[:pagination.limit]
+        next_cursor = encode_cursor(rows[-1], pagination.columns)
+    return KeysetPage(items=rows, next_cursor=next_cursor, total=total)
+
+
+# Strategie liczenia (select(..., count=...)) - liczba wraca w tym samym zapytaniu
+# co dane; 'planned'/'estimated' unikają pełnego COUNT(*) na dużych tabelach
+COUNT_STRATEGIES = ('exact', 'planned', 'estimated')
+
+
 @dataclass
 class QueryParams:
     """
@@ -126,11 +231,12 @@ class QueryParams:
     sorts: List[Sort] = field(default_factory=list)
     search: Optional[str] = None
     search_fields: List[str] = field(default_factory=list)
-    pagination: Pagination = field(default_factory=Pagination)
+    pagination: Union[Pagination, KeysetPagination] = field(default_factory=Pagination)
     
     # Dodatkowe opcje
     include_deleted: bool = False  # czy włączyć soft-deleted
     select_fields: List[str] = field(default_factory=list)  # konkretne kolumny
+    count: Optional[str] = None  # strategia liczenia (COUNT_STRATEGIES) - w tym samym zapytaniu
     
     def add_filter(
         self, 
@@ -174,21 +280,37 @@ class QueryBuilder:
         self.client = client
         self.table_name = table_name
         self.query = None
+        self._count = None
+        self._keyset: Optional[KeysetPagination] = None
         self._reset()
     
     def _reset(self):
         """Reset query do stanu początkowego"""
         self.query = self.client.table(self.table_name).select('*')
+        self._count = None
+        self._keyset = None
     
-    def select(self, columns: Union[str, List[str]] = '*') -> 'QueryBuilder':
-        """Ustaw kolumny do pobrania"""
+    def select(self, columns: Union[str, List[str]] = '*', count: Optional[str] = None) -> 'QueryBuilder':
+        """Ustaw kolumny do pobrania (i opcjonalnie strategię liczenia)"""
         if isinstance(columns, list):
             columns = ', '.join(columns)
-        self.query = self.client.table(self.table_name).select(columns)
+        if count is not None and count not in COUNT_STRATEGIES:
+            raise ValueError(f"Unknown count strategy: {count}")
+        if count:
+            self.query = self.client.table(self.table_name).select(columns, count=count)
+        else:
+            self.query = self.client.table(self.table_name).select(columns)
+        self._count = count
         return self
     
     def apply(self, params: QueryParams) -> 'QueryBuilder':
         """Zastosuj wszystkie parametry"""
+        if params.select_fields or params.count:
+            # Przy paginacji po kluczu liczymy tylko na pierwszej stronie
+            count = params.count
+            if isinstance(params.pagination, KeysetPagination) and params.pagination.cursor:
+                count = None
+            self.select(params.select_fields or '*', count=count)
         self.apply_filters(params)
         self.apply_search(params)
         self.apply_sorting(params)
@@ -285,8 +407,8 @@ class QueryBuilder:
         return self
     
     def apply_sorting(self, params: QueryParams) -> 'QueryBuilder':
-        """Zastosuj sortowanie"""
-        if not params.sorts:
+        """Zastosuj sortowanie (przy paginacji po kluczu porządek wyznacza klucz)"""
+        if not params.sorts or isinstance(params.pagination, KeysetPagination):
             return self
         
         for sort in params.sorts:
@@ -295,32 +417,57 @@ class QueryBuilder:
         return self
     
     def apply_pagination(self, params: QueryParams) -> 'QueryBuilder':
-        """Zastosuj paginację"""
+        """Zastosuj paginację (offset lub po kluczu)"""
         p = params.pagination
-        self.query = self.query.range(p.offset, p.offset + p.limit - 1)
+        if isinstance(p, KeysetPagination):
+            self.query = apply_keyset(self.query, p)
+            self._keyset = p
+        else:
+            self.query = self.query.range(p.offset, p.offset + p.limit - 1)
         return self
     
+    def _run(self) -> Tuple[List[dict], Optional[int]]:
+        """Wykonaj zapytanie: (dane, liczba z nagłówka count lub None)"""
+        try:
+            response = self.query.execute()
+            data = response.data or []
+            total = getattr(response, 'count', None) if self._count else None
+            return data, total
+        except Exception as e:
+            logger.error(f"[QueryBuilder] Query failed: {e}")
+            raise
+    
     def execute(self) -> Tuple[List[dict], int]:
         """
         Wykonaj zapytanie.
         
         Returns:
             Tuple[List[dict], int]: (dane, total_count)
+            total_count z tego samego zapytania gdy ustawiono count,
+            w przeciwnym razie len(dane)
         """
+        keyset = self._keyset
         try:
-            # Pobierz dane
-            response = self.query.execute()
-            data = response.data or []
-            
-            # TODO: Supabase count wymaga osobnego zapytania
-            # Na razie zwracamy len(data)
-            count = len(data)
-            
-            return data, count
-            
-        except Exception as e:
-            logger.error(f"[QueryBuilder] Query failed: {e}")
-            raise
+            data, total = self._run()
+            if keyset is not None:
+                data = data[:keyset.limit]
+            return data, total if total is not None else len(data)
+        finally:
+            self._reset()
+    
+    def execute_page(self) -> KeysetPage:
+        """
+        Wykonaj zapytanie z paginacją po kluczu.
+        
+        Returns:
+            KeysetPage: rekordy, next_cursor, total (jeśli liczono)
+        """
+        keyset = self._keyset
+        if keyset is None:
+            raise ValueError("execute_page() requires KeysetPagination")
+        try:
+            data, total = self._run()
+            return keyset_page(data, keyset, total)
         finally:
             self._reset()
     
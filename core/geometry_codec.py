@@ -0,0 +1,113 @@
+"""
+Geometry Codec
+==============
+Zwarty zapis konturów i otworów w bazie (product_snapshot, wyniki nestingu).
+
+Format "g1:" + base64(zlib(int32 LE)):
+    [liczba_pierścieni, długość_1, ..., długość_n, dx0, dy0, dx1, dy1, ...]
+Współrzędne kwantowane do 0.01 mm i zapisywane jako różnice względem
+poprzedniego punktu (ciągle przez wszystkie pierścienie) - małe liczby,
+które zlib kompresuje kilkukrotnie lepiej niż JSON z listami floatów.
+
+Odczyt jest zgodny wstecz: listy punktów z JSON (stare wiersze) zwracane
+są bez zmian. Dekodowanie odbywa się dopiero na żądanie - wiersze mogą
+nieść zakodowany napis bez rozpakowywania geometrii.
+
+Użycie:
+    from core.geometry_codec import encode_geometry, decode_geometry
+    data = encode_geometry(contour, holes)      # 'g1:eJx...'
+    contour, holes = decode_geometry(data)
+"""
+
+import base64
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Any, List, Sequence, Tuple
+
+PREFIX = 'g1:'
+
+# Kwant współrzędnych: 1/SCALE mm
+SCALE = 100
+
+Point = List[float]
+Ring = List[Point]
+
+
+def is_encoded(value: Any) -> bool:
+    """Czy wartość jest zakodowaną geometrią"""
+    return isinstance(value, str) and value.startswith(PREFIX)
+
+
+def encode_rings(rings: Sequence[Sequence[Sequence[float]]]) -> str:
+    """
+    Zakoduj listę pierścieni (list punktów).
+
+    Raises:
+        TypeError, ValueError, IndexError, OverflowError: niepoprawne punkty
+    """
+    values = array('i', [len(rings)])
+    values.extend(len(ring) for ring in rings)
+    px = py = 0
+    for ring in rings:
+        for point in ring:
+            x = round(point[0] * SCALE)
+            y = round(point[1] * SCALE)
+            values.append(x - px)
+            values.append(y - py)
+            px, py = x, y
+
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return PREFIX + base64.b64encode(zlib.compress(values.tobytes(), 6)).decode('ascii')
+
+
+def decode_rings(value: str) -> List[Ring]:
+    """Odkoduj pierścienie zapisane przez encode_rings"""
+    values = array('i')
+    values.frombytes(zlib.decompress(base64.b64decode(value[len(PREFIX):])))
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    count = values[0]
+    lengths = values[1:1 + count]
+    deltas = values[1 + count:]
+    xs = accumulate(deltas[0::2])
+    ys = accumulate(deltas[1::2])
+    points = [[x / SCALE, y / SCALE] for x, y in zip(xs, ys)]
+
+    rings = []
+    start = 0
+    for length in lengths:
+        rings.append(points[start:start + length])
+        start += length
+    return rings
+
+
+def encode_points(points: Sequence[Sequence[float]]) -> str:
+    """Zakoduj pojedynczy kontur"""
+    return encode_rings([points])
+
+
+def decode_points(value: Any) -> Ring:
+    """Odkoduj kontur - zakodowany napis lub stara lista punktów z JSON"""
+    if is_encoded(value):
+        rings = decode_rings(value)
+        return rings[0] if rings else []
+    return list(value) if value else []
+
+
+def encode_geometry(contour: Sequence, holes: Sequence = ()) -> str:
+    """Zakoduj kontur zewnętrzny z otworami w jeden napis"""
+    return encode_rings([contour or [], *(holes or [])])
+
+
+def decode_geometry(value: Any) -> Tuple[Ring, List[Ring]]:
+    """Odkoduj (kontur, otwory) zapisane przez encode_geometry"""
+    if not is_encoded(value):
+        return [], []
+    rings = decode_rings(value)
+    if not rings:
+        return [], []
+    return rings[0], rings[1:]
@@ -14,12 +14,19 @@ Uzycie:
     # Pobieranie stawek
     foil_rate = cache.get_foil_rate('stainless', 3.0)  # PLN/m
     pierce_rate = cache.get_piercing_rate('stainless', 3.0)  # PLN/szt
+
+Odczyty nie biora blokady: dane i indeksy grubosci trzymane sa w niezmiennym
+snapshocie, ktory ladowanie buduje obok i podmienia jednym przypisaniem.
+Najblizsza grubosc wyszukiwana jest przez bisect w posortowanej liscie
+grubosci danego materialu.
 """
 
 import logging
 import threading
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Callable, Tuple, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Callable, Tuple, Any, Iterable
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -53,6 +60,24 @@ MATERIAL_TYPE_MAP = {
 }
 
 
+@lru_cache(maxsize=1024)
+def resolve_material_type(material: str) -> str:
+    """Mapuj nazwe materialu na typ (steel/stainless/aluminum) - wynik zapamietany"""
+    material_upper = material.upper().strip()
+
+    # Bezposrednie dopasowanie
+    if material_upper in MATERIAL_TYPE_MAP:
+        return MATERIAL_TYPE_MAP[material_upper]
+
+    # Czesciowe dopasowanie
+    for key, mat_type in MATERIAL_TYPE_MAP.items():
+        if key in material_upper or material_upper in key:
+            return mat_type
+
+    # Domyslnie stal
+    return 'steel'
+
+
 @dataclass
 class MaterialPriceRecord:
     """Rekord ceny materialu"""
@@ -104,11 +129,68 @@ class FoilRateRecord:
     valid_from: Optional[str] = None
 
 
+class _ThicknessIndex:
+    """Posortowane grubosci jednego materialu z rekordem dla kazdej"""
+
+    __slots__ = ('thicknesses', 'records')
+
+    def __init__(self, items: Iterable[Tuple[float, Any]]):
+        # Dla powtorzonej grubosci wygrywa pierwszy rekord (kolejnosc slownika)
+        first: Dict[float, Any] = {}
+        for thickness, record in items:
+            first.setdefault(thickness, record)
+        self.thicknesses = sorted(first)
+        self.records = [first[t] for t in self.thicknesses]
+
+    def nearest(self, thickness: float) -> Tuple[Optional[Any], float]:
+        """(rekord najblizszej grubosci, roznica) - przy remisie ciensza"""
+        ths = self.thicknesses
+        i = bisect_left(ths, thickness)
+        best, best_diff = None, float('inf')
+        for j in (i - 1, i):
+            if 0 <= j < len(ths) and abs(ths[j] - thickness) < best_diff:
+                best, best_diff = self.records[j], abs(ths[j] - thickness)
+        return best, best_diff
+
+    def ceiling(self, thickness: float) -> Optional[Any]:
+        """Rekord najmniejszej grubosci >= thickness"""
+        i = bisect_left(self.thicknesses, thickness)
+        return self.records[i] if i < len(self.records) else None
+
+
+def _build_index(records: Dict[tuple, Any]) -> Dict[str, _ThicknessIndex]:
+    """Klucze (nazwa, grubosc, ...) -> indeks grubosci per nazwa"""
+    grouped: Dict[str, List[Tuple[float, Any]]] = {}
+    for key, record in records.items():
+        grouped.setdefault(key[0], []).append((key[1], record))
+    return {name: _ThicknessIndex(items) for name, items in grouped.items()}
+
+
+class _PricingSnapshot:
+    """Niezmienny zestaw danych cenowych z indeksami (podmieniany w calosci)"""
+
+    __slots__ = ('material_prices', 'cutting_prices', 'piercing_rates', 'foil_rates',
+                 'material_index', 'cutting_index', 'piercing_index', 'foil_index')
+
+    def __init__(self, material_prices: Dict = None, cutting_prices: Dict = None,
+                 piercing_rates: Dict = None, foil_rates: Dict = None):
+        self.material_prices: Dict[Tuple[str, float, str], MaterialPriceRecord] = material_prices or {}
+        self.cutting_prices: Dict[Tuple[str, float, str], CuttingPriceRecord] = cutting_prices or {}
+        self.piercing_rates: Dict[Tuple[str, float], PiercingRateRecord] = piercing_rates or {}
+        self.foil_rates: Dict[Tuple[str, float], FoilRateRecord] = foil_rates or {}
+
+        self.material_index = _build_index(self.material_prices)
+        self.cutting_index = _build_index(self.cutting_prices)
+        self.piercing_index = _build_index(self.piercing_rates)
+        self.foil_index = _build_index(self.foil_rates)
+
+
 class PricingDataCache:
     """
     Singleton cache danych cenowych z Supabase.
 
-    Thread-safe z asynchronicznym ladowaniem.
+    Thread-safe z asynchronicznym ladowaniem. Gettery czytaja biezacy
+    snapshot bez blokady; _data_lock serializuje tylko ladowanie.
     """
 
     _instance = None
@@ -139,10 +221,7 @@ class PricingDataCache:
         self._callbacks: List[Callable[[], None]] = []
 
         # Struktury danych - klucz to tuple (material, thickness) lub podobny
-        self.material_prices: Dict[Tuple[str, float, str], MaterialPriceRecord] = {}
-        self.cutting_prices: Dict[Tuple[str, float, str], CuttingPriceRecord] = {}
-        self.piercing_rates: Dict[Tuple[str, float], PiercingRateRecord] = {}
-        self.foil_rates: Dict[Tuple[str, float], FoilRateRecord] = {}
+        self._snapshot = _PricingSnapshot()
 
         # Supabase client (lazy init)
         self._client = None
@@ -160,6 +239,22 @@ class PricingDataCache:
                 self._client = None
         return self._client
 
+    @property
+    def material_prices(self) -> Dict[Tuple[str, float, str], MaterialPriceRecord]:
+        return self._snapshot.material_prices
+
+    @property
+    def cutting_prices(self) -> Dict[Tuple[str, float, str], CuttingPriceRecord]:
+        return self._snapshot.cutting_prices
+
+    @property
+    def piercing_rates(self) -> Dict[Tuple[str, float], PiercingRateRecord]:
+        return self._snapshot.piercing_rates
+
+    @property
+    def foil_rates(self) -> Dict[Tuple[str, float], FoilRateRecord]:
+        return self._snapshot.foil_rates
+
     @property
     def is_loaded(self) -> bool:
         """Czy dane zostaly zaladowane"""
@@ -228,16 +323,11 @@ class PricingDataCache:
         """
         Przeladuj dane (synchronicznie).
         Wywolywane po zmianach w Ustawieniach.
+
+        Do zakonczenia ladowania gettery zwracaja poprzednie dane.
         """
         logger.info("[PricingCache] Przeladowywanie danych cenowych...")
 
-        with self._data_lock:
-            self._loaded = False
-            self.material_prices.clear()
-            self.cutting_prices.clear()
-            self.piercing_rates.clear()
-            self.foil_rates.clear()
-
         try:
             self._load_all_data()
             self._loaded = True
@@ -255,18 +345,22 @@ class PricingDataCache:
             raise RuntimeError("Brak polaczenia z Supabase")
 
         with self._data_lock:
-            self._load_material_prices(client)
-            self._load_cutting_prices(client)
-            self._load_piercing_rates(client)
-            self._load_foil_rates(client)
-
-    def _load_material_prices(self, client) -> None:
+            material_prices, cutting_prices, piercing_rates, foil_rates = {}, {}, {}, {}
+            self._load_material_prices(client, material_prices)
+            self._load_cutting_prices(client, cutting_prices)
+            self._load_piercing_rates(client, piercing_rates)
+            self._load_foil_rates(client, foil_rates)
+            # Atomowa podmiana - czytelnicy widza stary albo nowy komplet danych
+            self._snapshot = _PricingSnapshot(material_prices, cutting_prices,
+                                              piercing_rates, foil_rates)
+
+    def _load_material_prices(self, client, material_prices: Dict) -> None:
         """Laduj ceny materialow"""
         try:
             response = client.table('material_prices').select('*').limit(5000).execute()
             for row in (response.data or []):
                 key = (row['material'], float(row['thickness']), row.get('format', '1500x3000'))
-                self.material_prices[key] = MaterialPriceRecord(
+                material_prices[key] = MaterialPriceRecord(
                     id=row['id'],
                     material=row['material'],
                     thickness=float(row['thickness']),
@@ -275,17 +369,17 @@ class PricingDataCache:
                     source=row.get('source'),
                     valid_from=row.get('valid_from'),
                 )
-            logger.debug(f"[PricingCache] Zaladowano {len(self.material_prices)} cen materialow")
+            logger.debug(f"[PricingCache] Zaladowano {len(material_prices)} cen materialow")
         except Exception as e:
             logger.warning(f"[PricingCache] Blad ladowania cen materialow: {e}")
 
-    def _load_cutting_prices(self, client) -> None:
+    def _load_cutting_prices(self, client, cutting_prices: Dict) -> None:
         """Laduj ceny ciecia"""
         try:
             response = client.table('cutting_prices').select('*').limit(5000).execute()
             for row in (response.data or []):
                 key = (row['material'], float(row['thickness']), row.get('gas', 'N'))
-                self.cutting_prices[key] = CuttingPriceRecord(
+                cutting_prices[key] = CuttingPriceRecord(
                     id=row['id'],
                     material=row['material'],
                     thickness=float(row['thickness']),
@@ -295,17 +389,17 @@ class PricingDataCache:
                     hour_price=float(row['hour_price']) if row.get('hour_price') else None,
                     valid_from=row.get('valid_from'),
                 )
-            logger.debug(f"[PricingCache] Zaladowano {len(self.cutting_prices)} cen ciecia")
+            logger.debug(f"[PricingCache] Zaladowano {len(cutting_prices)} cen ciecia")
         except Exception as e:
             logger.warning(f"[PricingCache] Blad ladowania cen ciecia: {e}")
 
-    def _load_piercing_rates(self, client) -> None:
+    def _load_piercing_rates(self, client, piercing_rates: Dict) -> None:
         """Laduj stawki przebijania"""
         try:
             response = client.table('piercing_rates').select('*').limit(5000).execute()
             for row in (response.data or []):
                 key = (row['material_type'], float(row['thickness']))
-                self.piercing_rates[key] = PiercingRateRecord(
+                piercing_rates[key] = PiercingRateRecord(
                     id=row['id'],
                     material_type=row['material_type'],
                     thickness=float(row['thickness']),
@@ -314,11 +408,11 @@ class PricingDataCache:
                     note=row.get('note'),
                     valid_from=row.get('valid_from'),
                 )
-            logger.debug(f"[PricingCache] Zaladowano {len(self.piercing_rates)} stawek przebijania")
+            logger.debug(f"[PricingCache] Zaladowano {len(piercing_rates)} stawek przebijania")
         except Exception as e:
             logger.warning(f"[PricingCache] Blad ladowania stawek przebijania: {e}")
 
-    def _load_foil_rates(self, client) -> None:
+    def _load_foil_rates(self, client, foil_rates: Dict) -> None:
         """Laduj stawki usuwania folii (z widoku current_foil_rates)"""
         try:
             # Probuj widok z obliczonym price_per_meter
@@ -342,7 +436,7 @@ class PricingDataCache:
                 else:
                     price_per_meter = float(price_per_meter)
 
-                self.foil_rates[key] = FoilRateRecord(
+                foil_rates[key] = FoilRateRecord(
                     id=row['id'],
                     material_type=row['material_type'],
                     max_thickness=float(row.get('max_thickness', 5.0)),
@@ -353,7 +447,7 @@ class PricingDataCache:
                     note=row.get('note'),
                     valid_from=row.get('valid_from'),
                 )
-            logger.debug(f"[PricingCache] Zaladowano {len(self.foil_rates)} stawek folii")
+            logger.debug(f"[PricingCache] Zaladowano {len(foil_rates)} stawek folii")
         except Exception as e:
             logger.warning(f"[PricingCache] Blad ladowania stawek folii: {e}")
 
@@ -363,19 +457,7 @@ class PricingDataCache:
 
     def get_material_type(self, material: str) -> str:
         """Mapuj nazwe materialu na typ (steel/stainless/aluminum)"""
-        material_upper = material.upper().strip()
-
-        # Bezposrednie dopasowanie
-        if material_upper in MATERIAL_TYPE_MAP:
-            return MATERIAL_TYPE_MAP[material_upper]
-
-        # Czesciowe dopasowanie
-        for key, mat_type in MATERIAL_TYPE_MAP.items():
-            if key in material_upper or material_upper in key:
-                return mat_type
-
-        # Domyslnie stal
-        return 'steel'
+        return resolve_material_type(material)
 
     def get_material_price(self, material: str, thickness: float,
                            format: str = '1500x3000') -> Optional[float]:
@@ -390,19 +472,21 @@ class PricingDataCache:
         Returns:
             Cena PLN/kg lub None jesli brak danych
         """
-        with self._data_lock:
-            key = (material, thickness, format)
-            if key in self.material_prices:
-                return self.material_prices[key].price_per_kg
-
-            # Probuj bez formatu
-            for (mat, th, fmt), record in self.material_prices.items():
-                if mat == material and abs(th - thickness) < 0.01:
-                    return record.price_per_kg
-
-            # Fallback do typu materialu
-            mat_type = self.get_material_type(material)
-            return DEFAULT_RATES['material_pln_per_kg'].get(mat_type)
+        snapshot = self._snapshot
+        record = snapshot.material_prices.get((material, thickness, format))
+        if record is not None:
+            return record.price_per_kg
+
+        # Probuj bez formatu
+        index = snapshot.material_index.get(material)
+        if index is not None:
+            record, diff = index.nearest(thickness)
+            if record is not None and diff < 0.01:
+                return record.price_per_kg
+
+        # Fallback do typu materialu
+        mat_type = self.get_material_type(material)
+        return DEFAULT_RATES['material_pln_per_kg'].get(mat_type)
 
     def get_cutting_price(self, material: str, thickness: float,
                           gas: str = 'N') -> Optional[float]:
@@ -417,29 +501,20 @@ class PricingDataCache:
         Returns:
             Cena PLN/m lub None
         """
-        with self._data_lock:
-            # Dokladne dopasowanie
-            key = (material, thickness, gas)
-            if key in self.cutting_prices:
-                return self.cutting_prices[key].price_per_meter
-
-            # Probuj bez gazu
-            for (mat, th, g), record in self.cutting_prices.items():
-                if mat == material and abs(th - thickness) < 0.01:
-                    return record.price_per_meter
+        snapshot = self._snapshot
+        # Dokladne dopasowanie
+        record = snapshot.cutting_prices.get((material, thickness, gas))
+        if record is not None:
+            return record.price_per_meter
 
-            # Szukaj najblizszej grubosci dla materialu
-            closest_record = None
-            min_diff = float('inf')
-            for (mat, th, g), record in self.cutting_prices.items():
-                if mat == material and abs(th - thickness) < min_diff:
-                    min_diff = abs(th - thickness)
-                    closest_record = record
+        # Bez gazu / najblizsza grubosc dla materialu
+        index = snapshot.cutting_index.get(material)
+        if index is not None:
+            record, _ = index.nearest(thickness)
+            if record is not None:
+                return record.price_per_meter
 
-            if closest_record:
-                return closest_record.price_per_meter
-
-            return DEFAULT_RATES['cutting_pln_per_m']
+        return DEFAULT_RATES['cutting_pln_per_m']
 
     def get_piercing_rate(self, material: str, thickness: float) -> Optional[float]:
         """
@@ -453,25 +528,21 @@ class PricingDataCache:
             Koszt PLN/przebicie lub None
         """
         mat_type = self.get_material_type(material)
+        snapshot = self._snapshot
 
-        with self._data_lock:
-            # Dokladne dopasowanie typu i grubosci
-            key = (mat_type, thickness)
-            if key in self.piercing_rates:
-                return self.piercing_rates[key].cost_per_pierce
-
-            # Szukaj najblizszej grubosci
-            closest_record = None
-            min_diff = float('inf')
-            for (mtype, th), record in self.piercing_rates.items():
-                if mtype == mat_type and abs(th - thickness) < min_diff:
-                    min_diff = abs(th - thickness)
-                    closest_record = record
+        # Dokladne dopasowanie typu i grubosci
+        record = snapshot.piercing_rates.get((mat_type, thickness))
+        if record is not None:
+            return record.cost_per_pierce
 
-            if closest_record:
-                return closest_record.cost_per_pierce
+        # Szukaj najblizszej grubosci
+        index = snapshot.piercing_index.get(mat_type)
+        if index is not None:
+            record, _ = index.nearest(thickness)
+            if record is not None:
+                return record.cost_per_pierce
 
-            return DEFAULT_RATES['piercing_pln_per_pierce']
+        return DEFAULT_RATES['piercing_pln_per_pierce']
 
     def get_foil_rate(self, material: str, thickness: float) -> Optional[float]:
         """
@@ -492,18 +563,13 @@ class PricingDataCache:
         if mat_type != 'stainless' or thickness > 5.0:
             return None
 
-        with self._data_lock:
-            # Szukaj stawki dla max_thickness >= thickness
-            best_record = None
-            for (mtype, max_th), record in self.foil_rates.items():
-                if mtype == mat_type and max_th >= thickness:
-                    if best_record is None or max_th < best_record.max_thickness:
-                        best_record = record
-
-            if best_record:
-                return best_record.price_per_meter
+        # Stawka dla najmniejszej max_thickness >= thickness
+        index = self._snapshot.foil_index.get(mat_type)
+        record = index.ceiling(thickness) if index is not None else None
+        if record is not None:
+            return record.price_per_meter
 
-            return DEFAULT_RATES['foil_pln_per_m']
+        return DEFAULT_RATES['foil_pln_per_m']
 
     def get_bending_rate(self, thickness: float) -> float:
         """
@@ -573,3 +639,4 @@ def reset_pricing_cache() -> None:
     """Reset singletona (do testow)"""
     global _pricing_cache_instance
     _pricing_cache_instance = None
+    PricingDataCache._instance = None
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Service Locator - leniwe repozytoria i klienci
+==============================================
+Rejestr fabryk dla obiektów współdzielonych przez moduły GUI
+(klient Supabase, repozytoria). Obiekt tworzony jest przy pierwszym
+get_service(), a nie przy imporcie modułu, więc otwarcie okna nie czeka
+na import i konfigurację klienta.
+
+Nieudane utworzenie zapamiętywane jest do reset() - brak konfiguracji
+nie jest sprawdzany przy każdym wywołaniu.
+
+Usage:
+    from core.service_locator import get_service, try_get_service, PRICING_REPOSITORY
+
+    repo = try_get_service(PRICING_REPOSITORY)   # None gdy niedostępne
+    if repo:
+        repo.get_cutting_price('S235', 2.0)
+"""
+
+import threading
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Nazwy usług rejestrowanych domyślnie
+SUPABASE = 'supabase'
+PRICING_REPOSITORY = 'pricing_repository'
+ORDER_REPOSITORY = 'order_repository'
+PRODUCT_REPOSITORY = 'product_repository'
+
+
+class ServiceLocator:
+    """
+    Rejestr fabryk z leniwym tworzeniem instancji.
+
+    Każda usługa tworzona jest co najwyżej raz (bezpiecznie wątkowo);
+    fabryka może pobierać inne usługi z tego samego lokatora.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        """Zarejestruj fabrykę (zastępuje poprzednią i utworzoną instancję)"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+            self._errors.pop(name, None)
+
+    def provide(self, name: str, instance: Any):
+        """Zarejestruj gotową instancję (np. atrapę w testach)"""
+        with self._lock:
+            self._factories[name] = lambda: instance
+            self._instances[name] = instance
+            self._errors.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """
+        Pobierz usługę, tworząc ją przy pierwszym użyciu.
+
+        Raises:
+            KeyError: Nieznana usługa
+            Exception: Błąd fabryki (także zapamiętany z poprzedniej próby)
+        """
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            if name in self._errors:
+                raise self._errors[name]
+            if name not in self._factories:
+                raise KeyError(f"Nieznana usługa: {name}")
+            try:
+                instance = self._factories[name]()
+            except Exception as e:
+                self._errors[name] = e
+                raise
+            self._instances[name] = instance
+            logger.debug(f"[ServiceLocator] Created: {name}")
+            return instance
+
+    def try_get(self, name: str) -> Optional[Any]:
+        """Pobierz usługę lub None, gdy nie da się jej utworzyć"""
+        with self._lock:
+            first_attempt = name not in self._errors
+        try:
+            return self.get(name)
+        except Exception as e:
+            if first_attempt:
+                logger.warning(f"[ServiceLocator] {name} not available: {e}")
+            return None
+
+    def is_created(self, name: str) -> bool:
+        """Czy instancja została już utworzona"""
+        with self._lock:
+            return name in self._instances
+
+    def names(self) -> List[str]:
+        """Nazwy zarejestrowanych usług"""
+        with self._lock:
+            return sorted(self._factories)
+
+    def reset(self, name: Optional[str] = None):
+        """Zapomnij instancje i błędy (jednej usługi lub wszystkich)"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self._errors.clear()
+            else:
+                self._instances.pop(name, None)
+                self._errors.pop(name, None)
+
+
+def _register_defaults(locator: ServiceLocator):
+    """Domyślne usługi - importy dopiero w fabrykach"""
+
+    def supabase_client():
+        from core.supabase_client import get_supabase_client
+        return get_supabase_client()
+
+    def pricing_repository():
+        from pricing.repository import PricingRepository
+        return PricingRepository(locator.get(SUPABASE))
+
+    def order_repository():
+        from orders.repository import OrderRepository
+        return OrderRepository(locator.get(SUPABASE))
+
+    def product_repository():
+        from products.repository import ProductRepository
+        return ProductRepository(locator.get(SUPABASE))
+
+    locator.register(SUPABASE, supabase_client)
+    locator.register(PRICING_REPOSITORY, pricing_repository)
+    locator.register(ORDER_REPOSITORY, order_repository)
+    locator.register(PRODUCT_REPOSITORY, product_repository)
+
+
+_locator: Optional[ServiceLocator] = None
+_locator_lock = threading.Lock()
+
+
+def get_locator() -> ServiceLocator:
+    """Globalny lokator z domyślnymi usługami"""
+    global _locator
+    if _locator is None:
+        with _locator_lock:
+            if _locator is None:
+                locator = ServiceLocator()
+                _register_defaults(locator)
+                _locator = locator
+    return _locator
+
+
+def get_service(name: str) -> Any:
+    """Skrót: get_locator().get(name)"""
+    return get_locator().get(name)
+
+
+def try_get_service(name: str) -> Optional[Any]:
+    """Skrót: get_locator().try_get(name)"""
+    return get_locator().try_get(name)
@@ -5,19 +5,24 @@ Centralny moduł połączenia z Supabase
 
 Singleton pattern - jeden klient dla całej aplikacji.
 Używa SERVICE_ROLE_KEY dla pełnych uprawnień (obejście RLS).
+
+Pakiet supabase importowany jest dopiero przy pierwszym get_supabase_client(),
+więc import modułu (i pakietu core) nie kosztuje startu aplikacji.
 """
 
-from typing import Optional
-from supabase import create_client, Client
+from typing import Optional, TYPE_CHECKING
 
 from config.settings import SUPABASE_URL, SUPABASE_SERVICE_KEY
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 
 # Globalny klient Supabase
-_supabase_client: Optional[Client] = None
+_supabase_client: Optional['Client'] = None
 
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> 'Client':
     """
     Zwraca singleton instancję klienta Supabase.
     
@@ -39,6 +44,7 @@ def get_supabase_client() -> Client:
                 "Sprawdź SUPABASE_URL i SUPABASE_SERVICE_KEY w config/settings.py lub .env"
             )
         
+        from supabase import create_client
         _supabase_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
         print("[OK] Połączono z Supabase (SERVICE_ROLE - pełne uprawnienia)")
     
@@ -57,7 +63,7 @@ def reset_client():
 supabase = property(lambda self: get_supabase_client())
 
 
-def ensure_authenticated() -> Client:
+def ensure_authenticated() -> 'Client':
     """
     Funkcja dla kompatybilności ze starym kodem.
     
@@ -67,7 +73,7 @@ def ensure_authenticated() -> Client:
     return get_supabase_client()
 
 
-def get_auth_client() -> Client:
+def get_auth_client() -> 'Client':
     """
     Alias dla kompatybilności.
     
@@ -9,35 +9,59 @@ Main components:
 - services: Main NestingCostingService
 """
 
-from .services.costing_service import (
-    NestingCostingService,
-    PricingConfig,
-    JobOverrides,
-    create_default_pricing
-)
-from .models.nesting_result import (
-    NestingResult,
-    NestingSheet,
-    PartInstance,
-    CostingSummary,
-    AllocationModel,
-    SheetMode,
-    SourceType
-)
-from .motion.motion_planner import MachineProfile
-from .toolpath.dxf_extractor import extract_toolpath_stats
-from .config import (
-    load_config,
-    save_config,
-    create_pricing_from_config,
-    create_machine_profile_from_config
-)
-from .gui import (
-    NestingCostingWindow,
-    launch_nesting_costing_window,
-    MotionDynamicsTestWindow,
-    launch_motion_dynamics_test_window
-)
+import importlib
+
+# Public names -> defining submodule. Imported on first attribute access
+# (PEP 562), so `import costing.motion...` does not pull in the services,
+# DXF extraction or the Tk windows.
+_EXPORTS = {
+    # Services
+    'NestingCostingService': '.services.costing_service',
+    'PricingConfig': '.services.costing_service',
+    'JobOverrides': '.services.costing_service',
+    'create_default_pricing': '.services.costing_service',
+
+    # Models
+    'NestingResult': '.models.nesting_result',
+    'NestingSheet': '.models.nesting_result',
+    'PartInstance': '.models.nesting_result',
+    'CostingSummary': '.models.nesting_result',
+    'AllocationModel': '.models.nesting_result',
+    'SheetMode': '.models.nesting_result',
+    'SourceType': '.models.nesting_result',
+
+    # Motion
+    'MachineProfile': '.motion.motion_planner',
+
+    # Toolpath
+    'extract_toolpath_stats': '.toolpath.dxf_extractor',
+
+    # Config
+    'load_config': '.config',
+    'save_config': '.config',
+    'create_pricing_from_config': '.config',
+    'create_machine_profile_from_config': '.config',
+
+    # GUI
+    'NestingCostingWindow': '.gui',
+    'launch_nesting_costing_window': '.gui',
+    'MotionDynamicsTestWindow': '.gui',
+    'launch_motion_dynamics_test_window': '.gui',
+}
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     # Services
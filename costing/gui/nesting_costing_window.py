@@ -1067,6 +1067,14 @@ class CostParametersPanel(ctk.CTkFrame):
             fg_color=Theme.ACCENT_PRIMARY
         ).pack(anchor="w", pady=2)
 
+        self.common_line_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            options_frame,
+            text="Wspolne linie ciecia",
+            variable=self.common_line_var,
+            fg_color=Theme.ACCENT_PRIMARY
+        ).pack(anchor="w", pady=2)
+
         # === Job Costs Section ===
         self._create_section_header(scroll, "Koszty zlecenia")
 
@@ -1527,6 +1535,7 @@ class CostParametersPanel(ctk.CTkFrame):
             'include_piercing': self.include_piercing_var.get(),
             'include_foil_removal': self.include_foil_var.get(),
             'include_punch': self.include_punch_var.get(),
+            'common_line': self.common_line_var.get(),
             'tech_cost_pln': safe_float(self.tech_cost_var),
             'packaging_cost_pln': safe_float(self.packaging_cost_var),
             'transport_cost_pln': safe_float(self.transport_cost_var),
@@ -1608,6 +1617,8 @@ class NestingCostingWindow(ctk.CTkToplevel):
         # Data
         self.nesting_result = None
         self.costing_result = None
+        # {sheet_id: SheetSequence} - rapid travel for Variant B
+        self.sheet_sequences: Dict[str, Any] = {}
         self.parts_by_material: Dict[str, List[Dict]] = {}
 
         self._setup_ui()
@@ -1739,21 +1750,23 @@ class NestingCostingWindow(ctk.CTkToplevel):
         self._log(f"Tryb arkusza: {sheet_mode}, margines Y: {margin_y}mm", "CALC")
 
         # Create nesting result with sheets grouped by material+thickness
-        self._create_grouped_nesting_result(parts, sheet_mode, margin_y)
+        self._create_grouped_nesting_result(parts, sheet_mode, margin_y, params['common_line'])
 
-    def _create_grouped_nesting_result(self, parts: List[Dict], sheet_mode: str, margin_y: float):
+    def _create_grouped_nesting_result(self, parts: List[Dict], sheet_mode: str, margin_y: float,
+                                       common_line: bool = False):
         """Create nesting result with sheets grouped by material+thickness."""
         try:
             from costing.models.nesting_result import (
                 NestingResult, NestingSheet, PartInstance, ToolpathStats,
                 SheetMode, SourceType
             )
-            from costing.toolpath import extract_toolpath_stats
+            from costing.toolpath.toolpath_cache import get_toolpath_cache
 
             nesting = NestingResult(
                 source_type=SourceType.ORDER,
                 source_id="TEST-001"
             )
+            self.sheet_sequences = {}
 
             # Group parts by material + thickness
             groups: Dict[str, List[Dict]] = {}
@@ -1787,6 +1800,8 @@ class NestingCostingWindow(ctk.CTkToplevel):
 
                 max_y = 0
                 total_area = 0
+                # Part outlines for the group nesting pass (sequence, common lines)
+                part_outlines: List[Dict] = []
 
                 for i, part in enumerate(group_parts):
                     dxf_path = part.get('dxf_path', '')
@@ -1797,7 +1812,7 @@ class NestingCostingWindow(ctk.CTkToplevel):
 
                     if dxf_path and Path(dxf_path).exists():
                         try:
-                            stats = extract_toolpath_stats(dxf_path)
+                            stats = get_toolpath_cache().get_stats(dxf_path)
                             toolpath_stats = ToolpathStats(
                                 cut_length_mm=stats.cut_length_mm,
                                 pierce_count=stats.pierce_count,
@@ -1812,6 +1827,11 @@ class NestingCostingWindow(ctk.CTkToplevel):
                         except Exception as e:
                             self._log(f"  {part['idx_code']}: BLAD - {e}", "WARN")
 
+                        outline = self._load_part_outline(dxf_path, part.get('idx_code') or f"PART-{i+1}")
+                        if outline:
+                            outline['qty'] = part.get('qty', 1)
+                            part_outlines.append(outline)
+
                     part_instance = PartInstance(
                         part_id=f"PART-{i+1}",
                         instance_id=f"INST-{group_key}-{i+1}",
@@ -1836,6 +1856,15 @@ class NestingCostingWindow(ctk.CTkToplevel):
                     sheet.used_length_y_mm = min(estimated_y, 3000)
                     self._log(f"  CUT_TO_LENGTH: estimated Y = {sheet.used_length_y_mm:.0f}mm", "CALC")
 
+                nested = self._nest_group_outlines(sheet, part_outlines, len(group_parts))
+                if nested:
+                    nester, result = nested
+                    self._sequence_group(sheet, result)
+                    if common_line:
+                        self._apply_common_lines(sheet, nester, result)
+                elif common_line:
+                    self._log("  Wspolne linie: brak obrysow wszystkich detali - pominiete", "WARN")
+
                 sheet.calculate_metrics()
                 nesting.sheets.append(sheet)
                 sheets_data.append(sheet.to_dict())
@@ -1867,6 +1896,56 @@ class NestingCostingWindow(ctk.CTkToplevel):
             traceback.print_exc()
             messagebox.showerror("Blad", f"Nie udalo sie utworzyc nestingu: {e}")
 
+    def _load_part_outline(self, dxf_path: str, name: str) -> Optional[Dict]:
+        """Real outer contour and holes of a part, in the form FastNester.add_part_from_dict takes."""
+        try:
+            from quotations.utils.dxf_loader import load_dxf
+            dxf_part = load_dxf(dxf_path)
+        except Exception as e:
+            self._log(f"  {name}: obrys DXF niedostepny - {e}", "WARN")
+            return None
+        if not dxf_part or not dxf_part.outer_contour:
+            return None
+        holes = [[(x - dxf_part.min_x, y - dxf_part.min_y) for x, y in hole] for hole in dxf_part.holes]
+        return {'name': name, 'width': dxf_part.width, 'height': dxf_part.height,
+                'contour': dxf_part.get_normalized_contour(), 'holes': holes,
+                'contour_area': dxf_part.contour_area}
+
+    def _nest_group_outlines(self, sheet, part_outlines: List[Dict], part_count: int):
+        """Nest the group's real outlines on the sheet; (nester, result) or None when an outline is missing."""
+        if not part_outlines or len(part_outlines) < part_count:
+            return None
+        try:
+            from quotations.nesting.fast_nester import FastNester
+        except ImportError as e:
+            self._log(f"  Nesting obrysow niedostepny ({e})", "WARN")
+            return None
+
+        nester = FastNester(sheet.sheet_width_mm, sheet.sheet_length_mm_nominal)
+        for outline in part_outlines:
+            nester.add_part_from_dict(outline, quantity=outline['qty'])
+        return nester, nester.run_nesting()
+
+    def _sequence_group(self, sheet, result):
+        """Cutting order of the nested group - rapid travel time for Variant B."""
+        if len(result.sheets) != 1:
+            self._log(f"  Sekwencja: grupa zajmuje {len(result.sheets)} arkuszy - przejazdy pominiete", "WARN")
+            return
+        from costing.toolpath.sheet_sequencer import sequence_nested_parts
+
+        sequence = sequence_nested_parts(result.sheets[0].placed_parts)
+        self.sheet_sequences[sheet.sheet_id] = sequence
+        self._log(f"  Sekwencja: {sequence.pierce_count} konturow, "
+                  f"przejazdy {sequence.rapid_length_mm / 1000:.1f}m", "CALC")
+
+    def _apply_common_lines(self, sheet, nester, result):
+        """Repack the nested group at kerf spacing and carry common-line savings to the sheet."""
+        from quotations.nesting.common_line import apply_common_lines
+
+        report = apply_common_lines(sheet, result.sheets, nester=nester)
+        self._log(f"  Wspolne linie: -{report.saved_cut_length_mm:.0f}mm ciecia, "
+                  f"-{report.saved_pierce_count} przebic", "CALC")
+
     def _calculate_costs(self):
         """Calculate costs using costing service."""
         if not self.nesting_result:
@@ -1936,7 +2015,8 @@ class NestingCostingWindow(ctk.CTkToplevel):
                 job_overrides,
                 self.pricing,
                 allocation_model=allocation,
-                buffer_factor=params['buffer_factor']
+                buffer_factor=params['buffer_factor'],
+                sheet_sequences=self.sheet_sequences
             )
 
             self.costing_result = result
@@ -1952,6 +2032,8 @@ class NestingCostingWindow(ctk.CTkToplevel):
                 self._log(f"  Ciecie (A): {sheet_cost.cut_cost_a_pln:.2f} PLN", "CALC")
                 self._log(f"  Przebicia (A): {sheet_cost.pierce_cost_a_pln:.2f} PLN", "CALC")
                 self._log(f"  Czas ciecia: {sheet_cost.cut_time_s:.1f}s", "CALC")
+                if sheet_cost.rapid_time_s:
+                    self._log(f"  Przejazdy: {sheet_cost.rapid_time_s:.1f}s", "CALC")
                 self._log(f"  Czas calkowity: {sheet_cost.total_time_s:.1f}s (z buforem)", "CALC")
                 self._log(f"  Laser (B): {sheet_cost.laser_cost_b_pln:.2f} PLN", "CALC")
 
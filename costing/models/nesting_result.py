@@ -155,6 +155,10 @@ class NestingSheet:
 
     preview_image_path: str = ""
 
+    # Common-line cutting: edge length cut once for two parts, pierces saved
+    common_line_saved_cut_mm: float = 0.0
+    common_line_saved_pierces: int = 0
+
     parts: List[PartInstance] = field(default_factory=list)
 
     def calculate_metrics(self):
@@ -187,6 +191,8 @@ class NestingSheet:
             'occupied_area_mm2': self.occupied_area_mm2,
             'utilization': self.utilization,
             'preview_image_path': self.preview_image_path,
+            'common_line_saved_cut_mm': self.common_line_saved_cut_mm,
+            'common_line_saved_pierces': self.common_line_saved_pierces,
             'parts': [p.to_dict() for p in self.parts]
         }
 
@@ -207,6 +213,8 @@ class NestingSheet:
             occupied_area_mm2=data.get('occupied_area_mm2', 0.0),
             utilization=data.get('utilization', 0.0),
             preview_image_path=data.get('preview_image_path', ''),
+            common_line_saved_cut_mm=data.get('common_line_saved_cut_mm', 0.0),
+            common_line_saved_pierces=data.get('common_line_saved_pierces', 0),
             parts=[PartInstance.from_dict(p) for p in data.get('parts', [])]
         )
 
@@ -277,6 +285,7 @@ class SheetCostBreakdown:
     cut_time_s: float = 0.0
     pierce_time_s: float = 0.0
     foil_time_s: float = 0.0
+    rapid_time_s: float = 0.0
     total_time_s: float = 0.0
     laser_cost_b_pln: float = 0.0
 
@@ -302,6 +311,7 @@ class SheetCostBreakdown:
             'cut_time_s': self.cut_time_s,
             'pierce_time_s': self.pierce_time_s,
             'foil_time_s': self.foil_time_s,
+            'rapid_time_s': self.rapid_time_s,
             'total_time_s': self.total_time_s,
             'laser_cost_b_pln': self.laser_cost_b_pln,
             'total_a': self.total_a(),
@@ -12,6 +12,19 @@ from .motion_planner import (
     m_min_to_mm_s,
     mm_s_to_m_min
 )
+from .vectorized_planner import (
+    HAS_NUMPY,
+    MotionArrays,
+    segments_to_arrays,
+    estimate_motion_time_arrays,
+    estimate_motion_time_batch,
+    estimate_motion_time_fast
+)
+from .part_time_model import (
+    PartTimeModel,
+    PartTimeModelCache,
+    get_part_time_cache
+)
 
 __all__ = [
     'MachineProfile',
@@ -23,5 +36,14 @@ __all__ = [
     'estimate_motion_time',
     'estimate_simple_time',
     'm_min_to_mm_s',
-    'mm_s_to_m_min'
+    'mm_s_to_m_min',
+    'HAS_NUMPY',
+    'MotionArrays',
+    'segments_to_arrays',
+    'estimate_motion_time_arrays',
+    'estimate_motion_time_batch',
+    'estimate_motion_time_fast',
+    'PartTimeModel',
+    'PartTimeModelCache',
+    'get_part_time_cache'
 ]
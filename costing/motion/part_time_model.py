@@ -0,0 +1,185 @@
+"""
+Part Time Model - motion time of a part type, computed once.
+
+A nesting result places the same part many times (300 copies of one
+bracket are common). Motion time of a part depends only on its toolpath
+(the DXF file content), the cutting speed (material + thickness) and the
+machine profile - not on where or how often it is placed. This module
+plans each part type once and memoizes the result per
+
+    (file content hash, material, thickness, v_max, machine profile)
+
+so all instances on all sheets reuse it.
+
+Toolpaths come from the persistent ToolpathCache; all part types missing
+from the memo are planned together in one vectorized batch.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, astuple
+from typing import Callable, Dict, Iterable, Optional
+
+from .motion_planner import MachineProfile, estimate_motion_time
+from .vectorized_planner import HAS_NUMPY, estimate_motion_time_batch
+
+if HAS_NUMPY:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PartTimeModel:
+    """Motion time of one instance of a part type."""
+    cutting_time_s: float
+    rapid_time_s: float
+    pierce_count: int
+
+    @property
+    def total_time_s(self) -> float:
+        return self.cutting_time_s + self.rapid_time_s
+
+
+class PartTimeModelCache:
+    """
+    In-memory memo of PartTimeModel per part type and cutting conditions.
+
+    Thread-safe; intended to be computed off the GUI thread.
+    """
+
+    def __init__(self, toolpath_cache=None):
+        """
+        Args:
+            toolpath_cache: ToolpathCache for toolpaths (default: shared cache)
+        """
+        if toolpath_cache is None:
+            from ..toolpath.toolpath_cache import get_toolpath_cache
+            toolpath_cache = get_toolpath_cache()
+        self.toolpath_cache = toolpath_cache
+        self._models: Dict[tuple, Optional[PartTimeModel]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, filepath: str, material: str, thickness: float,
+             machine: MachineProfile, v_max_mm_s: float) -> tuple:
+        return (self.toolpath_cache.content_hash(filepath), material, round(thickness, 3),
+                round(v_max_mm_s, 6), astuple(machine))
+
+    def get_models(self, filepaths: Iterable[str], material: str, thickness: float,
+                   machine: MachineProfile, v_max_mm_s: float,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   stop_flag: Optional[threading.Event] = None
+                   ) -> Dict[str, Optional[PartTimeModel]]:
+        """
+        Time models for many part types (one planning per unique file content).
+
+        Args:
+            filepaths: DXF files of the part types
+            material, thickness: Cutting conditions (part of the key)
+            machine: Machine dynamics profile
+            v_max_mm_s: Cutting speed for material + thickness
+            progress: callback(done, total) after each toolpath is loaded
+            stop_flag: Event that aborts loading (remaining files get None)
+
+        Returns:
+            {filepath: PartTimeModel or None when the toolpath is unavailable}
+        """
+        paths = list(dict.fromkeys(filepaths))
+        models: Dict[str, Optional[PartTimeModel]] = {}
+        missing: Dict[tuple, list] = {}
+
+        for path in paths:
+            try:
+                key = self._key(path, material, thickness, machine, v_max_mm_s)
+            except OSError as e:
+                logger.warning(f"Cannot read toolpath {path}: {e}")
+                models[path] = None
+                continue
+            with self._lock:
+                if key in self._models:
+                    self.hits += 1
+                    models[path] = self._models[key]
+                    continue
+                self.misses += 1
+            missing.setdefault(key, []).append(path)
+
+        total = len(missing)
+        if progress:
+            progress(0, total)
+
+        loaded = []
+        for done, (key, key_paths) in enumerate(missing.items(), 1):
+            if stop_flag is not None and stop_flag.is_set():
+                break
+            toolpath = self._load_toolpath(key_paths[0])
+            loaded.append((key, key_paths, toolpath))
+            if progress:
+                progress(done, total)
+
+        for (key, key_paths, _), model in zip(loaded, self._plan(loaded, machine, v_max_mm_s)):
+            with self._lock:
+                self._models[key] = model
+            for path in key_paths:
+                models[path] = model
+
+        for path in paths:
+            models.setdefault(path, None)
+        return models
+
+    def get_model(self, filepath: str, material: str, thickness: float,
+                  machine: MachineProfile, v_max_mm_s: float) -> Optional[PartTimeModel]:
+        """Time model of a single part type."""
+        return self.get_models([filepath], material, thickness, machine, v_max_mm_s)[filepath]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def _load_toolpath(self, filepath: str):
+        try:
+            if HAS_NUMPY:
+                return self.toolpath_cache.get_motion_arrays(filepath)
+            return self.toolpath_cache.get_motion_segments(filepath)
+        except Exception as e:
+            logger.error(f"Error loading toolpath {filepath}: {e}")
+            return None
+
+    def _plan(self, loaded, machine: MachineProfile, v_max_mm_s: float):
+        """PartTimeModel for each loaded toolpath (None when empty/unavailable)."""
+        valid = [toolpath for _, _, toolpath in loaded if toolpath is not None and len(toolpath)]
+        if HAS_NUMPY:
+            times = iter(estimate_motion_time_batch(valid, machine, v_max_mm_s))
+        else:
+            times = iter([estimate_motion_time(list(t), machine, v_max_mm_s) for t in valid])
+
+        models = []
+        for _, _, toolpath in loaded:
+            if toolpath is None or not len(toolpath):
+                models.append(None)
+                continue
+            cutting_time, rapid_time = next(times)
+            models.append(PartTimeModel(cutting_time, rapid_time, _pierce_count(toolpath)))
+        return models
+
+
+def _pierce_count(toolpath) -> int:
+    """Number of cutting contours (MotionArrays or MotionSegment list)."""
+    if HAS_NUMPY and hasattr(toolpath, 'contour_ids'):
+        return int(np.unique(toolpath.contour_ids[~toolpath.is_rapid]).size)
+    return len(set(s.contour_id for s in toolpath if not s.is_rapid))
+
+
+_default_cache: Optional[PartTimeModelCache] = None
+
+
+def get_part_time_cache() -> PartTimeModelCache:
+    """Shared in-memory memo (backed by the shared toolpath cache)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PartTimeModelCache()
+    return _default_cache
@@ -0,0 +1,259 @@
+"""
+Vectorized Motion Planner - NumPy version of the lookahead planner.
+
+Computes the same times as motion_planner.estimate_motion_time, but for
+flat arrays of segments covering many contours (whole part or whole sheet)
+without per-segment Python loops.
+
+Forward/backward passes in squared velocities are min-plus recurrences:
+
+    forward:   W[k] = min(W[k-1] + 2*a*L[k-1], cap[k])
+    backward:  B[k] = min(F[k], B[k+1] + 2*a*L[k])
+
+With prefix sums S of 2*a*L both have closed forms using cumulative
+minimum, so all contours are planned at once:
+
+    F = S + cummin(cap - S)
+    B = reverse_cummin(F + S) - S
+
+Contour start/end junctions have cap = 0, which makes the cumulative
+minimum restart at every contour boundary (each contour starts and ends
+at V=0).
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Tuple, Sequence, Optional
+
+from .motion_planner import MachineProfile, MotionSegment
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    logger.warning("numpy not installed - vectorized motion planner unavailable")
+
+
+@dataclass
+class MotionArrays:
+    """Flat segment arrays (angles in degrees, NaN = unknown direction)."""
+    lengths: 'np.ndarray'
+    start_angles: 'np.ndarray'
+    end_angles: 'np.ndarray'
+    contour_ids: 'np.ndarray'
+    is_rapid: 'np.ndarray'
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+
+def segments_to_arrays(segments: Sequence[MotionSegment]) -> MotionArrays:
+    """Convert MotionSegment list to flat arrays."""
+    nan = float('nan')
+    return MotionArrays(
+        lengths=np.fromiter((s.length_mm for s in segments), dtype=np.float64, count=len(segments)),
+        start_angles=np.fromiter(
+            (nan if s.start_angle_deg is None else s.start_angle_deg for s in segments),
+            dtype=np.float64, count=len(segments)),
+        end_angles=np.fromiter(
+            (nan if s.end_angle_deg is None else s.end_angle_deg for s in segments),
+            dtype=np.float64, count=len(segments)),
+        contour_ids=np.fromiter((s.contour_id for s in segments), dtype=np.int64, count=len(segments)),
+        is_rapid=np.fromiter((s.is_rapid for s in segments), dtype=bool, count=len(segments)),
+    )
+
+
+def concat_motion_arrays(items: Sequence[MotionArrays]) -> Tuple[MotionArrays, 'np.ndarray']:
+    """
+    Concatenate arrays of many toolpaths (e.g. all parts of a sheet).
+
+    Contour ids are renumbered so contours of different items never merge.
+
+    Returns:
+        (concatenated arrays, item index for each segment)
+    """
+    contour_ids = []
+    offset = 0
+    for item in items:
+        if len(item):
+            _, local = np.unique(item.contour_ids, return_inverse=True)
+            contour_ids.append(local.reshape(-1) + offset)
+            offset += int(local.max()) + 1
+        else:
+            contour_ids.append(np.zeros(0, dtype=np.int64))
+
+    owner = np.repeat(np.arange(len(items)), [len(item) for item in items])
+    arrays = MotionArrays(
+        lengths=np.concatenate([item.lengths for item in items]) if items else np.zeros(0),
+        start_angles=np.concatenate([item.start_angles for item in items]) if items else np.zeros(0),
+        end_angles=np.concatenate([item.end_angles for item in items]) if items else np.zeros(0),
+        contour_ids=np.concatenate(contour_ids) if items else np.zeros(0, dtype=np.int64),
+        is_rapid=np.concatenate([item.is_rapid for item in items]) if items else np.zeros(0, dtype=bool),
+    )
+    return arrays, owner
+
+
+def junction_speed_limits(angles: 'np.ndarray', machine: MachineProfile, v_max: float) -> 'np.ndarray':
+    """Vectorized corner_speed_limit / junction_deviation_speed."""
+    if machine.use_junction_deviation:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            half_theta = np.radians(180.0 - angles) / 2.0
+            sin_half = np.sin(half_theta)
+            cos_half = np.cos(half_theta)
+            radius = machine.junction_deviation_mm * sin_half / (1.0 - cos_half)
+            v = np.minimum(v_max, np.sqrt(machine.max_accel_mm_s2 * radius))
+        straight = (angles >= 179.0) | (half_theta < 0.001) | (sin_half < 0.001)
+        return np.where(straight, v_max, v)
+
+    a = np.clip(angles, 0.0, 180.0)
+    scale = 1.0 + (a - 90.0) / 90.0
+    v = np.minimum(v_max, machine.square_corner_velocity_mm_s * np.maximum(0.2, scale))
+    return np.where(a >= 179.0, v_max, v)
+
+
+def segment_times_trapezoid(lengths: 'np.ndarray', v_start: 'np.ndarray', v_end: 'np.ndarray',
+                            v_max: float, a_max: float) -> 'np.ndarray':
+    """Vectorized segment_time_trapezoid."""
+    if a_max <= 0:
+        return np.where(lengths > 0, lengths / max(1e-9, v_max), 0.0)
+
+    v_peak = np.minimum(v_max, np.sqrt(np.maximum(0.0, a_max * lengths + 0.5 * (v_start ** 2 + v_end ** 2))))
+
+    t1 = np.maximum(0.0, (v_peak - v_start) / a_max)
+    s1 = np.maximum(0.0, (v_peak ** 2 - v_start ** 2) / (2 * a_max))
+    t3 = np.maximum(0.0, (v_peak - v_end) / a_max)
+    s3 = np.maximum(0.0, (v_peak ** 2 - v_end ** 2) / (2 * a_max))
+    s2 = np.maximum(0.0, lengths - s1 - s3)
+    t2 = s2 / np.maximum(1e-9, v_peak)
+
+    return np.where(lengths > 0, t1 + t2 + t3, 0.0)
+
+
+def contour_times(lengths: 'np.ndarray', start_angles: 'np.ndarray', end_angles: 'np.ndarray',
+                  contour_ids: 'np.ndarray', machine: MachineProfile,
+                  v_max: float) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Plan all contours of one speed group at once.
+
+    Segments of a contour keep their relative order (they need not be
+    contiguous in the input, same as grouping by contour_id in
+    motion_planner._estimate_segment_group_time).
+
+    Returns:
+        (contour ids, time of each contour [s])
+    """
+    n = len(lengths)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    order = np.argsort(contour_ids, kind='stable')
+    L = lengths[order]
+    start_a = start_angles[order]
+    end_a = end_angles[order]
+    cid = contour_ids[order]
+
+    first = np.empty(n, dtype=bool)
+    first[0] = True
+    np.not_equal(cid[1:], cid[:-1], out=first[1:])
+
+    # Junction angles (like calculate_junction_angles), unknown => 90°
+    diff = np.abs(start_a[1:] - end_a[:-1])
+    diff = np.where(diff > 180.0, 360.0 - diff, diff)
+    angles = np.where(np.isnan(diff), 90.0, 180.0 - diff)
+
+    v_limit = np.empty(n)
+    v_limit[0] = 0.0
+    v_limit[1:] = junction_speed_limits(angles, machine, v_max)
+    cap = np.minimum(v_limit, v_max) ** 2
+    cap[first] = 0.0
+
+    # Junction sequence: start of every segment + end of every contour
+    a_max = machine.max_accel_mm_s2
+    contour_rank = np.cumsum(first) - 1
+    seg_pos = np.arange(n) + contour_rank
+    n_junctions = n + int(contour_rank[-1]) + 1
+
+    caps = np.zeros(n_junctions)
+    caps[seg_pos] = cap
+    step = np.zeros(n_junctions)
+    step[seg_pos] = 2.0 * a_max * L
+
+    S = np.concatenate(([0.0], np.cumsum(step[:-1])))
+
+    forward = S + np.minimum.accumulate(caps - S)
+    backward = np.minimum.accumulate((forward + S)[::-1])[::-1] - S
+    V = np.sqrt(np.maximum(backward, 0.0))
+
+    times = segment_times_trapezoid(L, V[seg_pos], V[seg_pos + 1], v_max, a_max)
+
+    starts = np.flatnonzero(first)
+    return cid[starts], np.add.reduceat(times, starts)
+
+
+def estimate_motion_time_arrays(arrays: MotionArrays, machine: MachineProfile,
+                                v_max_cutting: float) -> Tuple[float, float]:
+    """
+    Vectorized estimate_motion_time.
+
+    Returns:
+        Tuple of (cutting_time_s, rapid_time_s)
+    """
+    if len(arrays) == 0:
+        return 0.0, 0.0
+
+    result = []
+    for rapid, v_max in ((False, v_max_cutting), (True, machine.max_rapid_mm_s)):
+        mask = arrays.is_rapid == rapid
+        _, times = contour_times(arrays.lengths[mask], arrays.start_angles[mask],
+                                 arrays.end_angles[mask], arrays.contour_ids[mask],
+                                 machine, v_max)
+        result.append(float(times.sum()))
+
+    return result[0], result[1]
+
+
+def estimate_motion_time_batch(items: Sequence[MotionArrays], machine: MachineProfile,
+                               v_max_cutting: float) -> List[Tuple[float, float]]:
+    """
+    Motion times for many toolpaths (e.g. every part on a sheet) in one pass.
+
+    Returns:
+        [(cutting_time_s, rapid_time_s)] in the order of `items`
+    """
+    if not items:
+        return []
+
+    arrays, owner = concat_motion_arrays(items)
+    totals = np.zeros((2, len(items)))
+
+    for column, (rapid, v_max) in enumerate(((False, v_max_cutting), (True, machine.max_rapid_mm_s))):
+        mask = arrays.is_rapid == rapid
+        if not mask.any():
+            continue
+        cids, times = contour_times(arrays.lengths[mask], arrays.start_angles[mask],
+                                    arrays.end_angles[mask], arrays.contour_ids[mask],
+                                    machine, v_max)
+        # Contour ids are unique across items - map each contour back to its item
+        contour_owner = np.zeros(int(arrays.contour_ids.max()) + 1, dtype=np.int64)
+        contour_owner[arrays.contour_ids] = owner
+        totals[column] = np.bincount(contour_owner[cids], weights=times, minlength=len(items))
+
+    return [(float(c), float(r)) for c, r in zip(totals[0], totals[1])]
+
+
+def estimate_motion_time_fast(segments: Sequence[MotionSegment], machine: MachineProfile,
+                              v_max_cutting: float,
+                              arrays: Optional[MotionArrays] = None) -> Tuple[float, float]:
+    """
+    Drop-in replacement for estimate_motion_time (falls back to it without NumPy).
+    """
+    if not HAS_NUMPY:
+        from .motion_planner import estimate_motion_time
+        return estimate_motion_time(list(segments), machine, v_max_cutting)
+
+    if arrays is None:
+        arrays = segments_to_arrays(segments)
+    return estimate_motion_time_arrays(arrays, machine, v_max_cutting)
@@ -11,16 +11,17 @@ Usage:
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, Optional, Any
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from ..motion.motion_planner import (
-    MachineProfile, estimate_simple_time, estimate_motion_time, m_min_to_mm_s
-)
-from ..toolpath.dxf_extractor import (
-    extract_toolpath_stats, extract_motion_segments, ToolpathStats
+    MachineProfile, estimate_simple_time, m_min_to_mm_s
 )
+from ..motion.vectorized_planner import HAS_NUMPY, estimate_motion_time_fast, estimate_motion_time_arrays
+from ..toolpath.dxf_extractor import ToolpathStats
+from ..toolpath.toolpath_cache import ToolpathCache, get_toolpath_cache
+from ..toolpath.sheet_sequencer import SheetSequence
 from ..material.allocation import (
     SheetSpec, SheetMode as AllocSheetMode, MaterialSpec,
     PartPlacement, AllocationModel as AllocModel,
@@ -139,18 +140,21 @@ class NestingCostingService:
     """
 
     def __init__(self, machine_profile: Optional[MachineProfile] = None,
-                 use_detailed_motion_planning: bool = True):
+                 use_detailed_motion_planning: bool = True,
+                 toolpath_cache: Optional[ToolpathCache] = None):
         """
         Initialize costing service.
 
         Args:
             machine_profile: Machine dynamics profile (default if None)
             use_detailed_motion_planning: Use full lookahead algorithm with real segments
+            toolpath_cache: Persistent DXF toolpath cache (shared default if None)
         """
         self.machine_profile = machine_profile or MachineProfile()
         self.use_detailed_motion_planning = use_detailed_motion_planning
+        self.toolpath_cache = toolpath_cache or get_toolpath_cache()
         self._toolpath_cache: Dict[str, ToolpathStats] = {}
-        self._segments_cache: Dict[str, List] = {}  # Cache for detailed segments
+        self._segments_cache: Dict[str, Any] = {}  # Cache for detailed segments (arrays)
 
     def compute_part_stats_from_dxf(self, dxf_path: str) -> Dict:
         """
@@ -165,7 +169,7 @@ class NestingCostingService:
         if dxf_path in self._toolpath_cache:
             stats = self._toolpath_cache[dxf_path]
         else:
-            stats = extract_toolpath_stats(dxf_path)
+            stats = self.toolpath_cache.get_stats(dxf_path)
             self._toolpath_cache[dxf_path] = stats
 
         return {
@@ -182,7 +186,8 @@ class NestingCostingService:
     def estimate_sheet_times(
         self,
         sheet: NestingSheet,
-        pricing: PricingConfig
+        pricing: PricingConfig,
+        sequence: Optional[SheetSequence] = None
     ) -> Dict[str, float]:
         """
         Estimate cutting times for a sheet.
@@ -190,6 +195,7 @@ class NestingCostingService:
         Args:
             sheet: Sheet with parts
             pricing: Pricing configuration
+            sequence: Cutting order of the sheet (adds rapid travel time)
 
         Returns:
             Dict with time estimates
@@ -197,6 +203,7 @@ class NestingCostingService:
         total_cut_time = 0.0
         total_pierce_time = 0.0
         total_foil_time = 0.0
+        total_cut_length = 0.0
 
         v_max = pricing.get_cutting_speed(sheet.material_id, sheet.thickness_mm)
         pierce_time = pricing.get_pierce_time(sheet.material_id, sheet.thickness_mm)
@@ -213,16 +220,24 @@ class NestingCostingService:
                     # Try to get cached segments
                     dxf_path = part.dxf_storage_path
                     if dxf_path not in self._segments_cache:
-                        segments = extract_motion_segments(str(dxf_path))
+                        if HAS_NUMPY:
+                            segments = self.toolpath_cache.get_motion_arrays(str(dxf_path))
+                        else:
+                            segments = self.toolpath_cache.get_motion_segments(str(dxf_path))
                         self._segments_cache[dxf_path] = segments
                     else:
                         segments = self._segments_cache[dxf_path]
 
                     # Use detailed motion planning with full lookahead
                     v_max_mm_s = m_min_to_mm_s(v_max)
-                    cut_time, rapid_time = estimate_motion_time(
-                        segments, self.machine_profile, v_max_mm_s
-                    )
+                    if HAS_NUMPY:
+                        cut_time, rapid_time = estimate_motion_time_arrays(
+                            segments, self.machine_profile, v_max_mm_s
+                        )
+                    else:
+                        cut_time, rapid_time = estimate_motion_time_fast(
+                            segments, self.machine_profile, v_max_mm_s
+                        )
                     logger.debug(f"Part {part.idx_code}: detailed motion time = {cut_time:.2f}s")
                 except Exception as e:
                     logger.warning(f"Detailed motion planning failed for {part.idx_code}: {e}")
@@ -242,6 +257,15 @@ class NestingCostingService:
 
             total_cut_time += cut_time * part.qty_in_sheet
             total_pierce_time += stats.pierce_count * pierce_time * part.qty_in_sheet
+            total_cut_length += stats.cut_length_mm * part.qty_in_sheet
+
+        # Common-line cutting: shared edges cut once, joined parts pierced once
+        if sheet.common_line_saved_cut_mm > 0 and total_cut_length > 0:
+            saved_ratio = min(sheet.common_line_saved_cut_mm / total_cut_length, 1.0)
+            total_cut_time *= 1.0 - saved_ratio
+        total_pierce_time = max(
+            total_pierce_time - sheet.common_line_saved_pierces * pierce_time, 0.0
+        )
 
         # Foil removal time (if enabled)
         if sheet.sheet_area_used_mm2 > 0:
@@ -249,11 +273,15 @@ class NestingCostingService:
             foil_distance_m = foil_area_m2 * 100  # Approximate: 100m per m²
             total_foil_time = (foil_distance_m / pricing.foil_removal_speed_m_min) * 60
 
+        # Rapid travel between contours (requires sheet sequence)
+        total_rapid_time = sequence.rapid_time_s(self.machine_profile) if sequence else 0.0
+
         return {
             'cut_time_s': total_cut_time,
             'pierce_time_s': total_pierce_time,
             'foil_time_s': total_foil_time,
-            'total_base_time_s': total_cut_time + total_pierce_time
+            'rapid_time_s': total_rapid_time,
+            'total_base_time_s': total_cut_time + total_pierce_time + total_rapid_time
         }
 
     def allocate_material_costs(
@@ -309,7 +337,8 @@ class NestingCostingService:
         job_overrides: JobOverrides,
         pricing: PricingConfig,
         allocation_model: AllocationModel = AllocationModel.OCCUPIED_AREA,
-        buffer_factor: float = 1.25
+        buffer_factor: float = 1.25,
+        sheet_sequences: Optional[Dict[str, SheetSequence]] = None
     ) -> CostingSummary:
         """
         Compute complete costing for nesting result.
@@ -322,6 +351,8 @@ class NestingCostingService:
             pricing: Pricing configuration
             allocation_model: Material cost allocation method
             buffer_factor: Time buffer multiplier for Variant B (default 1.25 = +25%)
+            sheet_sequences: {sheet_id: SheetSequence} - adds rapid travel
+                time to Variant B for sequenced sheets
 
         Returns:
             CostingSummary with complete breakdown
@@ -347,7 +378,8 @@ class NestingCostingService:
 
         for sheet in nesting_result.sheets:
             sheet_breakdown = self._calculate_sheet_costs(
-                sheet, pricing, job_overrides, allocation_model, buffer_factor, summary
+                sheet, pricing, job_overrides, allocation_model, buffer_factor, summary,
+                (sheet_sequences or {}).get(sheet.sheet_id)
             )
             summary.sheet_costs.append(sheet_breakdown)
 
@@ -372,7 +404,8 @@ class NestingCostingService:
         job_overrides: JobOverrides,
         allocation_model: AllocationModel,
         buffer_factor: float,
-        summary: CostingSummary
+        summary: CostingSummary,
+        sequence: Optional[SheetSequence] = None
     ) -> SheetCostBreakdown:
         """Calculate costs for a single sheet."""
         breakdown = SheetCostBreakdown(sheet_id=sheet.sheet_id)
@@ -394,11 +427,12 @@ class NestingCostingService:
         )
 
         # Estimate times
-        times = self.estimate_sheet_times(sheet, pricing)
+        times = self.estimate_sheet_times(sheet, pricing, sequence)
 
         breakdown.cut_time_s = times['cut_time_s']
         breakdown.pierce_time_s = times['pierce_time_s']
         breakdown.foil_time_s = times['foil_time_s']
+        breakdown.rapid_time_s = times['rapid_time_s']
 
         # Operational cost
         breakdown.operational_cost_pln = job_overrides.operational_cost_per_sheet_pln
@@ -414,8 +448,12 @@ class NestingCostingService:
             for p in sheet.parts
         )
 
+        # Common-line cutting reduces billed length and pierces
+        billed_cut_length_m = max(total_cut_length_m - sheet.common_line_saved_cut_mm / 1000.0, 0.0)
+        total_pierces = max(total_pierces - sheet.common_line_saved_pierces, 0)
+
         cutting_price = pricing.get_cutting_price(sheet.material_id, sheet.thickness_mm)
-        breakdown.cut_cost_a_pln = total_cut_length_m * cutting_price
+        breakdown.cut_cost_a_pln = billed_cut_length_m * cutting_price
 
         if job_overrides.include_piercing:
             pierce_cost = pricing.get_pierce_cost(sheet.material_id, sheet.thickness_mm)
@@ -425,7 +463,7 @@ class NestingCostingService:
             breakdown.foil_cost_a_pln = area_m2 * pricing.foil_cost_per_m2
 
         # Variant B: Time-based
-        base_time_s = breakdown.cut_time_s
+        base_time_s = breakdown.cut_time_s + breakdown.rapid_time_s
 
         if job_overrides.include_piercing:
             base_time_s += breakdown.pierce_time_s
@@ -0,0 +1,75 @@
+"""
+Tests for per-part-type motion time memoization.
+"""
+
+import sys
+import shutil
+from pathlib import Path
+
+import pytest
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+pytest.importorskip("ezdxf")
+
+from costing.motion.motion_planner import MachineProfile, estimate_motion_time
+from costing.motion.part_time_model import PartTimeModelCache
+from costing.toolpath.dxf_extractor import extract_motion_segments
+from costing.toolpath.toolpath_cache import ToolpathCache
+
+TEST_DXF_DIR = Path(__file__).parent / "test_dxfs"
+
+pytestmark = pytest.mark.skipif(not TEST_DXF_DIR.exists(), reason="test DXF files not available")
+
+V_MAX = 100.0
+
+
+def test_models_match_motion_planner(tmp_path):
+    cache = PartTimeModelCache(ToolpathCache(tmp_path / "cache"))
+    machine = MachineProfile()
+    paths = [str(p) for p in sorted(TEST_DXF_DIR.glob("*.dxf"))[:3]]
+
+    models = cache.get_models(paths, "S235", 2.0, machine, V_MAX)
+
+    for path in paths:
+        segments = extract_motion_segments(path)
+        cutting, rapid = estimate_motion_time(segments, machine, V_MAX)
+        assert models[path].cutting_time_s == pytest.approx(cutting, rel=1e-9)
+        assert models[path].rapid_time_s == pytest.approx(rapid, rel=1e-9, abs=1e-12)
+        assert models[path].pierce_count == len({s.contour_id for s in segments if not s.is_rapid})
+
+
+def test_part_type_planned_once_per_conditions(tmp_path):
+    toolpaths = ToolpathCache(tmp_path / "cache")
+    cache = PartTimeModelCache(toolpaths)
+    machine = MachineProfile()
+
+    source = sorted(TEST_DXF_DIR.glob("*.dxf"))[0]
+    copies = []
+    for i in range(3):
+        copy = tmp_path / f"copy_{i}.dxf"
+        shutil.copy(source, copy)
+        copies.append(str(copy))
+
+    progress = []
+    models = cache.get_models(copies, "S235", 2.0, machine, V_MAX,
+                              progress=lambda done, total: progress.append((done, total)))
+
+    # Same content => one planning shared by all copies
+    assert progress == [(0, 1), (1, 1)]
+    assert len({id(m) for m in models.values()}) == 1
+    assert len(cache) == 1
+
+    assert cache.get_model(copies[0], "S235", 2.0, machine, V_MAX) is models[copies[0]]
+    assert cache.hits == 1
+
+    faster = cache.get_model(copies[0], "S235", 2.0, MachineProfile(max_accel_mm_s2=8000.0), V_MAX)
+    assert faster.cutting_time_s < models[copies[0]].cutting_time_s
+    cache.get_model(copies[0], "INOX304", 2.0, machine, V_MAX)
+    assert len(cache) == 3
+
+
+def test_missing_file_has_no_model(tmp_path):
+    cache = PartTimeModelCache(ToolpathCache(tmp_path / "cache"))
+    assert cache.get_model(str(tmp_path / "missing.dxf"), "S235", 2.0, MachineProfile(), V_MAX) is None
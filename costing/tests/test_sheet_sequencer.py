@@ -0,0 +1,142 @@
+"""
+Tests for sheet contour sequencing and rapid moves.
+"""
+
+import sys
+import math
+import random
+from pathlib import Path
+
+import pytest
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from costing.motion.motion_planner import MachineProfile
+from costing.toolpath.sheet_sequencer import (
+    SheetContour, SheetSequence, _GridIndex, estimate_sheet_time,
+    sequence_contours, sequence_nested_parts
+)
+
+
+class FakePart:
+    """Placed part with the NestedPart contour interface."""
+
+    def __init__(self, x, y, w=60.0, h=40.0, holes=3):
+        self.outer = [(x, y), (x + w, y), (x + w, y + h), (x, y + h), (x, y)]
+        self.holes = [[(x + 10 + k * 15, y + 10), (x + 15 + k * 15, y + 10),
+                       (x + 15 + k * 15, y + 15), (x + 10 + k * 15, y + 15)]
+                      for k in range(holes)]
+
+    def get_placed_contour(self):
+        return self.outer
+
+    def get_placed_holes(self):
+        return self.holes
+
+
+def grid_parts(cols=12, rows=8):
+    return [FakePart(i * 70.0, j * 50.0) for i in range(cols) for j in range(rows)]
+
+
+def test_grid_index_matches_brute_force():
+    rng = random.Random(3)
+    points = [(rng.uniform(0, 3000), rng.uniform(0, 1500)) for _ in range(500)]
+    index = _GridIndex(points)
+    for i in range(len(points)):
+        index.insert(i)
+
+    for _ in range(50):
+        p = (rng.uniform(-500, 3500), rng.uniform(-500, 2000))
+        expected = sorted(range(len(points)), key=lambda i: math.dist(p, points[i]))[:5]
+        assert index.nearest(p, 5) == expected
+
+
+def test_holes_cut_before_outer_contour():
+    sequence = sequence_nested_parts(grid_parts())
+
+    assert sequence.pierce_count == 12 * 8 * 4
+    outer_done = set()
+    for contour in sequence.contours:
+        if contour.is_hole:
+            assert contour.part_index not in outer_done
+        else:
+            outer_done.add(contour.part_index)
+    assert len(outer_done) == 12 * 8
+
+
+def test_improvement_shortens_rapids():
+    rng = random.Random(7)
+    parts = grid_parts()
+    contours = [c for p_idx, part in enumerate(parts)
+                for c in [SheetContour(list(h), p_idx, True) for h in part.get_placed_holes()]
+                + [SheetContour(list(part.get_placed_contour()), p_idx)]]
+    rng.shuffle(contours)
+
+    greedy = sequence_contours([SheetContour(list(c.points), c.part_index, c.is_hole) for c in contours],
+                               improve=False)
+    improved = sequence_contours(contours)
+
+    assert improved.rapid_length_mm < greedy.rapid_length_mm
+    # Rapids lead exactly to each pierce point
+    position = improved.start
+    for rapid, contour in zip(improved.rapid_segments, improved.contours):
+        assert rapid.is_rapid
+        assert rapid.length_mm == pytest.approx(math.dist(position, contour.pierce_point))
+        position = contour.pierce_point
+
+
+def test_sheet_time_includes_rapids_and_pierces():
+    machine = MachineProfile()
+    sequence = sequence_nested_parts(grid_parts(3, 2), end=(0.0, 0.0))
+
+    times = estimate_sheet_time(sequence, machine, 100.0, pierce_time_s=0.5)
+
+    assert times.rapid_time_s == pytest.approx(sequence.rapid_time_s(machine))
+    assert times.rapid_time_s > sequence.rapid_length_mm / machine.max_rapid_mm_s
+    assert times.cutting_time_s > sequence.cut_length_mm / 100.0
+    assert times.pierce_time_s == pytest.approx(sequence.pierce_count * 0.5)
+
+    given = estimate_sheet_time(sequence, machine, 100.0,
+                                part_cutting_times={i: 10.0 for i in range(6)})
+    assert given.cutting_time_s == pytest.approx(60.0)
+    assert given.rapid_time_s == pytest.approx(times.rapid_time_s)
+
+    segments = sequence.motion_segments()
+    assert sum(s.length_mm for s in segments if s.is_rapid) == pytest.approx(sequence.rapid_length_mm)
+    assert sum(s.length_mm for s in segments if not s.is_rapid) == pytest.approx(sequence.cut_length_mm)
+
+
+def test_empty_sheet():
+    sequence = sequence_contours([])
+    assert sequence == SheetSequence()
+    assert estimate_sheet_time(sequence, MachineProfile(), 100.0).total_time_s == 0.0
+
+
+def test_variant_b_includes_sequenced_rapids():
+    from costing.services.costing_service import (
+        NestingCostingService, JobOverrides, create_default_pricing
+    )
+    from costing.models.nesting_result import (
+        NestingResult, NestingSheet, PartInstance, ToolpathStats
+    )
+
+    sheet = NestingSheet(sheet_id="SHEET-1", material_id="S355", thickness_mm=3.0)
+    sheet.parts = [PartInstance(part_id="P1", instance_id="I1", qty_in_sheet=6,
+                                occupied_area_mm2=2400,
+                                toolpath_stats=ToolpathStats(cut_length_mm=260, pierce_count=4))]
+    sheet.calculate_metrics()
+    nesting = NestingResult(sheets=[sheet])
+
+    service = NestingCostingService(use_detailed_motion_planning=False)
+    pricing = create_default_pricing()
+    sequence = sequence_nested_parts(grid_parts(3, 2))
+
+    plain = service.compute_costing(nesting, JobOverrides(), pricing, buffer_factor=1.0)
+    sequenced = service.compute_costing(nesting, JobOverrides(), pricing, buffer_factor=1.0,
+                                        sheet_sequences={"SHEET-1": sequence})
+
+    rapid = sequenced.sheet_costs[0].rapid_time_s
+    assert plain.sheet_costs[0].rapid_time_s == 0.0
+    assert rapid == pytest.approx(sequence.rapid_time_s(service.machine_profile))
+    assert sequenced.sheet_costs[0].total_time_s == pytest.approx(plain.sheet_costs[0].total_time_s + rapid)
@@ -0,0 +1,89 @@
+"""
+Tests for the persistent DXF toolpath cache.
+"""
+
+import sys
+import shutil
+from pathlib import Path
+
+import pytest
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+ezdxf = pytest.importorskip("ezdxf")
+
+from costing.motion.vectorized_planner import HAS_NUMPY
+from costing.toolpath import dxf_extractor
+from costing.toolpath.toolpath_cache import ToolpathCache
+
+TEST_DXF_DIR = Path(__file__).parent / "test_dxfs"
+
+pytestmark = pytest.mark.skipif(not TEST_DXF_DIR.exists(), reason="test DXF files not available")
+
+
+def sample_dxf(tmp_path: Path, name: str = "part.dxf") -> Path:
+    source = sorted(TEST_DXF_DIR.glob("*.dxf"))[0]
+    target = tmp_path / name
+    shutil.copy(source, target)
+    return target
+
+
+def count_parsing(monkeypatch) -> list:
+    calls = []
+    readfile = dxf_extractor.ezdxf.readfile
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return readfile(*args, **kwargs)
+
+    monkeypatch.setattr(dxf_extractor.ezdxf, "readfile", counting)
+    return calls
+
+
+def test_stats_cached_by_content(tmp_path, monkeypatch):
+    cache = ToolpathCache(tmp_path / "cache")
+    dxf = sample_dxf(tmp_path)
+
+    stats = cache.get_stats(dxf)
+    assert stats == dxf_extractor.extract_toolpath_stats(str(dxf))
+
+    # Same content under another name => no parsing
+    copy = sample_dxf(tmp_path, "renamed.dxf")
+    parsed = count_parsing(monkeypatch)
+    assert cache.get_stats(copy) == stats
+    assert cache.hits == 1 and not parsed
+
+    # Other settings => different key
+    cache.get_stats(dxf, tolerance_mm=0.05)
+    assert len(parsed) == 1
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed")
+def test_segments_round_trip(tmp_path, monkeypatch):
+    cache = ToolpathCache(tmp_path / "cache")
+    dxf = sample_dxf(tmp_path)
+    expected = dxf_extractor.extract_motion_segments(str(dxf))
+
+    assert cache.get_motion_segments(dxf) == expected
+
+    parsed = count_parsing(monkeypatch)
+    assert cache.get_motion_segments(dxf) == expected
+    assert len(cache.get_motion_arrays(dxf)) == len(expected)
+    assert not parsed
+
+
+def test_changed_file_misses_and_lru_eviction(tmp_path):
+    cache = ToolpathCache(tmp_path / "cache", max_entries=2)
+    dxfs = [sample_dxf(tmp_path, f"p{i}.dxf") for i in range(3)]
+    for i, dxf in enumerate(dxfs):
+        with open(dxf, "a") as f:
+            f.write(f"999\nvariant {i}\n")
+
+    for dxf in dxfs:
+        cache.get_stats(dxf)
+
+    assert len(cache) == 2
+    assert cache.misses == 3
+    cache.get_stats(dxfs[2])
+    assert cache.hits == 1
@@ -0,0 +1,76 @@
+"""
+Tests for the vectorized (NumPy) motion planner.
+
+The vectorized planner must return the same times as the reference
+pure-Python planner (motion_planner.estimate_motion_time).
+"""
+
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from costing.motion.motion_planner import MachineProfile, MotionSegment, estimate_motion_time
+from costing.motion.vectorized_planner import (
+    HAS_NUMPY, segments_to_arrays, estimate_motion_time_batch, estimate_motion_time_fast
+)
+
+pytestmark = pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed")
+
+TEST_DXF_DIR = Path(__file__).parent / "test_dxfs"
+REL_TOLERANCE = 1e-9
+
+
+def random_segments(rnd: random.Random, count: int, contours: int):
+    segments = []
+    for _ in range(count):
+        start = rnd.choice([None, rnd.uniform(-180, 360)])
+        end = rnd.choice([None, start, rnd.uniform(-180, 360)])
+        length = rnd.choice([0.0, rnd.uniform(0, 2), rnd.uniform(0, 300)])
+        segments.append(MotionSegment(length, start, end, rnd.random() < 0.1, rnd.randrange(contours)))
+    return segments
+
+
+def assert_close(expected, actual):
+    for e, a in zip(expected, actual):
+        assert a == pytest.approx(e, rel=REL_TOLERANCE, abs=1e-12)
+
+
+@pytest.mark.parametrize("use_junction_deviation", [False, True])
+def test_matches_reference_on_random_toolpaths(use_junction_deviation):
+    rnd = random.Random(42)
+    machine = MachineProfile(use_junction_deviation=use_junction_deviation)
+
+    for _ in range(300):
+        segments = random_segments(rnd, rnd.randint(0, 60), rnd.randint(1, 8))
+        v_max = rnd.uniform(5, 300)
+        assert_close(estimate_motion_time(segments, machine, v_max),
+                     estimate_motion_time_fast(segments, machine, v_max))
+
+
+def test_batch_matches_per_toolpath_reference():
+    rnd = random.Random(7)
+    machine = MachineProfile()
+    toolpaths = [random_segments(rnd, rnd.randint(0, 40), rnd.randint(1, 5)) for _ in range(50)]
+
+    batch = estimate_motion_time_batch([segments_to_arrays(s) for s in toolpaths], machine, 60.0)
+
+    assert len(batch) == len(toolpaths)
+    for segments, times in zip(toolpaths, batch):
+        assert_close(estimate_motion_time(segments, machine, 60.0), times)
+
+
+@pytest.mark.skipif(not TEST_DXF_DIR.exists(), reason="test DXF files not available")
+def test_matches_reference_on_real_dxf():
+    pytest.importorskip("ezdxf")
+    from costing.toolpath.dxf_extractor import extract_motion_segments
+
+    machine = MachineProfile()
+    for dxf in sorted(TEST_DXF_DIR.glob("*.dxf")):
+        segments = extract_motion_segments(str(dxf))
+        assert_close(estimate_motion_time(segments, machine, 50.0),
+                     estimate_motion_time_fast(segments, machine, 50.0))
@@ -6,10 +6,29 @@ from .dxf_extractor import (
     ToolpathStats,
     ExtractedContour
 )
+from .toolpath_cache import ToolpathCache, get_toolpath_cache
+from .sheet_sequencer import (
+    SheetContour,
+    SheetSequence,
+    SheetTime,
+    contours_from_nested_parts,
+    sequence_contours,
+    sequence_nested_parts,
+    estimate_sheet_time
+)
 
 __all__ = [
     'extract_toolpath_stats',
     'extract_motion_segments',
     'ToolpathStats',
-    'ExtractedContour'
+    'ExtractedContour',
+    'ToolpathCache',
+    'get_toolpath_cache',
+    'SheetContour',
+    'SheetSequence',
+    'SheetTime',
+    'contours_from_nested_parts',
+    'sequence_contours',
+    'sequence_nested_parts',
+    'estimate_sheet_time'
 ]
@@ -11,6 +11,7 @@ Extracts:
 """
 
 import math
+import logging
 from typing import List, Dict, Tuple, Optional, Set
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -31,6 +32,8 @@ except ImportError:
 
 from ..motion.motion_planner import MotionSegment
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class ToolpathStats:
@@ -401,7 +404,8 @@ def extract_spline_segments(entity, tolerance_mm: float = 0.2) -> List[MotionSeg
 def extract_toolpath_stats(dxf_path: str,
                            ignore_layers: Optional[Set[str]] = None,
                            marking_keywords: Optional[Set[str]] = None,
-                           tolerance_mm: float = 0.2) -> ToolpathStats:
+                           tolerance_mm: float = 0.2,
+                           doc=None) -> ToolpathStats:
     """
     Extract toolpath statistics from a DXF file.
 
@@ -410,6 +414,7 @@ def extract_toolpath_stats(dxf_path: str,
         ignore_layers: Layer names to skip (default: standard non-cutting layers)
         marking_keywords: Keywords for marking/engraving layers
         tolerance_mm: Tolerance for arc/spline approximation
+        doc: Already loaded ezdxf document (skips reading dxf_path)
 
     Returns:
         ToolpathStats with extracted statistics
@@ -426,10 +431,11 @@ def extract_toolpath_stats(dxf_path: str,
     all_segments: List[MotionSegment] = []
     all_points: List[Tuple[float, float]] = []
 
-    try:
-        doc = ezdxf.readfile(dxf_path)
-    except Exception as e:
-        raise ValueError(f"Cannot read DXF file: {e}")
+    if doc is None:
+        try:
+            doc = ezdxf.readfile(dxf_path)
+        except Exception as e:
+            raise ValueError(f"Cannot read DXF file: {e}")
 
     msp = doc.modelspace()
 
@@ -652,7 +658,8 @@ def _points_close(p1: Tuple[float, float], p2: Tuple[float, float],
 
 def extract_motion_segments(dxf_path: str,
                             ignore_layers: Optional[Set[str]] = None,
-                            tolerance_mm: float = 0.2) -> List[MotionSegment]:
+                            tolerance_mm: float = 0.2,
+                            doc=None) -> List[MotionSegment]:
     """
     Extract all motion segments from a DXF file.
 
@@ -664,6 +671,7 @@ def extract_motion_segments(dxf_path: str,
         dxf_path: Path to DXF file
         ignore_layers: Layer names to skip
         tolerance_mm: Tolerance for arc/spline approximation
+        doc: Already loaded ezdxf document (skips reading dxf_path)
 
     Returns:
         List of MotionSegment objects with contour_id assigned
@@ -677,7 +685,8 @@ def extract_motion_segments(dxf_path: str,
     segments: List[MotionSegment] = []
     contour_id = 0  # Counter for unique contour IDs
 
-    doc = ezdxf.readfile(dxf_path)
+    if doc is None:
+        doc = ezdxf.readfile(dxf_path)
     msp = doc.modelspace()
 
     for entity in msp:
@@ -720,7 +729,8 @@ class EngravingInfo:
 
 
 def extract_engraving_info(dxf_path: str,
-                           marking_keywords: Optional[Set[str]] = None) -> EngravingInfo:
+                           marking_keywords: Optional[Set[str]] = None,
+                           doc=None) -> EngravingInfo:
     """
     Extract engraving/marking information from a DXF file.
 
@@ -730,6 +740,7 @@ def extract_engraving_info(dxf_path: str,
     Args:
         dxf_path: Path to DXF file
         marking_keywords: Keywords to identify marking layers (default: standard keywords)
+        doc: Already loaded ezdxf document (skips reading dxf_path)
 
     Returns:
         EngravingInfo with engraving length and layer information
@@ -746,7 +757,8 @@ def extract_engraving_info(dxf_path: str,
     engraving_length = 0.0
 
     try:
-        doc = ezdxf.readfile(dxf_path)
+        if doc is None:
+            doc = ezdxf.readfile(dxf_path)
         msp = doc.modelspace()
 
         for entity in msp:
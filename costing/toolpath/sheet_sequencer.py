@@ -0,0 +1,430 @@
+"""
+Sheet Sequencer - cutting order and rapid moves for a nested sheet.
+
+Per-part toolpaths know nothing about where the part sits on the sheet,
+so the laser-off travel between contours was never planned. This module
+orders all contours of all parts placed on a sheet and generates the
+rapid moves between them:
+
+    1. holes of a part are cut before its outer contour (the part must not
+       drop out of the skeleton while holes are still being cut),
+    2. greedy nearest-neighbour order from the machine origin, with
+       a uniform grid as spatial index for the candidate lookup,
+    3. 2-opt improvement over grid neighbour lists (moves that would put
+       an outer contour before one of its holes are rejected),
+    4. pierce point of each contour moved to the vertex closest to the
+       neighbouring pierces.
+
+Usage:
+    sequence = sequence_nested_parts(sheet.placed_parts)
+    times = estimate_sheet_time(sequence, machine, v_max_mm_s, pierce_time_s=0.5)
+"""
+
+import math
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..motion.motion_planner import MachineProfile, MotionSegment
+from ..motion.vectorized_planner import estimate_motion_time_fast
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[float, float]
+
+# Candidates examined per contour in 2-opt
+NEIGHBOUR_COUNT = 8
+
+# Improvements below this are ignored (mm)
+MIN_GAIN_MM = 1e-6
+
+
+@dataclass
+class SheetContour:
+    """Closed contour placed on the sheet (sheet coordinates)."""
+    points: List[Point]
+    part_index: int
+    is_hole: bool = False
+    pierce_index: int = 0
+
+    def __post_init__(self):
+        if len(self.points) > 1 and self.points[0] == self.points[-1]:
+            self.points = list(self.points[:-1])
+
+    @property
+    def pierce_point(self) -> Point:
+        return self.points[self.pierce_index]
+
+    @property
+    def length_mm(self) -> float:
+        n = len(self.points)
+        return sum(_dist(self.points[i], self.points[(i + 1) % n]) for i in range(n)) if n > 1 else 0.0
+
+    def cutting_segments(self, contour_id: int) -> List[MotionSegment]:
+        """Closed path from the pierce point back to it."""
+        n = len(self.points)
+        segments = []
+        for k in range(n):
+            a = self.points[(self.pierce_index + k) % n]
+            b = self.points[(self.pierce_index + k + 1) % n]
+            length = _dist(a, b)
+            if length < 0.001:
+                continue
+            angle = math.degrees(math.atan2(b[1] - a[1], b[0] - a[0]))
+            segments.append(MotionSegment(length, angle, angle, False, contour_id))
+        return segments
+
+
+@dataclass
+class SheetSequence:
+    """Cutting order of a sheet with the rapid moves between contours."""
+    contours: List[SheetContour] = field(default_factory=list)
+    rapid_segments: List[MotionSegment] = field(default_factory=list)
+    start: Point = (0.0, 0.0)
+
+    @property
+    def rapid_length_mm(self) -> float:
+        return sum(s.length_mm for s in self.rapid_segments)
+
+    @property
+    def cut_length_mm(self) -> float:
+        return sum(c.length_mm for c in self.contours)
+
+    @property
+    def pierce_count(self) -> int:
+        return len(self.contours)
+
+    def rapid_time_s(self, machine: MachineProfile) -> float:
+        """Time of all rapid moves (each move starts and ends at rest)."""
+        return estimate_motion_time_fast(self.rapid_segments, machine, machine.max_rapid_mm_s)[1]
+
+    def motion_segments(self) -> List[MotionSegment]:
+        """Complete sheet toolpath: rapid to each pierce, then the contour."""
+        segments = []
+        rapids = {int(s.contour_id): s for s in self.rapid_segments}
+        for i, contour in enumerate(self.contours):
+            rapid = rapids.get(2 * i)
+            if rapid is not None:
+                segments.append(rapid)
+            segments.extend(contour.cutting_segments(2 * i + 1))
+        final = rapids.get(2 * len(self.contours))
+        if final is not None:
+            segments.append(final)
+        return segments
+
+
+@dataclass
+class SheetTime:
+    """Machine time of a sequenced sheet."""
+    cutting_time_s: float = 0.0
+    rapid_time_s: float = 0.0
+    pierce_time_s: float = 0.0
+
+    @property
+    def total_time_s(self) -> float:
+        return self.cutting_time_s + self.rapid_time_s + self.pierce_time_s
+
+
+class _GridIndex:
+    """Uniform grid over points for nearest-neighbour queries."""
+
+    def __init__(self, points: Sequence[Point], cell_size: Optional[float] = None):
+        self.points = points
+        if cell_size is None:
+            cell_size = _default_cell_size(points)
+        self.cell = cell_size
+        self.cells: Dict[Tuple[int, int], set] = {}
+        self.count = 0
+        keys = [self._key(p) for p in points] or [(0, 0)]
+        self.bounds = (min(k[0] for k in keys), max(k[0] for k in keys),
+                       min(k[1] for k in keys), max(k[1] for k in keys))
+
+    def _key(self, p: Point) -> Tuple[int, int]:
+        return int(math.floor(p[0] / self.cell)), int(math.floor(p[1] / self.cell))
+
+    def insert(self, idx: int) -> None:
+        self.cells.setdefault(self._key(self.points[idx]), set()).add(idx)
+        self.count += 1
+
+    def remove(self, idx: int) -> None:
+        key = self._key(self.points[idx])
+        bucket = self.cells[key]
+        bucket.discard(idx)
+        if not bucket:
+            del self.cells[key]
+        self.count -= 1
+
+    def nearest(self, p: Point, k: int = 1, exclude: Optional[int] = None) -> List[int]:
+        """Up to k indexed points closest to p (closest first)."""
+        if self.count == 0:
+            return []
+        cx, cy = self._key(p)
+        found: List[Tuple[float, int]] = []
+        # Rings beyond the grid extent cannot hold more points
+        x0, x1, y0, y1 = self.bounds
+        max_ring = max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+        for ring in range(max_ring + 1):
+            for key in _ring_cells(cx, cy, ring):
+                for idx in self.cells.get(key, ()):
+                    if idx != exclude:
+                        found.append((_dist(p, self.points[idx]), idx))
+            if len(found) >= k:
+                found.sort()
+                # Points in the next ring are at least ring * cell away
+                if found[k - 1][0] <= ring * self.cell:
+                    break
+        found.sort()
+        return [idx for _, idx in found[:k]]
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    if ring == 0:
+        yield cx, cy
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cy - ring
+        yield cx + dx, cy + ring
+    for dy in range(-ring + 1, ring):
+        yield cx - ring, cy + dy
+        yield cx + ring, cy + dy
+
+
+def _default_cell_size(points: Sequence[Point]) -> float:
+    """About one point per cell."""
+    if len(points) < 2:
+        return 100.0
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    area = max(max(xs) - min(xs), 1.0) * max(max(ys) - min(ys), 1.0)
+    return max(math.sqrt(area / len(points)), 1.0)
+
+
+def _dist(a: Point, b: Point) -> float:
+    return math.hypot(b[0] - a[0], b[1] - a[1])
+
+
+def contours_from_nested_parts(parts: Iterable) -> List[SheetContour]:
+    """
+    Placed contours of all parts on a sheet.
+
+    Args:
+        parts: Objects with get_placed_contour() and get_placed_holes()
+            (NestedPart from the nester)
+    """
+    contours = []
+    for part_index, part in enumerate(parts):
+        for hole in part.get_placed_holes():
+            if len(hole) >= 2:
+                contours.append(SheetContour(list(hole), part_index, is_hole=True))
+        outer = part.get_placed_contour()
+        if len(outer) >= 2:
+            contours.append(SheetContour(list(outer), part_index))
+    return contours
+
+
+def sequence_contours(contours: Sequence[SheetContour], start: Point = (0.0, 0.0),
+                      end: Optional[Point] = None, improve: bool = True,
+                      max_passes: int = 10) -> SheetSequence:
+    """
+    Order contours for cutting and generate the rapid moves.
+
+    Args:
+        contours: Contours of all parts on the sheet
+        start: Head position before the first pierce (machine origin)
+        end: Position to return to after the last contour (None = stay)
+        improve: Run 2-opt and pierce point optimisation after the greedy order
+        max_passes: 2-opt passes limit
+
+    Returns:
+        SheetSequence; rapid segment i (contour_id 2*i) leads to contour i
+    """
+    contours = list(contours)
+    if not contours:
+        return SheetSequence(start=start)
+
+    order = _nearest_neighbour_order(contours, start)
+    if improve and len(order) > 2:
+        order = _two_opt(contours, order, start, max_passes)
+
+    ordered = [contours[i] for i in order]
+    if improve:
+        _optimise_pierce_points(ordered, start, end)
+
+    return SheetSequence(ordered, _rapid_segments(ordered, start, end), start)
+
+
+def sequence_nested_parts(parts: Iterable, start: Point = (0.0, 0.0), **options) -> SheetSequence:
+    """Sequence all contours of parts placed on one sheet (see sequence_contours)."""
+    return sequence_contours(contours_from_nested_parts(parts), start, **options)
+
+
+def _nearest_neighbour_order(contours: Sequence[SheetContour], start: Point) -> List[int]:
+    """Greedy order; an outer contour becomes available once its holes are cut."""
+    points = [c.pierce_point for c in contours]
+    index = _GridIndex(points)
+
+    holes_left: Dict[int, int] = {}
+    outer_of: Dict[int, List[int]] = {}
+    for i, contour in enumerate(contours):
+        if contour.is_hole:
+            holes_left[contour.part_index] = holes_left.get(contour.part_index, 0) + 1
+        else:
+            outer_of.setdefault(contour.part_index, []).append(i)
+
+    for i, contour in enumerate(contours):
+        if contour.is_hole or not holes_left.get(contour.part_index):
+            index.insert(i)
+
+    order = []
+    position = start
+    while index.count:
+        i = index.nearest(position)[0]
+        index.remove(i)
+        order.append(i)
+        position = points[i]
+
+        contour = contours[i]
+        if contour.is_hole:
+            holes_left[contour.part_index] -= 1
+            if holes_left[contour.part_index] == 0:
+                for outer in outer_of.get(contour.part_index, ()):
+                    index.insert(outer)
+
+    return order
+
+
+def _two_opt(contours: Sequence[SheetContour], order: List[int], start: Point,
+             max_passes: int) -> List[int]:
+    """
+    2-opt on the open path start -> contours, candidate edges from grid neighbours.
+
+    Node 0 of the tour is the start position; contour i is node i + 1.
+    Reversing tour[lo+1..hi] replaces edges (lo, lo+1), (hi, hi+1) with
+    (lo, hi), (lo+1, hi+1).
+    """
+    points = [start] + [c.pierce_point for c in contours]
+    tour = [0] + [i + 1 for i in order]
+    n = len(tour)
+    pos = [0] * n
+    for k, node in enumerate(tour):
+        pos[node] = k
+
+    index = _GridIndex(points)
+    for node in range(n):
+        index.insert(node)
+    neighbours = [index.nearest(points[node], NEIGHBOUR_COUNT, exclude=node) for node in range(n)]
+
+    outers: Dict[int, List[int]] = {}
+    for i, contour in enumerate(contours):
+        if not contour.is_hole:
+            outers.setdefault(contour.part_index, []).append(i + 1)
+
+    def violates(lo: int, hi: int) -> bool:
+        """Reversal would put an outer contour before one of its holes."""
+        for k in range(lo + 1, hi + 1):
+            contour = contours[tour[k] - 1]
+            if contour.is_hole:
+                for outer in outers.get(contour.part_index, ()):
+                    if lo < pos[outer] <= hi:
+                        return True
+        return False
+
+    def d(a: int, b: int) -> float:
+        return _dist(points[tour[a]], points[tour[b]])
+
+    for _ in range(max_passes):
+        improved = False
+        for a in range(n):
+            for b in neighbours[a]:
+                lo, hi = sorted((pos[a], pos[b]))
+                if hi - lo < 2:
+                    continue
+                if hi == n - 1:
+                    gain = d(lo, lo + 1) - d(lo, hi)
+                else:
+                    gain = d(lo, lo + 1) + d(hi, hi + 1) - d(lo, hi) - d(lo + 1, hi + 1)
+                if gain <= MIN_GAIN_MM or violates(lo, hi):
+                    continue
+                tour[lo + 1:hi + 1] = tour[lo + 1:hi + 1][::-1]
+                for k in range(lo + 1, hi + 1):
+                    pos[tour[k]] = k
+                improved = True
+        if not improved:
+            break
+
+    return [node - 1 for node in tour[1:]]
+
+
+def _optimise_pierce_points(ordered: List[SheetContour], start: Point,
+                            end: Optional[Point]) -> None:
+    """Move each pierce to the vertex closest to the previous and next pierce."""
+    previous = start
+    for i, contour in enumerate(ordered):
+        if i + 1 < len(ordered):
+            following = ordered[i + 1].pierce_point
+        else:
+            following = end
+        best, best_cost = contour.pierce_index, None
+        for k, p in enumerate(contour.points):
+            cost = _dist(previous, p) + (_dist(p, following) if following is not None else 0.0)
+            if best_cost is None or cost < best_cost - MIN_GAIN_MM:
+                best, best_cost = k, cost
+        contour.pierce_index = best
+        previous = contour.pierce_point
+
+
+def _rapid_segments(ordered: Sequence[SheetContour], start: Point,
+                    end: Optional[Point]) -> List[MotionSegment]:
+    targets = [c.pierce_point for c in ordered] + ([end] if end is not None else [])
+    segments = []
+    position = start
+    for i, target in enumerate(targets):
+        length = _dist(position, target)
+        if length >= 0.001:
+            angle = math.degrees(math.atan2(target[1] - position[1], target[0] - position[0]))
+            # Separate contour_id: the head stops before each pierce
+            segments.append(MotionSegment(length, angle, angle, True, 2 * i))
+        position = target
+    return segments
+
+
+def estimate_sheet_time(sequence: SheetSequence, machine: MachineProfile, v_max_mm_s: float,
+                        pierce_time_s: float = 0.0,
+                        part_cutting_times: Optional[Dict[int, float]] = None) -> SheetTime:
+    """
+    Machine time of a sequenced sheet.
+
+    Args:
+        sequence: Result of sequence_contours
+        machine: Machine dynamics profile
+        v_max_mm_s: Cutting speed for material + thickness
+        pierce_time_s: Time of a single pierce
+        part_cutting_times: {part_index: cutting time} from the part's own
+            toolpath (e.g. PartTimeModel.cutting_time_s); parts without an
+            entry are planned from their placed polylines
+
+    Returns:
+        SheetTime (cutting, rapid and pierce time)
+    """
+    part_cutting_times = part_cutting_times or {}
+    segments = list(sequence.rapid_segments)
+    for i, contour in enumerate(sequence.contours):
+        if contour.part_index not in part_cutting_times:
+            segments.extend(contour.cutting_segments(2 * i + 1))
+
+    cutting_time, rapid_time = estimate_motion_time_fast(segments, machine, v_max_mm_s)
+    parts = {c.part_index for c in sequence.contours}
+    cutting_time += sum(t for idx, t in part_cutting_times.items() if idx in parts)
+
+    return SheetTime(cutting_time, rapid_time, sequence.pierce_count * pierce_time_s)
+
+
+__all__ = [
+    'SheetContour',
+    'SheetSequence',
+    'SheetTime',
+    'contours_from_nested_parts',
+    'sequence_contours',
+    'sequence_nested_parts',
+    'estimate_sheet_time',
+]
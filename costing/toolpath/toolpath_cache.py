@@ -0,0 +1,305 @@
+"""
+Toolpath Cache - persistent cache of DXF toolpath data.
+
+Most costings reuse the same catalog parts, so parsing each DXF again
+(ezdxf.readfile) on every costing dominates the run time. This cache
+stores extraction results on disk:
+
+- ToolpathStats as JSON: key = file content hash + tolerance + ignored
+  layers + marking keywords
+- motion segments as compact NumPy arrays (.npz): key = file content hash
+  + tolerance + ignored layers
+
+Keys use file CONTENT, so renamed/copied files hit the cache and edited
+files miss it. Content hashes are memoized per (path, mtime, size).
+
+Eviction: LRU by file modification time (reads refresh it), oldest
+entries above max_entries are removed after each write.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from ..motion.motion_planner import MotionSegment
+from ..motion.vectorized_planner import HAS_NUMPY, MotionArrays, segments_to_arrays
+from .dxf_extractor import (
+    ToolpathStats, DEFAULT_IGNORE_LAYERS, DEFAULT_MARKING_KEYWORDS,
+    extract_toolpath_stats, extract_motion_segments
+)
+
+if HAS_NUMPY:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when extractor output or file format changes
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 5000
+
+STATS_SUFFIX = ".stats.json"
+SEGMENTS_SUFFIX = ".segments.npz"
+
+_HASH_CHUNK = 1 << 20
+
+
+def file_content_hash(path: Union[str, Path]) -> str:
+    """SHA-256 of file content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _settings_key(*parts) -> str:
+    raw = json.dumps([CACHE_FORMAT_VERSION, *parts], separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def _stats_to_dict(stats: ToolpathStats) -> dict:
+    return asdict(stats)
+
+
+def _stats_from_dict(data: dict) -> ToolpathStats:
+    data = dict(data)
+    if data.get('bounding_box') is not None:
+        data['bounding_box'] = tuple(data['bounding_box'])
+    return ToolpathStats(**data)
+
+
+def arrays_to_segments(arrays: MotionArrays) -> List[MotionSegment]:
+    """MotionArrays -> MotionSegment list (NaN angle = None)."""
+    segments = []
+    for length, start, end, cid, rapid in zip(arrays.lengths.tolist(), arrays.start_angles.tolist(),
+                                              arrays.end_angles.tolist(), arrays.contour_ids.tolist(),
+                                              arrays.is_rapid.tolist()):
+        segments.append(MotionSegment(
+            length_mm=length,
+            start_angle_deg=None if start != start else start,
+            end_angle_deg=None if end != end else end,
+            is_rapid=rapid,
+            contour_id=cid
+        ))
+    return segments
+
+
+class ToolpathCache:
+    """
+    On-disk cache of ToolpathStats and motion segment arrays.
+
+    Thread-safe within a process; writes are atomic (temp file + os.replace).
+    """
+
+    def __init__(self, cache_dir: Union[str, Path, None] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hash_memo: Dict[Tuple[str, int, int], str] = {}
+        self._last_access_ns = 0
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Cannot create toolpath cache dir {self.cache_dir}: {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def content_hash(self, dxf_path: Union[str, Path]) -> str:
+        """Content hash of a file, memoized per (path, mtime, size)."""
+        path = os.path.abspath(str(dxf_path))
+        st = os.stat(path)
+        memo_key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._hash_memo.get(memo_key)
+        if cached is None:
+            cached = file_content_hash(path)
+            with self._lock:
+                self._hash_memo[memo_key] = cached
+        return cached
+
+    def get_stats(self, dxf_path: Union[str, Path],
+                  ignore_layers: Optional[Set[str]] = None,
+                  marking_keywords: Optional[Set[str]] = None,
+                  tolerance_mm: float = 0.2) -> ToolpathStats:
+        """Cached extract_toolpath_stats."""
+        ignore = ignore_layers if ignore_layers is not None else DEFAULT_IGNORE_LAYERS
+        marking = marking_keywords if marking_keywords is not None else DEFAULT_MARKING_KEYWORDS
+        key = self.content_hash(dxf_path) + _settings_key(
+            'stats', round(tolerance_mm, 6), sorted(ignore), sorted(marking))
+        path = self.cache_dir / f"{key}{STATS_SUFFIX}"
+
+        data = self._read(path, lambda p: json.loads(p.read_text(encoding='utf-8')))
+        if data is not None:
+            try:
+                return _stats_from_dict(data)
+            except TypeError as e:
+                logger.warning(f"Invalid toolpath cache entry {path.name}: {e}")
+                self._remove(path)
+
+        stats = extract_toolpath_stats(str(dxf_path), ignore_layers, marking_keywords, tolerance_mm)
+        payload = json.dumps(_stats_to_dict(stats), ensure_ascii=False).encode('utf-8')
+        self._write(path, lambda tmp: tmp.write_bytes(payload))
+        return stats
+
+    def get_motion_arrays(self, dxf_path: Union[str, Path],
+                          ignore_layers: Optional[Set[str]] = None,
+                          tolerance_mm: float = 0.2) -> MotionArrays:
+        """Cached extract_motion_segments as MotionArrays (requires NumPy)."""
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for motion arrays")
+
+        ignore = ignore_layers if ignore_layers is not None else DEFAULT_IGNORE_LAYERS
+        key = self.content_hash(dxf_path) + _settings_key(
+            'segments', round(tolerance_mm, 6), sorted(ignore))
+        path = self.cache_dir / f"{key}{SEGMENTS_SUFFIX}"
+
+        arrays = self._read(path, _load_arrays)
+        if arrays is not None:
+            return arrays
+
+        arrays = segments_to_arrays(extract_motion_segments(str(dxf_path), ignore_layers, tolerance_mm))
+        self._write(path, lambda tmp: _save_arrays(tmp, arrays))
+        return arrays
+
+    def get_motion_segments(self, dxf_path: Union[str, Path],
+                            ignore_layers: Optional[Set[str]] = None,
+                            tolerance_mm: float = 0.2) -> List[MotionSegment]:
+        """Cached extract_motion_segments (parses every time without NumPy)."""
+        if not HAS_NUMPY:
+            return extract_motion_segments(str(dxf_path), ignore_layers, tolerance_mm)
+        return arrays_to_segments(self.get_motion_arrays(dxf_path, ignore_layers, tolerance_mm))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            for path in self._entries():
+                self._remove(path)
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _read(self, path: Path, loader):
+        with self._lock:
+            try:
+                value = loader(path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Corrupted toolpath cache entry {path.name}: {e}")
+                self._remove(path)
+                self.misses += 1
+                return None
+            self._touch(path)
+            self.hits += 1
+            return value
+
+    def _write(self, path: Path, writer) -> None:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with self._lock:
+            try:
+                writer(tmp)
+                os.replace(tmp, path)
+                self._touch(path)
+            except OSError as e:
+                logger.warning(f"Cannot write toolpath cache entry: {e}")
+                self._remove(tmp)
+                return
+            self._evict()
+
+    def _entries(self) -> List[Path]:
+        try:
+            return [p for p in self.cache_dir.iterdir()
+                    if p.name.endswith(STATS_SUFFIX) or p.name.endswith(SEGMENTS_SUFFIX)]
+        except OSError:
+            return []
+
+    def _touch(self, path: Path) -> None:
+        """Strictly increasing access time (mtime resolution can be coarse)."""
+        now = max(time.time_ns(), self._last_access_ns + 1000)
+        self._last_access_ns = now
+        try:
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+
+        def mtime(p: Path) -> int:
+            try:
+                return p.stat().st_mtime_ns
+            except OSError:
+                return 0
+
+        entries.sort(key=mtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _save_arrays(path: Path, arrays: MotionArrays) -> None:
+    with open(path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            lengths=arrays.lengths,
+            start_angles=arrays.start_angles,
+            end_angles=arrays.end_angles,
+            contour_ids=arrays.contour_ids.astype(np.int32),
+            is_rapid=arrays.is_rapid,
+        )
+
+
+def _load_arrays(path: Path) -> MotionArrays:
+    with np.load(path) as data:
+        return MotionArrays(
+            lengths=data['lengths'],
+            start_angles=data['start_angles'],
+            end_angles=data['end_angles'],
+            contour_ids=data['contour_ids'].astype(np.int64),
+            is_rapid=data['is_rapid'],
+        )
+
+
+def _default_cache_dir() -> Path:
+    try:
+        from config.settings import CACHE_DIR
+    except ImportError:
+        CACHE_DIR = Path(os.getenv("CACHE_DIR", Path.home() / ".newerp_cache"))
+    return Path(CACHE_DIR) / "toolpath"
+
+
+_default_cache: Optional[ToolpathCache] = None
+
+
+def get_toolpath_cache() -> ToolpathCache:
+    """Shared cache in CACHE_DIR/toolpath."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ToolpathCache()
+    return _default_cache
@@ -423,6 +423,9 @@ class MainDashboard(ctk.CTk):
 
         # Stan
         self.orders_data = []
+        self._aggregate_cache = None       # OrderAggregateCache (liczniki z bazy)
+        self._db_status_counts = None      # status -> liczba dla wszystkich zamówień w bazie
+        self._db_order_ids = set()
 
         # Build UI
         self._setup_ui()
@@ -801,9 +804,22 @@ class MainDashboard(ctk.CTk):
 
                     client = get_supabase_client()
                     repo = OrderRepository(client)
-                    orders_from_db = repo.get_all(limit=100)
+                    orders_from_db = repo.get_page(limit=100).items
                     logger.info(f"[MainDashboard] Loaded {len(orders_from_db)} orders from Supabase")
 
+                    # Liczniki statusów dla wszystkich zamówień - agregaty z bazy,
+                    # odświeżane przyrostowo (nie tylko dla 100 pobranych)
+                    try:
+                        from orders.aggregates import OrderAggregateCache
+                        if self._aggregate_cache is None:
+                            self._aggregate_cache = OrderAggregateCache(repo)
+                        else:
+                            self._aggregate_cache.repository = repo
+                        self._db_status_counts = dict(self._aggregate_cache.refresh().status_counts)
+                    except Exception as e:
+                        logger.warning(f"[MainDashboard] Order aggregates not available: {e}")
+                        self._db_status_counts = None
+
                 except ImportError as e:
                     logger.warning(f"[MainDashboard] OrderRepository not available: {e}")
                 except Exception as e:
@@ -847,6 +863,7 @@ class MainDashboard(ctk.CTk):
                     reverse=True
                 )
 
+                self._db_order_ids = {order.get('id') for order in orders_from_db}
                 self.orders_data = all_orders
                 logger.info(f"[MainDashboard] Total orders: {len(self.orders_data)}")
 
@@ -897,6 +914,25 @@ class MainDashboard(ctk.CTk):
             'wyfakturowane': 0
         }
 
+        # Statusy z bazy (ENUM order_status) oraz stare statusy z plików JSON
+        status_keys = {
+            'RECEIVED': 'wplynelo', 'new': 'wplynelo', 'wplynelo': 'wplynelo',
+            'CONFIRMED': 'potwierdzone', 'potwierdzone': 'potwierdzone',
+            'PLANNED': 'na_planie', 'na_planie': 'na_planie', 'nesting_done': 'na_planie',
+            'IN_PROGRESS': 'w_realizacji', 'in_progress': 'w_realizacji',
+            'w_realizacji': 'w_realizacji', 'production': 'w_realizacji',
+            'DONE': 'gotowe', 'completed': 'gotowe', 'gotowe': 'gotowe',
+            'INVOICED': 'wyfakturowane', 'wyfakturowane': 'wyfakturowane',
+        }
+
+        # Zamówienia z bazy liczone przez agregaty, lokalnie tylko pliki JSON
+        db_counted = self._db_status_counts is not None
+        if db_counted:
+            for status, count in self._db_status_counts.items():
+                key = status_keys.get(status)
+                if key:
+                    status_counts[key] += count
+
         # Dodaj zamówienia
         for order in self.orders_data:
             # Pobierz dane
@@ -921,16 +957,9 @@ class MainDashboard(ctk.CTk):
             date_end = order.get('zakonczona', '')
 
             # Liczenie statusów
-            if status_raw in ['new', 'wplynelo']:
-                status_counts['wplynelo'] += 1
-            elif status_raw in ['potwierdzone']:
-                status_counts['potwierdzone'] += 1
-            elif status_raw in ['na_planie', 'nesting_done']:
-                status_counts['na_planie'] += 1
-            elif status_raw in ['in_progress', 'w_realizacji', 'production']:
-                status_counts['w_realizacji'] += 1
-            elif status_raw in ['completed', 'gotowe']:
-                status_counts['gotowe'] += 1
+            status_key = status_keys.get(status_raw)
+            if status_key and not (db_counted and order.get('id') in self._db_order_ids):
+                status_counts[status_key] += 1
 
             # Status faktury - tylko niewyfakturowane sa czerwone
             is_invoiced = order.get('invoiced', False) or order.get('invoice_sent', False)
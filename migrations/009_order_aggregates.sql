@@ -0,0 +1,136 @@
+-- ============================================================
+-- NewERP - Agregaty zamówień dla dashboardu
+-- Migracja: 009_order_aggregates.sql
+-- Data: 2026-10-16
+--
+-- Liczniki statusów, przychód per okres i sumy per klient liczone
+-- w bazie zamiast pobierania wszystkich zamówień do aplikacji.
+-- Funkcja get_order_dashboard zwraca wszystkie agregaty w jednym
+-- zapytaniu razem ze znacznikiem (watermark = max(updated_at)),
+-- od którego aplikacja odświeża swój cache przyrostowo.
+-- ============================================================
+
+-- Indeks dla zapytań przyrostowych (updated_at > watermark)
+CREATE INDEX IF NOT EXISTS idx_orders_updated_at ON orders(updated_at);
+
+-- Trigger do aktualizacji updated_at (watermark musi rosnąć przy każdej zmianie)
+CREATE OR REPLACE FUNCTION update_orders_timestamp()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_orders_updated ON orders;
+CREATE TRIGGER trigger_orders_updated
+    BEFORE UPDATE ON orders
+    FOR EACH ROW
+    EXECUTE FUNCTION update_orders_timestamp();
+
+-- ============================================================
+-- Widoki
+-- ============================================================
+
+-- Liczba zamówień i suma wartości per status
+CREATE OR REPLACE VIEW order_status_counts AS
+SELECT
+    status::TEXT AS status,
+    COUNT(*) AS order_count,
+    COALESCE(SUM(total_cost), 0) AS revenue
+FROM orders
+GROUP BY status;
+
+-- Sumy per klient (klucz: customer_id, a bez niego nazwa klienta)
+CREATE OR REPLACE VIEW order_customer_totals AS
+SELECT
+    COALESCE(customer_id::TEXT, NULLIF(COALESCE(NULLIF(customer_name, ''), client), ''), '-') AS customer_key,
+    MAX(COALESCE(NULLIF(customer_name, ''), client, '')) AS customer_name,
+    COUNT(*) AS order_count,
+    COALESCE(SUM(total_cost), 0) AS revenue,
+    MAX(created_at) AS last_order_at
+FROM orders
+GROUP BY 1;
+
+COMMENT ON VIEW order_status_counts IS 'Liczba i wartość zamówień per status';
+COMMENT ON VIEW order_customer_totals IS 'Liczba i wartość zamówień per klient';
+
+-- ============================================================
+-- Funkcje RPC
+-- ============================================================
+
+-- Liczniki statusów
+CREATE OR REPLACE FUNCTION get_order_status_counts()
+RETURNS TABLE (status TEXT, order_count BIGINT) AS $$
+    SELECT status, order_count FROM order_status_counts;
+$$ LANGUAGE sql STABLE;
+
+-- Przychód per okres (p_period: day / week / month / quarter / year)
+CREATE OR REPLACE FUNCTION get_order_revenue_by_period(
+    p_period TEXT DEFAULT 'month',
+    p_from DATE DEFAULT NULL,
+    p_to DATE DEFAULT NULL
+)
+RETURNS TABLE (period DATE, order_count BIGINT, revenue NUMERIC) AS $$
+    SELECT
+        date_trunc(p_period, COALESCE(date_in::TIMESTAMP, created_at::TIMESTAMP))::DATE AS period,
+        COUNT(*) AS order_count,
+        COALESCE(SUM(total_cost), 0) AS revenue
+    FROM orders
+    WHERE (p_from IS NULL OR COALESCE(date_in, created_at::DATE) >= p_from)
+      AND (p_to IS NULL OR COALESCE(date_in, created_at::DATE) <= p_to)
+    GROUP BY 1
+    ORDER BY 1;
+$$ LANGUAGE sql STABLE;
+
+-- Sumy per klient (najwięksi klienci pierwsi)
+CREATE OR REPLACE FUNCTION get_order_customer_totals(p_limit INTEGER DEFAULT NULL)
+RETURNS SETOF order_customer_totals AS $$
+    SELECT * FROM order_customer_totals
+    ORDER BY revenue DESC, customer_key
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Wszystkie agregaty dashboardu w jednej migawce + watermark do odświeżania przyrostowego
+CREATE OR REPLACE FUNCTION get_order_dashboard(p_period TEXT DEFAULT 'month')
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'watermark', (SELECT MAX(updated_at) FROM orders),
+        'order_count', (SELECT COUNT(*) FROM orders),
+        'status_counts', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'status', status, 'order_count', order_count, 'revenue', revenue))
+            FROM order_status_counts), '[]'::JSONB),
+        'revenue', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'period', period, 'order_count', order_count, 'revenue', revenue))
+            FROM get_order_revenue_by_period(p_period)), '[]'::JSONB),
+        'customers', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'customer_key', customer_key, 'customer_name', customer_name,
+                'order_count', order_count, 'revenue', revenue, 'last_order_at', last_order_at))
+            FROM order_customer_totals), '[]'::JSONB)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Znacznik zmian: max(updated_at) i liczba zamówień (wykrywa też usunięcia)
+CREATE OR REPLACE FUNCTION get_orders_watermark()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'watermark', MAX(updated_at),
+        'order_count', COUNT(*)
+    ) FROM orders;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_order_dashboard IS 'Agregaty zamówień dla dashboardu + watermark';
+COMMENT ON FUNCTION get_orders_watermark IS 'max(updated_at) i liczba zamówień - do odświeżania cache';
+
+GRANT EXECUTE ON FUNCTION get_order_status_counts() TO authenticated;
+GRANT EXECUTE ON FUNCTION get_order_revenue_by_period(TEXT, DATE, DATE) TO authenticated;
+GRANT EXECUTE ON FUNCTION get_order_customer_totals(INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION get_order_dashboard(TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION get_orders_watermark() TO authenticated;
+
+-- ============================================================
+-- Koniec migracji
+-- ============================================================
@@ -22,13 +22,14 @@ from dataclasses import dataclass
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import logging
+import threading
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
 # Import modułów projektu
 try:
-    from quotations.utils.dxf_loader import load_dxf, DXFPart
+    from quotations.utils.dxf_loader import iter_load_dxf, DXFPart
     from quotations.utils.name_parser import parse_filename_with_folder_context, reload_rules
     from quotations.gui.nesting_tabs_panel import NestingTabsPanel, Theme
     from quotations.gui.regex_editor_panel import RegexEditorWindow
@@ -531,6 +532,7 @@ class NestingWindow(ctk.CTkToplevel):
         self.parts_by_group: dict = {}
         self.nesting_panel: Optional[NestingTabsPanel] = None
         self.nesting_results: Dict = {}
+        self._folder_loading = False
 
         logger.info(f"[NestingWindow] Opening with context: {context_type}, id: {context_id}")
         logger.info(f"[NestingWindow] Initial parts: {len(self.initial_parts)}")
@@ -782,7 +784,10 @@ class NestingWindow(ctk.CTkToplevel):
         self._load_folder_path(folder)
 
     def _load_folder_path(self, folder: str):
-        """Wczytaj folder podany jako ścieżka"""
+        """Wczytaj folder podany jako ścieżka (geometria w wątku roboczym)"""
+        if self._folder_loading:
+            return
+
         folder_path = Path(folder)
 
         # Znajdź pliki DXF
@@ -792,55 +797,66 @@ class NestingWindow(ctk.CTkToplevel):
             messagebox.showwarning("Uwaga", "Nie znaleziono plików DXF w wybranym folderze")
             return
 
+        self._folder_loading = True
         self.lbl_status.configure(text=f"Wczytywanie {len(dxf_files)} plików...")
-        self.update()
 
-        new_parts_count = 0
+        def on_progress(done, total, path):
+            self.after(0, lambda: self.lbl_status.configure(text=f"Wczytywanie {done}/{total} plików..."))
 
-        for dxf_path in dxf_files:
+        def load_thread():
+            loaded = []
             try:
-                # Wczytaj geometrię
-                part = load_dxf(str(dxf_path))
-                if not part:
-                    logger.warning(f"Nie udało się wczytać: {dxf_path.name}")
-                    continue
-
-                # Parsuj nazwę
-                parsed = parse_filename_with_folder_context(dxf_path, stop_at=folder_path)
-
-                material = parsed.get('material', '') or 'NIEZNANY'
-                thickness = parsed.get('thickness_mm') or 0.0
-                quantity = parsed.get('quantity') or 1
-
-                # Uzupełnij dane
-                part.material = material
-                part.thickness = thickness
-                part.quantity = quantity
-
-                self.loaded_parts.append(part)
-
-                # Grupuj
-                key = (material, thickness)
-                if key not in self.parts_by_group:
-                    self.parts_by_group[key] = []
-
-                # Konwertuj DXFPart na dict dla NestingTabsPanel
-                part_dict = {
-                    'name': part.name,
-                    'width': part.width,
-                    'height': part.height,
-                    'quantity': quantity,
-                    'contour': part.get_normalized_contour(),
-                    'holes': [[(x - part.min_x, y - part.min_y) for x, y in hole] for hole in part.holes],
-                    'contour_area': part.contour_area,
-                    'weight_kg': part.weight_kg if part.thickness else 0,
-                    'filepath': part.filepath,
-                }
-                self.parts_by_group[key].append(part_dict)
-                new_parts_count += 1
+                # Geometria wczytywana równolegle w puli procesów
+                for dxf_path, part in iter_load_dxf(dxf_files, progress=on_progress):
+                    dxf_path = Path(dxf_path)
+                    try:
+                        if not part:
+                            logger.warning(f"Nie udało się wczytać: {dxf_path.name}")
+                            continue
+
+                        # Parsuj nazwę
+                        parsed = parse_filename_with_folder_context(dxf_path, stop_at=folder_path)
+
+                        # Uzupełnij dane
+                        part.material = parsed.get('material', '') or 'NIEZNANY'
+                        part.thickness = parsed.get('thickness_mm') or 0.0
+                        part.quantity = parsed.get('quantity') or 1
+                        loaded.append(part)
+
+                    except Exception as e:
+                        logger.error(f"Błąd wczytywania {dxf_path.name}: {e}")
+            finally:
+                self.after(0, self._on_folder_loaded, loaded)
+
+        threading.Thread(target=load_thread, daemon=True).start()
+
+    def _on_folder_loaded(self, loaded: List[DXFPart]):
+        """Dodaj wczytane detale do grup (wątek GUI)"""
+        self._folder_loading = False
+        new_parts_count = 0
 
-            except Exception as e:
-                logger.error(f"Błąd wczytywania {dxf_path.name}: {e}")
+        for part in loaded:
+            self.loaded_parts.append(part)
+
+            # Grupuj
+            key = (part.material, part.thickness)
+            if key not in self.parts_by_group:
+                self.parts_by_group[key] = []
+
+            # Konwertuj DXFPart na dict dla NestingTabsPanel
+            part_dict = {
+                'name': part.name,
+                'width': part.width,
+                'height': part.height,
+                'quantity': part.quantity,
+                'contour': part.get_normalized_contour(),
+                'holes': [[(x - part.min_x, y - part.min_y) for x, y in hole] for hole in part.holes],
+                'contour_area': part.contour_area,
+                'weight_kg': part.weight_kg if part.thickness else 0,
+                'filepath': part.filepath,
+            }
+            self.parts_by_group[key].append(part_dict)
+            new_parts_count += 1
 
         # Podsumowanie
         total_parts = len(self.loaded_parts)
@@ -0,0 +1,215 @@
+"""
+NewERP - Order Aggregates
+=========================
+Agregaty zamówień dla dashboardu: liczniki statusów, przychód per okres
+i sumy per klient.
+
+Agregaty liczy baza (widoki/RPC z migrations/009_order_aggregates.sql);
+aplikacja trzyma je w OrderAggregateCache razem ze znacznikiem
+watermark = max(updated_at). Odświeżenie pobiera tylko zamówienia
+zmienione po znaczniku:
+- same nowe zamówienia (created_at > watermark, liczba zamówień zgodna)
+  dodawane są lokalnie do agregatów,
+- zmiana istniejącego zamówienia lub usunięcie (liczba się nie zgadza)
+  oznacza ponowne pobranie agregatów z bazy - jedno wywołanie RPC.
+
+aggregate_orders() liczy te same agregaty w Pythonie - używane gdy
+w bazie nie ma jeszcze funkcji RPC i do dodawania nowych zamówień.
+
+Usage:
+    cache = OrderAggregateCache(OrderRepository(client))
+    aggregates = cache.get()          # odświeża przyrostowo po max_age_s
+    aggregates.status_counts          # {'RECEIVED': 12, 'DONE': 40, ...}
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Kolumny potrzebne do agregatów (projekcja zamiast select('*'))
+AGGREGATE_COLUMNS = 'id,status,total_cost,customer_id,customer_name,client,date_in,created_at,updated_at'
+
+# Okresy zgodne z date_trunc w PostgreSQL
+PERIODS = ('day', 'week', 'month', 'quarter', 'year')
+
+
+def period_start(value: Any, period: str = 'month') -> Optional[str]:
+    """Początek okresu dla daty (jak date_trunc(period, ...)::DATE) jako 'YYYY-MM-DD'"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        day = value.date()
+    elif isinstance(value, date):
+        day = value
+    else:
+        try:
+            day = date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+
+    if period == 'day':
+        start = day
+    elif period == 'week':
+        start = day - timedelta(days=day.weekday())
+    elif period == 'month':
+        start = day.replace(day=1)
+    elif period == 'quarter':
+        start = date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    elif period == 'year':
+        start = date(day.year, 1, 1)
+    else:
+        raise ValueError(f"Nieznany okres: {period}")
+    return start.isoformat()
+
+
+def customer_key(row: Dict) -> str:
+    """Klucz klienta jak w widoku order_customer_totals"""
+    return str(row.get('customer_id') or row.get('customer_name') or row.get('client') or '-')
+
+
+@dataclass
+class OrderAggregates:
+    """Agregaty zamówień w jednej migawce"""
+    period: str = 'month'
+    status_counts: Dict[str, int] = field(default_factory=dict)
+    revenue_by_period: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    customer_totals: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    order_count: int = 0
+    watermark: Optional[str] = None
+
+    def add_orders(self, rows: Iterable[Dict]):
+        """Dodaj wkład zamówień do agregatów (zamówienia jeszcze niepoliczone)"""
+        for row in rows:
+            total = float(row.get('total_cost') or 0)
+            status = row.get('status') or 'unknown'
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+            period = period_start(row.get('date_in') or row.get('created_at'), self.period)
+            if period:
+                bucket = self.revenue_by_period.setdefault(period, {'order_count': 0, 'revenue': 0.0})
+                bucket['order_count'] += 1
+                bucket['revenue'] += total
+
+            customer = self.customer_totals.setdefault(customer_key(row), {
+                'customer_name': '', 'order_count': 0, 'revenue': 0.0, 'last_order_at': None
+            })
+            customer['customer_name'] = customer['customer_name'] or row.get('customer_name') or row.get('client') or ''
+            customer['order_count'] += 1
+            customer['revenue'] += total
+            created = row.get('created_at')
+            if created and (customer['last_order_at'] is None or created > customer['last_order_at']):
+                customer['last_order_at'] = created
+
+            self.order_count += 1
+            updated = row.get('updated_at')
+            if updated and (self.watermark is None or updated > self.watermark):
+                self.watermark = updated
+
+    def top_customers(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Klienci posortowani malejąco po przychodzie"""
+        ranked = sorted(self.customer_totals.items(), key=lambda kv: (-kv[1]['revenue'], kv[0]))
+        return [dict(values, customer_key=key) for key, values in ranked[:limit]]
+
+    @classmethod
+    def from_dashboard(cls, data: Dict[str, Any], period: str = 'month') -> 'OrderAggregates':
+        """Agregaty z wyniku RPC get_order_dashboard"""
+        aggregates = cls(period=period, order_count=int(data.get('order_count') or 0),
+                         watermark=data.get('watermark'))
+        for row in data.get('status_counts') or []:
+            aggregates.status_counts[row['status']] = int(row['order_count'])
+        for row in data.get('revenue') or []:
+            if row.get('period'):
+                aggregates.revenue_by_period[str(row['period'])[:10]] = {
+                    'order_count': int(row['order_count']), 'revenue': float(row['revenue'] or 0)
+                }
+        for row in data.get('customers') or []:
+            aggregates.customer_totals[row['customer_key']] = {
+                'customer_name': row.get('customer_name') or '',
+                'order_count': int(row['order_count']),
+                'revenue': float(row['revenue'] or 0),
+                'last_order_at': row.get('last_order_at'),
+            }
+        return aggregates
+
+
+def aggregate_orders(rows: Iterable[Dict], period: str = 'month') -> OrderAggregates:
+    """Policz agregaty z wierszy zamówień (AGGREGATE_COLUMNS)"""
+    aggregates = OrderAggregates(period=period)
+    aggregates.add_orders(rows)
+    return aggregates
+
+
+class OrderAggregateCache:
+    """
+    Lokalny cache agregatów odświeżany przyrostowo po znaczniku updated_at.
+
+    Zapytania przez OrderRepository: get_dashboard_aggregates (pełne),
+    get_orders_changed_since + get_orders_watermark (przyrostowe).
+    """
+
+    def __init__(self, repository, period: str = 'month', max_age_s: float = 30.0):
+        if period not in PERIODS:
+            raise ValueError(f"Nieznany okres: {period}")
+        self.repository = repository
+        self.period = period
+        self.max_age_s = max_age_s
+        self._aggregates: Optional[OrderAggregates] = None
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        # Statystyki (testy, logi)
+        self.full_refreshes = 0
+        self.incremental_refreshes = 0
+
+    def get(self, force: bool = False) -> OrderAggregates:
+        """Aktualne agregaty; odświeżane gdy starsze niż max_age_s"""
+        with self._lock:
+            if force or self._aggregates is None or time.monotonic() - self._refreshed_at >= self.max_age_s:
+                self._refresh_locked()
+            return self._aggregates
+
+    def refresh(self) -> OrderAggregates:
+        """Odśwież od razu (przyrostowo, gdy to możliwe)"""
+        return self.get(force=True)
+
+    def invalidate(self):
+        """Wymuś pełne przeliczenie przy następnym get()"""
+        with self._lock:
+            self._aggregates = None
+
+    def _refresh_locked(self):
+        current = self._aggregates
+        if current is None or current.watermark is None or not self._apply_changes(current):
+            self._aggregates = self._load_full()
+        self._refreshed_at = time.monotonic()
+
+    def _load_full(self) -> OrderAggregates:
+        self.full_refreshes += 1
+        return self.repository.get_dashboard_aggregates(self.period)
+
+    def _apply_changes(self, current: OrderAggregates) -> bool:
+        """Dodaj nowe zamówienia; False gdy potrzebne pełne przeliczenie"""
+        changed = self.repository.get_orders_changed_since(current.watermark)
+        if changed is None:
+            return False
+        mark = self.repository.get_orders_watermark()
+        if mark is None:
+            return False
+
+        # Zmienione stare zamówienia - nieznany poprzedni wkład
+        if any((row.get('created_at') or '') <= current.watermark for row in changed):
+            return False
+        # Usunięcia (lub zamówienia dodane między zapytaniami)
+        if mark['order_count'] != current.order_count + len(changed):
+            return False
+
+        if changed:
+            current.add_orders(changed)
+            logger.debug(f"[OrderAggregateCache] Added {len(changed)} new orders")
+        self.incremental_refreshes += 1
+        return True
@@ -14,6 +14,11 @@ Składniki kosztu:
 6. Koszty operacyjne: per arkusz (domyślnie 40 PLN)
 7. Koszty per zlecenie: technologia, opakowania, transport
 8. Narzut procentowy
+
+Zamówienia liczone są wsadowo: części grupowane po (materiał, grubość),
+stawki pobierane raz na grupę, składniki liczone na tablicach float
+i zaokrąglane do groszy dopiero na końcu (wynik identyczny jak
+calculate_part_cost dla każdej części).
 """
 
 import math
@@ -26,6 +31,12 @@ from dataclasses import dataclass, field
 # Import from cost_models - single source of truth
 from orders.cost_models import AllocationModel, CostVariant, CostParams
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -160,6 +171,165 @@ class OrderCostResult:
     calculation_time_ms: float = 0.0
 
 
+def _decimal_cents(value: Decimal) -> int:
+    """Kwota zaokrąglona do groszy -> liczba groszy"""
+    return int(value.scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _cents_decimal(cents: int) -> Decimal:
+    """Liczba groszy -> Decimal z dwoma miejscami po przecinku"""
+    return Decimal(cents).scaleb(-2)
+
+
+def _quantize_cents(values) -> List[int]:
+    """
+    Zaokrąglij tablicę kwot do groszy (ROUND_HALF_UP).
+
+    Wynik zgodny z Decimal(str(x)).quantize(Decimal('0.01'), ROUND_HALF_UP);
+    wartości leżące praktycznie na połówce grosza liczone są przez Decimal.
+    """
+    scaled = np.abs(values) * 100.0
+    cents = np.floor(scaled + 0.5)
+    ambiguous = np.nonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)[0]
+    for i in ambiguous:
+        exact = Decimal(str(abs(float(values[i])))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        cents[i] = _decimal_cents(exact)
+    return np.copysign(cents, values).astype(np.int64).tolist()
+
+
+@dataclass
+class PartCostBatch:
+    """
+    Składniki kosztów jednostkowych części w groszach (kalkulacja wsadowa).
+
+    Materiał liczony z wagi - alokacja z arkusza stosowana przy sumowaniu.
+    """
+    names: List[str]
+    quantities: List[int]
+    material: List[int]
+    cutting: List[int]
+    engraving: List[int]
+    foil: List[int]
+    piercing: List[int]
+    bending: List[int]
+    additional: List[int]
+
+    def __len__(self) -> int:
+        return len(self.quantities)
+
+    @classmethod
+    def from_results(cls, results: List[PartCostResult]) -> 'PartCostBatch':
+        """Zbuduj z wyników calculate_part_cost (ścieżka bez NumPy)"""
+        return cls(
+            names=[r.part_name for r in results],
+            quantities=[r.quantity for r in results],
+            material=[_decimal_cents(r.material_cost) for r in results],
+            cutting=[_decimal_cents(r.cutting_cost) for r in results],
+            engraving=[_decimal_cents(r.engraving_cost) for r in results],
+            foil=[_decimal_cents(r.foil_cost) for r in results],
+            piercing=[_decimal_cents(r.piercing_cost) for r in results],
+            bending=[_decimal_cents(r.bending_cost) for r in results],
+            additional=[_decimal_cents(r.additional_cost) for r in results],
+        )
+
+    def result(self, idx: int, material_cost: Optional[Decimal] = None) -> PartCostResult:
+        """PartCostResult dla części (opcjonalnie z alokowanym kosztem materiału)"""
+        return PartCostResult(
+            part_name=self.names[idx],
+            quantity=self.quantities[idx],
+            material_cost=material_cost if material_cost is not None else _cents_decimal(self.material[idx]),
+            cutting_cost=_cents_decimal(self.cutting[idx]),
+            engraving_cost=_cents_decimal(self.engraving[idx]),
+            foil_cost=_cents_decimal(self.foil[idx]),
+            piercing_cost=_cents_decimal(self.piercing[idx]),
+            bending_cost=_cents_decimal(self.bending[idx]),
+            additional_cost=_cents_decimal(self.additional[idx]),
+        )
+
+
+@dataclass
+class LineTotals:
+    """Wkład jednej linii zamówienia w sumy (składnik × ilość)"""
+    quantity: int = 1
+    # Składniki liczone w groszach (materiał z wagi)
+    material_cents: int = 0
+    cutting_cents: int = 0
+    engraving_cents: int = 0
+    foil_cents: int = 0
+    piercing_cents: int = 0
+    # Wartości ręczne i niezaokrąglane
+    manual_lm: Decimal = Decimal('0')
+    bending: Decimal = Decimal('0')
+    additional: Decimal = Decimal('0')
+    # Materiał podlega alokacji z arkusza (L+M nie ustawione ręcznie)
+    allocatable: bool = False
+
+
+class OrderTotals:
+    """
+    Sumy linii zamówienia - dodawanie i odejmowanie linii jest dokładne,
+    więc sumy można aktualizować o różnicę przy zmianie pojedynczych linii.
+    """
+
+    def __init__(self):
+        self.parts = 0
+        self.quantity = 0
+        self.material_cents = 0
+        self.cutting_cents = 0
+        self.engraving_cents = 0
+        self.foil_cents = 0
+        self.piercing_cents = 0
+        self.manual_lm = Decimal('0')
+        self.bending = Decimal('0')
+        self.additional = Decimal('0')
+
+    def add(self, line: LineTotals, sign: int = 1):
+        """Dodaj linię (sign=-1 odejmuje)"""
+        self.parts += sign
+        self.quantity += sign * line.quantity
+        self.material_cents += sign * line.material_cents
+        self.cutting_cents += sign * line.cutting_cents
+        self.engraving_cents += sign * line.engraving_cents
+        self.foil_cents += sign * line.foil_cents
+        self.piercing_cents += sign * line.piercing_cents
+        if line.manual_lm:
+            self.manual_lm += sign * line.manual_lm
+        if line.bending:
+            self.bending += sign * line.bending
+        if line.additional:
+            self.additional += sign * line.additional
+
+    def remove(self, line: LineTotals):
+        """Odejmij linię"""
+        self.add(line, -1)
+
+    @staticmethod
+    def allocated_material(lines: List[LineTotals], allocations: List[Decimal],
+                           params: CostParams) -> Decimal:
+        """Koszt materiału po alokacji z arkuszy (linie bez alokacji - z wag)"""
+        material = Decimal('0.00')
+        cents = 0
+        for idx, line in enumerate(lines):
+            alloc = allocations[idx] if idx < len(allocations) else Decimal('0.00')
+            if line.allocatable and params.include_material and alloc > 0:
+                material += alloc * line.quantity
+            else:
+                cents += line.material_cents
+        return material + _cents_decimal(cents)
+
+    def fill(self, result: OrderCostResult):
+        """Przepisz sumy do OrderCostResult"""
+        result.total_parts = self.parts
+        result.total_quantity = self.quantity
+        result.total_material = Decimal('0.00') + _cents_decimal(self.material_cents)
+        result.total_cutting = Decimal('0.00') + self.manual_lm + _cents_decimal(self.cutting_cents)
+        result.total_engraving = Decimal('0.00') + _cents_decimal(self.engraving_cents)
+        result.total_foil = Decimal('0.00') + _cents_decimal(self.foil_cents)
+        result.total_piercing = Decimal('0.00') + _cents_decimal(self.piercing_cents)
+        result.total_bending = Decimal('0.00') + self.bending
+        result.total_additional = Decimal('0.00') + self.additional
+
+
 # ============================================================
 # COST ENGINE
 # ============================================================
@@ -177,7 +347,7 @@ class CostEngine:
     - Auto-recalculation callbacks
 
     Wymagania:
-    - Przeliczenie < 0.1s dla 100 części
+    - Przeliczenie < 0.1s dla 100 części (budżety: scripts/cost_engine_benchmark.py)
     """
 
     def __init__(self, pricing_tables=None):
@@ -508,6 +678,121 @@ class CostEngine:
 
         return weight_kg
 
+    # ============================================================
+    # BATCH CALCULATION
+    # ============================================================
+
+    def calculate_batch(self, parts: List[Dict], params: CostParams) -> PartCostBatch:
+        """
+        Oblicz koszty jednostkowe wszystkich części naraz.
+
+        Wynik zgodny z calculate_part_cost(part, params) dla każdej części
+        (materiał z wagi, bez alokacji z arkusza).
+        """
+        if not HAS_NUMPY:
+            return PartCostBatch.from_results([self.calculate_part_cost(p, params) for p in parts])
+
+        n = len(parts)
+        groups: Dict[Tuple[str, float], int] = {}
+        group_idx: List[int] = []
+        names: List[str] = []
+        quantities: List[int] = []
+        cutting_len: List[float] = []
+        engraving_len: List[float] = []
+        pierces: List[int] = []
+        bends: List[int] = []
+        additional: List[float] = []
+        weights: List[float] = []
+
+        for part in parts:
+            material = str(part.get('material', '')).upper()
+            thickness = float(part.get('thickness', 0) or 0)
+            group_idx.append(groups.setdefault((material, thickness), len(groups)))
+            names.append(part.get('name', ''))
+            quantities.append(int(part.get('quantity', 1) or 1))
+            cutting_len.append(float(part.get('cutting_len', 0) or 0))
+            engraving_len.append(float(part.get('engraving_len', 0) or 0))
+            pierces.append(int(part.get('pierce_count', part.get('piercing_count', 1)) or 1))
+            bends.append(int(part.get('bends', part.get('bends_count', 0)) or 0))
+            additional.append(float(part.get('additional', 0) or 0))
+            weights.append(self._get_part_weight(part) if params.include_material else 0.0)
+
+        # Stawki raz na grupę (materiał, grubość), rozłożone na części
+        keys = list(groups)
+        gi = np.array(group_idx, dtype=np.intp)
+
+        def per_part(rate: Callable[[str, float], float]) -> 'np.ndarray':
+            return np.array([rate(material, thickness) for material, thickness in keys], dtype=float)[gi]
+
+        zeros = np.zeros(n)
+        cutting_mm = np.array(cutting_len, dtype=float)
+        engraving_mm = np.array(engraving_len, dtype=float)
+        bends_arr = np.array(bends, dtype=float)
+
+        material_cost = (np.array(weights, dtype=float) * per_part(self._get_material_price)
+                         if params.include_material else zeros)
+        cutting_cost = (cutting_mm / 1000.0 * per_part(self._get_cutting_rate)
+                        if params.include_cutting else zeros)
+        engraving_cost = np.where(
+            engraving_mm > 0, engraving_mm / 1000.0 * DEFAULT_RATES['engraving_pln_per_m'], 0.0
+        )
+        piercing_cost = (np.array(pierces, dtype=float) * per_part(self._get_pierce_rate)
+                         if params.include_piercing else zeros)
+
+        if params.include_foil_removal:
+            # Stawka 0 dla grup bez folii (nie INOX lub > 5mm)
+            foil_rate = per_part(lambda m, t: self._get_foil_rate(m, t)
+                                 if self._should_include_foil(m, t) else 0.0)
+            foil_cost = (cutting_mm + engraving_mm) / 1000.0 * foil_rate
+        else:
+            foil_cost = zeros
+
+        bending_cost = np.where(
+            bends_arr > 0, bends_arr * per_part(lambda m, t: self._get_bending_rate(t)), 0.0
+        )
+
+        return PartCostBatch(
+            names=names,
+            quantities=quantities,
+            material=_quantize_cents(material_cost),
+            cutting=_quantize_cents(cutting_cost),
+            engraving=_quantize_cents(engraving_cost),
+            foil=_quantize_cents(foil_cost),
+            piercing=_quantize_cents(piercing_cost),
+            bending=_quantize_cents(bending_cost),
+            additional=_quantize_cents(np.array(additional, dtype=float)),
+        )
+
+    def calculate_parts_batch(
+        self,
+        parts: List[Dict],
+        params: CostParams,
+        material_allocations: Optional[List[Decimal]] = None
+    ) -> List[PartCostResult]:
+        """
+        Wsadowy odpowiednik calculate_part_cost dla listy części.
+
+        Args:
+            parts: Lista danych części
+            params: Parametry kalkulacji
+            material_allocations: Alokowane koszty materiału (jak sheet_cost_allocated)
+
+        Returns:
+            Lista PartCostResult w kolejności części
+        """
+        batch = self.calculate_batch(parts, params)
+        results = []
+        for idx, part in enumerate(parts):
+            material_cost = None
+            if params.include_material and material_allocations and idx < len(material_allocations):
+                if material_allocations[idx] > 0:
+                    material_cost = material_allocations[idx]
+            result = batch.result(idx, material_cost)
+            result.is_manual_lm = part.get('_manual_lm_cost', False)
+            result.is_manual_bending = part.get('_manual_bending_cost', False)
+            results.append(result)
+        return results
+
     # ============================================================
     # ALLOCATION MODELS
     # ============================================================
@@ -609,64 +894,128 @@ class CostEngine:
             OrderCostResult z pełnym podsumowaniem
         """
         start_time = time.perf_counter()
+        batch = self.calculate_batch(parts, params)
+        return self._summarize_order(parts, params, nesting_data, batch, start_time)
 
-        result = OrderCostResult()
-        result.total_parts = len(parts)
-        result.total_quantity = sum(int(p.get('quantity', 1) or 1) for p in parts)
-
-        # === ALOKACJA KOSZTÓW MATERIAŁU ===
-        if nesting_data and 'sheets' in nesting_data:
-            # Alokuj z arkuszy
-            sheets = nesting_data['sheets']
-            result.total_sheets = len(sheets)
-
-            # Suma efektywności
-            efficiencies = [s.get('efficiency', 0) or s.get('utilization', 0) for s in sheets]
-            result.average_efficiency = sum(efficiencies) / len(efficiencies) if efficiencies else 0
-
-            # Dla uproszczenia: alokuj całkowity koszt materiału proporcjonalnie
-            total_sheet_cost = sum(Decimal(str(s.get('material_cost', 0))) for s in sheets)
+    def line_totals(
+        self,
+        parts: List[Dict],
+        params: CostParams,
+        batch: Optional[PartCostBatch] = None
+    ) -> List[LineTotals]:
+        """
+        Wkład każdej linii zamówienia w sumy (składniki × ilość).
 
-            material_allocations = self.allocate_material_cost(
-                total_sheet_cost, parts, params.allocation_model
-            )
-        else:
-            # Brak nestingu - oblicz materiał z wag
-            material_allocations = [Decimal('0.00')] * len(parts)
-            result.total_sheets = 1  # Zakładamy 1 arkusz
+        Args:
+            parts: Lista danych części
+            params: Parametry kalkulacji
+            batch: Gotowy wynik calculate_batch dla tych części (opcjonalnie)
+        """
+        if batch is None:
+            batch = self.calculate_batch(parts, params)
+        bending_rates: Dict[float, float] = {}
+        lines = []
 
-        # === OBLICZ KOSZTY KAŻDEJ CZĘŚCI ===
+        zero = Decimal('0')
         for idx, part_data in enumerate(parts):
-            qty = int(part_data.get('quantity', 1) or 1)
-            mat_alloc = material_allocations[idx] if idx < len(material_allocations) else Decimal('0.00')
+            qty = batch.quantities[idx]
+            manual_lm = bending = additional_cost = zero
 
             # Sprawdź czy manualne koszty
-            if part_data.get('_manual_lm_cost'):
-                # Użyj ręcznej wartości L+M
-                lm_cost = Decimal(str(part_data.get('lm_cost', 0) or 0))
-                result.total_cutting += lm_cost * qty
-            else:
-                part_cost = self.calculate_part_cost(part_data, params, mat_alloc)
-                result.total_material += part_cost.material_cost * qty
-                result.total_cutting += part_cost.cutting_cost * qty
-                result.total_engraving += part_cost.engraving_cost * qty
-                result.total_foil += part_cost.foil_cost * qty
-                result.total_piercing += part_cost.piercing_cost * qty
+            is_manual_lm = part_data.get('_manual_lm_cost')
+            if is_manual_lm:
+                # Ręczna wartość L+M liczona jako cięcie
+                manual_lm = Decimal(str(part_data.get('lm_cost', 0) or 0)) * qty
 
             # Gięcie
             if part_data.get('_manual_bending_cost'):
-                bending = Decimal(str(part_data.get('bending_cost', 0) or 0))
+                bending = Decimal(str(part_data.get('bending_cost', 0) or 0)) * qty
             else:
                 bends = int(part_data.get('bends', 0) or 0)
-                thickness = float(part_data.get('thickness', 0) or 0)
-                bending_rate = self._get_bending_rate(thickness)
-                bending = Decimal(str(bends * bending_rate))
-
-            result.total_bending += bending * qty
+                if bends:
+                    thickness = float(part_data.get('thickness', 0) or 0)
+                    if thickness not in bending_rates:
+                        bending_rates[thickness] = self._get_bending_rate(thickness)
+                    bending = Decimal(str(bends * bending_rates[thickness])) * qty
 
             # Dodatkowe
-            additional = Decimal(str(part_data.get('additional', 0) or 0))
-            result.total_additional += additional * qty
+            additional = part_data.get('additional', 0) or 0
+            if additional:
+                additional_cost = Decimal(str(additional)) * qty
+
+            if is_manual_lm:
+                lines.append(LineTotals(qty, 0, 0, 0, 0, 0, manual_lm, bending, additional_cost, False))
+            else:
+                lines.append(LineTotals(
+                    qty, batch.material[idx] * qty, batch.cutting[idx] * qty,
+                    batch.engraving[idx] * qty, batch.foil[idx] * qty, batch.piercing[idx] * qty,
+                    zero, bending, additional_cost, True
+                ))
+        return lines
+
+    def material_allocations(
+        self,
+        parts: List[Dict],
+        params: CostParams,
+        nesting_data: Optional[Dict]
+    ) -> Optional[List[Decimal]]:
+        """Alokacja kosztu arkuszy z nestingu na części (None gdy brak nestingu)"""
+        if not (nesting_data and 'sheets' in nesting_data):
+            return None
+        # Dla uproszczenia: alokuj całkowity koszt materiału proporcjonalnie
+        total_sheet_cost = sum(Decimal(str(s.get('material_cost', 0))) for s in nesting_data['sheets'])
+        return self.allocate_material_cost(total_sheet_cost, parts, params.allocation_model)
+
+    def _summarize_order(
+        self,
+        parts: List[Dict],
+        params: CostParams,
+        nesting_data: Optional[Dict],
+        batch: PartCostBatch,
+        start_time: float
+    ) -> OrderCostResult:
+        """Zsumuj koszty zamówienia z wyników kalkulacji wsadowej"""
+        lines = self.line_totals(parts, params, batch)
+        totals = OrderTotals()
+        for line in lines:
+            totals.add(line)
+
+        allocations = self.material_allocations(parts, params, nesting_data)
+        material = totals.allocated_material(lines, allocations, params) if allocations is not None else None
+        return self.finalize_order_cost(totals, params, nesting_data, start_time, material)
+
+    def finalize_order_cost(
+        self,
+        totals: OrderTotals,
+        params: CostParams,
+        nesting_data: Optional[Dict],
+        start_time: float,
+        total_material: Optional[Decimal] = None
+    ) -> OrderCostResult:
+        """
+        Zbuduj OrderCostResult z sum linii: koszty operacyjne, per zlecenie i narzut.
+
+        Args:
+            totals: Sumy linii zamówienia
+            params: Parametry kalkulacji
+            nesting_data: Dane nestingu (liczba arkuszy, efektywność)
+            start_time: Początek obliczeń (perf_counter)
+            total_material: Koszt materiału po alokacji z arkuszy (domyślnie z wag)
+        """
+        result = OrderCostResult()
+        totals.fill(result)
+        if total_material is not None:
+            result.total_material = total_material
+
+        if nesting_data and 'sheets' in nesting_data:
+            sheets = nesting_data['sheets']
+            result.total_sheets = len(sheets)
+
+            # Suma efektywności
+            efficiencies = [s.get('efficiency', 0) or s.get('utilization', 0) for s in sheets]
+            result.average_efficiency = sum(efficiencies) / len(efficiencies) if efficiencies else 0
+        else:
+            result.total_sheets = 1  # Zakładamy 1 arkusz
 
         # === KOSZTY OPERACYJNE ===
         if params.include_operational:
@@ -711,9 +1060,9 @@ class CostEngine:
         result.calculation_time_ms = elapsed
 
         if elapsed > 100:
-            logger.warning(f"[CostEngine] Calculation too slow: {elapsed:.1f}ms for {len(parts)} parts")
+            logger.warning(f"[CostEngine] Calculation too slow: {elapsed:.1f}ms for {result.total_parts} parts")
         else:
-            logger.debug(f"[CostEngine] Calculated in {elapsed:.1f}ms for {len(parts)} parts")
+            logger.debug(f"[CostEngine] Calculated in {elapsed:.1f}ms for {result.total_parts} parts")
 
         return result
 
@@ -721,6 +1070,36 @@ class CostEngine:
     # RECALCULATION
     # ============================================================
 
+    def apply_part_costs(self, parts: List[Dict], batch: PartCostBatch):
+        """
+        Zapisz koszty jednostkowe w danych części (in-place).
+
+        Ręcznie ustawione L+M i koszty gięcia nie są nadpisywane.
+        """
+        bending_rates: Dict[float, float] = {}
+
+        for idx, part in enumerate(parts):
+            if not part.get('_manual_lm_cost'):
+                # L+M (materiał z wagi)
+                part['lm_cost'] = (batch.cutting[idx] + batch.engraving[idx] + batch.material[idx]) / 100
+                part['cutting_cost'] = batch.cutting[idx] / 100
+                part['piercing_cost'] = batch.piercing[idx] / 100
+                part['foil_cost'] = batch.foil[idx] / 100
+
+            if not part.get('_manual_bending_cost'):
+                # Oblicz gięcie
+                bends = int(part.get('bends', 0) or 0)
+                thickness = float(part.get('thickness', 0) or 0)
+                if thickness not in bending_rates:
+                    bending_rates[thickness] = self._get_bending_rate(thickness)
+                part['bending_cost'] = bends * bending_rates[thickness]
+
+            # Total
+            lm = float(part.get('lm_cost', 0) or 0)
+            bending = float(part.get('bending_cost', 0) or 0)
+            additional = float(part.get('additional', 0) or 0)
+            part['total_unit'] = lm + bending + additional
+
     def recalculate_all(
         self,
         parts: List[Dict],
@@ -730,6 +1109,9 @@ class CostEngine:
         """
         Przelicz wszystkie części i zwróć zaktualizowane dane.
 
+        Przy edycji pojedynczych linii tańszy jest IncrementalCostModel
+        (orders.incremental_cost), który liczy tylko zmienione części.
+
         Args:
             parts: Lista danych części (modyfikowana in-place)
             params: Parametry kalkulacji
@@ -740,31 +1122,12 @@ class CostEngine:
         """
         start_time = time.perf_counter()
 
-        # Oblicz koszty każdej części
-        for part in parts:
-            if not part.get('_manual_lm_cost'):
-                # Oblicz L+M
-                part_cost = self.calculate_part_cost(part, params)
-                part['lm_cost'] = float(part_cost.lm_cost)
-                part['cutting_cost'] = float(part_cost.cutting_cost)
-                part['piercing_cost'] = float(part_cost.piercing_cost)
-                part['foil_cost'] = float(part_cost.foil_cost)
-
-            if not part.get('_manual_bending_cost'):
-                # Oblicz gięcie
-                bends = int(part.get('bends', 0) or 0)
-                thickness = float(part.get('thickness', 0) or 0)
-                bending_rate = self._get_bending_rate(thickness)
-                part['bending_cost'] = bends * bending_rate
-
-            # Total
-            lm = float(part.get('lm_cost', 0) or 0)
-            bending = float(part.get('bending_cost', 0) or 0)
-            additional = float(part.get('additional', 0) or 0)
-            part['total_unit'] = lm + bending + additional
+        # Koszty wszystkich części liczone raz - także dla podsumowania
+        batch = self.calculate_batch(parts, params)
+        self.apply_part_costs(parts, batch)
 
         # Oblicz podsumowanie
-        order_cost = self.calculate_order_cost(parts, params, nesting_data)
+        order_cost = self._summarize_order(parts, params, nesting_data, batch, start_time)
 
         elapsed = (time.perf_counter() - start_time) * 1000
         logger.debug(f"[CostEngine] Full recalc in {elapsed:.1f}ms")
@@ -225,6 +225,67 @@ class CostEventBus:
         }
 
 
+class Debouncer:
+    """
+    Grupuje serię wywołań trigger() w jedno wywołanie callbacku
+    po delay_ms bez kolejnych zmian.
+
+    Domyślnie używa threading.Timer. W GUI przekaż schedule=widget.after
+    i cancel=widget.after_cancel - callback wykona się w wątku Tk.
+    """
+
+    def __init__(self, callback: Callable[[], Any], delay_ms: int = 50,
+                 schedule: Callable[[int, Callable], Any] = None,
+                 cancel: Callable[[Any], None] = None):
+        self._callback = callback
+        self._delay_ms = delay_ms
+        self._schedule = schedule or self._schedule_timer
+        self._cancel = cancel or (lambda timer: timer.cancel())
+        self._handle = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _schedule_timer(delay_ms: int, func: Callable) -> threading.Timer:
+        timer = threading.Timer(delay_ms / 1000.0, func)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    @property
+    def pending(self) -> bool:
+        """Czy callback czeka na wywołanie"""
+        return self._handle is not None
+
+    def trigger(self):
+        """Zgłoś zmianę - odlicza delay_ms od nowa"""
+        with self._lock:
+            if self._handle is not None:
+                self._cancel(self._handle)
+            self._handle = self._schedule(self._delay_ms, self._fire)
+
+    def cancel(self):
+        """Anuluj oczekujące wywołanie"""
+        with self._lock:
+            if self._handle is not None:
+                self._cancel(self._handle)
+                self._handle = None
+
+    def flush(self) -> bool:
+        """Wywołaj oczekujący callback od razu; False gdy nic nie czekało"""
+        with self._lock:
+            if self._handle is None:
+                return False
+            self._cancel(self._handle)
+            self._handle = None
+        self._callback()
+        return True
+
+    def _fire(self):
+        with self._lock:
+            self._handle = None
+        self._callback()
+
+
 # ============================================================
 # DECORATORS
 # ============================================================
@@ -21,6 +21,8 @@ import threading
 from PIL import Image, ImageTk, ImageDraw
 import io
 
+from orders.incremental_cost import IncrementalLines
+
 logger = logging.getLogger(__name__)
 
 # Import cost debug logger
@@ -571,6 +573,15 @@ class DetailedPartsPanel(ctk.CTkFrame):
         "#ec4899", "#84cc16", "#f97316", "#6366f1", "#14b8a6"
     ]
 
+    # Czas grupowania edycji komórek przed przeliczeniem [ms]
+    RECALC_DELAY_MS = 150
+
+    # Kolumny, których edycja zmienia koszty bazowe wiersza
+    COST_COLUMNS = frozenset({
+        "material", "thickness", "lm_cost", "bends", "bending_cost", "additional",
+        "weight", "cutting_len", "engraving_len", "calc_mat",
+    })
+
     def __init__(self, parent, on_parts_change: Callable = None,
                  cost_service=None, **kwargs):
         super().__init__(parent, fg_color=Theme.BG_CARD, corner_radius=8, **kwargs)
@@ -588,6 +599,12 @@ class DetailedPartsPanel(ctk.CTkFrame):
         self._nesting_completed = False
         self.nesting_results = {}  # Wyniki nestingu do modeli alokacji
 
+        # Przeliczanie przyrostowe: edytowane wiersze (klucz: słownik detalu, niezależny od 'nr')
+        # przeliczane razem po RECALC_DELAY_MS
+        self._row_values: Dict[str, tuple] = {}  # item_id -> ostatnio wyświetlone wartości
+        self._cost_lines = IncrementalLines(self._recalculate_rows, delay_ms=self.RECALC_DELAY_MS,
+                                            schedule=self.after, cancel=self.after_cancel)
+
         # Załaduj cenniki z PricingTables
         self.pricing_tables = None
         self._load_pricing_tables()
@@ -1015,7 +1032,7 @@ class DetailedPartsPanel(ctk.CTkFrame):
                 if column == "bends":
                     self.parts_data[idx]['_manual_bending_cost'] = False
             elif column in ["thickness", "lm_cost", "bending_cost", "additional",
-                            "weight", "cutting_len"]:
+                            "weight", "cutting_len", "engraving_len"]:
                 self.parts_data[idx][column] = float(new_value.replace(",", "."))
                 # Oznacz ręcznie edytowane koszty
                 if column == "lm_cost":
@@ -1031,10 +1048,16 @@ class DetailedPartsPanel(ctk.CTkFrame):
             logger.warning(f"Invalid value for {column}: {new_value}")
             return
 
-        # Aktualizuj tylko total bez nadpisywania ręcznych wartości
+        # Komórka została już zmieniona w tabeli - nie ufaj zapamiętanym wartościom
+        self._row_values.pop(item, None)
+
+        # Aktualizuj od razu total wiersza, koszty bazowe i podsumowanie po serii edycji
         self._update_total_only(idx)
         self._update_row(idx)
-        self._update_summary()
+        if column in self.COST_COLUMNS:
+            self._cost_lines.update_part(self.parts_data[idx])
+        else:
+            self._cost_lines.mark_order_dirty()
 
     def _find_part_index(self, item_id: str) -> Optional[int]:
         """Znajdz indeks czesci po ID wiersza"""
@@ -1071,7 +1094,8 @@ class DetailedPartsPanel(ctk.CTkFrame):
     def _recalculate_all(self):
         """Przelicz wszystkie detale z uwzględnieniem modelu alokacji"""
         if not self.parts_data:
-            self._update_summary()
+            self._cost_lines.set_parts([])
+            self._cost_lines.recalculate()
             return
 
         allocation_model = self.allocation_model_var.get()
@@ -1082,11 +1106,27 @@ class DetailedPartsPanel(ctk.CTkFrame):
             order_name = getattr(self, 'order_name', 'unknown')
             log_calculation_start(allocation_model, order_name)
 
-        # Krok 1: Oblicz koszty bazowe (proporcjonalne) dla wszystkich detali
-        for idx in range(len(self.parts_data)):
-            self._recalculate_part_base(idx)
+        # Kroki 1-3: wszystkie wiersze zmienione - koszty bazowe, alokacja,
+        # wiersze tabeli i podsumowanie w jednym przeliczeniu (od razu)
+        self._cost_lines.set_parts(self.parts_data)
+        self._cost_lines.recalculate()
 
-        # Krok 2: Zastosuj model alokacji
+        # Krok 4: Loguj koszty dla analityka finansowego
+        if get_cost_logger is not None:
+            for part in self.parts_data:
+                log_part_cost(part)
+            # Zapisz log do pliku
+            try:
+                log_filepath = save_cost_log()
+                logger.info(f"[DetailedParts] Zapisano log kosztów do: {log_filepath}")
+            except Exception as e:
+                logger.error(f"[DetailedParts] Błąd zapisu logu kosztów: {e}")
+
+        # Krok 5: Raport kosztów generowany przy otwarciu okna debug
+        self._last_cost_report = None
+
+    def _apply_allocation_model(self, allocation_model: str):
+        """Rozdziel koszt arkuszy wg modelu alokacji (zależy od wszystkich detali)"""
         if allocation_model == "Równy podział":
             self._apply_equal_allocation()  # Równy podział kosztów arkuszy z nestingu
         elif allocation_model == "Bbox (pre-nesting)":
@@ -1099,26 +1139,23 @@ class DetailedPartsPanel(ctk.CTkFrame):
         elif allocation_model == "Na arkusz":
             self._apply_equal_allocation()
 
-        # Krok 3: Aktualizuj wiersze w tabeli
-        for idx in range(len(self.parts_data)):
-            self._update_row(idx)
-
-        # Krok 4: Loguj koszty dla analityka finansowego
-        if get_cost_logger is not None:
-            for part in self.parts_data:
-                log_part_cost(part)
-            # Zapisz log do pliku
-            try:
-                log_filepath = save_cost_log()
-                logger.info(f"[DetailedParts] Zapisano log kosztów do: {log_filepath}")
-            except Exception as e:
-                logger.error(f"[DetailedParts] Błąd zapisu logu kosztów: {e}")
+    def _recalculate_rows(self, dirty_parts: List[Dict]):
+        """Przelicz zgrupowane edycje (IncrementalLines): koszty bazowe tylko zmienionych wierszy, alokacja i jedno podsumowanie"""
+        if dirty_parts:
+            dirty = {id(part) for part in dirty_parts}
+            for idx, part in enumerate(self.parts_data):
+                if id(part) in dirty:
+                    self._recalculate_part_base(idx)
+
+            # Udział w koszcie arkuszy zmienia się dla wszystkich detali
+            self._apply_allocation_model(self.allocation_model_var.get())
+            for idx in range(len(self.parts_data)):
+                self._update_row(idx)
+            self._last_cost_report = None
+            logger.debug(f"[DetailedParts] Przeliczono {len(dirty)}/{len(self.parts_data)} wierszy")
 
         self._update_summary()
 
-        # Krok 5: Generuj raport kosztów (do wyświetlenia w oknie debug)
-        self._last_cost_report = self._generate_cost_report()
-
     def _recalculate_part_base(self, idx: int):
         """Oblicz bazowe koszty dla detalu (bez alokacji) - respektuje manualne wartości.
 
@@ -1393,7 +1430,10 @@ class DetailedPartsPanel(ctk.CTkFrame):
         part = self.parts_data[idx]
         item_id = part.get('_item_id')
         if item_id:
-            self.tree.item(item_id, values=self._part_to_values(part))
+            values = self._part_to_values(part)
+            if self._row_values.get(item_id) != values:
+                self.tree.item(item_id, values=values)
+                self._row_values[item_id] = values
 
     def _part_to_values(self, part: Dict) -> tuple:
         """Konwertuj dane detalu na wartosci dla tabeli"""
@@ -1450,6 +1490,7 @@ class DetailedPartsPanel(ctk.CTkFrame):
     def _refresh_table(self):
         """Odswiez cala tabele"""
         self.tree.delete(*self.tree.get_children())
+        self._row_values.clear()
 
         for idx, part in enumerate(self.parts_data):
             color = self.PART_COLORS[idx % len(self.PART_COLORS)]
@@ -1457,9 +1498,11 @@ class DetailedPartsPanel(ctk.CTkFrame):
             item_id = f"part_{part.get('nr', idx)}"
             part['_item_id'] = item_id
 
+            values = self._part_to_values(part)
+            self._row_values[item_id] = values
             self.tree.insert_with_thumbnail(
                 '', 'end', iid=item_id,
-                values=self._part_to_values(part),
+                values=values,
                 contour=part.get('contour', []),
                 color=color,
                 tags=(tag,)
@@ -1592,11 +1635,9 @@ class DetailedPartsPanel(ctk.CTkFrame):
             return
 
         try:
-            from core.supabase_client import get_supabase_client
-            from products.repository import ProductRepository
+            from core.service_locator import get_service, PRODUCT_REPOSITORY
 
-            client = get_supabase_client()
-            product_repo = ProductRepository(client)
+            product_repo = get_service(PRODUCT_REPOSITORY)
 
             added = 0
             for product_id in product_ids:
@@ -1697,7 +1738,7 @@ class DetailedPartsPanel(ctk.CTkFrame):
 
         idx = self._find_part_index(selection[0])
         if idx is not None:
-            del self.parts_data[idx]
+            self._cost_lines.remove_part(self.parts_data.pop(idx))
 
         self._refresh_table()
         self._update_summary()
@@ -70,10 +70,19 @@ def setup_file_logging():
 
     return log_file
 
-# Inicjalizuj logowanie
-LOG_FILE = setup_file_logging()
 logger = logging.getLogger(__name__)
-logger.info(f"[OrderWindow] Log file: {LOG_FILE}")
+
+# Plik logu - konfigurowany przy pierwszym oknie, nie przy imporcie modułu
+LOG_FILE: Optional[Path] = None
+
+
+def get_log_file() -> Path:
+    """Skonfiguruj logowanie do pliku (raz) i zwróć ścieżkę pliku"""
+    global LOG_FILE
+    if LOG_FILE is None:
+        LOG_FILE = setup_file_logging()
+        logger.info(f"[OrderWindow] Log file: {LOG_FILE}")
+    return LOG_FILE
 
 
 # ============================================================
@@ -647,6 +656,9 @@ class PartsListPanel(ctk.CTkFrame):
         self.thumbnail_generator = ThumbnailGenerator(callback=self._on_thumbnail_ready)
         self.thumbnail_generator.start()
 
+        # Równoległe wczytywanie DXF (stop() przy zamknięciu)
+        self._dxf_loader = None
+
         self._setup_ui()
 
     def _setup_ui(self):
@@ -807,7 +819,8 @@ class PartsListPanel(ctk.CTkFrame):
 
         def load_thread():
             try:
-                from quotations.utils.dxf_loader import load_dxf
+                from core.dxf import BatchDXFLoader
+                from quotations.utils.dxf_loader import load_dxf, iter_load_dxf
                 from quotations.utils.name_parser import parse_filename_with_folder_context
                 from quotations.utils.dxf_area_calculator import (
                     calculate_weight_from_contour,
@@ -816,11 +829,14 @@ class PartsListPanel(ctk.CTkFrame):
                     process_dxf_file
                 )
 
+                def on_progress(done, total, path):
+                    self.after(0, lambda: self.lbl_loading.configure(text=f"Ładowanie {done}/{total}..."))
+
+                # Geometria wczytywana równolegle w puli procesów
+                self._dxf_loader = BatchDXFLoader(extractor=load_dxf)
                 loaded_count = 0
-                for i, filepath in enumerate(filepaths):
+                for filepath, part in iter_load_dxf(filepaths, progress=on_progress, loader=self._dxf_loader):
                     try:
-                        logger.debug(f"[PartsListPanel] Loading file {i+1}/{len(filepaths)}: {filepath}")
-                        part = load_dxf(filepath)
                         if not part:
                             logger.warning(f"[PartsListPanel] Failed to load: {filepath}")
                             continue
@@ -1139,6 +1155,8 @@ class PartsListPanel(ctk.CTkFrame):
     def destroy(self):
         """Cleanup"""
         self.thumbnail_generator.stop()
+        if self._dxf_loader is not None:
+            self._dxf_loader.stop()
         super().destroy()
 
 
@@ -1794,6 +1812,7 @@ class OrderWindow(ctk.CTkToplevel):
     def __init__(self, parent=None, order_id: str = None, order_data: Dict = None,
                  on_save_callback: Callable = None):
         super().__init__(parent)
+        get_log_file()
 
         self.parent = parent
         self.order_id = order_id or str(uuid.uuid4())
@@ -1991,7 +2010,7 @@ class OrderWindow(ctk.CTkToplevel):
         self.lbl_status.pack(side="left", padx=15, pady=5)
 
         # Log file info
-        log_info = ctk.CTkLabel(statusbar, text=f"Log: {LOG_FILE}", font=ctk.CTkFont(size=9),
+        log_info = ctk.CTkLabel(statusbar, text=f"Log: {get_log_file()}", font=ctk.CTkFont(size=9),
                                  text_color=Theme.TEXT_MUTED)
         log_info.pack(side="right", padx=15, pady=5)
 
@@ -2563,11 +2582,9 @@ class OrderWindow(ctk.CTkToplevel):
                 # Zapisz detale do katalogu produktów (jeśli zaznaczono)
                 if self.save_to_catalog_var.get():
                     try:
-                        from orders.repository import OrderRepository
-                        from core.supabase_client import get_supabase_client
+                        from core.service_locator import get_service, ORDER_REPOSITORY
 
-                        client = get_supabase_client()
-                        repo = OrderRepository(client)
+                        repo = get_service(ORDER_REPOSITORY)
                         saved_ids = repo.save_parts_to_catalog(parts, self.order_id)
                         logger.info(f"[OrderWindow] Saved {len(saved_ids)} parts to catalog")
                     except Exception as e:
@@ -2591,11 +2608,9 @@ class OrderWindow(ctk.CTkToplevel):
     def _save_to_repository(self, order_data: Dict) -> bool:
         """Zapisz zamówienie do repozytorium"""
         try:
-            from orders.repository import OrderRepository
-            from core.supabase_client import get_supabase_client
+            from core.service_locator import get_service, ORDER_REPOSITORY
 
-            client = get_supabase_client()
-            repo = OrderRepository(client)
+            repo = get_service(ORDER_REPOSITORY)
 
             # Sprawdź czy istnieje
             existing = repo.get_by_id(order_data['id'])
@@ -2685,11 +2700,9 @@ class OrderWindow(ctk.CTkToplevel):
         if not self.order_data.get('items'):
             logger.info(f"[OrderWindow] No items in order_data, fetching from repository...")
             try:
-                from orders.repository import OrderRepository
-                from core.supabase_client import get_supabase_client
+                from core.service_locator import get_service, ORDER_REPOSITORY
 
-                client = get_supabase_client()
-                repo = OrderRepository(client)
+                repo = get_service(ORDER_REPOSITORY)
                 full_data = repo.get_by_id(self.order_id)
 
                 if full_data:
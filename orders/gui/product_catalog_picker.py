@@ -196,11 +196,9 @@ class ProductCatalogPicker(ctk.CTkToplevel):
     def _load_products(self):
         """Załaduj produkty z bazy"""
         try:
-            from core.supabase_client import get_supabase_client
-            from products.repository import ProductRepository
+            from core.service_locator import get_service, PRODUCT_REPOSITORY
 
-            client = get_supabase_client()
-            repo = ProductRepository(client)
+            repo = get_service(PRODUCT_REPOSITORY)
 
             # Pobierz produkty z filtrami
             search = self.search_var.get().strip() if hasattr(self, 'search_var') else None
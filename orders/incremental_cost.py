@@ -0,0 +1,290 @@
+"""
+NewERP - Incremental Cost Model
+===============================
+Przyrostowe przeliczanie kosztów zamówienia przy edycji pojedynczych linii.
+
+Model pamięta wkład każdej linii w sumy zamówienia (LineTotals). Edycja
+linii oznacza ją jako zmienioną; przeliczenie liczy tylko zmienione linie
+i aktualizuje sumy o różnicę. Zmiana parametrów wpływających na koszt
+części (include_*) oznacza wszystkie linie, pozostałe parametry
+(narzut, koszty per zlecenie, model alokacji) przeliczają tylko podsumowanie.
+
+Seria szybkich zmian grupowana jest przez Debouncer w jedno przeliczenie
+i jedno powiadomienie słuchaczy.
+
+Śledzenie zmian i grupowanie realizuje IncrementalLines - używane też
+bezpośrednio przez DetailedPartsPanel z jego własną wyceną wierszy.
+
+Usage:
+    model = IncrementalCostModel(params=CostParams())
+    model.on_change(lambda result, changed: refresh(result, changed))
+    model.set_parts(parts)
+
+    part['quantity'] = 5
+    model.update_part(part)          # przeliczenie po delay_ms
+    result = model.recalculate()     # lub od razu
+"""
+
+import time
+import logging
+import threading
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from orders.cost_engine import CostEngine, LineTotals, OrderCostResult, OrderTotals, get_cost_engine
+from orders.cost_events import Debouncer
+from orders.cost_models import CostParams
+
+logger = logging.getLogger(__name__)
+
+
+# Parametry wpływające na koszty jednostkowe części
+PART_PARAMS = frozenset({
+    'include_material', 'include_cutting', 'include_foil_removal', 'include_piercing',
+})
+
+ChangeListener = Callable[[Any, Set[Any]], None]
+
+
+class IncrementalLines:
+    """
+    Linie przeliczane przyrostowo: śledzenie zmian i grupowanie przeliczeń.
+
+    Linie identyfikowane są stabilnym kluczem (domyślnie id słownika części,
+    niezależnie od numeracji wierszy). Przeliczenie dostaje tylko zmienione
+    linie - funkcja recalculate(zmienione_części) -> wynik albo podklasa
+    nadpisująca _recalculate_lines.
+    """
+
+    def __init__(self, recalculate: Callable[[List[Dict]], Any] = None,
+                 key: Callable[[Dict], Any] = None, delay_ms: int = 50,
+                 schedule: Callable[[int, Callable], Any] = None,
+                 cancel: Callable[[Any], None] = None):
+        """
+        Args:
+            recalculate: Przeliczenie zmienionych linii; zwraca wynik dla słuchaczy
+            key: Klucz linii (domyślnie id słownika części)
+            delay_ms: Czas grupowania zmian przed przeliczeniem
+            schedule, cancel: Planowanie wywołań (np. widget.after / after_cancel)
+        """
+        self._recalculate = recalculate
+        self._key = key or id
+
+        self._parts: Dict[Any, Dict] = {}
+        self._dirty: Set[Any] = set()
+        self._removed: Set[Any] = set()
+        self._order_dirty = True
+        self._result: Any = None
+
+        self._listeners: List[ChangeListener] = []
+        self._lock = threading.RLock()
+        self._debouncer = Debouncer(self.recalculate, delay_ms, schedule, cancel)
+
+    # ============================================================
+    # ZMIANY
+    # ============================================================
+
+    def on_change(self, listener: ChangeListener):
+        """Zarejestruj słuchacza: listener(wynik, klucze_zmienionych_linii)"""
+        self._listeners.append(listener)
+
+    def set_parts(self, parts: List[Dict]):
+        """Zastąp wszystkie linie"""
+        with self._lock:
+            old_keys = set(self._parts)
+            self._parts = {self._key(p): p for p in parts}
+            self._removed.update(old_keys - set(self._parts))
+            self._clear_lines()
+            self._dirty = set(self._parts)
+            self._order_dirty = True
+        self._debouncer.trigger()
+
+    def add_part(self, part: Dict):
+        """Dodaj linię (lub zastąp linię o tym samym kluczu)"""
+        self.update_part(part)
+
+    def update_part(self, part: Dict):
+        """Oznacz linię jako zmienioną (słownik mógł być zmieniony in-place)"""
+        with self._lock:
+            key = self._key(part)
+            self._parts[key] = part
+            self._dirty.add(key)
+            self._removed.discard(key)
+        self._debouncer.trigger()
+
+    def remove_part(self, part_or_key: Any):
+        """Usuń linię (słownik części lub jej klucz)"""
+        key = self._key(part_or_key) if isinstance(part_or_key, dict) else part_or_key
+        with self._lock:
+            if self._parts.pop(key, None) is None:
+                return
+            self._drop_line(key)
+            self._dirty.discard(key)
+            self._removed.add(key)
+            self._order_dirty = True
+        self._debouncer.trigger()
+
+    def mark_all_dirty(self):
+        """Przelicz wszystkie linie przy następnym przeliczeniu (np. po przeładowaniu cenników)"""
+        with self._lock:
+            self._dirty.update(self._parts)
+        self._debouncer.trigger()
+
+    def mark_order_dirty(self):
+        """Przelicz samo podsumowanie (np. zmiana ilości bez zmiany kosztów jednostkowych)"""
+        with self._lock:
+            self._order_dirty = True
+        self._debouncer.trigger()
+
+    # ============================================================
+    # PRZELICZENIE
+    # ============================================================
+
+    @property
+    def result(self) -> Any:
+        """Ostatni wynik (None przed pierwszym przeliczeniem)"""
+        return self._result
+
+    @property
+    def is_dirty(self) -> bool:
+        """Czy są zmiany czekające na przeliczenie"""
+        return bool(self._dirty) or self._order_dirty
+
+    @property
+    def pending(self) -> bool:
+        """Czy przeliczenie czeka na upływ delay_ms"""
+        return self._debouncer.pending
+
+    def recalculate(self) -> Any:
+        """Przelicz zmienione linie od razu i powiadom słuchaczy (jeśli coś się zmieniło)"""
+        self._debouncer.cancel()
+        with self._lock:
+            if not self.is_dirty:
+                return self._result
+            dirty_keys = [k for k in self._parts if k in self._dirty]
+            result = self._recalculate_lines(dirty_keys)
+            changed = set(dirty_keys) | self._removed
+
+            self._dirty.clear()
+            self._removed.clear()
+            self._order_dirty = False
+            self._result = result
+
+        for listener in self._listeners:
+            try:
+                listener(result, changed)
+            except Exception as e:
+                logger.error(f"[IncrementalCost] Listener error: {e}")
+        return result
+
+    def _recalculate_lines(self, dirty_keys: List[Any]) -> Any:
+        return self._recalculate([self._parts[k] for k in dirty_keys])
+
+    def _clear_lines(self):
+        """Zapomnij wkłady wszystkich linii (set_parts)"""
+
+    def _drop_line(self, key: Any):
+        """Odejmij wkład usuniętej linii"""
+
+
+class IncrementalCostModel(IncrementalLines):
+    """
+    Koszty zamówienia aktualizowane przyrostowo.
+
+    Wynik recalculate() jest identyczny z CostEngine.calculate_order_cost
+    dla bieżących części, parametrów i danych nestingu.
+    """
+
+    def __init__(self, engine: Optional[CostEngine] = None, params: Optional[CostParams] = None,
+                 key: Callable[[Dict], Any] = None, delay_ms: int = 50,
+                 schedule: Callable[[int, Callable], Any] = None,
+                 cancel: Callable[[Any], None] = None):
+        """
+        Args:
+            engine: Silnik kosztów (domyślnie globalny)
+            params: Parametry kalkulacji (kopiowane)
+            key: Klucz linii (domyślnie id słownika części)
+            delay_ms: Czas grupowania zmian przed przeliczeniem
+            schedule, cancel: Planowanie wywołań (np. widget.after / after_cancel)
+        """
+        super().__init__(key=key, delay_ms=delay_ms, schedule=schedule, cancel=cancel)
+        self.engine = engine or get_cost_engine()
+        self.params = replace(params) if params else CostParams()
+
+        self._lines: Dict[Any, LineTotals] = {}
+        self._totals = OrderTotals()
+        self._nesting_data: Optional[Dict] = None
+
+    # ============================================================
+    # ZMIANY
+    # ============================================================
+
+    def _clear_lines(self):
+        self._lines.clear()
+        self._totals = OrderTotals()
+
+    def _drop_line(self, key: Any):
+        line = self._lines.pop(key, None)
+        if line is not None:
+            self._totals.remove(line)
+
+    def set_params(self, **changes):
+        """
+        Zmień parametry kalkulacji.
+
+        Parametry include_* przeliczają wszystkie linie, pozostałe - tylko podsumowanie.
+        """
+        with self._lock:
+            changed = {name for name, value in changes.items() if getattr(self.params, name) != value}
+            if not changed:
+                return
+            self.params = replace(self.params, **changes)
+            if changed & PART_PARAMS:
+                self._dirty.update(self._parts)
+            self._order_dirty = True
+        self._debouncer.trigger()
+
+    def set_nesting_data(self, nesting_data: Optional[Dict]):
+        """Ustaw dane nestingu (alokacja materiału, liczba arkuszy)"""
+        with self._lock:
+            self._nesting_data = nesting_data
+            self._order_dirty = True
+        self._debouncer.trigger()
+
+    # ============================================================
+    # PRZELICZENIE
+    # ============================================================
+
+    @property
+    def result(self) -> Optional[OrderCostResult]:
+        """Ostatni wynik (None przed pierwszym przeliczeniem)"""
+        return self._result
+
+    def _recalculate_lines(self, dirty_keys: List[Any]) -> OrderCostResult:
+        start_time = time.perf_counter()
+        dirty_parts = [self._parts[k] for k in dirty_keys]
+
+        if dirty_parts:
+            batch = self.engine.calculate_batch(dirty_parts, self.params)
+            self.engine.apply_part_costs(dirty_parts, batch)
+            for key, line in zip(dirty_keys, self.engine.line_totals(dirty_parts, self.params, batch)):
+                old = self._lines.get(key)
+                if old is not None:
+                    self._totals.remove(old)
+                self._totals.add(line)
+                self._lines[key] = line
+
+        # Alokacja z arkuszy zależy od wszystkich linii - tania, bez stawek
+        material = None
+        parts = list(self._parts.values())
+        allocations = self.engine.material_allocations(parts, self.params, self._nesting_data)
+        if allocations is not None:
+            lines = [self._lines[k] for k in self._parts]
+            material = OrderTotals.allocated_material(lines, allocations, self.params)
+
+        result = self.engine.finalize_order_cost(
+            self._totals, self.params, self._nesting_data, start_time, material
+        )
+        logger.debug(f"[IncrementalCost] Recalculated {len(dirty_keys)}/{len(parts)} lines "
+                     f"in {result.calculation_time_ms:.1f}ms")
+        return result
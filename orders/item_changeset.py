@@ -0,0 +1,225 @@
+"""
+Order Item Change Set
+=====================
+Różnicowy zapis pozycji zamówienia (order_items).
+
+Zamiast usuwać wszystkie wiersze i wstawiać je od nowa, repozytorium
+pamięta odcisk każdego zapisanego wiersza (kolumny + hash product_snapshot).
+Przy zapisie pozycje dopasowywane są do wierszy - po id wiersza, a potem
+po nazwie/materiale/grubości/pliku - i do bazy trafiają tylko:
+- nowe wiersze (insert),
+- zmienione wiersze (upsert); product_snapshot z konturem i otworami
+  wysyłany jest tylko gdy się zmienił,
+- id usuniętych wierszy (delete ... in).
+"""
+
+import json
+import uuid
+import hashlib
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.geometry_codec import encode_geometry
+
+# Kolumny order_items porównywane przy zapisie (poza product_snapshot)
+ITEM_COLUMNS = (
+    'custom_name', 'qty', 'thickness_mm', 'unit_price', 'total_price',
+    'documentation_path', 'notes',
+)
+
+# Klucz pozycji po stronie aplikacji z id wiersza order_items
+ROW_ID_KEY = 'order_item_id'
+
+
+def build_item_record(order_id: str, item: Dict) -> Dict:
+    """
+    Mapowanie pozycji aplikacji -> kolumny order_items (bez id i znaczników czasu).
+
+    Schemat bazy: id, order_id, custom_name, qty, thickness_mm,
+                  unit_price, total_price, documentation_path, notes,
+                  product_snapshot, created_at, updated_at
+    """
+    # Snapshot produktu - wszystkie dane detalu w JSON, geometria zakodowana
+    product_snapshot = {
+        'name': item.get('name', ''),
+        'material': item.get('material', ''),
+        'thickness_mm': item.get('thickness_mm', 0),
+        'width': item.get('width', 0),
+        'height': item.get('height', 0),
+        'weight_kg': item.get('weight_kg', 0),
+        'filepath': item.get('filepath', ''),
+        **item_geometry(item),
+    }
+
+    return {
+        'order_id': order_id,
+        'custom_name': item.get('name', ''),
+        'qty': int(item.get('quantity', 1)),
+        'thickness_mm': float(item.get('thickness_mm', 0)),
+        'unit_price': float(item.get('unit_cost', 0)),
+        'total_price': float(item.get('total_cost', 0)),
+        'documentation_path': item.get('filepath', ''),
+        'notes': f"Materiał: {item.get('material', '')} | {item.get('width', 0):.0f}x{item.get('height', 0):.0f}mm",
+        'product_snapshot': json.dumps(product_snapshot),
+    }
+
+
+def item_geometry(item: Dict) -> Dict:
+    """
+    Geometria pozycji do product_snapshot.
+
+    Pozycja odczytana bez dekodowania (tylko 'geometry') zachowuje zakodowany
+    napis; kontur, którego nie da się zakodować, zapisywany jest jak dawniej.
+    """
+    if 'contour' not in item and 'holes' not in item and item.get('geometry'):
+        return {'geometry': item['geometry']}
+
+    contour, holes = item.get('contour', []), item.get('holes', [])
+    try:
+        return {'geometry': encode_geometry(contour, holes)}
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return {'contour': contour, 'holes': holes}
+
+
+def item_key(item: Dict) -> Tuple:
+    """Naturalny klucz pozycji - dopasowanie gdy pozycja nie zna id wiersza"""
+    return (
+        item.get('name', ''),
+        item.get('material', ''),
+        round(float(item.get('thickness_mm', 0) or 0), 3),
+        item.get('filepath', ''),
+    )
+
+
+def snapshot_hash(snapshot_json: str) -> str:
+    """Hash product_snapshot (geometria nie jest trzymana w pamięci drugi raz)"""
+    return hashlib.blake2b(snapshot_json.encode('utf-8'), digest_size=16).hexdigest()
+
+
+@dataclass
+class PersistedItem:
+    """Odcisk zapisanego wiersza order_items"""
+    row_id: str
+    key: Tuple
+    columns: Tuple
+    snapshot: str
+
+    @classmethod
+    def from_record(cls, row_id: str, item: Dict, record: Dict) -> 'PersistedItem':
+        return cls(
+            row_id=row_id,
+            key=item_key(item),
+            columns=tuple(record[c] for c in ITEM_COLUMNS),
+            snapshot=snapshot_hash(record['product_snapshot']),
+        )
+
+    @classmethod
+    def unknown(cls, row_id: str) -> 'PersistedItem':
+        """Wiersz o nieznanej zawartości - dopasowywany tylko po id, zmieniane wszystkie kolumny"""
+        return cls(row_id=row_id, key=(), columns=(object(),) * len(ITEM_COLUMNS), snapshot='')
+
+
+@dataclass
+class ItemChangeSet:
+    """Zmiany pozycji zamówienia do wysłania do bazy"""
+    inserts: List[Dict] = field(default_factory=list)
+    updates: List[Dict] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    # Stan wierszy po zapisaniu zmian (row_id -> odcisk)
+    state: Dict[str, PersistedItem] = field(default_factory=dict)
+    # Id wiersza dla każdej pozycji (w kolejności pozycji)
+    row_ids: List[str] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.inserts or self.updates or self.deletes)
+
+    def summary(self) -> str:
+        return (f"+{len(self.inserts)} ~{len(self.updates)} -{len(self.deletes)} "
+                f"={self.unchanged}")
+
+
+def diff_items(order_id: str, items: List[Dict], persisted: Dict[str, PersistedItem],
+               now: str) -> ItemChangeSet:
+    """
+    Porównaj pozycje z zapisanym stanem.
+
+    Args:
+        order_id: ID zamówienia
+        items: Pozycje aplikacji (w kolejności zamówienia)
+        persisted: Zapisane wiersze (row_id -> odcisk)
+        now: Znacznik czasu created_at/updated_at
+
+    Returns:
+        ItemChangeSet z wierszami do wstawienia, zmiany i id do usunięcia
+    """
+    changes = ItemChangeSet()
+
+    # 1. Dopasowanie po id wiersza
+    matched: List[Optional[str]] = []
+    used = set()
+    for item in items:
+        row_id = item.get(ROW_ID_KEY) or item.get('id')
+        if row_id in persisted and row_id not in used:
+            used.add(row_id)
+            matched.append(row_id)
+        else:
+            matched.append(None)
+
+    # 2. Dopasowanie po kluczu naturalnym (w kolejności wierszy)
+    free_by_key: Dict[Tuple, deque] = defaultdict(deque)
+    for row_id, entry in persisted.items():
+        if row_id not in used:
+            free_by_key[entry.key].append(row_id)
+    for i, item in enumerate(items):
+        if matched[i] is None:
+            candidates = free_by_key.get(item_key(item))
+            if candidates:
+                matched[i] = candidates.popleft()
+                used.add(matched[i])
+
+    for item, row_id in zip(items, matched):
+        record = build_item_record(order_id, item)
+        if row_id is None:
+            row_id = str(uuid.uuid4())
+            changes.inserts.append(dict(record, id=row_id, created_at=now, updated_at=now))
+            entry = PersistedItem.from_record(row_id, item, record)
+        else:
+            old = persisted[row_id]
+            entry = PersistedItem.from_record(row_id, item, record)
+            if entry.columns == old.columns and entry.snapshot == old.snapshot:
+                changes.unchanged += 1
+            else:
+                # Kolumny skalarne wysyłane zawsze (małe, spełniają NOT NULL przy upsert),
+                # product_snapshot z geometrią tylko gdy się zmienił
+                update: Dict[str, Any] = {c: record[c] for c in ITEM_COLUMNS}
+                if entry.snapshot != old.snapshot:
+                    update['product_snapshot'] = record['product_snapshot']
+                changes.updates.append(dict(update, id=row_id, order_id=order_id, updated_at=now))
+
+        changes.state[row_id] = entry
+        changes.row_ids.append(row_id)
+
+    changes.deletes = [row_id for row_id in persisted if row_id not in used]
+    return changes
+
+
+def group_updates(updates: List[Dict]) -> List[List[Dict]]:
+    """
+    Pogrupuj zmiany wg zestawu kolumn.
+
+    Upsert wsadowy wysyła wspólny zestaw kolumn - grupy zapobiegają
+    nadpisaniu niezmienionych kolumn (np. product_snapshot) wartością NULL.
+    """
+    groups: Dict[frozenset, List[Dict]] = {}
+    for update in updates:
+        groups.setdefault(frozenset(update), []).append(update)
+    return list(groups.values())
+
+
+def chunks(rows: List[Any], size: int):
+    """Podziel listę na partie po `size` elementów"""
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
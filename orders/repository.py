@@ -14,6 +14,12 @@ from datetime import datetime
 import uuid
 import json
 
+from core.filters import KeysetPage, KeysetPagination, apply_keyset, keyset_page
+from core.geometry_codec import decode_geometry, decode_points, encode_points, is_encoded
+from orders.item_changeset import (
+    ROW_ID_KEY, ItemChangeSet, PersistedItem, build_item_record, chunks, diff_items, group_updates
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +29,7 @@ class OrderRepository:
     def __init__(self, supabase_client):
         self.client = supabase_client
         self._available_columns = None  # Cache dla dostępnych kolumn
+        self._items_state: Dict[str, Dict[str, PersistedItem]] = {}  # order_id -> zapisane wiersze order_items
 
     def _get_available_columns(self) -> set:
         """Pobierz dostępne kolumny tabeli orders"""
@@ -50,6 +57,17 @@ class OrderRepository:
         logger.info(f"[OrderRepository] Using default columns: {self._available_columns}")
         return self._available_columns
 
+    # Kolumny listy zamówień (dashboard) - bez metadata (JSON)
+    LIST_COLUMNS = (
+        'id', 'title', 'name', 'client', 'customer_name', 'customer_id', 'status', 'priority',
+        'date_in', 'date_due', 'total_cost', 'parts_count', 'created_at', 'updated_at'
+    )
+
+    def _list_columns(self, columns=None) -> str:
+        """Projekcja listy ograniczona do kolumn istniejących w tabeli"""
+        available = self._get_available_columns()
+        return ','.join(c for c in (columns or self.LIST_COLUMNS) if c in available or c == 'id')
+
     # Statusy zgodne z ENUM order_status w Supabase
     VALID_STATUSES = ['RECEIVED', 'CONFIRMED', 'PLANNED', 'IN_PROGRESS', 'DONE', 'INVOICED']
     DEFAULT_STATUS = 'RECEIVED'
@@ -147,7 +165,7 @@ class OrderRepository:
                 items = order_data.get('items', [])
                 if items:
                     logger.info(f"[OrderRepository] Saving {len(items)} order items")
-                    self._save_order_items(order_id, items)
+                    self._save_order_items(order_id, items, persisted={})
 
                 logger.info(f"[OrderRepository] === CREATE ORDER SUCCESS === {order_id}")
                 return order_id
@@ -177,12 +195,13 @@ class OrderRepository:
 
             return None
 
-    def get_by_id(self, order_id: str) -> Optional[Dict]:
+    def get_by_id(self, order_id: str, with_geometry: bool = True) -> Optional[Dict]:
         """
         Pobierz zamówienie po ID.
 
         Args:
             order_id: ID zamówienia
+            with_geometry: Dekoduj kontury pozycji (False - tylko zakodowane 'geometry')
 
         Returns:
             Dane zamówienia lub None
@@ -218,7 +237,7 @@ class OrderRepository:
                         logger.warning(f"[OrderRepository] Error parsing metadata: {e}")
 
                 # Pobierz pozycje
-                order['items'] = self._get_order_items(order_id)
+                order['items'] = self._get_order_items(order_id, with_geometry)
 
                 # Pobierz dane nestingu z NestingRepository (nowa tabela)
                 try:
@@ -264,17 +283,10 @@ class OrderRepository:
             if not response.data:
                 logger.warning(f"[OrderRepository] Update returned no data for {order_id}")
 
-            # Aktualizuj pozycje
+            # Aktualizuj pozycje - tylko zmienione wiersze
             items = order_data.get('items', [])
             if items:
                 logger.info(f"[OrderRepository] Updating {len(items)} order items")
-                # Usuń stare pozycje
-                try:
-                    self.client.table('order_items').delete().eq('order_id', order_id).execute()
-                except Exception as e:
-                    logger.warning(f"[OrderRepository] Error deleting old items: {e}")
-
-                # Dodaj nowe
                 self._save_order_items(order_id, items)
 
             logger.info(f"[OrderRepository] === UPDATE ORDER SUCCESS === {order_id}")
@@ -328,6 +340,7 @@ class OrderRepository:
         try:
             # Usuń pozycje
             self.client.table('order_items').delete().eq('order_id', order_id).execute()
+            self._items_state.pop(order_id, None)
             # Usuń zamówienie
             self.client.table('orders').delete().eq('id', order_id).execute()
 
@@ -342,10 +355,10 @@ class OrderRepository:
     # List & Search
     # ============================================================
 
-    def get_all(self, limit: int = 100, offset: int = 0) -> List[Dict]:
-        """Pobierz listę zamówień"""
+    def get_all(self, limit: int = 100, offset: int = 0, columns: str = '*') -> List[Dict]:
+        """Pobierz listę zamówień (offset - dla długich list get_page)"""
         try:
-            response = self.client.table('orders').select('*').order(
+            response = self.client.table('orders').select(columns).order(
                 'created_at', desc=True
             ).range(offset, offset + limit - 1).execute()
 
@@ -357,6 +370,39 @@ class OrderRepository:
             logger.error(f"[OrderRepository] Error getting orders: {e}")
             return []
 
+    def get_page(self, limit: int = 100, cursor: str = None, status: str = None,
+                 columns=None, count: str = None) -> KeysetPage:
+        """
+        Strona zamówień od najnowszych z paginacją po kluczu (created_at, id).
+
+        Args:
+            limit: Rozmiar strony
+            cursor: next_cursor poprzedniej strony (None = pierwsza strona)
+            status: Opcjonalny filtr statusu
+            columns: Projekcja (domyślnie LIST_COLUMNS)
+            count: 'exact' / 'planned' / 'estimated' - liczba wszystkich
+                w tym samym zapytaniu (tylko pierwsza strona)
+        """
+        pagination = KeysetPagination(limit=limit, cursor=cursor)
+        count = None if cursor else count
+        try:
+            select = self._list_columns(columns)
+            if count:
+                query = self.client.table('orders').select(select, count=count)
+            else:
+                query = self.client.table('orders').select(select)
+            if status:
+                query = query.eq('status', status)
+
+            response = apply_keyset(query, pagination).execute()
+            page = keyset_page(response.data, pagination, response.count if count else None)
+            logger.debug(f"[OrderRepository] Page with {len(page.items)} orders")
+            return page
+
+        except Exception as e:
+            logger.error(f"[OrderRepository] Error getting orders page: {e}")
+            return KeysetPage()
+
     def get_by_status(self, status: str, limit: int = 100) -> List[Dict]:
         """Pobierz zamówienia o danym statusie"""
         try:
@@ -397,13 +443,17 @@ class OrderRepository:
             return []
 
     def get_status_counts(self) -> Dict[str, int]:
-        """Pobierz liczby zamówień per status"""
+        """Pobierz liczby zamówień per status (liczone w bazie)"""
         try:
-            # Pobierz wszystkie zamówienia i policz statusy
-            response = self.client.table('orders').select('status').execute()
+            response = self.client.rpc('get_order_status_counts', {}).execute()
+            return {row['status']: int(row['order_count']) for row in (response.data or [])}
+        except Exception as e:
+            logger.debug(f"[OrderRepository] RPC get_order_status_counts unavailable: {e}")
 
+        try:
+            # Fallback - policz statusy z projekcji kolumny status
             counts = {}
-            for row in (response.data or []):
+            for row in self._scan_orders('status'):
                 status = row.get('status', 'unknown')
                 counts[status] = counts.get(status, 0) + 1
 
@@ -413,6 +463,120 @@ class OrderRepository:
             logger.error(f"[OrderRepository] Error getting status counts: {e}")
             return {}
 
+    # ============================================================
+    # Aggregates (dashboard)
+    # ============================================================
+
+    SCAN_PAGE_SIZE = 1000  # Domyślny limit wierszy PostgREST
+
+    def _scan_orders(self, columns: str) -> List[Dict]:
+        """Pobierz wybrane kolumny wszystkich zamówień stronami (fallback bez RPC)"""
+        rows = []
+        offset = 0
+        while True:
+            page = self.client.table('orders').select(columns).order('id').range(
+                offset, offset + self.SCAN_PAGE_SIZE - 1
+            ).execute().data or []
+            rows.extend(page)
+            if len(page) < self.SCAN_PAGE_SIZE:
+                return rows
+            offset += self.SCAN_PAGE_SIZE
+
+    def get_revenue_by_period(self, period: str = 'month', date_from: str = None,
+                              date_to: str = None) -> List[Dict]:
+        """Przychód per okres: [{'period': 'YYYY-MM-DD', 'order_count', 'revenue'}, ...]"""
+        try:
+            response = self.client.rpc('get_order_revenue_by_period', {
+                'p_period': period, 'p_from': date_from, 'p_to': date_to
+            }).execute()
+            return [{'period': str(row['period'])[:10], 'order_count': int(row['order_count']),
+                     'revenue': float(row['revenue'] or 0)} for row in (response.data or [])]
+        except Exception as e:
+            logger.debug(f"[OrderRepository] RPC get_order_revenue_by_period unavailable: {e}")
+
+        from orders.aggregates import AGGREGATE_COLUMNS, aggregate_orders, period_start
+        try:
+            rows = self._scan_orders(AGGREGATE_COLUMNS)
+            if date_from or date_to:
+                def in_range(row):
+                    day = period_start(row.get('date_in') or row.get('created_at'), 'day')
+                    return day and (not date_from or day >= date_from) and (not date_to or day <= date_to)
+                rows = [row for row in rows if in_range(row)]
+            aggregates = aggregate_orders(rows, period)
+            return [dict(values, period=key) for key, values in sorted(aggregates.revenue_by_period.items())]
+        except Exception as e:
+            logger.error(f"[OrderRepository] Error getting revenue by period: {e}")
+            return []
+
+    def get_customer_totals(self, limit: int = None) -> List[Dict]:
+        """Liczba i wartość zamówień per klient, malejąco po wartości"""
+        try:
+            response = self.client.rpc('get_order_customer_totals', {'p_limit': limit}).execute()
+            return [dict(row, order_count=int(row['order_count']), revenue=float(row['revenue'] or 0))
+                    for row in (response.data or [])]
+        except Exception as e:
+            logger.debug(f"[OrderRepository] RPC get_order_customer_totals unavailable: {e}")
+
+        from orders.aggregates import AGGREGATE_COLUMNS, aggregate_orders
+        try:
+            aggregates = aggregate_orders(self._scan_orders(AGGREGATE_COLUMNS))
+            return aggregates.top_customers(limit if limit is not None else len(aggregates.customer_totals))
+        except Exception as e:
+            logger.error(f"[OrderRepository] Error getting customer totals: {e}")
+            return []
+
+    def get_dashboard_aggregates(self, period: str = 'month'):
+        """
+        Wszystkie agregaty dashboardu w jednej migawce (OrderAggregates)
+        razem z watermark = max(updated_at) do odświeżania przyrostowego.
+        """
+        from orders.aggregates import AGGREGATE_COLUMNS, OrderAggregates, aggregate_orders
+        try:
+            response = self.client.rpc('get_order_dashboard', {'p_period': period}).execute()
+            if response.data:
+                return OrderAggregates.from_dashboard(response.data, period)
+        except Exception as e:
+            logger.debug(f"[OrderRepository] RPC get_order_dashboard unavailable: {e}")
+
+        try:
+            return aggregate_orders(self._scan_orders(AGGREGATE_COLUMNS), period)
+        except Exception as e:
+            logger.error(f"[OrderRepository] Error getting dashboard aggregates: {e}")
+            return OrderAggregates(period=period)
+
+    def get_orders_changed_since(self, watermark: str, columns: str = None) -> Optional[List[Dict]]:
+        """Zamówienia z updated_at > watermark (None przy błędzie)"""
+        from orders.aggregates import AGGREGATE_COLUMNS
+        try:
+            response = self.client.table('orders').select(columns or AGGREGATE_COLUMNS).gt(
+                'updated_at', watermark
+            ).order('updated_at').execute()
+            return response.data or []
+        except Exception as e:
+            logger.error(f"[OrderRepository] Error getting changed orders: {e}")
+            return None
+
+    def get_orders_watermark(self) -> Optional[Dict]:
+        """{'watermark': max(updated_at), 'order_count': liczba zamówień} (None przy błędzie)"""
+        try:
+            response = self.client.rpc('get_orders_watermark', {}).execute()
+            if response.data:
+                return {'watermark': response.data.get('watermark'),
+                        'order_count': int(response.data.get('order_count') or 0)}
+        except Exception as e:
+            logger.debug(f"[OrderRepository] RPC get_orders_watermark unavailable: {e}")
+
+        try:
+            response = self.client.table('orders').select('updated_at', count='exact').order(
+                'updated_at', desc=True, nullsfirst=False
+            ).limit(1).execute()
+            rows = response.data or []
+            return {'watermark': rows[0].get('updated_at') if rows else None,
+                    'order_count': int(response.count or 0)}
+        except Exception as e:
+            logger.error(f"[OrderRepository] Error getting orders watermark: {e}")
+            return None
+
     # ============================================================
     # Order Items (pozycje zamówienia)
     # ============================================================
@@ -437,92 +601,83 @@ class OrderRepository:
         self._order_items_columns = {'id', 'order_id', 'name', 'quantity', 'created_at'}
         return self._order_items_columns
 
-    def _save_order_items(self, order_id: str, items: List[Dict]):
-        """Zapisz pozycje zamówienia - mapowanie do schematu Supabase"""
-        try:
-            records = []
-            for i, item in enumerate(items):
-                # Mapowanie pól aplikacji → kolumny bazy danych
-                # Schemat bazy: id, order_id, custom_name, qty, thickness_mm,
-                #               unit_price, total_price, documentation_path, notes,
-                #               product_snapshot, created_at, updated_at
-
-                # Snapshot produktu - wszystkie dane detalu w JSON
-                product_snapshot = {
-                    'name': item.get('name', ''),
-                    'material': item.get('material', ''),
-                    'thickness_mm': item.get('thickness_mm', 0),
-                    'width': item.get('width', 0),
-                    'height': item.get('height', 0),
-                    'weight_kg': item.get('weight_kg', 0),
-                    'filepath': item.get('filepath', ''),
-                    'contour': item.get('contour', []),
-                    'holes': item.get('holes', []),
-                }
+    # Rozmiar partii insert/upsert/delete pozycji
+    ITEMS_BATCH_SIZE = 500
 
-                record = {
-                    'id': str(uuid.uuid4()),
-                    'order_id': order_id,
-                    'custom_name': item.get('name', ''),
-                    'qty': int(item.get('quantity', 1)),
-                    'thickness_mm': float(item.get('thickness_mm', 0)),
-                    'unit_price': float(item.get('unit_cost', 0)),
-                    'total_price': float(item.get('total_cost', 0)),
-                    'documentation_path': item.get('filepath', ''),
-                    'notes': f"Materiał: {item.get('material', '')} | {item.get('width', 0):.0f}x{item.get('height', 0):.0f}mm",
-                    'product_snapshot': json.dumps(product_snapshot),
-                    'created_at': datetime.now().isoformat(),
-                    'updated_at': datetime.now().isoformat()
-                }
-                records.append(record)
+    def _save_order_items(self, order_id: str, items: List[Dict],
+                          persisted: Optional[Dict[str, PersistedItem]] = None):
+        """
+        Zapisz pozycje zamówienia różnicowo - mapowanie do schematu Supabase.
 
-            if records:
-                logger.info(f"[OrderRepository] Inserting {len(records)} order items")
-                logger.debug(f"[OrderRepository] First record keys: {list(records[0].keys())}")
-                self.client.table('order_items').insert(records).execute()
-                logger.info(f"[OrderRepository] Saved {len(records)} order items successfully")
+        Wysyłane są tylko nowe, zmienione i usunięte wiersze (orders.item_changeset).
+        Stan zapisanych wierszy pochodzi z ostatniego odczytu/zapisu zamówienia;
+        gdy go brak, jest odczytywany z bazy.
 
+        Args:
+            order_id: ID zamówienia
+            items: Pozycje zamówienia (dostają id wiersza w ROW_ID_KEY)
+            persisted: Znany stan wierszy ({} dla nowego zamówienia)
+        """
+        if persisted is None:
+            persisted = self._items_state.get(order_id)
+        if persisted is None:
+            try:
+                persisted = self._load_items_state(order_id)
+            except Exception as e:
+                # Bez stanu nie da się policzyć różnicy - zapis pełny jak dawniej
+                logger.warning(f"[OrderRepository] Cannot load order items state, rewriting all: {e}")
+                try:
+                    self.client.table('order_items').delete().eq('order_id', order_id).execute()
+                except Exception as e2:
+                    logger.warning(f"[OrderRepository] Error deleting old items: {e2}")
+                persisted = {}
+
+        changes = diff_items(order_id, items, persisted, datetime.now().isoformat())
+        logger.info(f"[OrderRepository] Order items changes for {order_id}: {changes.summary()}")
+
+        try:
+            self._apply_item_changes(changes)
         except Exception as e:
             logger.error(f"[OrderRepository] Error saving order items: {e}")
-
-    def _get_order_items(self, order_id: str) -> List[Dict]:
+            # Stan bazy nieznany - odczytaj przy następnym zapisie
+            self._items_state.pop(order_id, None)
+            return
+
+        self._items_state[order_id] = changes.state
+        for item, row_id in zip(items, changes.row_ids):
+            item[ROW_ID_KEY] = row_id
+
+    def _apply_item_changes(self, changes: ItemChangeSet):
+        """Wyślij zmiany pozycji partiami"""
+        table = self.client.table
+        size = self.ITEMS_BATCH_SIZE
+
+        for batch in chunks(changes.deletes, size):
+            table('order_items').delete().in_('id', batch).execute()
+
+        for batch in chunks(changes.inserts, size):
+            table('order_items').insert(batch).execute()
+
+        for group in group_updates(changes.updates):
+            for batch in chunks(group, size):
+                table('order_items').upsert(batch).execute()
+
+    def _fetch_order_item_rows(self, order_id: str) -> List[Dict]:
+        """Pobierz wiersze order_items zamówienia (wyjątek przy błędzie)"""
+        response = self.client.table('order_items').select('*').eq(
+            'order_id', order_id
+        ).order('created_at').execute()
+        return response.data or []
+
+    def _load_items_state(self, order_id: str) -> Dict[str, PersistedItem]:
+        """Odczytaj z bazy stan zapisanych wierszy zamówienia"""
+        self._rows_to_items(order_id, self._fetch_order_item_rows(order_id), with_geometry=False)
+        return self._items_state[order_id]
+
+    def _get_order_items(self, order_id: str, with_geometry: bool = True) -> List[Dict]:
         """Pobierz pozycje zamówienia - mapowanie z bazy do formatu aplikacji"""
         try:
-            response = self.client.table('order_items').select('*').eq(
-                'order_id', order_id
-            ).order('created_at').execute()
-
-            items = []
-            for row in (response.data or []):
-                # Spróbuj odczytać dane z product_snapshot
-                snapshot = {}
-                if row.get('product_snapshot'):
-                    try:
-                        if isinstance(row['product_snapshot'], str):
-                            snapshot = json.loads(row['product_snapshot'])
-                        else:
-                            snapshot = row['product_snapshot']
-                    except:
-                        pass
-
-                # Mapowanie kolumn bazy → pola aplikacji
-                item = {
-                    'id': row.get('id', ''),
-                    'name': row.get('custom_name', '') or snapshot.get('name', ''),
-                    'material': snapshot.get('material', ''),
-                    'thickness_mm': row.get('thickness_mm', 0) or snapshot.get('thickness_mm', 0),
-                    'quantity': row.get('qty', 1),
-                    'width': snapshot.get('width', 0),
-                    'height': snapshot.get('height', 0),
-                    'weight_kg': snapshot.get('weight_kg', 0),
-                    'unit_cost': row.get('unit_price', 0),
-                    'total_cost': row.get('total_price', 0),
-                    'filepath': row.get('documentation_path', '') or snapshot.get('filepath', ''),
-                    'contour': snapshot.get('contour', []),
-                    'holes': snapshot.get('holes', []),
-                }
-                items.append(item)
-
+            items = self._rows_to_items(order_id, self._fetch_order_item_rows(order_id), with_geometry)
             logger.debug(f"[OrderRepository] Loaded {len(items)} order items for {order_id}")
             return items
 
@@ -530,6 +685,72 @@ class OrderRepository:
             logger.error(f"[OrderRepository] Error getting order items: {e}")
             return []
 
+    def _rows_to_items(self, order_id: str, rows: List[Dict], with_geometry: bool = True) -> List[Dict]:
+        """
+        Mapowanie wierszy order_items -> pozycje aplikacji; zapamiętuje stan wierszy.
+
+        Geometria zapisana kodekiem trafia do 'geometry' i jest dekodowana do
+        'contour'/'holes' tylko gdy with_geometry. Stare wiersze z listami
+        punktów w JSON czytane są bez zmian.
+        """
+        items = []
+        state = {}
+        for row in rows:
+            # Spróbuj odczytać dane z product_snapshot
+            snapshot = {}
+            if row.get('product_snapshot'):
+                try:
+                    if isinstance(row['product_snapshot'], str):
+                        snapshot = json.loads(row['product_snapshot'])
+                    else:
+                        snapshot = row['product_snapshot']
+                except:
+                    pass
+
+            # Mapowanie kolumn bazy → pola aplikacji
+            item = {
+                'id': row.get('id', ''),
+                'name': row.get('custom_name', '') or snapshot.get('name', ''),
+                'material': snapshot.get('material', ''),
+                'thickness_mm': row.get('thickness_mm', 0) or snapshot.get('thickness_mm', 0),
+                'quantity': row.get('qty', 1),
+                'width': snapshot.get('width', 0),
+                'height': snapshot.get('height', 0),
+                'weight_kg': snapshot.get('weight_kg', 0),
+                'unit_cost': row.get('unit_price', 0),
+                'total_cost': row.get('total_price', 0),
+                'filepath': row.get('documentation_path', '') or snapshot.get('filepath', ''),
+            }
+            if snapshot.get('geometry'):
+                item['geometry'] = snapshot['geometry']
+            else:
+                # Stary format - listy punktów w JSON
+                item['contour'] = snapshot.get('contour', [])
+                item['holes'] = snapshot.get('holes', [])
+            items.append(item)
+
+            if item['id']:
+                item[ROW_ID_KEY] = item['id']
+                try:
+                    # Odcisk z zakodowanego napisu - bez dekodowania geometrii
+                    state[item['id']] = PersistedItem.from_record(
+                        item['id'], item, build_item_record(order_id, item)
+                    )
+                except (TypeError, ValueError) as e:
+                    # Wiersz nadpisywany w całości przy następnym zapisie
+                    logger.debug(f"[OrderRepository] Cannot fingerprint order item {item['id']}: {e}")
+                    state[item['id']] = PersistedItem.unknown(item['id'])
+
+            if with_geometry and 'geometry' in item:
+                try:
+                    item['contour'], item['holes'] = decode_geometry(item['geometry'])
+                except Exception as e:
+                    logger.warning(f"[OrderRepository] Cannot decode geometry of item {item['id']}: {e}")
+                    item['contour'], item['holes'] = [], []
+
+        self._items_state[order_id] = state
+        return items
+
     def _serialize_nesting_results(self, results: Dict) -> Dict:
         """Serializuj wyniki nestingu do formatu zapisywalnego"""
         if not results:
@@ -537,7 +758,11 @@ class OrderRepository:
 
         serialized = {}
         for key, value in results.items():
-            if hasattr(value, 'to_dict'):
+            packed = self._pack_nesting(value)
+            if packed is not None:
+                # Geometria raz na typ detalu + tablica pozycji
+                serialized[str(key)] = packed
+            elif hasattr(value, 'to_dict'):
                 # Pełna serializacja jeśli obiekt ma metodę to_dict
                 serialized[str(key)] = value.to_dict()
             elif hasattr(value, '__dict__'):
@@ -583,9 +808,9 @@ class OrderRepository:
                     'rotation': getattr(part, 'rotation', 0),
                     'quantity': getattr(part, 'quantity', 1),
                 }
-                # Zapisz kontur jeśli dostępny
+                # Kontur zakodowany pod 'geometry'; odczyt (_decode_sheets) odtwarza 'contour'
                 if hasattr(part, 'contour'):
-                    part_data['contour'] = list(part.contour) if part.contour else []
+                    part_data.update(self._encode_contour(part.contour))
                 if hasattr(part, 'perimeter'):
                     part_data['perimeter'] = part.perimeter
                 sheet_data['placed_parts'].append(part_data)
@@ -594,6 +819,47 @@ class OrderRepository:
 
         return serialized_sheets
 
+    @staticmethod
+    def _pack_nesting(result) -> Optional[Dict]:
+        """Wynik FastNester w formacie packed-v1 (None dla innych obiektów)"""
+        try:
+            from quotations.nesting.fast_nester import NestingResult
+            from quotations.nesting.packed_result import pack_nesting_result
+        except ImportError:
+            return None
+        if not isinstance(result, NestingResult):
+            return None
+        return pack_nesting_result(result)
+
+    @staticmethod
+    def _encode_contour(contour) -> Dict:
+        """Kontur detalu na arkuszu: {'geometry': kodek} lub {'contour': punkty} gdy nie da się zakodować"""
+        if not contour:
+            return {'contour': []}
+        try:
+            return {'geometry': encode_points(contour)}
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return {'contour': list(contour)}
+
+    @staticmethod
+    def _decode_sheets(sheets) -> list:
+        """Arkusze z _serialize_sheets z konturami jako listy punktów (in-place)"""
+        for sheet in sheets or []:
+            if not isinstance(sheet, dict):
+                continue
+            for part in sheet.get('placed_parts', []):
+                # 'geometry' albo napis kodeka pod 'contour' (zapisy przejściowe)
+                encoded = part.pop('geometry', None)
+                if encoded is None and is_encoded(part.get('contour')):
+                    encoded = part['contour']
+                if encoded is not None:
+                    try:
+                        part['contour'] = decode_points(encoded)
+                    except Exception as e:
+                        logger.warning(f"[OrderRepository] Cannot decode nesting contour of {part.get('name')}: {e}")
+                        part['contour'] = []
+        return sheets
+
     # ============================================================
     # Nesting Results - Full Save/Load
     # ============================================================
@@ -612,16 +878,17 @@ class OrderRepository:
             ID zapisanego rekordu lub None
         """
         try:
-            # Przygotuj pełne dane
-            nesting_data = None
-            if hasattr(nesting_result, 'to_dict'):
-                nesting_data = nesting_result.to_dict()
-            elif hasattr(nesting_result, '__dict__'):
-                nesting_data = {
-                    'sheets': self._serialize_sheets(getattr(nesting_result, 'sheets', [])),
-                    'total_efficiency': getattr(nesting_result, 'total_efficiency', 0),
-                    'sheets_used': len(getattr(nesting_result, 'sheets', [])),
-                }
+            # Przygotuj pełne dane (wynik FastNester - format packed-v1)
+            nesting_data = self._pack_nesting(nesting_result)
+            if nesting_data is None:
+                if hasattr(nesting_result, 'to_dict'):
+                    nesting_data = nesting_result.to_dict()
+                elif hasattr(nesting_result, '__dict__'):
+                    nesting_data = {
+                        'sheets': self._serialize_sheets(getattr(nesting_result, 'sheets', [])),
+                        'total_efficiency': getattr(nesting_result, 'total_efficiency', 0),
+                        'sheets_used': len(getattr(nesting_result, 'sheets', [])),
+                    }
 
             record = {
                 'id': str(uuid.uuid4()),
@@ -650,10 +917,108 @@ class OrderRepository:
             logger.error(f"[OrderRepository] Error saving nesting result: {e}")
             return None
 
+    def _load_nesting_data(self, order_id: str) -> Optional[Dict]:
+        """Ostatni zapis nesting_data zamówienia (słownik JSON) lub None"""
+        response = self.client.table('nesting_results').select('nesting_data').eq(
+            'context_id', order_id
+        ).order('created_at', desc=True).limit(1).execute()
+        if not response.data or not response.data[0].get('nesting_data'):
+            return None
+
+        data = response.data[0]['nesting_data']
+        if isinstance(data, str):
+            data = json.loads(data)
+        return data
+
+    def _readable_nesting(self, data):
+        """
+        Dane nestingu w formacie czytelników nesting_results: słownik z listą arkuszy.
+
+        packed-v1 rozpakowywany przez unpack_nesting_result; starszy format
+        (per-arkusz) zwracany bez zmian, z konturami jako listy punktów.
+        """
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                return data
+        if not isinstance(data, dict):
+            return data
+
+        from quotations.nesting.packed_result import is_packed, unpack_nesting_result
+        if is_packed(data):
+            result = unpack_nesting_result(data)
+            return {
+                'sheets': self._decode_sheets(self._serialize_sheets(result.sheets)),
+                'total_efficiency': result.total_efficiency,
+                'sheets_used': len(result.sheets),
+            }
+        if 'nesting_data' in data:
+            # Rekord tabeli nesting_results
+            return dict(data, nesting_data=self._readable_nesting(data['nesting_data']))
+        self._decode_sheets(data.get('sheets'))
+        return data
+
+    @staticmethod
+    def _result_from_sheets(data: Dict):
+        """NestingResult ze starszego zapisu per-arkusz (bez kosztów i nieumieszczonych)"""
+        from quotations.nesting.fast_nester import NestingResult, NestedPart, SheetResult
+
+        sheets = []
+        for index, sheet_data in enumerate(data.get('sheets') or []):
+            sheet = SheetResult(sheet_index=sheet_data.get('sheet_index', index),
+                                sheet_width=sheet_data.get('sheet_width', 0),
+                                sheet_height=sheet_data.get('sheet_height', 0),
+                                efficiency=sheet_data.get('efficiency', 0))
+            for part_data in sheet_data.get('placed_parts', []):
+                contour = [tuple(p) for p in part_data.get('contour') or []]
+                sheet.placed_parts.append(NestedPart(
+                    name=part_data.get('name', ''), x=part_data.get('x', 0), y=part_data.get('y', 0),
+                    width=part_data.get('width', 0), height=part_data.get('height', 0),
+                    rotation=part_data.get('rotation', 0), original_contour=contour,
+                    sheet_index=sheet.sheet_index))
+            sheets.append(sheet)
+
+        return NestingResult(sheets=sheets,
+                             placed_parts=[p for sheet in sheets for p in sheet.placed_parts],
+                             sheets_used=len(sheets),
+                             total_efficiency=data.get('total_efficiency', 0))
+
+    def load_nesting_result(self, order_id: str):
+        """
+        Pobierz ostatni zapisany wynik nestingu zamówienia jako NestingResult.
+
+        Obsługuje format packed-v1 (save_nesting_result) i starszy zapis
+        per-arkusz (pozycje i kontury detali, bez danych kosztowych).
+
+        Args:
+            order_id: ID zamówienia
+
+        Returns:
+            NestingResult lub None
+        """
+        try:
+            data = self._load_nesting_data(order_id)
+            if data is None:
+                return None
+
+            from quotations.nesting.packed_result import is_packed, unpack_nesting_result
+            if is_packed(data):
+                return unpack_nesting_result(data)
+            if isinstance(data, dict) and isinstance(data.get('sheets'), list):
+                logger.debug(f"[OrderRepository] Nesting result for {order_id} in legacy format")
+                self._decode_sheets(data['sheets'])
+                return self._result_from_sheets(data)
+            return None
+
+        except Exception as e:
+            logger.error(f"[OrderRepository] Error loading nesting result: {e}")
+            return None
+
     def get_nesting_result(self, order_id: str) -> Optional[Dict]:
         """
         Pobierz pełne dane nestingu dla zamówienia.
-        DELEGUJE do NestingRepository.
+        DELEGUJE do NestingRepository; bez niego - ostatni zapis save_nesting_result.
 
         Args:
             order_id: ID zamówienia
@@ -662,8 +1027,11 @@ class OrderRepository:
             Pełne dane nestingu lub None
         """
         try:
-            from orders.nesting_repository import get_nesting_repository
-            return get_nesting_repository().load(order_id)
+            try:
+                from orders.nesting_repository import get_nesting_repository
+            except ImportError:
+                return self._readable_nesting(self._load_nesting_data(order_id))
+            return self._readable_nesting(get_nesting_repository().load(order_id))
         except Exception as e:
             logger.error(f"[OrderRepository] Error getting nesting result: {e}")
             return None
@@ -675,7 +1043,8 @@ class OrderRepository:
         """
         try:
             from orders.nesting_repository import get_nesting_repository
-            return get_nesting_repository().get_all_for_order(order_id)
+            return [self._readable_nesting(record)
+                    for record in get_nesting_repository().get_all_for_order(order_id)]
         except Exception as e:
             logger.error(f"[OrderRepository] Error getting nesting results: {e}")
             return []
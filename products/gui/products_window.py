@@ -63,6 +63,7 @@ class ProductsWindow(ctk.CTkToplevel):
         self.current_page = 0
         self.total_count = 0
         self.is_loading = False
+        self._page_cursors: List[Optional[str]] = [None]  # kursor strony N (paginacja po kluczu)
         
         # Cache miniatur
         self.thumbnail_cache: Dict[str, ImageTk.PhotoImage] = {}
@@ -508,32 +509,33 @@ class ProductsWindow(ctk.CTkToplevel):
             # Wyszukiwanie
             search = self.search_var.get().strip() or None
             
-            # Pobierz produkty
-            offset = self.current_page * PRODUCTS_PAGE_SIZE
+            # Pobierz stronę (kursor poprzedniej strony zamiast offsetu);
+            # liczba wszystkich tylko dla pierwszej strony, w tym samym zapytaniu
+            page_index = self.current_page
+            cursor = self._page_cursors[page_index] if page_index < len(self._page_cursors) else None
             
-            products = self.service.list_products(
+            page = self.service.list_products_page(
                 filters=filters if filters else None,
                 search=search,
                 limit=PRODUCTS_PAGE_SIZE,
-                offset=offset,
+                cursor=cursor,
+                count="exact" if page_index == 0 else None,
                 include_urls=True  # Potrzebne dla miniatur
             )
-            
-            # Policz wszystkie
-            count = self.service.count_products(
-                filters=filters if filters else None,
-                search=search
-            )
+            total = page.total if page.total is not None else self.total_count
             
             # Aktualizuj w głównym wątku
-            self.after(0, lambda: self._update_product_list(products, count))
+            self.after(0, lambda: self._update_product_list(
+                page.items, total, page_index, page.next_cursor
+            ))
             
         except Exception as e:
             self.after(0, lambda: self._show_error(f"Błąd ładowania: {e}"))
         finally:
             self.is_loading = False
     
-    def _update_product_list(self, products: List[Dict], total: int):
+    def _update_product_list(self, products: List[Dict], total: int,
+                             page_index: int = 0, next_cursor: Optional[str] = None):
         """Aktualizuj listę produktów w UI"""
         # Sprawdź czy okno i widget istnieją
         if not self.winfo_exists():
@@ -547,6 +549,11 @@ class ProductsWindow(ctk.CTkToplevel):
         self.products = products
         self.total_count = total
         
+        # Kursory kolejnych stron
+        del self._page_cursors[page_index + 1:]
+        if next_cursor:
+            self._page_cursors.append(next_cursor)
+        
         # Wyczyść TreeView
         for item in self.tree.get_children():
             self.tree.delete(item)
@@ -570,7 +577,7 @@ class ProductsWindow(ctk.CTkToplevel):
         self.page_label.configure(text=f"Strona {current}/{max(1, total_pages)}")
         
         self.prev_btn.configure(state="normal" if self.current_page > 0 else "disabled")
-        self.next_btn.configure(state="normal" if end < total else "disabled")
+        self.next_btn.configure(state="normal" if next_cursor else "disabled")
     
     def _add_product_to_tree(self, product: Dict):
         """Dodaj produkt do TreeView"""
@@ -695,8 +702,7 @@ class ProductsWindow(ctk.CTkToplevel):
     
     def _next_page(self):
         """Następna strona"""
-        max_page = (self.total_count - 1) // PRODUCTS_PAGE_SIZE
-        if self.current_page < max_page:
+        if self.current_page + 1 < len(self._page_cursors):
             self.current_page += 1
             self._load_products()
     
@@ -915,10 +921,13 @@ class ProductsWindow(ctk.CTkToplevel):
         
         from products.gui.product_edit_dialog import ProductEditDialog
         
+        # Lista ma tylko kolumny widoku - edycja potrzebuje pełnego rekordu
+        product = self.service.get_product(self.selected_product['id']) or self.selected_product
+        
         dialog = ProductEditDialog(
             self, 
             service=self.service,
-            product=self.selected_product
+            product=product
         )
         self.wait_window(dialog)
         
@@ -22,6 +22,8 @@ import getpass
 
 from supabase import Client
 
+from core.filters import KeysetPage, KeysetPagination, apply_keyset, keyset_page
+
 
 class ProductRepository:
     """
@@ -49,6 +51,19 @@ class ProductRepository:
     TABLE = "products_catalog"
     ATTACHMENTS_TABLE = "product_attachments"
     
+    # Kolumny widoku listy (ProductsWindow: tabela + panel podglądu)
+    LIST_COLUMNS = (
+        "id, idx_code, name, category, material_id, thickness_mm, "
+        "width_mm, height_mm, length_mm, "
+        "material_cost, laser_cost, bending_cost, additional_costs, "
+        "cad_2d_path, cad_2d_filename, cad_3d_path, cad_3d_filename, "
+        "user_image_path, user_image_filename, thumbnail_100_path, preview_800_path, "
+        "is_active, created_at, updated_at, materials_dict(id, name)"
+    )
+    
+    # Pola wyszukiwania tekstowego (list, list_page, count)
+    SEARCH_FIELDS = ("name", "idx_code", "category", "description")
+    
     def __init__(self, client: Client):
         """
         Inicjalizacja z klientem Supabase.
@@ -234,6 +249,39 @@ class ProductRepository:
             print(f"[DB] ❌ Get product by idx_code failed: {idx_code} - {e}")
             return None
     
+    def _filtered_query(
+        self,
+        columns: str,
+        filters: Dict[str, Any] = None,
+        search: str = None,
+        active_only: bool = True,
+        count: str = None
+    ):
+        """Zapytanie z filtrami list/list_page/count"""
+        if count:
+            query = self.client.table(self.TABLE).select(columns, count=count)
+        else:
+            query = self.client.table(self.TABLE).select(columns)
+        
+        # Filtr aktywności
+        if active_only:
+            query = query.eq('is_active', True)
+        
+        # Filtry dokładne
+        if filters:
+            for col, val in filters.items():
+                if val is not None:
+                    query = query.eq(col, val)
+        
+        # Wyszukiwanie tekstowe (ILIKE = case-insensitive)
+        if search:
+            search_pattern = f"%{search}%"
+            query = query.or_(
+                ",".join(f"{field}.ilike.{search_pattern}" for field in self.SEARCH_FIELDS)
+            )
+        
+        return query
+    
     def list(
         self, 
         filters: Dict[str, Any] = None,
@@ -242,10 +290,14 @@ class ProductRepository:
         offset: int = 0,
         order_by: str = "created_at",
         ascending: bool = False,
-        active_only: bool = True
+        active_only: bool = True,
+        columns: str = "*, materials_dict(id, name)"
     ) -> List[Dict]:
         """
-        Lista produktów z filtrami i paginacją.
+        Lista produktów z filtrami i paginacją (offset).
+        
+        Dla długich list lepsze list_page() - offset przechodzi przez
+        wszystkie pominięte wiersze.
         
         Args:
             filters: Słownik filtrów {kolumna: wartość}
@@ -255,33 +307,13 @@ class ProductRepository:
             order_by: Kolumna sortowania
             ascending: True = rosnąco, False = malejąco
             active_only: True = tylko aktywne produkty
+            columns: Projekcja (np. LIST_COLUMNS)
             
         Returns:
             Lista produktów (pusta lista w przypadku błędu)
         """
         try:
-            query = self.client.table(self.TABLE)\
-                .select("*, materials_dict(id, name)")
-            
-            # Filtr aktywności
-            if active_only:
-                query = query.eq('is_active', True)
-            
-            # Filtry dokładne
-            if filters:
-                for col, val in filters.items():
-                    if val is not None:
-                        query = query.eq(col, val)
-            
-            # Wyszukiwanie tekstowe (ILIKE = case-insensitive)
-            if search:
-                search_pattern = f"%{search}%"
-                query = query.or_(
-                    f"name.ilike.{search_pattern},"
-                    f"idx_code.ilike.{search_pattern},"
-                    f"category.ilike.{search_pattern},"
-                    f"description.ilike.{search_pattern}"
-                )
+            query = self._filtered_query(columns, filters, search, active_only)
             
             # Sortowanie
             query = query.order(order_by, desc=not ascending)
@@ -296,6 +328,46 @@ class ProductRepository:
             print(f"[DB] ❌ List products failed: {e}")
             return []
     
+    def list_page(
+        self,
+        filters: Dict[str, Any] = None,
+        search: str = None,
+        limit: int = 100,
+        cursor: str = None,
+        active_only: bool = True,
+        columns: str = None,
+        count: str = None
+    ) -> KeysetPage:
+        """
+        Strona produktów z paginacją po kluczu (created_at, id - od najnowszych).
+        
+        Args:
+            filters: Słownik filtrów {kolumna: wartość}
+            search: Tekst do wyszukania (nazwa, kod, kategoria, opis)
+            limit: Rozmiar strony
+            cursor: next_cursor poprzedniej strony (None = pierwsza strona)
+            active_only: True = tylko aktywne produkty
+            columns: Projekcja (domyślnie LIST_COLUMNS)
+            count: 'exact' / 'planned' / 'estimated' - liczba wszystkich
+                wyników w tym samym zapytaniu (tylko pierwsza strona)
+            
+        Returns:
+            KeysetPage (pusta strona w przypadku błędu)
+        """
+        pagination = KeysetPagination(limit=limit, cursor=cursor)
+        try:
+            query = self._filtered_query(
+                columns or self.LIST_COLUMNS, filters, search, active_only,
+                count=None if cursor else count
+            )
+            response = apply_keyset(query, pagination).execute()
+            total = response.count if count and not cursor else None
+            return keyset_page(response.data, pagination, total)
+            
+        except Exception as e:
+            print(f"[DB] ❌ List products page failed: {e}")
+            return KeysetPage()
+    
     def count(
         self, 
         filters: Dict[str, Any] = None, 
@@ -314,24 +386,8 @@ class ProductRepository:
             Liczba produktów (0 w przypadku błędu)
         """
         try:
-            query = self.client.table(self.TABLE).select("id", count="exact")
-            
-            if active_only:
-                query = query.eq('is_active', True)
-            
-            if filters:
-                for col, val in filters.items():
-                    if val is not None:
-                        query = query.eq(col, val)
-            
-            if search:
-                search_pattern = f"%{search}%"
-                query = query.or_(
-                    f"name.ilike.{search_pattern},"
-                    f"idx_code.ilike.{search_pattern}"
-                )
-            
-            response = query.execute()
+            query = self._filtered_query("id", filters, search, active_only, count="exact")
+            response = query.limit(1).execute()
             return response.count or 0
             
         except Exception as e:
@@ -31,6 +31,7 @@ from typing import Optional, Dict, List, Tuple, Any
 from pathlib import Path
 import uuid
 
+from core.filters import KeysetPage
 from products.repository import ProductRepository
 from products.storage import StorageRepository
 from products.paths import StoragePaths
@@ -326,6 +327,42 @@ class ProductService:
         
         return products
     
+    def list_products_page(
+        self,
+        filters: Dict[str, Any] = None,
+        search: str = None,
+        limit: int = 50,
+        cursor: str = None,
+        count: str = None,
+        include_urls: bool = False
+    ) -> KeysetPage:
+        """
+        Strona produktów z paginacją po kluczu (kolumny widoku listy).
+        
+        Args:
+            filters: Słownik filtrów {kolumna: wartość}
+            search: Tekst wyszukiwania
+            limit: Rozmiar strony
+            cursor: next_cursor poprzedniej strony (None = pierwsza strona)
+            count: Strategia liczenia dla pierwszej strony ('exact', 'planned', 'estimated')
+            include_urls: True = dodaj URL
+            
+        Returns:
+            KeysetPage (items, next_cursor, total)
+        """
+        page = self.products.list_page(
+            filters=filters,
+            search=search,
+            limit=limit,
+            cursor=cursor,
+            count=count
+        )
+        
+        if include_urls:
+            page.items = [self._add_file_urls(p) for p in page.items]
+        
+        return page
+    
     def count_products(
         self,
         filters: Dict[str, Any] = None,
@@ -20,6 +20,7 @@ import customtkinter as ctk
 from tkinter import Canvas, ttk, messagebox, filedialog
 import threading
 import logging
+import uuid
 from typing import List, Dict, Optional, Callable, Tuple, Any, Set
 from dataclasses import dataclass, field
 import os
@@ -35,23 +36,20 @@ try:
     if str(_project_root) not in sys.path:
         sys.path.insert(0, str(_project_root))
 
-    from costing.motion.motion_planner import MachineProfile, estimate_motion_time, m_min_to_mm_s
-    from costing.toolpath.dxf_extractor import extract_motion_segments
+    from costing.motion.motion_planner import MachineProfile, m_min_to_mm_s
+    from costing.motion.part_time_model import get_part_time_cache
+    from costing.toolpath.toolpath_cache import get_toolpath_cache
+    from costing.toolpath.sheet_sequencer import sequence_nested_parts
     HAS_MOTION_DYNAMICS = True
 except ImportError as e:
     logger.warning(f"Motion dynamics not available: {e}")
     HAS_MOTION_DYNAMICS = False
 
-# Import pricing repository for cutting speeds from Supabase
-try:
-    from pricing.repository import PricingRepository
-    from core.supabase_client import get_supabase_client
-    _pricing_repo = PricingRepository(get_supabase_client())
-    HAS_PRICING_REPO = True
-except (ImportError, Exception) as e:
-    logger.warning(f"Pricing repository not available: {e}")
-    HAS_PRICING_REPO = False
-    _pricing_repo = None
+# Pricing repository (cutting speeds from Supabase) - created on first use
+from core.service_locator import try_get_service, PRICING_REPOSITORY
+
+# Bufor geometrii podglądu arkuszy
+from quotations.gui.sheet_render import PartGeometry, SheetGeometry, lod_level, to_canvas_coords
 
 
 @dataclass
@@ -172,7 +170,7 @@ class VelocityProfileCanvas(Canvas):
                 MachineProfile, calculate_junction_angles, plan_speeds, corner_speed_limit
             )
 
-            segments = extract_motion_segments(filepath)
+            segments = get_toolpath_cache().get_motion_segments(filepath)
             if not segments:
                 self.clear()
                 return
@@ -423,10 +421,20 @@ class PartPreviewCanvas(Canvas):
 # ============================================================
 
 class SheetCanvas(Canvas):
-    """Canvas dla pojedynczego arkusza z zoom i interakcją"""
-    
+    """
+    Canvas dla pojedynczego arkusza z zoom i interakcją.
+
+    Elementy canvas tworzone są raz na zestaw detali; pan i zoom przesuwają
+    i skalują istniejące elementy (move/scale), a po ustaniu zoomu kontury
+    podmieniane są na wersję uproszczoną dla bieżącej skali (coords).
+    Przy lazy=True elementy powstają dopiero po wywołaniu ensure_rendered().
+    """
+
+    # Opóźnienie podmiany poziomu szczegółowości po zoomie [ms]
+    LOD_REFRESH_DELAY_MS = 120
+
     def __init__(self, parent, sheet_index: int, sheet_width: float, sheet_height: float,
-                 on_part_click: Optional[Callable] = None, **kwargs):
+                 on_part_click: Optional[Callable] = None, lazy: bool = False, **kwargs):
         super().__init__(parent, bg="#1a1a1a", highlightthickness=1,
                         highlightbackground="#444444", **kwargs)
         
@@ -445,6 +453,17 @@ class SheetCanvas(Canvas):
         
         self.on_part_click = on_part_click
         self.selected_part_name: Optional[str] = None
+
+        # Stan renderingu
+        self.lazy = lazy
+        self.is_rendered = False
+        self._geometry: Optional[SheetGeometry] = None
+        self._part_items: List[Tuple[int, List[int]]] = []  # (kontur, [otwory]) per detal
+        self._items_by_name: Dict[str, List[int]] = {}
+        self._frame_item: Optional[int] = None
+        self._label_item: Optional[int] = None
+        self._rendered_level = 0
+        self._lod_job = None
         
         # Binds
         self.bind("<ButtonPress-1>", self._on_click)
@@ -461,70 +480,75 @@ class SheetCanvas(Canvas):
     
     def _on_click(self, event):
         """Obsłuż kliknięcie - znajdź detal"""
-        if not self.placed_parts:
+        if not self.placed_parts or not self.is_rendered:
             return
         
         sheet_x, sheet_y = self._from_canvas(event.x, event.y)
-        
-        for i in range(len(self.placed_parts) - 1, -1, -1):
-            part = self.placed_parts[i]
-            if self._point_in_part(sheet_x, sheet_y, part):
-                self.selected_part_name = part.name if hasattr(part, 'name') else None
-                self.redraw()
-                
-                if self.on_part_click:
-                    self.on_part_click(self.sheet_index, part)
-                break
+        geometry = self.geometry.hit_test(sheet_x, sheet_y)
+        if geometry is None:
+            return
+
+        self._set_selection(geometry.name or None)
+        if self.on_part_click:
+            self.on_part_click(self.sheet_index, geometry.part)
     
     def _from_canvas(self, cx: float, cy: float) -> Tuple[float, float]:
         x = (cx - self.offset_x) / self.zoom_scale
         y = self.sheet_height - (cy - self.offset_y) / self.zoom_scale
         return x, y
     
-    def _point_in_part(self, x: float, y: float, part) -> bool:
-        contour = part.get_placed_contour() if hasattr(part, 'get_placed_contour') else []
-        if len(contour) < 3:
-            px = part.x if hasattr(part, 'x') else 0
-            py = part.y if hasattr(part, 'y') else 0
-            pw = part.width if hasattr(part, 'width') else 0
-            ph = part.height if hasattr(part, 'height') else 0
-            return px <= x <= px + pw and py <= y <= py + ph
-        
-        n = len(contour)
-        inside = False
-        j = n - 1
-        for i in range(n):
-            xi, yi = contour[i]
-            xj, yj = contour[j]
-            if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
-                inside = not inside
-            j = i
-        return inside
-    
     def select_part_by_name(self, part_name: str):
         """Zaznacz detal po nazwie"""
-        self.selected_part_name = part_name
-        self.redraw()
+        self._set_selection(part_name)
     
     def clear_selection(self):
         """Wyczyść zaznaczenie"""
-        self.selected_part_name = None
-        self.redraw()
+        self._set_selection(None)
+
+    def _set_selection(self, part_name: Optional[str]):
+        """Zmień zaznaczenie - tylko styl obrysu, bez przebudowy elementów"""
+        previous = self.selected_part_name
+        self.selected_part_name = part_name
+        if not self.is_rendered or previous == part_name:
+            return
+        for item in self._items_by_name.get(previous, []):
+            self.itemconfigure(item, outline="#ffffff", width=1)
+        for item in self._items_by_name.get(part_name, []):
+            self.itemconfigure(item, outline="#ffff00", width=3)
     
     def set_parts(self, parts: List[Any], colors: Dict[str, str]):
         """Ustaw detale"""
         self.placed_parts = parts
         self.part_colors = colors
-        # Upewnij się że canvas ma właściwe wymiary przed fit_view
-        self.update_idletasks()
+        self._geometry = None
+        self.is_rendered = False
+        if self.lazy:
+            return
+        self.ensure_rendered()
+        # Ponownie dopasuj widok po pełnym renderingu
+        self.after(50, self.zoom_all)
+
+    @property
+    def geometry(self) -> SheetGeometry:
+        """Bufor geometrii detali (liczony przy pierwszym użyciu)"""
+        if self._geometry is None:
+            self._geometry = SheetGeometry(self.placed_parts)
+        return self._geometry
+
+    def ensure_rendered(self):
+        """Utwórz elementy canvas (dla lazy - przy pierwszym pokazaniu)"""
+        if self.is_rendered:
+            return
         self._fit_view()
         self.redraw()
-        # Ponownie dopasuj widok po pełnym renderingu
-        self.after(50, lambda: (self._fit_view(), self.redraw()))
     
     def _fit_view(self):
-        canvas_w = self.winfo_width() or 300
-        canvas_h = self.winfo_height() or 200
+        canvas_w = self.winfo_width()
+        canvas_h = self.winfo_height()
+        if canvas_w <= 1:
+            canvas_w = self.winfo_reqwidth() or 300
+        if canvas_h <= 1:
+            canvas_h = self.winfo_reqheight() or 200
         
         scale_x = (canvas_w - 20) / self.sheet_width
         scale_y = (canvas_h - 20) / self.sheet_height
@@ -537,6 +561,47 @@ class SheetCanvas(Canvas):
         cx = self.offset_x + x * self.zoom_scale
         cy = self.offset_y + (self.sheet_height - y) * self.zoom_scale
         return cx, cy
+
+    def _update_view(self, old_scale: float, old_offset_x: float, old_offset_y: float):
+        """Przenieś istniejące elementy z poprzedniego widoku do bieżącego"""
+        if not self.is_rendered:
+            return
+        factor = self.zoom_scale / old_scale
+        if factor != 1.0:
+            self.scale("content", 0, 0, factor, factor)
+        dx = self.offset_x - old_offset_x * factor
+        dy = self.offset_y - old_offset_y * factor
+        if dx or dy:
+            self.move("content", dx, dy)
+
+        x1, y1 = self._to_canvas(0, 0)
+        x2, y2 = self._to_canvas(self.sheet_width, self.sheet_height)
+        self.coords(self._label_item, x1 + 10, y2 + 15)
+
+        if factor != 1.0:
+            self._schedule_lod_refresh()
+
+    def _schedule_lod_refresh(self):
+        if self._lod_job is not None:
+            self.after_cancel(self._lod_job)
+        self._lod_job = self.after(self.LOD_REFRESH_DELAY_MS, self._refresh_lod)
+
+    def _refresh_lod(self):
+        """Podmień kontury na poziom szczegółowości bieżącej skali"""
+        self._lod_job = None
+        level = lod_level(self.zoom_scale)
+        if not self.is_rendered or level == self._rendered_level:
+            return
+        self._rendered_level = level
+        for geometry, (item, hole_items) in zip(self.geometry.parts, self._part_items):
+            contour, holes = geometry.at_level(level)
+            self.coords(item, *self._flat(contour))
+            for hole_item, hole in zip(hole_items, holes):
+                self.coords(hole_item, *self._flat(hole))
+
+    def _flat(self, points: List[Tuple[float, float]]) -> List[float]:
+        return to_canvas_coords(points, self.zoom_scale, self.offset_x, self.offset_y,
+                                self.sheet_height)
     
     def _start_pan(self, event):
         self.is_panning = True
@@ -552,7 +617,9 @@ class SheetCanvas(Canvas):
         self.offset_y += dy
         self.last_x = event.x
         self.last_y = event.y
-        self.redraw()
+        if self.is_rendered:
+            self.move("content", dx, dy)
+            self.move(self._label_item, dx, dy)
     
     def _end_pan(self, event):
         self.is_panning = False
@@ -561,31 +628,34 @@ class SheetCanvas(Canvas):
         if factor is None:
             factor = 1.1 if event.delta > 0 else 0.9
         
-        old_scale = self.zoom_scale
+        old = (self.zoom_scale, self.offset_x, self.offset_y)
         self.zoom_scale = max(0.05, min(self.zoom_scale * factor, 50))
         
         mouse_x = event.x
         mouse_y = event.y
         
-        self.offset_x = mouse_x - (mouse_x - self.offset_x) * (self.zoom_scale / old_scale)
-        self.offset_y = mouse_y - (mouse_y - self.offset_y) * (self.zoom_scale / old_scale)
+        self.offset_x = mouse_x - (mouse_x - self.offset_x) * (self.zoom_scale / old[0])
+        self.offset_y = mouse_y - (mouse_y - self.offset_y) * (self.zoom_scale / old[0])
         
-        self.redraw()
+        self._update_view(*old)
     
     def zoom_in(self):
         """Powiększ widok (Zoom In)"""
+        old = (self.zoom_scale, self.offset_x, self.offset_y)
         self.zoom_scale = min(self.zoom_scale * 1.2, 50)
-        self.redraw()
+        self._update_view(*old)
 
     def zoom_out(self):
         """Pomniejsz widok (Zoom Out)"""
+        old = (self.zoom_scale, self.offset_x, self.offset_y)
         self.zoom_scale = max(self.zoom_scale / 1.2, 0.05)
-        self.redraw()
+        self._update_view(*old)
 
     def zoom_all(self):
         """Dopasuj widok do arkusza (Zoom All)"""
+        old = (self.zoom_scale, self.offset_x, self.offset_y)
         self._fit_view()
-        self.redraw()
+        self._update_view(*old)
 
     def zoom_fit(self):
         """Alias dla zoom_all (zgodność z CAD)"""
@@ -593,77 +663,62 @@ class SheetCanvas(Canvas):
 
     def _on_resize(self, event):
         if not self.placed_parts:
-            self._fit_view()
-        self.redraw()
+            self.zoom_all()
 
     def redraw(self):
+        """Przebuduj wszystkie elementy canvas dla bieżącego widoku"""
         self.delete("all")
+        if self._lod_job is not None:
+            self.after_cancel(self._lod_job)
+            self._lod_job = None
+        self._part_items = []
+        self._items_by_name = {}
+        self._rendered_level = lod_level(self.zoom_scale)
         
         # Ramka arkusza
         x1, y1 = self._to_canvas(0, 0)
         x2, y2 = self._to_canvas(self.sheet_width, self.sheet_height)
         
-        self.create_rectangle(x1, y2, x2, y1, outline="#ffffff", width=2, fill="#2a2a2a")
+        self._frame_item = self.create_rectangle(x1, y2, x2, y1, outline="#ffffff", width=2,
+                                                 fill="#2a2a2a", tags=("content",))
         
         # Siatka
         grid_step = 100
         for gx in range(0, int(self.sheet_width) + 1, grid_step):
             cx, _ = self._to_canvas(gx, 0)
-            _, cy1 = self._to_canvas(0, 0)
-            _, cy2 = self._to_canvas(0, self.sheet_height)
-            self.create_line(cx, cy1, cx, cy2, fill="#333333", width=1)
+            self.create_line(cx, y1, cx, y2, fill="#333333", width=1, tags=("content",))
         
         for gy in range(0, int(self.sheet_height) + 1, grid_step):
             _, cy = self._to_canvas(0, gy)
-            cx1, _ = self._to_canvas(0, 0)
-            cx2, _ = self._to_canvas(self.sheet_width, 0)
-            self.create_line(cx1, cy, cx2, cy, fill="#333333", width=1)
+            self.create_line(x1, cy, x2, cy, fill="#333333", width=1, tags=("content",))
         
         # Detale
-        for part in self.placed_parts:
-            self._draw_part(part)
+        for geometry in self.geometry.parts:
+            self._draw_part(geometry)
         
         # Numer arkusza
-        self.create_text(x1 + 10, y2 + 15, text=f"Arkusz #{self.sheet_index + 1}",
-                        fill="#888888", anchor="nw", font=("Arial", 10, "bold"))
+        self._label_item = self.create_text(x1 + 10, y2 + 15, text=f"Arkusz #{self.sheet_index + 1}",
+                                            fill="#888888", anchor="nw", font=("Arial", 10, "bold"))
+        self.is_rendered = True
     
-    def _draw_part(self, part):
-        name = part.name if hasattr(part, 'name') else ''
+    def _draw_part(self, geometry: PartGeometry):
+        name = geometry.name
         color = self.part_colors.get(name, "#3B82F6")
         
         is_selected = (name == self.selected_part_name)
         outline_color = "#ffff00" if is_selected else "#ffffff"
         outline_width = 3 if is_selected else 1
         
-        contour = part.get_placed_contour() if hasattr(part, 'get_placed_contour') else []
-        
-        if len(contour) >= 3:
-            canvas_points = []
-            for x, y in contour:
-                cx, cy = self._to_canvas(x, y)
-                canvas_points.extend([cx, cy])
-            
-            self.create_polygon(canvas_points, fill=color, outline=outline_color, width=outline_width)
-        else:
-            px = part.x if hasattr(part, 'x') else 0
-            py = part.y if hasattr(part, 'y') else 0
-            pw = part.width if hasattr(part, 'width') else 100
-            ph = part.height if hasattr(part, 'height') else 100
-            
-            x1, y1 = self._to_canvas(px, py)
-            x2, y2 = self._to_canvas(px + pw, py + ph)
-            
-            self.create_rectangle(x1, y1, x2, y2, fill=color, outline=outline_color, width=outline_width)
+        contour, holes = geometry.at_level(self._rendered_level)
+        item = self.create_polygon(self._flat(contour), fill=color, outline=outline_color,
+                                   width=outline_width, tags=("content",))
+        self._items_by_name.setdefault(name, []).append(item)
         
         # Otwory
-        if hasattr(part, 'get_placed_holes'):
-            for hole in part.get_placed_holes():
-                if len(hole) >= 3:
-                    hole_points = []
-                    for x, y in hole:
-                        cx, cy = self._to_canvas(x, y)
-                        hole_points.extend([cx, cy])
-                    self.create_polygon(hole_points, fill="#2a2a2a", outline="#666666", width=1)
+        hole_items = [self.create_polygon(self._flat(hole), fill="#2a2a2a", outline="#666666",
+                                          width=1, tags=("content",))
+                      for hole in holes]
+        self._part_items.append((item, hole_items))
 
     def export_to_image(self, width: int = 800, height: int = 600) -> bytes:
         """Eksportuj arkusz do obrazu PNG jako bytes"""
@@ -705,34 +760,19 @@ class SheetCanvas(Canvas):
                 cx2, _ = to_export(self.sheet_width, 0)
                 draw.line([(cx1, cy), (cx2, cy)], fill=(51, 51, 51), width=1)
 
-            # Detale
-            for part in self.placed_parts:
-                name = part.name if hasattr(part, 'name') else ''
-                color_hex = self.part_colors.get(name, "#3B82F6")
+            # Detale (pełna geometria z bufora)
+            for geometry in self.geometry.parts:
+                color_hex = self.part_colors.get(geometry.name, "#3B82F6")
                 # Konwersja hex na RGB
                 color = tuple(int(color_hex.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
 
-                contour = part.get_placed_contour() if hasattr(part, 'get_placed_contour') else []
-
-                if len(contour) >= 3:
-                    points = [to_export(x, y) for x, y in contour]
-                    draw.polygon(points, fill=color, outline='white')
-                else:
-                    px = part.x if hasattr(part, 'x') else 0
-                    py = part.y if hasattr(part, 'y') else 0
-                    pw = part.width if hasattr(part, 'width') else 100
-                    ph = part.height if hasattr(part, 'height') else 100
-
-                    ex1, ey1 = to_export(px, py)
-                    ex2, ey2 = to_export(px + pw, py + ph)
-                    draw.rectangle([ex1, ey1, ex2, ey2], fill=color, outline='white')
+                points = [to_export(x, y) for x, y in geometry.contour]
+                draw.polygon(points, fill=color, outline='white')
 
                 # Otwory
-                if hasattr(part, 'get_placed_holes'):
-                    for hole in part.get_placed_holes():
-                        if len(hole) >= 3:
-                            hole_points = [to_export(x, y) for x, y in hole]
-                            draw.polygon(hole_points, fill=(42, 42, 42), outline=(102, 102, 102))
+                for hole in geometry.holes:
+                    hole_points = [to_export(x, y) for x, y in hole]
+                    draw.polygon(hole_points, fill=(42, 42, 42), outline=(102, 102, 102))
 
             # Numer arkusza
             try:
@@ -762,7 +802,13 @@ class SheetCanvas(Canvas):
 # ============================================================
 
 class MultiSheetView(ctk.CTkFrame):
-    """Przewijalna lista arkuszy wyświetlanych obok siebie"""
+    """
+    Przewijalna lista arkuszy wyświetlanych obok siebie.
+
+    Canvasy arkuszy tworzone są jako lazy - geometria rysowana jest tylko dla
+    arkuszy widocznych w oknie przewijania, po jednym arkuszu na cykl idle,
+    więc duże wyniki nie blokują interfejsu.
+    """
 
     def __init__(self, parent, sheet_width: float, sheet_height: float,
                  on_part_click: Optional[Callable] = None):
@@ -777,6 +823,7 @@ class MultiSheetView(ctk.CTkFrame):
         self.canvas_frames: List[ctk.CTkFrame] = []
         self.sheets_data: List[Any] = []
         self.all_parts: List[dict] = []
+        self._render_job = None
 
         self._setup_ui()
 
@@ -786,6 +833,15 @@ class MultiSheetView(ctk.CTkFrame):
                                                     orientation="horizontal")
         self.scroll_frame.pack(fill="both", expand=True)
 
+        # Renderuj arkusze, które pojawiają się w widoku przy przewijaniu
+        parent_canvas = getattr(self.scroll_frame, '_parent_canvas', None)
+        scrollbar = getattr(self.scroll_frame, '_scrollbar', None)
+        if parent_canvas is not None and scrollbar is not None:
+            def on_scroll(*args):
+                scrollbar.set(*args)
+                self._schedule_visible_render()
+            parent_canvas.configure(xscrollcommand=on_scroll)
+
         # Binduj resize do aktualizacji wysokości canvasów
         self.bind("<Configure>", self._on_resize)
     
@@ -796,6 +852,9 @@ class MultiSheetView(ctk.CTkFrame):
         self.all_parts = all_parts or []
 
         # Usuń stare canvas
+        if self._render_job is not None:
+            self.after_cancel(self._render_job)
+            self._render_job = None
         for canvas in self.sheet_canvases:
             canvas.destroy()
         self.sheet_canvases.clear()
@@ -855,16 +914,50 @@ class MultiSheetView(ctk.CTkFrame):
                 sheet_width=self.sheet_width,
                 sheet_height=self.sheet_height,
                 on_part_click=self._handle_part_click,
+                lazy=True,
                 width=canvas_width,
                 height=canvas_height
             )
             canvas.pack(padx=5, pady=5)
             
-            # Ustaw detale
+            # Ustaw detale (rysowane dopiero po pojawieniu się w widoku)
             parts = sheet.placed_parts if hasattr(sheet, 'placed_parts') else []
             canvas.set_parts(parts, colors)
             
             self.sheet_canvases.append(canvas)
+
+        self._schedule_visible_render()
+
+    def _schedule_visible_render(self):
+        """Zaplanuj rysowanie widocznych arkuszy w cyklu idle"""
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._render_next_visible)
+
+    def _visible_canvases(self) -> List[SheetCanvas]:
+        """Canvasy nachodzące na widoczny obszar przewijania"""
+        view_left = self.winfo_rootx()
+        view_right = view_left + self.winfo_width()
+        visible = []
+        for canvas in self.sheet_canvases:
+            left = canvas.winfo_rootx()
+            if left < view_right and left + canvas.winfo_width() > view_left:
+                visible.append(canvas)
+        return visible
+
+    def _render_next_visible(self):
+        """Narysuj jeden niewyrenderowany, widoczny arkusz i zaplanuj kolejny"""
+        self._render_job = None
+        if not self.sheet_canvases:
+            return
+        if self.winfo_width() <= 1:
+            # Geometria okna jeszcze nieznana
+            self._render_job = self.after(50, self._render_next_visible)
+            return
+        for canvas in self._visible_canvases():
+            if not canvas.is_rendered:
+                canvas.ensure_rendered()
+                self._schedule_visible_render()
+                return
     
     def _handle_part_click(self, sheet_index: int, part):
         """Obsłuż kliknięcie na detal"""
@@ -916,8 +1009,8 @@ class MultiSheetView(ctk.CTkFrame):
         # Zaktualizuj wysokość wszystkich canvasów
         for canvas in self.sheet_canvases:
             canvas.configure(height=available_height)
-            canvas._fit_view()
-            canvas.redraw()
+            canvas.zoom_all()
+        self._schedule_visible_render()
 
     def _open_sheet_detail(self, sheet_index: int):
         """Otwórz szczegółowe okno dla arkusza"""
@@ -1312,6 +1405,8 @@ class NestingTab(ctk.CTkFrame):
         self.nester = None
         self.nesting_result = None
         self.nesting_thread = None
+        # Zlecenie w magazynie resztek - kolejne przebiegi zastępują poprzedni zapis
+        self.remnant_job = f"{material}/{thickness}/{uuid.uuid4().hex[:12]}"
 
         # Time comparison data
         self.time_classic_s = 0.0
@@ -1457,6 +1552,21 @@ class NestingTab(ctk.CTkFrame):
                                           variable=self.deep_var)
         self.deep_check.pack(side="left", padx=20)
         
+        self.nfp_var = ctk.BooleanVar(value=False)
+        self.nfp_check = ctk.CTkCheckBox(toolbar, text="✂ Prawdziwe kształty (NFP)",
+                                         variable=self.nfp_var)
+        self.nfp_check.pack(side="left", padx=(0, 20))
+        
+        self.optimize_var = ctk.BooleanVar(value=False)
+        self.optimize_check = ctk.CTkCheckBox(toolbar, text="🧬 Optymalizuj zlecenie",
+                                              variable=self.optimize_var)
+        self.optimize_check.pack(side="left", padx=(0, 20))
+        
+        self.remnants_var = ctk.BooleanVar(value=False)
+        self.remnants_check = ctk.CTkCheckBox(toolbar, text="♻ Resztki z magazynu",
+                                              variable=self.remnants_var)
+        self.remnants_check.pack(side="left", padx=(0, 20))
+        
         self.btn_start = ctk.CTkButton(toolbar, text="▶ Start Nesting",
                                        command=self.start_nesting,
                                        fg_color=Theme.ACCENT_SUCCESS, width=120)
@@ -1685,9 +1795,10 @@ class NestingTab(ctk.CTkFrame):
         def save(e=None):
             try:
                 new_qty = int(entry.get())
-                if new_qty > 0:
+                if new_qty > 0 and new_qty != current_qty:
                     self.parts[idx]['quantity'] = new_qty
                     self.tree.set(item, "qty", str(new_qty))
+                    self._renest_incremental(self.parts[idx].get('name', 'Part'), new_qty)
             except:
                 pass
             entry.destroy()
@@ -1697,6 +1808,35 @@ class NestingTab(ctk.CTkFrame):
         entry.bind("<Return>", save)
         entry.bind("<FocusOut>", save)
 
+    def _renest_incremental(self, name: str, quantity: int):
+        """Po zmianie ilości: przyrostowa aktualizacja wyniku + pełny nesting w tle"""
+        if not self.nester or not self.nester.result:
+            return
+        if self.nesting_thread and self.nesting_thread.is_alive():
+            return
+        if not self.nester.set_quantity(name, quantity):
+            return
+
+        self.btn_start.configure(state="disabled")
+        self.lbl_status.configure(text="Aktualizacja nestingu...")
+        use_remnants = self.remnants_var.get()
+
+        def on_reoptimized(result):
+            if use_remnants:
+                self._record_remnants(result)
+            self.after(0, lambda: self._finish_nesting(result))
+
+        def run():
+            # Z resztkami run_incremental robi pełny nesting - nowy układ trzeba zapisać jak w start_nesting
+            result = self.nester.run_incremental(callback=self._update_view, reoptimize=True,
+                                                 on_reoptimized=on_reoptimized)
+            if use_remnants and not self.nester.stop_flag.is_set():
+                self._record_remnants(result)
+            self.after(0, lambda: self._finish_nesting(result))
+
+        self.nesting_thread = threading.Thread(target=run, daemon=True)
+        self.nesting_thread.start()
+
     def _toggle_parts_list(self):
         """Zwiń/rozwiń listę detali."""
         if self._parts_list_collapsed:
@@ -1739,12 +1879,14 @@ class NestingTab(ctk.CTkFrame):
         except:
             spacing = 5.0
         
-        from quotations.nesting.fast_nester import FastNester
+        from quotations.nesting.fast_nester import FastNester, ENGINE_NFP, ENGINE_RECTPACK
+        from quotations.nesting.result_cache import get_default_cache
         
         sheet_w = min(w, h)
         sheet_h = max(w, h)
         
-        self.nester = FastNester(sheet_w, sheet_h, spacing)
+        # Stały seed - powtórny nesting tej samej wyceny trafia w cache
+        self.nester = FastNester(sheet_w, sheet_h, spacing, seed=0, cache=get_default_cache())
         
         # Aktualizuj multi_sheet_view
         self.multi_sheet_view.sheet_width = sheet_w
@@ -1753,7 +1895,7 @@ class NestingTab(ctk.CTkFrame):
         for p in self.parts:
             self.nester.add_part_from_dict(p, quantity=p.get('quantity', 1))
         
-        if not self.nester.parts:
+        if not self.nester.part_types:
             messagebox.showerror("Błąd", "Brak detali do nestingu")
             return
         
@@ -1773,14 +1915,39 @@ class NestingTab(ctk.CTkFrame):
         self.progress.set(0.1)
         
         deep = self.deep_var.get()
+        engine = ENGINE_NFP if self.nfp_var.get() else ENGINE_RECTPACK
+        optimize = self.optimize_var.get()
+        use_remnants = self.remnants_var.get()
         
         def run():
-            result = self.nester.run_nesting(callback=self._update_view, deep_analysis=deep)
+            remnants = None
+            if use_remnants:
+                try:
+                    from quotations.nesting.remnants import get_remnant_store
+                    remnants = get_remnant_store().available(self.material, self.thickness,
+                                                             job=self.remnant_job)
+                except Exception as e:
+                    logger.error(f"Cannot load remnants: {e}")
+            result = self.nester.run_nesting(callback=self._update_view, deep_analysis=deep,
+                                             engine=engine, parallel=deep,
+                                             optimize_job=optimize, remnants=remnants)
+            if use_remnants and not self.nester.stop_flag.is_set():
+                self._record_remnants(result)
             self.after(0, lambda: self._finish_nesting(result))
         
         self.nesting_thread = threading.Thread(target=run, daemon=True)
         self.nesting_thread.start()
     
+    def _record_remnants(self, result):
+        """Zużyte resztki i nowe odpady arkuszy do magazynu (wątek nestingu)"""
+        try:
+            from quotations.nesting.remnants import get_remnant_store
+            get_remnant_store().record_nesting(result, self.material, self.thickness,
+                                               source=f"nesting {self.material} {self.thickness}mm",
+                                               job=self.remnant_job)
+        except Exception as e:
+            logger.error(f"Cannot record remnants: {e}")
+    
     def _update_view(self, parts, efficiency: float):
         """Callback z nestera"""
         self.after(0, lambda: self._redraw(parts, efficiency))
@@ -1831,15 +1998,14 @@ class NestingTab(ctk.CTkFrame):
         self.btn_start.configure(state="normal")
         self.btn_export.configure(state="normal")
 
-        # Calculate time comparison
-        self._calculate_time_comparison()
-
         # Status
         placed_count = len(result.placed_parts)
         unplaced_count = result.unplaced_count
         sheets_count = result.sheets_used
 
         status_text = f"Gotowe! {placed_count} detali na {sheets_count} arkuszach"
+        if result.remnants_used:
+            status_text += f" (w tym {result.remnants_used} resztek)"
         if unplaced_count > 0:
             status_text += f" | ⚠️ {unplaced_count} nieznestowanych"
 
@@ -1847,7 +2013,11 @@ class NestingTab(ctk.CTkFrame):
         self.lbl_sheets.configure(text=f"Arkusze: {sheets_count}")
         self.lbl_efficiency.configure(text=f"Efektywność: {result.total_efficiency:.1%}")
 
-        # Display time comparison in new panel
+        # Czasy cięcia liczone w tle - panel czasu i callback po zakończeniu
+        self._calculate_time_comparison()
+
+    def _show_time_comparison(self):
+        """Pokaż porównanie czasu klasycznego i dynamicznego"""
         if self.time_classic_s > 0 or self.time_dynamic_s > 0:
             def format_time(seconds):
                 if seconds >= 3600:
@@ -1899,6 +2069,9 @@ class NestingTab(ctk.CTkFrame):
             self.lbl_diff_time.configure(text="Czas: -")
             self.lbl_diff_cost.configure(text="Koszt: -")
 
+    def _complete_nesting(self, result):
+        """Zakończ po policzeniu czasów - panel czasu i callback"""
+        self._show_time_comparison()
         self.progress.set(1.0)
 
         if self.on_nesting_complete:
@@ -2134,21 +2307,24 @@ ale dla skomplikowanych kształtów zalecamy metodę dynamiczną."""
     def _calculate_time_comparison(self):
         """Calculate and compare classic vs dynamic cutting time for all parts.
 
+        Motion time is planned once per part type (PartTimeModelCache) in a
+        background thread; results are applied to all placed instances on
+        the GUI thread, then _complete_nesting shows them and fires the callback.
+
         Updates:
         - self.time_classic_s, self.time_dynamic_s (for display)
         - result.cut_time_classic_s, result.cut_time_dynamic_s (for callback)
         - Per-sheet and per-part times in result objects
         """
-        if not HAS_MOTION_DYNAMICS:
-            logger.warning("Motion dynamics not available for time calculation")
-            return
-
+        result = self.nesting_result
         self.time_classic_s = 0.0
         self.time_dynamic_s = 0.0
 
-        # Get cutting speed based on material and thickness
-        v_max_m_min = self._get_cutting_speed()
-        v_max_mm_s = m_min_to_mm_s(v_max_m_min)
+        if not HAS_MOTION_DYNAMICS or not result:
+            if not HAS_MOTION_DYNAMICS:
+                logger.warning("Motion dynamics not available for time calculation")
+            self._complete_nesting(result)
+            return
 
         # Create machine profile
         machine = MachineProfile(
@@ -2167,68 +2343,113 @@ ale dla skomplikowanych kształtów zalecamy metodę dynamiczną."""
             if name and filepath:
                 filepath_by_name[name] = filepath
 
-        # Calculate time for each placed part in result
-        if self.nesting_result:
-            for sheet in self.nesting_result.sheets:
-                sheet.cut_time_classic_s = 0.0
-                sheet.cut_time_dynamic_s = 0.0
-                sheet.total_cut_length_mm = 0.0
-                sheet.total_pierce_count = 0
-
-                for part in sheet.placed_parts:
-                    # Get filepath from original parts data
-                    filepath = filepath_by_name.get(part.name, '')
-                    part.filepath = filepath
-
-                    # Estimate cut length from contour
-                    cut_length_mm = self._estimate_cut_length_from_nested_part(part)
-                    part.cut_length_mm = cut_length_mm
-
-                    # Classic time: length / speed
-                    if v_max_mm_s > 0:
-                        part.cut_time_classic_s = cut_length_mm / v_max_mm_s
-                    else:
-                        part.cut_time_classic_s = 0.0
-
-                    # Dynamic time: use motion planner if filepath available
-                    if filepath and os.path.exists(filepath):
-                        try:
-                            segments = extract_motion_segments(filepath)
-                            if segments:
-                                cutting_time, rapid_time = estimate_motion_time(segments, machine, v_max_mm_s)
-                                part.cut_time_dynamic_s = cutting_time + rapid_time
-                                part.pierce_count = len(set(s.contour_id for s in segments if not s.is_rapid))
-                            else:
-                                part.cut_time_dynamic_s = part.cut_time_classic_s * 1.3
-                                part.pierce_count = 1
-                        except Exception as e:
-                            logger.error(f"Error calculating dynamic time for {filepath}: {e}")
-                            part.cut_time_dynamic_s = part.cut_time_classic_s * 1.3
-                            part.pierce_count = 1
-                    else:
-                        # Estimate from contour complexity
-                        holes_count = len(part.holes) if hasattr(part, 'holes') else 0
-                        part.pierce_count = 1 + holes_count
-                        part.cut_time_dynamic_s = part.cut_time_classic_s * (1.2 + holes_count * 0.1)
-
-                    # Aggregate to sheet
-                    sheet.cut_time_classic_s += part.cut_time_classic_s
-                    sheet.cut_time_dynamic_s += part.cut_time_dynamic_s
-                    sheet.total_cut_length_mm += part.cut_length_mm
-                    sheet.total_pierce_count += part.pierce_count
-
-                # Aggregate to totals
-                self.time_classic_s += sheet.cut_time_classic_s
-                self.time_dynamic_s += sheet.cut_time_dynamic_s
-
-            # Store in result for callback
-            self.nesting_result.cut_time_classic_s = self.time_classic_s
-            self.nesting_result.cut_time_dynamic_s = self.time_dynamic_s
-            self.nesting_result.total_cut_length_mm = sum(s.total_cut_length_mm for s in self.nesting_result.sheets)
-            self.nesting_result.total_pierce_count = sum(s.total_pierce_count for s in self.nesting_result.sheets)
+        placed_names = {part.name for sheet in result.sheets for part in sheet.placed_parts}
+        filepaths = [filepath_by_name[name] for name in placed_names if name in filepath_by_name]
+
+        def on_progress(done, total):
+            if total:
+                self.after(0, lambda: self.lbl_dynamic_time.configure(
+                    text=f"Czas: obliczanie {done}/{total} typów..."))
+
+        def compute():
+            models = {}
+            rapid_times = {}
+            v_max_mm_s = 0.0
+            try:
+                # Get cutting speed based on material and thickness
+                v_max_mm_s = m_min_to_mm_s(self._get_cutting_speed())
+                existing = [f for f in filepaths if os.path.exists(f)]
+                models = get_part_time_cache().get_models(
+                    existing, self.material, self.thickness, machine, v_max_mm_s,
+                    progress=on_progress
+                )
+            except Exception as e:
+                logger.error(f"Error calculating part time models: {e}")
+            try:
+                # Rapid moves between contours of the whole sheet
+                from quotations.nesting.fast_nester import place_contours
+                for sheet in result.sheets:
+                    place_contours(sheet.placed_parts)
+                    sequence = sequence_nested_parts(sheet.placed_parts)
+                    rapid_times[sheet.sheet_index] = (sequence.rapid_length_mm,
+                                                      sequence.rapid_time_s(machine))
+            except Exception as e:
+                logger.error(f"Error sequencing sheets: {e}")
+            self.after(0, lambda: self._apply_time_models(result, filepath_by_name, models,
+                                                          v_max_mm_s, rapid_times))
+
+        threading.Thread(target=compute, daemon=True).start()
+
+    def _apply_time_models(self, result, filepath_by_name: Dict[str, str],
+                           models: Dict[str, object], v_max_mm_s: float,
+                           rapid_times: Optional[Dict[int, Tuple[float, float]]] = None):
+        """Apply per-type time models and sheet rapid times (GUI thread)."""
+        if result is not self.nesting_result:
+            return  # Nowszy nesting zastąpił ten wynik
+
+        cut_length_by_name: Dict[str, float] = {}
+
+        for sheet in result.sheets:
+            sheet.cut_time_classic_s = 0.0
+            sheet.cut_time_dynamic_s = 0.0
+            sheet.total_cut_length_mm = 0.0
+            sheet.total_pierce_count = 0
+
+            for part in sheet.placed_parts:
+                # Get filepath from original parts data
+                filepath = filepath_by_name.get(part.name, '')
+                part.filepath = filepath
+
+                # Estimate cut length from contour (once per part type)
+                if part.name not in cut_length_by_name:
+                    cut_length_by_name[part.name] = self._estimate_cut_length_from_nested_part(part)
+                part.cut_length_mm = cut_length_by_name[part.name]
+
+                # Classic time: length / speed
+                if v_max_mm_s > 0:
+                    part.cut_time_classic_s = part.cut_length_mm / v_max_mm_s
+                else:
+                    part.cut_time_classic_s = 0.0
+
+                # Dynamic time: per-type motion model if toolpath available
+                model = models.get(filepath) if filepath else None
+                if model is not None:
+                    part.cut_time_dynamic_s = model.total_time_s
+                    part.pierce_count = model.pierce_count
+                elif filepath and filepath in models:
+                    part.cut_time_dynamic_s = part.cut_time_classic_s * 1.3
+                    part.pierce_count = 1
+                else:
+                    # Estimate from contour complexity
+                    holes_count = len(part.holes) if hasattr(part, 'holes') else 0
+                    part.pierce_count = 1 + holes_count
+                    part.cut_time_dynamic_s = part.cut_time_classic_s * (1.2 + holes_count * 0.1)
+
+                # Aggregate to sheet
+                sheet.cut_time_classic_s += part.cut_time_classic_s
+                sheet.cut_time_dynamic_s += part.cut_time_dynamic_s
+                sheet.total_cut_length_mm += part.cut_length_mm
+                sheet.total_pierce_count += part.pierce_count
+
+            # Rapid moves between contours (sheet sequence)
+            sheet.rapid_length_mm, sheet.rapid_time_s = (rapid_times or {}).get(
+                sheet.sheet_index, (0.0, 0.0))
+            sheet.cut_time_dynamic_s += sheet.rapid_time_s
+
+            # Aggregate to totals
+            self.time_classic_s += sheet.cut_time_classic_s
+            self.time_dynamic_s += sheet.cut_time_dynamic_s
+
+        # Store in result for callback
+        result.cut_time_classic_s = self.time_classic_s
+        result.cut_time_dynamic_s = self.time_dynamic_s
+        result.total_cut_length_mm = sum(s.total_cut_length_mm for s in result.sheets)
+        result.total_pierce_count = sum(s.total_pierce_count for s in result.sheets)
 
         logger.info(f"Time comparison: Classic={self.time_classic_s:.1f}s, Dynamic={self.time_dynamic_s:.1f}s")
 
+        self._complete_nesting(result)
+
     def _estimate_cut_length_from_nested_part(self, part) -> float:
         """Estimate cut length from NestedPart contour and holes."""
         cut_length = 0.0
@@ -2259,9 +2480,10 @@ ale dla skomplikowanych kształtów zalecamy metodę dynamiczną."""
         falls back to hardcoded defaults if not available.
         """
         # Try Supabase first
-        if HAS_PRICING_REPO and _pricing_repo:
+        pricing_repo = try_get_service(PRICING_REPOSITORY)
+        if pricing_repo:
             try:
-                record = _pricing_repo.get_cutting_price(self.material, self.thickness)
+                record = pricing_repo.get_cutting_price(self.material, self.thickness)
                 if record and record.get('cutting_speed'):
                     speed = float(record['cutting_speed'])
                     logger.info(f"[NestingTab] Got cutting speed from Supabase: {self.material} {self.thickness}mm = {speed} m/min")
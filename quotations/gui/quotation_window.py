@@ -41,6 +41,9 @@ try:
 except ImportError:
     HAS_OPENPYXL = False
 
+# Rozmiar miniatury detalu (liczonej przy imporcie folderu)
+THUMBNAIL_SIZE = (150, 150)
+
 
 # ============================================================
 # KOLORY I STYLE
@@ -715,6 +718,8 @@ class QuotationWindow(ctk.CTkToplevel):
                 
                 parser = FolderParser()
                 result = parser.scan_folder(folder)
+                parser.load_geometry(result, thumbnail_size=THUMBNAIL_SIZE,
+                                      progress=self._on_geometry_progress)
                 
                 # Aktualizuj UI w głównym wątku
                 self.after(0, lambda: self._display_scan_result(result))
@@ -748,6 +753,8 @@ class QuotationWindow(ctk.CTkToplevel):
                 
                 parser = FolderParser()
                 result = parser.scan_archive(archive)
+                parser.load_geometry(result, thumbnail_size=THUMBNAIL_SIZE,
+                                      progress=self._on_geometry_progress)
                 
                 self.after(0, lambda: self._display_scan_result(result))
                 
@@ -757,6 +764,10 @@ class QuotationWindow(ctk.CTkToplevel):
         
         threading.Thread(target=load, daemon=True).start()
     
+    def _on_geometry_progress(self, done: int, total: int, path: str):
+        """Postęp wczytywania geometrii DXF (wywoływane z wątku roboczego)"""
+        self.after(0, lambda: self._set_status(f"Wczytywanie geometrii DXF: {done}/{total}"))
+    
     def _display_scan_result(self, result):
         """Wyświetl wyniki skanowania"""
         from shared.parsers.folder_parser import FolderScanResult
@@ -777,16 +788,10 @@ class QuotationWindow(ctk.CTkToplevel):
                 logger.debug(f"Pominięto grupę bez pliku 2D: {group.core_name}")
                 continue
             
-            # Pobierz wymiary z DXF (jeśli możliwe)
+            # Wymiary z geometrii wczytanej przez load_geometry
             width, height = 0, 0
-            if group.primary_2d:
-                try:
-                    from quotations.nesting.nester import get_dxf_bounding_box
-                    dims = get_dxf_bounding_box(str(group.primary_2d.path))
-                    if dims:
-                        width, height = dims
-                except:
-                    pass
+            if group.dxf_part is not None:
+                width, height = group.dxf_part.width, group.dxf_part.height
             
             # Unikalny ID z indeksem
             unique_id = f"part_{idx}_{group.core_name}"
@@ -802,6 +807,7 @@ class QuotationWindow(ctk.CTkToplevel):
                 'has_bending': group.has_bending,
                 'file_2d': str(group.primary_2d.path) if group.primary_2d else None,
                 'file_3d': str(group.primary_3d.path) if group.primary_3d else None,
+                'thumbnail': group.thumbnail,
             }
             
             self.parts_list.append(part_data)
@@ -880,6 +886,10 @@ class QuotationWindow(ctk.CTkToplevel):
         """Generuj miniaturę dla detalu"""
         file_2d = part_data.get('file_2d')
         
+        if part_data.get('thumbnail') is not None:
+            self._display_thumbnail(part_data['thumbnail'])
+            return
+        
         if not file_2d or not Path(file_2d).exists():
             self._show_placeholder("Brak pliku DXF")
             return
@@ -891,7 +901,7 @@ class QuotationWindow(ctk.CTkToplevel):
                 
                 img = generate_thumbnail(
                     file_2d,
-                    img_size=(150, 150),
+                    img_size=THUMBNAIL_SIZE,
                     bg_color='#1a1a1a',
                     line_color='#8b5cf6'  # Fioletowy accent
                 )
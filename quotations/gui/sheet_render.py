@@ -0,0 +1,194 @@
+"""
+Sheet Render - Geometria podglądu arkuszy
+=========================================
+Bufor geometrii detali dla SheetCanvas, niezależny od Tk:
+- Kontury i otwory w układzie arkusza liczone raz na detal
+- Uproszczone wersje (Ramer-Douglas-Peucker) per poziom szczegółowości
+- Bbox detali do szybkiego trafiania kliknięciem
+
+Poziom szczegółowości zależy od skali widoku - przy małym zoomie
+wierzchołki bliżej niż pół piksela nie są widoczne, więc nie trafiają na canvas.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+# Tolerancja uproszczenia w pikselach ekranu
+PIXEL_TOLERANCE = 0.5
+# Tolerancja poziomu 1 w mm (kolejne poziomy - podwojenie)
+BASE_TOLERANCE_MM = 0.05
+MAX_LEVEL = 12
+
+
+def lod_level(zoom_scale: float, pixel_tolerance: float = PIXEL_TOLERANCE) -> int:
+    """Poziom szczegółowości dla skali widoku (px/mm); 0 = pełna geometria"""
+    if zoom_scale <= 0:
+        return MAX_LEVEL
+    tolerance_mm = pixel_tolerance / zoom_scale
+    if tolerance_mm < BASE_TOLERANCE_MM:
+        return 0
+    return min(MAX_LEVEL, int(math.log2(tolerance_mm / BASE_TOLERANCE_MM)) + 1)
+
+
+def level_tolerance(level: int) -> float:
+    """Tolerancja uproszczenia [mm] dla poziomu"""
+    return 0.0 if level <= 0 else BASE_TOLERANCE_MM * 2 ** (level - 1)
+
+
+def _segment_distance(p: Point, a: Point, b: Point) -> float:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(p[0] - a[0], p[1] - a[1])
+    t = max(0.0, min(1.0, ((p[0] - a[0]) * dx + (p[1] - a[1]) * dy) / length_sq))
+    return math.hypot(p[0] - a[0] - t * dx, p[1] - a[1] - t * dy)
+
+
+def _simplify_chain(points: List[Point], tolerance: float) -> List[Point]:
+    """RDP dla otwartej łamanej (iteracyjnie, bez rekurencji)"""
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        best, best_dist = -1, tolerance
+        for i in range(first + 1, last):
+            dist = _segment_distance(points[i], points[first], points[last])
+            if dist > best_dist:
+                best, best_dist = i, dist
+        if best >= 0:
+            keep[best] = True
+            stack.append((first, best))
+            stack.append((best, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def simplify_polygon(points: List[Point], tolerance: float) -> List[Point]:
+    """
+    Uprość zamknięty wielokąt z zachowaniem co najmniej 3 wierzchołków.
+
+    Wielokąt dzielony jest w wierzchołku najdalszym od pierwszego,
+    a obie łamane upraszczane osobno.
+    """
+    pts = _open_ring(points)
+    if tolerance <= 0 or len(pts) <= 3:
+        return pts
+
+    x0, y0 = pts[0]
+    far = max(range(len(pts)), key=lambda i: (pts[i][0] - x0) ** 2 + (pts[i][1] - y0) ** 2)
+    first = _simplify_chain(pts[:far + 1], tolerance)
+    second = _simplify_chain(pts[far:] + [pts[0]], tolerance)
+    result = first + second[1:-1]
+    if len(result) < 3:
+        # Zdegenerowany - zostaw trzy skrajne wierzchołki
+        mid = max(range(len(pts)), key=lambda i: _segment_distance(pts[i], pts[0], pts[far]))
+        result = [pts[i] for i in sorted({0, far, mid})]
+    return result
+
+
+def _open_ring(points: List[Point]) -> List[Point]:
+    """Wielokąt bez powtórzonego punktu zamykającego"""
+    pts = list(points)
+    if len(pts) > 1 and pts[0] == pts[-1]:
+        pts.pop()
+    return pts
+
+
+def _bbox(points: List[Point]) -> Tuple[float, float, float, float]:
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def point_in_polygon(x: float, y: float, polygon: List[Point]) -> bool:
+    """Test ray-casting"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
+            inside = not inside
+        j = i
+    return inside
+
+
+class PartGeometry:
+    """Geometria jednego detalu w układzie arkusza"""
+
+    __slots__ = ('part', 'name', 'contour', 'holes', 'bbox', 'is_rect', '_levels')
+
+    def __init__(self, part: Any):
+        self.part = part
+        self.name = getattr(part, 'name', '')
+        contour = part.get_placed_contour() if hasattr(part, 'get_placed_contour') else []
+        self.is_rect = len(contour) < 3
+        if self.is_rect:
+            px, py = getattr(part, 'x', 0), getattr(part, 'y', 0)
+            pw, ph = getattr(part, 'width', 100), getattr(part, 'height', 100)
+            contour = [(px, py), (px + pw, py), (px + pw, py + ph), (px, py + ph)]
+        self.contour: List[Point] = _open_ring(contour)
+        holes = part.get_placed_holes() if hasattr(part, 'get_placed_holes') else []
+        self.holes: List[List[Point]] = [_open_ring(h) for h in holes if len(h) >= 3]
+        self.bbox = _bbox(self.contour)
+        self._levels: Dict[int, Tuple[List[Point], List[List[Point]]]] = {}
+
+    def at_level(self, level: int) -> Tuple[List[Point], List[List[Point]]]:
+        """Kontur i otwory uproszczone dla poziomu szczegółowości"""
+        cached = self._levels.get(level)
+        if cached is None:
+            if level <= 0 or self.is_rect:
+                cached = (self.contour, self.holes)
+            else:
+                tolerance = level_tolerance(level)
+                cached = (simplify_polygon(self.contour, tolerance),
+                          [simplify_polygon(h, tolerance) for h in self.holes])
+            self._levels[level] = cached
+        return cached
+
+    def contains(self, x: float, y: float) -> bool:
+        x1, y1, x2, y2 = self.bbox
+        if not (x1 <= x <= x2 and y1 <= y <= y2):
+            return False
+        return self.is_rect or point_in_polygon(x, y, self.contour)
+
+
+class SheetGeometry:
+    """Bufor geometrii wszystkich detali arkusza"""
+
+    def __init__(self, parts: List[Any]):
+        # Kontury NestedPart liczone wsadowo (bufor w detalach)
+        from quotations.nesting.fast_nester import NestedPart, place_contours
+        place_contours([p for p in parts if isinstance(p, NestedPart)])
+        self.parts: List[PartGeometry] = [PartGeometry(p) for p in parts]
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+    def hit_test(self, x: float, y: float) -> Optional[PartGeometry]:
+        """Detal pod punktem (ostatni narysowany wygrywa)"""
+        for geometry in reversed(self.parts):
+            if geometry.contains(x, y):
+                return geometry
+        return None
+
+    def vertex_count(self, level: int) -> int:
+        """Liczba wierzchołków wysyłanych na canvas dla poziomu"""
+        total = 0
+        for geometry in self.parts:
+            contour, holes = geometry.at_level(level)
+            total += len(contour) + sum(len(h) for h in holes)
+        return total
+
+
+def to_canvas_coords(points: List[Point], scale: float, offset_x: float, offset_y: float,
+                     sheet_height: float) -> List[float]:
+    """Spłaszczone współrzędne canvas (oś Y odwrócona)"""
+    flat: List[float] = []
+    base_y = offset_y + sheet_height * scale
+    for x, y in points:
+        flat.append(offset_x + x * scale)
+        flat.append(base_y - y * scale)
+    return flat
@@ -6,6 +6,12 @@ Moduły nestingu dla cięcia laserowego.
 Główny algorytm: FastNester (rectpack)
 - Szybki tryb: 3 próby, ~1s
 - Głęboka analiza: setki prób z różnymi algorytmami
+- Silnik NFP (engine=ENGINE_NFP): prawdziwe kształty, detale w otworach
+- Cache wyników na dysku (NestingResultCache): powtórny nesting tego samego zestawu natychmiast
+- Zapis w bazie (pack_nesting_result): geometria raz na typ detalu + tablica pozycji
+- Wspólne linie cięcia (detect_common_lines): krawędzie sąsiednich detali cięte raz
+- Magazyn resztek (RemnantStore): odpady po nestingu zużywane przed pełnymi arkuszami
+- Kontury na arkuszu (place_contours): wsadowa transformacja NumPy z buforem w detalach
 
 Funkcje:
 - Pakowanie bounding box z prawdziwymi kształtami
@@ -20,7 +26,20 @@ from .fast_nester import (
     PartCostBreakdown,
     HAS_RECTPACK,
     SCALE,
+    ENGINE_RECTPACK,
+    ENGINE_NFP,
+    place_contours,
 )
+from .result_cache import NestingResultCache, get_default_cache
+from .packed_result import pack_nesting_result, unpack_nesting_result, iter_sheets, is_packed
+from .common_line import (
+    CommonLineReport,
+    detect_common_lines,
+    analyze_common_lines,
+    repack_common_line,
+    apply_common_lines,
+)
+from .remnants import Remnant, RemnantStore, extract_remnant, get_remnant_store
 
 __all__ = [
     'FastNester',
@@ -29,4 +48,22 @@ __all__ = [
     'PartCostBreakdown',
     'HAS_RECTPACK',
     'SCALE',
+    'ENGINE_RECTPACK',
+    'ENGINE_NFP',
+    'place_contours',
+    'NestingResultCache',
+    'get_default_cache',
+    'pack_nesting_result',
+    'unpack_nesting_result',
+    'iter_sheets',
+    'is_packed',
+    'CommonLineReport',
+    'detect_common_lines',
+    'analyze_common_lines',
+    'repack_common_line',
+    'apply_common_lines',
+    'Remnant',
+    'RemnantStore',
+    'extract_remnant',
+    'get_remnant_store',
 ]
@@ -0,0 +1,388 @@
+"""
+Common Line - wykrywanie wspólnych krawędzi cięcia na arkuszu
+=============================================================
+Detale o prostych krawędziach ułożone przez FastNester obok siebie
+w odstępie ≈ szerokość szczeliny cięcia (kerf) mogą mieć wspólną linię
+cięcia: krawędź cięta jest raz dla obu detali, a połączone detale
+tną się jednym konturem (mniej przebić).
+
+Analiza arkusza (SheetResult):
+1. Krawędzie konturów zewnętrznych trafiają do indeksu segmentów:
+   kubełki (kierunek, odległość prostej od początku układu), więc
+   porównywane są tylko krawędzie prawie współliniowe, a w kubełku
+   nakładanie przedziałów sprawdza przeciąganie (sweep) - bez O(n²).
+2. Para krawędzi różnych detali jest wspólna, gdy są równoległe,
+   zwrócone do siebie (detale po przeciwnych stronach), odstęp ≤ kerf
+   + tolerancja, a rzuty nakładają się na co najmniej min_length_mm.
+3. Oszczędność długości cięcia = suma nakładań; oszczędność przebić =
+   liczba detali połączonych wspólnymi liniami - liczba grup.
+
+Przy domyślnym odstępie nestingu (5 mm) wspólnych linii nie ma -
+repack_common_line przepakowuje arkusz detali o prostych krawędziach
+z odstępem równym kerf.
+
+apply_common_lines przenosi oszczędności arkuszy nestingu do NestingSheet
+kalkulacji kosztów (NestingCostingWindow, opcja "Wspólne linie cięcia").
+
+Użycie:
+    report = detect_common_lines(sheet, kerf_mm=0.2)
+    report.apply_to(costing_sheet)      # NestingSheet kalkulacji kosztów
+
+    apply_common_lines(costing_sheet, result.sheets, nester=nester)
+"""
+
+import copy
+import math
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .fast_nester import FastNester, NestedPart, NestingResult, SheetResult, place_contours
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[float, float]
+
+# Domyślna szerokość szczeliny cięcia [mm]
+DEFAULT_KERF_MM = 0.2
+
+# Tolerancja odstępu i kierunku krawędzi
+GAP_TOLERANCE_MM = 0.05
+ANGLE_TOLERANCE_DEG = 0.1
+
+# Krótsze nakładania nie są opłacalne (dojazd, zwolnienie na narożu)
+MIN_COMMON_LENGTH_MM = 10.0
+
+
+@dataclass
+class CommonEdge:
+    """Wspólny odcinek krawędzi dwóch detali (indeksy w sheet.placed_parts)"""
+    part_a: int
+    part_b: int
+    start: Point
+    end: Point
+    length_mm: float
+
+
+@dataclass
+class CommonLineReport:
+    """Wynik analizy wspólnych linii cięcia jednego arkusza"""
+    sheet_index: int
+    edges: List[CommonEdge] = field(default_factory=list)
+    original_cut_length_mm: float = 0.0
+    original_pierce_count: int = 0
+    saved_cut_length_mm: float = 0.0
+    saved_pierce_count: int = 0
+
+    @property
+    def cut_length_mm(self) -> float:
+        return self.original_cut_length_mm - self.saved_cut_length_mm
+
+    @property
+    def pierce_count(self) -> int:
+        return self.original_pierce_count - self.saved_pierce_count
+
+    @property
+    def has_common_lines(self) -> bool:
+        return bool(self.edges)
+
+    def apply_to(self, costing_sheet) -> None:
+        """Przenieś oszczędności do NestingSheet (costing.models) - warianty kosztów A i B"""
+        costing_sheet.common_line_saved_cut_mm = self.saved_cut_length_mm
+        costing_sheet.common_line_saved_pierces = self.saved_pierce_count
+
+
+class _Edge:
+    """Prosta krawędź konturu zewnętrznego z normalną na zewnątrz detalu"""
+    __slots__ = ('part', 'a', 'b', 'length', 'direction', 'normal')
+
+    def __init__(self, part: int, a: Point, b: Point, ccw: bool):
+        self.part = part
+        self.a = a
+        self.b = b
+        self.length = math.hypot(b[0] - a[0], b[1] - a[1])
+        self.direction = ((b[0] - a[0]) / self.length, (b[1] - a[1]) / self.length)
+        dx, dy = self.direction
+        # Wnętrze po lewej stronie dla konturu CCW
+        self.normal = (dy, -dx) if ccw else (-dy, dx)
+
+
+class SegmentIndex:
+    """
+    Indeks krawędzi prawie współliniowych.
+
+    Klucz kubełka: (kierunek skwantowany do angle_tol, odległość prostej
+    od początku układu skwantowana do bin_size). Krawędzie, które mogą
+    leżeć w odstępie ≤ bin_size, są w tym samym lub sąsiednim kubełku.
+    """
+
+    def __init__(self, angle_tol_deg: float, bin_size: float):
+        self.angle_tol = angle_tol_deg
+        self.bin_size = bin_size
+        self.buckets: Dict[Tuple[int, int], List[Tuple[float, float, _Edge]]] = defaultdict(list)
+
+    def _angle_key(self, edge: _Edge) -> int:
+        angle = math.degrees(math.atan2(edge.direction[1], edge.direction[0])) % 180.0
+        if angle >= 180.0 - self.angle_tol / 2:
+            angle -= 180.0
+        return int(round(angle / self.angle_tol))
+
+    def _frame(self, angle_key: int) -> Tuple[Point, Point]:
+        theta = math.radians(angle_key * self.angle_tol)
+        return (math.cos(theta), math.sin(theta)), (-math.sin(theta), math.cos(theta))
+
+    def insert(self, edge: _Edge) -> None:
+        key = self._angle_key(edge)
+        (dx, dy), (nx, ny) = self._frame(key)
+        mx, my = (edge.a[0] + edge.b[0]) / 2, (edge.a[1] + edge.b[1]) / 2
+        offset_bin = int(math.floor((nx * mx + ny * my) / self.bin_size))
+        t0 = dx * edge.a[0] + dy * edge.a[1]
+        t1 = dx * edge.b[0] + dy * edge.b[1]
+        self.buckets[(key, offset_bin)].append((min(t0, t1), max(t0, t1), edge))
+
+    def candidate_pairs(self):
+        """Pary krawędzi z sąsiednich kubełków o nakładających się rzutach"""
+        for (key, offset_bin), items in self.buckets.items():
+            for d_key in (0, 1):
+                for d_bin in ((-1, 0, 1) if d_key else (0, 1)):
+                    other = self.buckets.get((key + d_key, offset_bin + d_bin))
+                    if other is None:
+                        continue
+                    yield from _overlapping(items, other if (d_key or d_bin) else None)
+
+
+def _overlapping(items, other):
+    """Sweep po przedziałach rzutu: pary w items (other=None) lub items × other"""
+    if other is None:
+        events = sorted(items, key=lambda item: item[0])
+        active = []
+        for t0, t1, edge in events:
+            active = [a for a in active if a[1] > t0]
+            for _, _, prev in active:
+                yield prev, edge
+            active.append((t0, t1, edge))
+        return
+
+    # Kubełek sąsiedni ma inny kierunek rzutu tylko o ≤ angle_tol - przedziały
+    # porównywane z zapasem, dokładne nakładanie liczy _common_segment
+    events = sorted([(t0, t1, edge, 0) for t0, t1, edge in items] +
+                    [(t0, t1, edge, 1) for t0, t1, edge in other], key=lambda item: item[0])
+    active = ([], [])
+    for t0, t1, edge, side in events:
+        active = tuple([a for a in group if a[1] > t0 - 1.0] for group in active)
+        for _, _, prev in active[1 - side]:
+            yield prev, edge
+        active[side].append((t0, t1, edge))
+
+
+def _common_segment(e1: _Edge, e2: _Edge, max_gap: float, angle_tol_deg: float,
+                    min_length: float) -> Optional[Tuple[Point, Point, float]]:
+    """Wspólny odcinek dwóch krawędzi (na linii środkowej szczeliny) lub None"""
+    # Równoległe i zwrócone do siebie
+    cos_normals = e1.normal[0] * e2.normal[0] + e1.normal[1] * e2.normal[1]
+    if cos_normals > -math.cos(math.radians(angle_tol_deg)):
+        return None
+
+    # Odstęp: e2 po zewnętrznej stronie e1
+    gaps = [(p[0] - e1.a[0]) * e1.normal[0] + (p[1] - e1.a[1]) * e1.normal[1] for p in (e2.a, e2.b)]
+    if min(gaps) < -GAP_TOLERANCE_MM or max(gaps) > max_gap:
+        return None
+
+    # Nakładanie rzutów na kierunek e1
+    dx, dy = e1.direction
+    s0, s1 = 0.0, e1.length
+    u = sorted((p[0] - e1.a[0]) * dx + (p[1] - e1.a[1]) * dy for p in (e2.a, e2.b))
+    lo, hi = max(s0, u[0]), min(s1, u[1])
+    if hi - lo < min_length:
+        return None
+
+    half = sum(gaps) / 4
+    nx, ny = e1.normal
+    start = (e1.a[0] + dx * lo + nx * half, e1.a[1] + dy * lo + ny * half)
+    end = (e1.a[0] + dx * hi + nx * half, e1.a[1] + dy * hi + ny * half)
+    return start, end, hi - lo
+
+
+def _closed(points: List[Point]) -> List[Point]:
+    if len(points) > 1 and points[0] == points[-1]:
+        return list(points[:-1])
+    return list(points)
+
+
+def _signed_area(points: List[Point]) -> float:
+    n = len(points)
+    return sum(points[i][0] * points[(i + 1) % n][1] - points[(i + 1) % n][0] * points[i][1]
+               for i in range(n)) / 2
+
+
+def _perimeter(points: List[Point]) -> float:
+    n = len(points)
+    return sum(math.dist(points[i], points[(i + 1) % n]) for i in range(n)) if n > 1 else 0.0
+
+
+def detect_common_lines(sheet: SheetResult, kerf_mm: float = DEFAULT_KERF_MM,
+                        min_length_mm: float = MIN_COMMON_LENGTH_MM,
+                        angle_tol_deg: float = ANGLE_TOLERANCE_DEG) -> CommonLineReport:
+    """
+    Znajdź wspólne linie cięcia między detalami arkusza.
+
+    Args:
+        sheet: Arkusz z wyniku nestingu
+        kerf_mm: Szerokość szczeliny cięcia (maksymalny odstęp krawędzi)
+        min_length_mm: Minimalna długość wspólnego odcinka
+        angle_tol_deg: Tolerancja równoległości krawędzi
+
+    Returns:
+        CommonLineReport (długość cięcia i przebicia przed/po)
+    """
+    report = CommonLineReport(sheet_index=sheet.sheet_index)
+    max_gap = kerf_mm + GAP_TOLERANCE_MM
+    index = SegmentIndex(angle_tol_deg, max(max_gap, 0.1))
+
+    for i, (contour, part_holes) in enumerate(place_contours(sheet.placed_parts)):
+        outer = _closed(contour)
+        holes = [_closed(h) for h in part_holes]
+        report.original_cut_length_mm += _perimeter(outer) + sum(_perimeter(h) for h in holes)
+        report.original_pierce_count += 1 + len(holes)
+
+        if len(outer) < 3:
+            continue
+        ccw = _signed_area(outer) > 0
+        for k in range(len(outer)):
+            a, b = outer[k], outer[(k + 1) % len(outer)]
+            if math.dist(a, b) >= min_length_mm:
+                index.insert(_Edge(i, a, b, ccw))
+
+    parent = list(range(len(sheet.placed_parts)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for e1, e2 in index.candidate_pairs():
+        if e1.part == e2.part:
+            continue
+        common = _common_segment(e1, e2, max_gap, angle_tol_deg, min_length_mm)
+        if common is None:
+            continue
+        start, end, length = common
+        report.edges.append(CommonEdge(e1.part, e2.part, start, end, length))
+        report.saved_cut_length_mm += length
+        root_a, root_b = find(e1.part), find(e2.part)
+        if root_a != root_b:
+            parent[root_a] = root_b
+            # Połączone detale tną się jednym konturem - jedno przebicie mniej
+            report.saved_pierce_count += 1
+
+    return report
+
+
+def analyze_common_lines(result: NestingResult, **options) -> List[CommonLineReport]:
+    """detect_common_lines dla wszystkich arkuszy wyniku"""
+    return [detect_common_lines(sheet, **options) for sheet in result.sheets]
+
+
+def is_common_line_candidate(part: NestedPart, min_edge_ratio: float = 0.5,
+                             tolerance_mm: float = GAP_TOLERANCE_MM) -> bool:
+    """
+    Detal o prostych krawędziach na obrysie (prostokąt, ceownik, L...).
+
+    Kandydat, gdy proste krawędzie leżące na bounding boxie pokrywają co
+    najmniej min_edge_ratio jego obwodu - tylko one mogą się stykać
+    z sąsiadami przy pakowaniu bounding box.
+    """
+    outer = _closed(part.original_contour)
+    if len(outer) < 3:
+        return True  # Brak konturu = prostokąt bounding box
+    xs = [p[0] for p in outer]
+    ys = [p[1] for p in outer]
+    x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+    bbox_perimeter = 2 * ((x1 - x0) + (y1 - y0))
+    if bbox_perimeter <= 0:
+        return False
+
+    on_bbox = 0.0
+    for k in range(len(outer)):
+        a, b = outer[k], outer[(k + 1) % len(outer)]
+        for coord, bound in ((0, x0), (0, x1), (1, y0), (1, y1)):
+            if abs(a[coord] - bound) <= tolerance_mm and abs(b[coord] - bound) <= tolerance_mm:
+                on_bbox += math.dist(a, b)
+                break
+    return on_bbox >= min_edge_ratio * bbox_perimeter
+
+
+def repack_common_line(nester: FastNester, sheet: SheetResult,
+                       kerf_mm: float = DEFAULT_KERF_MM) -> Optional[SheetResult]:
+    """
+    Przepakuj arkusz z odstępem równym kerf (wspólne linie cięcia).
+
+    Tylko gdy wszystkie detale arkusza są kandydatami do wspólnej linii -
+    detale o krzywoliniowym obrysie wymagają pełnego odstępu nestera.
+
+    Args:
+        nester: FastNester, który wyprodukował arkusz (typy detali)
+        sheet: Arkusz do przepakowania
+        kerf_mm: Odstęp między detalami po przepakowaniu
+
+    Returns:
+        Nowy SheetResult lub None (niekandydaci albo detale się nie mieszczą)
+    """
+    if not sheet.placed_parts:
+        return None
+    if not all(is_common_line_candidate(p) for p in sheet.placed_parts):
+        logger.info(f"Sheet {sheet.sheet_index}: not all parts are common-line candidates")
+        return None
+
+    clone = FastNester(nester.sheet_width, nester.sheet_height, kerf_mm,
+                       max_sheets=1, seed=nester.seed, workers=1)
+    names = {p.source_part_name or p.name for p in sheet.placed_parts}
+    clone.part_types = [copy.copy(t) for t in nester.part_types if t.name in names]
+
+    repacked = clone._repack_sheet(sheet.placed_parts, sheet.sheet_index)
+    if repacked is None:
+        logger.info(f"Sheet {sheet.sheet_index}: common-line repack does not fit")
+    return repacked
+
+
+def apply_common_lines(costing_sheet, sheets: List[SheetResult],
+                       nester: Optional[FastNester] = None,
+                       kerf_mm: float = DEFAULT_KERF_MM) -> CommonLineReport:
+    """
+    Oszczędności wspólnych linii arkuszy nestingu w NestingSheet kalkulacji.
+
+    Z nesterem arkusze są najpierw przepakowywane z odstępem kerf
+    (repack_common_line) - przy odstępie nestera wspólnych linii nie ma.
+    Raporty arkuszy są sumowane (NestingSheet może obejmować kilka arkuszy).
+
+    Returns:
+        Łączny CommonLineReport (przeniesiony do costing_sheet)
+    """
+    total = CommonLineReport(sheet_index=sheets[0].sheet_index if sheets else 0)
+    for sheet in sheets:
+        if nester is not None:
+            sheet = repack_common_line(nester, sheet, kerf_mm) or sheet
+        report = detect_common_lines(sheet, kerf_mm=kerf_mm)
+        total.edges.extend(report.edges)
+        total.original_cut_length_mm += report.original_cut_length_mm
+        total.original_pierce_count += report.original_pierce_count
+        total.saved_cut_length_mm += report.saved_cut_length_mm
+        total.saved_pierce_count += report.saved_pierce_count
+
+    total.apply_to(costing_sheet)
+    return total
+
+
+__all__ = [
+    'CommonEdge',
+    'CommonLineReport',
+    'SegmentIndex',
+    'detect_common_lines',
+    'analyze_common_lines',
+    'is_common_line_candidate',
+    'repack_common_line',
+    'apply_common_lines',
+    'DEFAULT_KERF_MM',
+]
@@ -136,6 +136,17 @@ class DXFPolygonExtractor:
         
         try:
             doc = ezdxf.readfile(str(filepath))
+        except Exception as e:
+            logger.error(f"Error extracting polygon from {filepath}: {e}")
+            return None
+        
+        return self.extract_from_document(doc, filepath)
+    
+    def extract_from_document(self, doc, filepath: str | Path = "") -> Optional[DXFPolygon]:
+        """
+        Wyekstrahuj główny wielokąt z już wczytanego dokumentu ezdxf.
+        """
+        try:
             msp = doc.modelspace()
             
             polygons = []
@@ -303,6 +314,14 @@ def get_dxf_polygon(filepath: str | Path, use_cache: bool = True) -> Optional[DX
     return polygon
 
 
+def store_dxf_polygon(filepath: str | Path, polygon: Optional[DXFPolygon]) -> None:
+    """
+    Zapisz w cache wielokąt wyliczony poza get_dxf_polygon (np. z ParsedDXF),
+    żeby kolejne wywołania nie czytały pliku ponownie.
+    """
+    _polygon_cache[str(filepath)] = polygon
+
+
 def clear_polygon_cache():
     """Wyczyść cache wielokątów"""
     _polygon_cache.clear()
@@ -15,18 +15,55 @@ Metoda alokacji kosztów:
 Tryby:
 - Szybki (default): 3 próby, ~1s
 - Głęboka analiza: setki prób z różnymi algorytmami, sortowaniami i tasowaniem
+- Głęboka analiza równoległa (parallel=True): próby rozdzielone na ProcessPoolExecutor,
+  wynik deterministyczny dla danego seed
+- Optymalizacja zlecenia (optimize_job=True): wyżarzanie kolejności/obrotów całego
+  zlecenia w budżecie czasu - patrz job_optimizer.py
+
+Nesting przyrostowy (set_quantity + run_incremental): po zmianie ilości
+przepakowywane są tylko arkusze, z których usunięto detale, oraz ostatni
+arkusz z nowymi sztukami; pełna optymalizacja opcjonalnie w tle.
+
+Cache wyników (cache=NestingResultCache): ten sam zestaw detali i parametrów
+zwraca zapisany układ bez ponownego nestingu - patrz result_cache.py
+
+Silniki:
+- rectpack (default): pakowanie bounding box
+- nfp: prawdziwe kształty (no-fit polygon, pyclipper) - patrz nfp_nester.py
+
+Resztki (remnants=[Remnant]): przed pełnymi arkuszami detale pakowane są
+na resztki materiału z magazynu (od najmniejszej) - patrz remnants.py
+
+Kontury na arkuszu (place_contours): geometria typu detalu trzymana jest raz
+jako tablica NumPy (PartShape), a detale arkusza transformowane grupami
+(typ + obrót) jedną operacją; wynik buforowany w NestedPart.
 """
 
+import os
+import copy
 import math
 import time
 import random
 import threading
 import logging
-from dataclasses import dataclass, field
-from typing import List, Tuple, Optional, Callable, Dict, Any
+import multiprocessing
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import List, Tuple, Optional, Callable, Dict, Any, Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .result_cache import NestingResultCache
+    from .remnants import Remnant
 
 logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 try:
     import rectpack
     HAS_RECTPACK = True
@@ -55,10 +92,23 @@ except ImportError:
 
 SCALE = 20  # 0.05 mm precision
 
+# Silniki nestingu (parametr engine w FastNester.run_nesting)
+ENGINE_RECTPACK = "rectpack"  # bounding box (domyślny)
+ENGINE_NFP = "nfp"            # prawdziwe kształty - no-fit polygon (pyclipper)
+
+# Domyślny budżet czasu optymalizacji całego zlecenia (optimize_job=True)
+DEFAULT_JOB_TIME_BUDGET_S = 10.0
+
 
 @dataclass
 class NestedPart:
-    """Detal umieszczony na arkuszu"""
+    """
+    Detal umieszczony na arkuszu.
+
+    Kontur i otwory na arkuszu buforowane są w atrybucie _placement (poza polami
+    dataclass) i liczone ponownie tylko po zmianie pozycji, obrotu lub geometrii.
+    Zwracane listy są współdzielone - nie modyfikować.
+    """
     name: str
     x: float
     y: float
@@ -98,35 +148,180 @@ class NestedPart:
                 (self.x, self.y)
             ]
         
-        result = []
-        for px, py in self.original_contour:
-            if self.rotation == 90:
-                o_w = self.orig_width if self.orig_width > 0 else self.width
-                rx = py
-                ry = o_w - px
-                result.append((self.x + rx, self.y + ry))
-            else:
-                result.append((self.x + px, self.y + py))
-        return result
+        return self._placed()[0]
     
     def get_placed_holes(self) -> List[List[Tuple[float, float]]]:
         """Zwróć otwory umieszczone na arkuszu"""
         if not self.original_contour:
             return []
         
-        placed_holes = []
-        for hole in self.holes:
-            placed_hole = []
-            for px, py in hole:
-                if self.rotation == 90:
-                    o_w = self.orig_width if self.orig_width > 0 else self.width
-                    rx = py
-                    ry = o_w - px
-                    placed_hole.append((self.x + rx, self.y + ry))
-                else:
-                    placed_hole.append((self.x + px, self.y + py))
-            placed_holes.append(placed_hole)
-        return placed_holes
+        return self._placed()[1]
+
+    def _placement_key(self) -> tuple:
+        return (self.x, self.y, self.rotation, self.orig_width, self.orig_height,
+                self.width, self.height)
+
+    def _cached_placement(self) -> Optional[tuple]:
+        """(kontur, otwory) z bufora, jeśli nadal aktualne"""
+        cached = getattr(self, '_placement', None)
+        if (cached is not None and cached[0] == self._placement_key()
+                and cached[1] is self.original_contour and cached[2] is self.holes):
+            return cached[3]
+        return None
+
+    def _store_placement(self, contour: List[Tuple[float, float]],
+                         holes: List[List[Tuple[float, float]]]) -> tuple:
+        placed = (contour, holes)
+        self._placement = (self._placement_key(), self.original_contour, self.holes, placed)
+        return placed
+
+    def _placed(self) -> tuple:
+        placed = self._cached_placement()
+        if placed is None:
+            o_w, o_h = self._orig_size()
+            contour = transform_contour(self.original_contour, self.rotation, o_w, o_h, self.x, self.y)
+            holes = [transform_contour(hole, self.rotation, o_w, o_h, self.x, self.y)
+                     for hole in self.holes]
+            placed = self._store_placement(contour, holes)
+        return placed
+    
+    def _orig_size(self) -> Tuple[float, float]:
+        """Wymiary detalu przed obrotem (fallback z wymiarów po obrocie)"""
+        if self.rotation == 90:
+            # Zachowana dotychczasowa konwencja (fallback na width)
+            o_w = self.orig_width if self.orig_width > 0 else self.width
+            o_h = self.orig_height if self.orig_height > 0 else self.width
+        elif self.rotation == 270:
+            o_w = self.orig_width if self.orig_width > 0 else self.height
+            o_h = self.orig_height if self.orig_height > 0 else self.width
+        else:
+            o_w = self.orig_width if self.orig_width > 0 else self.width
+            o_h = self.orig_height if self.orig_height > 0 else self.height
+        return o_w, o_h
+
+
+def transform_contour(points: List[Tuple[float, float]], rotation: float,
+                      orig_width: float, orig_height: float,
+                      dx: float = 0.0, dy: float = 0.0) -> List[Tuple[float, float]]:
+    """
+    Obróć znormalizowany kontur (bbox w (0, 0)) o wielokrotność 90° i przesuń.
+
+    Po obrocie bbox konturu nadal zaczyna się w (0, 0), więc (dx, dy)
+    to lewy dolny róg detalu na arkuszu. Obrót 90° zachowuje dotychczasową
+    konwencję FastNestera: (x, y) → (y, orig_width - x).
+    """
+    rot = int(round(rotation)) % 360
+    if rot == 90:
+        return [(dx + py, dy + orig_width - px) for px, py in points]
+    if rot == 180:
+        return [(dx + orig_width - px, dy + orig_height - py) for px, py in points]
+    if rot == 270:
+        return [(dx + orig_height - py, dy + px) for px, py in points]
+    return [(dx + px, dy + py) for px, py in points]
+
+
+def _rotation_terms(rotation: float, orig_width: float, orig_height: float) -> tuple:
+    """
+    Obrót transform_contour w postaci (kolumna, znak, stała) dla osi X i Y.
+
+    x' = dx + stała_x + znak_x * p[kolumna_x] - ta sama kolejność działań
+    co w transform_contour, więc wyniki są identyczne co do bitu.
+    """
+    rot = int(round(rotation)) % 360
+    if rot == 90:
+        return (1, 1.0, 0.0), (0, -1.0, orig_width)
+    if rot == 180:
+        return (0, -1.0, orig_width), (1, -1.0, orig_height)
+    if rot == 270:
+        return (1, -1.0, orig_height), (0, 1.0, 0.0)
+    return (0, 1.0, 0.0), (1, 1.0, 0.0)
+
+
+class PartShape:
+    """Kontur i otwory typu detalu jako jedna tablica NumPy (N, 2)"""
+
+    __slots__ = ('contour', 'holes', 'points', 'bounds')
+
+    def __init__(self, contour: List[Tuple[float, float]], holes: List[List[Tuple[float, float]]]):
+        # Listy źródłowe - ich tożsamość identyfikuje typ detalu
+        self.contour = contour
+        self.holes = holes
+        rings = [contour] + list(holes)
+        self.points = np.array([p for ring in rings for p in ring], dtype=float).reshape(-1, 2)
+        # Granice pierścieni w points: kontur, potem kolejne otwory
+        self.bounds = [0]
+        for ring in rings:
+            self.bounds.append(self.bounds[-1] + len(ring))
+
+
+_SHAPES: 'OrderedDict[int, PartShape]' = OrderedDict()
+_SHAPES_LOCK = threading.Lock()
+MAX_CACHED_SHAPES = 4096
+
+
+def get_part_shape(contour: List[Tuple[float, float]],
+                   holes: List[List[Tuple[float, float]]]) -> PartShape:
+    """
+    PartShape współdzielony przez instancje typu detalu.
+
+    Instancje typu dzielą te same listy contour/holes (z part_types lub
+    z deduplikacji w result_cache), więc kluczem jest ich tożsamość.
+    """
+    key = id(contour)
+    with _SHAPES_LOCK:
+        shape = _SHAPES.get(key)
+        if shape is not None and shape.contour is contour and shape.holes is holes:
+            _SHAPES.move_to_end(key)
+            return shape
+
+    shape = PartShape(contour, holes)
+    with _SHAPES_LOCK:
+        _SHAPES[key] = shape
+        while len(_SHAPES) > MAX_CACHED_SHAPES:
+            _SHAPES.popitem(last=False)
+    return shape
+
+
+def place_contours(parts: List['NestedPart']) -> List[tuple]:
+    """
+    Kontury i otwory wielu detali na arkuszu: [(kontur, [otwory]), ...].
+
+    Detale tego samego typu, obrotu i wymiarów transformowane są razem
+    jedną operacją NumPy; wyniki trafiają do bufora detali, więc kolejne
+    get_placed_contour()/get_placed_holes() nie liczą nic ponownie.
+    """
+    results: List[Optional[tuple]] = [None] * len(parts)
+    groups: Dict[tuple, List[int]] = {}
+    for i, part in enumerate(parts):
+        cached = part._cached_placement()
+        if cached is not None:
+            results[i] = cached
+        elif not part.original_contour:
+            results[i] = (part.get_placed_contour(), [])
+        elif not HAS_NUMPY:
+            results[i] = part._placed()
+        else:
+            o_w, o_h = part._orig_size()
+            key = (id(part.original_contour), id(part.holes), int(round(part.rotation)) % 360, o_w, o_h)
+            groups.setdefault(key, []).append(i)
+
+    for (_, _, rotation, o_w, o_h), indices in groups.items():
+        first = parts[indices[0]]
+        shape = get_part_shape(first.original_contour, first.holes)
+        (ix, sx, cx), (iy, sy, cy) = _rotation_terms(rotation, o_w, o_h)
+        dx = np.array([parts[i].x for i in indices], dtype=float)
+        dy = np.array([parts[i].y for i in indices], dtype=float)
+        xs = ((dx[:, None] + cx) + sx * shape.points[None, :, ix]).tolist()
+        ys = ((dy[:, None] + cy) + sy * shape.points[None, :, iy]).tolist()
+
+        bounds = shape.bounds
+        for row, i in enumerate(indices):
+            points = list(zip(xs[row], ys[row]))
+            contour = points[:bounds[1]]
+            holes = [points[bounds[k]:bounds[k + 1]] for k in range(1, len(bounds) - 1)]
+            results[i] = parts[i]._store_placement(contour, holes)
+
+    return results
 
 
 @dataclass
@@ -177,7 +372,12 @@ class SheetResult:
     total_cut_length_mm: float = 0.0     # Sum of all parts cutting length
     total_pierce_count: int = 0           # Sum of all parts pierces
     cut_time_classic_s: float = 0.0      # Sum of classic times
-    cut_time_dynamic_s: float = 0.0      # Sum of dynamic times
+    cut_time_dynamic_s: float = 0.0      # Sum of dynamic times (incl. rapids)
+    rapid_length_mm: float = 0.0         # Rapid travel between contours
+    rapid_time_s: float = 0.0            # Rapid travel time
+
+    # Resztka z magazynu (None = pełny arkusz); wymiary arkusza = prostokąt resztki
+    remnant_id: Optional[int] = None
 
 
 @dataclass
@@ -195,6 +395,7 @@ class NestingResult:
     
     # Statystyki globalne
     sheets_used: int = 1
+    remnants_used: int = 0
     total_efficiency: float = 0.0
     
     # Wymiary pojedynczego arkusza (dla kompatybilności)
@@ -235,6 +436,9 @@ class NestingResult:
         
         for sheet in self.sheets:
             sheet.sheet_cost = full_sheet_cost
+            if sheet.remnant_id is not None and full_sheet_area > 0:
+                # Resztka wyceniana proporcjonalnie do pola
+                sheet.sheet_cost = full_sheet_cost * (sheet.sheet_width * sheet.sheet_height / full_sheet_area)
             
             # Oblicz wagę każdego detalu
             for part in sheet.placed_parts:
@@ -325,6 +529,147 @@ class NestingResult:
         self.cost_breakdown.sort(key=lambda x: x.share_of_used_area, reverse=True)
 
 
+# Typy z co najmniej tyloma sztukami są grupowane w bloki-siatki
+GRID_MIN_QUANTITY = 20
+
+# Docelowa wysokość dużego bloku jako ułamek wysokości arkusza
+GRID_BLOCK_HEIGHT_RATIO = 1 / 8
+
+
+class PartType:
+    """
+    Typ detalu z ilością - jeden obiekt na typ zamiast słownika na sztukę.
+
+    Wymiary bez odstępu; słowniki sztuk (format FastNester) tworzone
+    są dopiero na potrzeby silnika, który ich wymaga.
+    """
+    __slots__ = ('name', 'width', 'height', 'contour', 'holes',
+                 'contour_area', 'weight_kg', 'quantity')
+
+    def __init__(self, name: str, width: float, height: float,
+                 contour: List[Tuple[float, float]], holes: List[List[Tuple[float, float]]],
+                 contour_area: float, weight_kg: float, quantity: int):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.contour = contour
+        self.holes = holes
+        self.contour_area = contour_area
+        self.weight_kg = weight_kg
+        self.quantity = quantity
+
+    def piece(self, spacing: float, part_index: int) -> dict:
+        """Słownik pojedynczej sztuki (wymiary z odstępem)"""
+        w = self.width + spacing
+        h = self.height + spacing
+        return {
+            'name': self.name,
+            'width': w,
+            'height': h,
+            'contour': self.contour,
+            'holes': self.holes,
+            'area': w * h,
+            'contour_area': self.contour_area,
+            'weight_kg': self.weight_kg,
+            'source_name': self.name,
+            'part_index': part_index
+        }
+
+    def block(self, spacing: float, first_index: int, nx: int, ny: int, rotated: bool) -> dict:
+        """
+        Słownik bloku nx × ny identycznych sztuk pakowanego jako jeden prostokąt.
+
+        rotated - sztuki w bloku obrócone o 90° względem konturu.
+        """
+        piece_w = (self.height if rotated else self.width) + spacing
+        piece_h = (self.width if rotated else self.height) + spacing
+        count = nx * ny
+        return {
+            'name': self.name,
+            'width': nx * piece_w,
+            'height': ny * piece_h,
+            'contour': self.contour,
+            'holes': self.holes,
+            'area': nx * piece_w * ny * piece_h,
+            'contour_area': self.contour_area * count,
+            'weight_kg': self.weight_kg * count,
+            'source_name': self.name,
+            'part_index': first_index,
+            'block': (nx, ny),
+            'piece_width': self.width,
+            'piece_height': self.height,
+            'piece_rotated': rotated,
+            'piece_contour_area': self.contour_area,
+            'piece_weight_kg': self.weight_kg,
+        }
+
+
+# ============================================================
+# Próby pakowania (wspólne dla trybu sekwencyjnego i procesów)
+# ============================================================
+
+# Stan procesu roboczego - ustawiany przez initializer puli
+_worker_stop_event = None
+
+
+def _init_pack_worker(stop_event) -> None:
+    """Initializer procesu roboczego - współdzielony sygnał stop"""
+    global _worker_stop_event
+    _worker_stop_event = stop_event
+
+
+def _pack_rects(dims: List[Tuple[float, float]], sheet_width: float, sheet_height: float,
+                pack_algo_index: int, sort_algo_index: int) -> Tuple[List[tuple], float]:
+    """
+    Jedna próba rectpack na pojedynczym arkuszu.
+
+    Args:
+        dims: (width, height) prostokątów z odstępem, rid = indeks w liście
+
+    Returns:
+        ([(rid, x, y, width, height), ...], efficiency)
+    """
+    packer = rectpack.newPacker(
+        mode=rectpack.PackingMode.Offline,
+        pack_algo=PACKING_ALGORITHMS[pack_algo_index],
+        rotation=True,
+        sort_algo=SORT_ALGORITHMS[sort_algo_index]
+    )
+    packer.add_bin(sheet_width, sheet_height)
+    for i, (w, h) in enumerate(dims):
+        packer.add_rect(w, h, rid=i)
+    packer.pack()
+    
+    placements = []
+    total_area = 0.0
+    max_x = 0
+    max_y = 0
+    for abin in packer:
+        for rect in abin:
+            placements.append((rect.rid, rect.x, rect.y, rect.width, rect.height))
+            w, h = dims[rect.rid]
+            total_area += w * h
+            max_x = max(max_x, rect.x + rect.width)
+            max_y = max(max_y, rect.y + rect.height)
+    
+    efficiency = total_area / (max_x * max_y) if max_x > 0 and max_y > 0 else 0
+    return placements, efficiency
+
+
+def _pack_trial_worker(trial: tuple) -> Optional[tuple]:
+    """
+    Próba wykonywana w procesie roboczym.
+
+    trial = (trial_index, dims, sheet_width, sheet_height, pack_algo_index, sort_algo_index)
+    Zwraca (trial_index, placements, efficiency) lub None po sygnale stop.
+    """
+    if _worker_stop_event is not None and _worker_stop_event.is_set():
+        return None
+    trial_index, dims, sheet_width, sheet_height, pack_idx, sort_idx = trial
+    placements, efficiency = _pack_rects(dims, sheet_width, sheet_height, pack_idx, sort_idx)
+    return trial_index, placements, efficiency
+
+
 class FastNester:
     """
     Szybki nester oparty na rectpack.
@@ -332,18 +677,37 @@ class FastNester:
     Obsługuje WIELE ARKUSZY automatycznie.
     """
     
+    # Liczba tasowań w fazie 2 głębokiej analizy
+    DEEP_SHUFFLES = 30
+    
     def __init__(self, sheet_width: float, sheet_height: float, spacing: float = 5.0,
-                 max_sheets: int = 100):
+                 max_sheets: int = 100, seed: Optional[int] = None,
+                 workers: Optional[int] = None,
+                 cache: Optional['NestingResultCache'] = None):
         self.sheet_width = sheet_width
         self.sheet_height = sheet_height
         self.spacing = spacing
         self.max_sheets = max_sheets
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
         
-        self.parts: List[dict] = []
+        self.part_types: List[PartType] = []
         self.result: Optional[NestingResult] = None
         
+        # Parametry ostatniego run_nesting (dla run_incremental / reoptimize_async)
+        self._last_run: Dict[str, Any] = {}
+        # Zmienia się przy każdej zmianie listy detali
+        self._revision = 0
+        self._reoptimizer: Optional['FastNester'] = None
+        
         self.stop_flag = threading.Event()
         self._progress_callback: Optional[Callable] = None
+        self._rng = random.Random(seed)
+        
+        # Pula procesów (tylko w trakcie równoległej głębokiej analizy)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._mp_stop_event = None
     
     def add_part(self, dxf_part: Any, quantity: int = 1) -> None:
         """Dodaj detal do nestingu."""
@@ -358,19 +722,18 @@ class FastNester:
         contour_area = dxf_part.contour_area if hasattr(dxf_part, 'contour_area') else dxf_part.width * dxf_part.height
         weight_kg = dxf_part.weight_kg if hasattr(dxf_part, 'weight_kg') else 0.0
         
-        for i in range(quantity):
-            self.parts.append({
-                'name': dxf_part.name,
-                'width': dxf_part.width + self.spacing,
-                'height': dxf_part.height + self.spacing,
-                'contour': normalized,
-                'holes': normalized_holes,
-                'area': (dxf_part.width + self.spacing) * (dxf_part.height + self.spacing),
-                'contour_area': contour_area,
-                'weight_kg': weight_kg,
-                'source_name': dxf_part.name,
-                'part_index': i
-            })
+        if quantity > 0:
+            self._revision += 1
+            self.part_types.append(PartType(
+                name=dxf_part.name,
+                width=dxf_part.width,
+                height=dxf_part.height,
+                contour=normalized,
+                holes=normalized_holes,
+                contour_area=contour_area,
+                weight_kg=weight_kg,
+                quantity=quantity
+            ))
     
     def add_part_from_dict(self, part_dict: dict, quantity: int = 1) -> None:
         """Dodaj detal ze słownika (dla integracji z GUI)."""
@@ -383,73 +746,148 @@ class FastNester:
         
         contour_area = part_dict.get('contour_area', width * height)
         
-        for i in range(quantity):
-            self.parts.append({
-                'name': part_dict.get('name', 'Part'),
-                'width': width + self.spacing,
-                'height': height + self.spacing,
-                'contour': contour,
-                'holes': part_dict.get('holes', []),
-                'area': (width + self.spacing) * (height + self.spacing),
-                'contour_area': contour_area,
-                'weight_kg': part_dict.get('weight_kg', 0.0),
-                'source_name': part_dict.get('name', 'Part'),
-                'part_index': i
-            })
+        if quantity > 0:
+            self._revision += 1
+            self.part_types.append(PartType(
+                name=part_dict.get('name', 'Part'),
+                width=width,
+                height=height,
+                contour=contour,
+                holes=part_dict.get('holes', []),
+                contour_area=contour_area,
+                weight_kg=part_dict.get('weight_kg', 0.0),
+                quantity=quantity
+            ))
+    
+    @property
+    def parts(self) -> List[dict]:
+        """Lista sztuk (słownik na sztukę) - budowana na żądanie z part_types"""
+        return [t.piece(self.spacing, i) for t in self.part_types for i in range(t.quantity)]
+    
+    @property
+    def part_count(self) -> int:
+        """Łączna liczba sztuk"""
+        return sum(t.quantity for t in self.part_types)
+    
+    def set_quantity(self, name: str, quantity: int) -> bool:
+        """
+        Zmień ilość typu detalu (przed run_incremental).
+        
+        Returns:
+            False gdy brak typu o tej nazwie (lub nazwa niejednoznaczna)
+        """
+        matching = [t for t in self.part_types if t.name == name]
+        if len(matching) != 1:
+            return False
+        
+        quantity = max(0, int(quantity))
+        if matching[0].quantity != quantity:
+            matching[0].quantity = quantity
+            self._revision += 1
+        return True
     
     def run_nesting(self, callback: Optional[Callable] = None,
-                     deep_analysis: bool = False) -> NestingResult:
-        """Uruchom nesting z obsługą wielu arkuszy."""
-        if not HAS_RECTPACK:
+                     deep_analysis: bool = False,
+                     engine: str = ENGINE_RECTPACK,
+                     parallel: bool = False,
+                     optimize_job: bool = False,
+                     time_budget_s: float = DEFAULT_JOB_TIME_BUDGET_S,
+                     remnants: Optional[List['Remnant']] = None) -> NestingResult:
+        """
+        Uruchom nesting z obsługą wielu arkuszy.
+
+        Args:
+            callback: Wywoływany po każdym arkuszu (placed_parts, efficiency)
+            deep_analysis: Więcej prób (wolniej, lepsze wykorzystanie)
+            engine: ENGINE_RECTPACK (bounding box) lub ENGINE_NFP (prawdziwe kształty)
+            parallel: Głęboka analiza rectpack na puli procesów (self.workers)
+            optimize_job: Po nestingu zachłannym optymalizuj całe zlecenie
+                (liczba arkuszy + odpad na ostatnim arkuszu) - tylko rectpack
+            time_budget_s: Budżet czasu optymalizacji zlecenia [s]
+            remnants: Resztki materiału zużywane przed pełnymi arkuszami
+                (arkusze-resztki na początku wyniku, SheetResult.remnant_id)
+        """
+        if engine == ENGINE_NFP:
+            from .nfp_nester import HAS_PYCLIPPER
+            if not HAS_PYCLIPPER:
+                logger.warning("pyclipper not installed - falling back to rectpack engine")
+                engine = ENGINE_RECTPACK
+        
+        if engine != ENGINE_NFP and not HAS_RECTPACK:
             logger.error("rectpack not installed")
             return NestingResult()
         
-        if not self.parts:
+        remnants = list(remnants or [])
+        self._last_run = dict(deep_analysis=deep_analysis, engine=engine, parallel=parallel,
+                              optimize_job=optimize_job, time_budget_s=time_budget_s,
+                              remnants=remnants)
+        
+        if not self.part_types:
             return NestingResult()
         
+        cache_key = None
+        if self.cache is not None:
+            from .result_cache import nesting_cache_key
+            cache_key = nesting_cache_key(self, engine, deep_analysis, optimize_job, time_budget_s,
+                                          remnants)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"→ Nesting result from cache ({cache_key[:12]})")
+                if callback:
+                    callback(cached.placed_parts, cached.total_efficiency)
+                self.result = cached
+                return cached
+        
         self.stop_flag.clear()
         self._progress_callback = callback
+        self._rng = random.Random(self.seed)
         
-        # Sortuj detale od największych
-        parts_sorted = sorted(self.parts, key=lambda x: x['area'], reverse=True)
-        
-        # Sprawdź które detale są za duże na arkusz
-        max_part_width = self.sheet_width - self.spacing
-        max_part_height = self.sheet_height - self.spacing
+        # Sztuki / bloki do pakowania (NFP potrzebuje pojedynczych konturów)
+        fittable_parts, unplaceable_parts = self._build_pack_items(use_blocks=engine != ENGINE_NFP)
         
-        fittable_parts = []
-        unplaceable_parts = []
-        
-        for p in parts_sorted:
-            p_w = p['width'] - self.spacing
-            p_h = p['height'] - self.spacing
-            
-            # Sprawdź czy mieści się (także po obrocie)
-            fits_normal = p_w <= max_part_width and p_h <= max_part_height
-            fits_rotated = p_h <= max_part_width and p_w <= max_part_height
-            
-            if fits_normal or fits_rotated:
-                fittable_parts.append(p)
-            else:
-                unplaceable_parts.append(UnplacedPart(
-                    name=p['name'],
-                    width=p_w,
-                    height=p_h,
-                    contour_area=p.get('contour_area', p_w * p_h),
-                    reason=f"Za duży ({p_w:.0f}x{p_h:.0f}mm > arkusz {max_part_width:.0f}x{max_part_height:.0f}mm)",
-                    source_part_name=p.get('source_name', p['name']),
-                    part_index=p.get('part_index', 0)
-                ))
-        
-        if deep_analysis:
+        # Sortuj detale od największych
+        fittable_parts.sort(key=lambda x: x['area'], reverse=True)
+        
+        # Najpierw resztki z magazynu, reszta na pełne arkusze
+        remnant_sheets = []
+        if remnants and HAS_RECTPACK:
+            remnant_sheets, fittable_parts = self._pack_remnants(fittable_parts, remnants)
+        
+        if engine == ENGINE_NFP:
+            result = self._run_nfp_multisheet(fittable_parts, callback, deep_analysis)
+        elif deep_analysis and parallel and self.workers > 1:
+            self._start_pool()
+            try:
+                result = self._run_deep_analysis_multisheet(fittable_parts, callback)
+            finally:
+                self._shutdown_pool()
+        elif deep_analysis:
             result = self._run_deep_analysis_multisheet(fittable_parts, callback)
         else:
             result = self._run_fast_multisheet(fittable_parts, callback)
         
+        if optimize_job and engine != ENGINE_NFP and fittable_parts and not self.stop_flag.is_set():
+            from .job_optimizer import JobOptimizer
+            optimizer = JobOptimizer(self, time_budget_s=time_budget_s, callback=callback)
+            result = optimizer.optimize(fittable_parts, result)
+        
+        if remnant_sheets:
+            self._prepend_remnant_sheets(result, remnant_sheets)
+        
         # Dodaj nieumieszczalne detale
-        result.unplaced_parts = unplaceable_parts
-        result.unplaced_count = len(unplaceable_parts)
+        result.unplaced_parts = unplaceable_parts + result.unplaced_parts
+        self._finish_result(result)
+        
+        # Przerwany nesting to wynik częściowy - nie zapisuj
+        if cache_key is not None and not self.stop_flag.is_set():
+            self.cache.put(cache_key, result)
         
+        self.result = result
+        return result
+    
+    def _finish_result(self, result: NestingResult) -> None:
+        """Liczniki, wymiary arkusza i pola kompatybilności wstecznej"""
+        result.unplaced_count = len(result.unplaced_parts)
         result.sheet_width = self.sheet_width
         result.sheet_height = self.sheet_height
         
@@ -459,18 +897,445 @@ class FastNester:
             result.used_width = first.used_width
             result.used_height = first.used_height
             result.efficiency = first.efficiency
+    
+    # ------------------------------------------------------------------
+    # Nesting przyrostowy
+    # ------------------------------------------------------------------
+    
+    def run_incremental(self, callback: Optional[Callable] = None,
+                        reoptimize: bool = False,
+                        on_reoptimized: Optional[Callable[[NestingResult], None]] = None) -> NestingResult:
+        """
+        Zaktualizuj poprzedni wynik po zmianie ilości (set_quantity / add_part).
+        
+        Nadmiarowe sztuki usuwane są od ostatniego arkusza; arkusze, z których
+        coś usunięto, są przepakowywane (gdy się nie uda - zostaje dotychczasowy
+        układ bez usuniętych sztuk). Nowe sztuki dopakowywane są do ostatniego
+        arkusza, nadmiar trafia na nowe arkusze.
+        
+        Brak poprzedniego wyniku, silnik NFP lub resztki => pełny run_nesting.
+        
+        Args:
+            callback: Jak w run_nesting
+            reoptimize: Po aktualizacji uruchom pełny nesting w tle (reoptimize_async)
+            on_reoptimized: Wywoływany z wątku tła, gdy pełny nesting dał lepszy wynik
+        """
+        self._stop_reoptimizer()
+        
+        prev = self.result
+        names = [t.name for t in self.part_types]
+        if (prev is None or not self._last_run or self._last_run.get('engine') == ENGINE_NFP
+                or self._last_run.get('remnants') or len(set(names)) != len(names)):
+            return self.run_nesting(callback=callback, **self._last_run)
+        
+        if not HAS_RECTPACK:
+            logger.error("rectpack not installed")
+            return NestingResult()
+        
+        self.stop_flag.clear()
+        self._progress_callback = callback
+        
+        cached = None
+        cache_key = None
+        if self.cache is not None:
+            from .result_cache import nesting_cache_key
+            cache_key = nesting_cache_key(
+                self, self._last_run['engine'], self._last_run['deep_analysis'],
+                self._last_run['optimize_job'], self._last_run['time_budget_s'], incremental=True)
+            cached = self.cache.get(cache_key)
+        
+        if cached is not None:
+            result = cached
+            if callback:
+                callback(result.placed_parts, result.total_efficiency)
+        else:
+            result = self._update_result(prev, callback)
+            # Jak w run_nesting - przerwany wynik nie trafia do cache
+            if cache_key is not None and not self.stop_flag.is_set():
+                self.cache.put(cache_key, result)
         
         self.result = result
+        if reoptimize and not self.stop_flag.is_set():
+            self.reoptimize_async(on_reoptimized)
         return result
     
-    def _run_fast_multisheet(self, parts: List[dict], callback: Optional[Callable]) -> NestingResult:
+    def _update_result(self, prev: NestingResult, callback: Optional[Callable]) -> NestingResult:
+        """Wynik po zmianie ilości na bazie `prev` (patrz run_incremental)"""
+        start_time = time.time()
+        types = {t.name: t for t in self.part_types}
+        sheets = [list(s.placed_parts) for s in prev.sheets]
+        
+        # Usuń nadmiarowe sztuki - od ostatniego arkusza
+        placed_count = Counter(p.source_part_name or p.name for parts in sheets for p in parts)
+        affected = set()
+        for si in reversed(range(len(sheets))):
+            kept = []
+            for p in reversed(sheets[si]):
+                name = p.source_part_name or p.name
+                target = types[name].quantity if name in types else 0
+                if placed_count[name] > target:
+                    placed_count[name] -= 1
+                    affected.add(si)
+                else:
+                    kept.append(p)
+            sheets[si] = kept[::-1]
+        
+        sheets = [(si, parts) for si, parts in enumerate(sheets) if parts]
+        
+        # Brakujące sztuki (nowe i dotychczas nieumieszczone)
+        next_index = {}
+        for parts in (p for _, p in sheets):
+            for p in parts:
+                name = p.source_part_name or p.name
+                next_index[name] = max(next_index.get(name, 0), p.part_index + 1)
+        
+        missing = []
+        for t in self.part_types:
+            count = t.quantity - placed_count[t.name]
+            if count > 0:
+                missing.append((t, count, next_index.get(t.name, 0)))
+        
+        if not missing and not affected:
+            return prev
+        
+        new_items, unplaceable = self._build_pack_items_for(missing)
+        
+        # Ostatni arkusz przepakowywany, gdy dochodzą sztuki lub coś z niego usunięto
+        tail = None
+        if sheets and (new_items or sheets[-1][0] in affected):
+            tail = sheets.pop()
+        
+        result = NestingResult()
+        for new_index, (old_index, parts) in enumerate(sheets):
+            sheet = None
+            if old_index in affected:
+                sheet = self._repack_sheet(parts, new_index)
+            if sheet is None:
+                sheet = self._sheet_from_nested(parts, new_index)
+            result.sheets.append(sheet)
+            result.placed_parts.extend(sheet.placed_parts)
+        
+        items = new_items
+        if tail is not None:
+            items = [types[p.source_part_name or p.name].piece(self.spacing, p.part_index)
+                     for p in tail[1]] + new_items
+        items.sort(key=lambda x: x['area'], reverse=True)
+        
+        if items:
+            first_index = len(result.sheets)
+            tail_result = self._run_fast_multisheet(items, None, first_sheet_index=first_index)
+            
+            # Bez nowych sztuk przepakowanie ogona nie może go pogorszyć
+            if tail is not None and not new_items and (
+                    tail_result.sheets_used > 1 or tail_result.unplaced_parts):
+                sheet = self._sheet_from_nested(tail[1], first_index)
+                tail_result = NestingResult(sheets=[sheet], placed_parts=list(sheet.placed_parts))
+            
+            result.sheets.extend(tail_result.sheets)
+            result.placed_parts.extend(tail_result.placed_parts)
+            result.unplaced_parts.extend(tail_result.unplaced_parts)
+        
+        result.unplaced_parts = unplaceable + result.unplaced_parts
+        result.sheets_used = len(result.sheets)
+        if result.sheets:
+            total_parts_area = sum(s.total_parts_area for s in result.sheets)
+            total_used_area = sum(s.used_sheet_area for s in result.sheets)
+            result.total_efficiency = total_parts_area / total_used_area if total_used_area > 0 else 0
+        self._finish_result(result)
+        
+        if callback:
+            callback(result.placed_parts, result.total_efficiency)
+        
+        logger.debug(f"→ Incremental nesting in {time.time() - start_time:.2f}s | "
+                     f"repacked {len(affected)} sheet(s), {len(new_items)} new item(s)")
+        return result
+    
+    def _build_pack_items_for(self, missing: List[Tuple[PartType, int, int]]
+                              ) -> Tuple[List[dict], List[UnplacedPart]]:
+        """Elementy pakowania dla (typ, liczba sztuk, pierwszy indeks sztuki)"""
+        saved = self.part_types
+        items, unplaceable = [], []
+        try:
+            for t, count, first_index in missing:
+                partial = copy.copy(t)
+                partial.quantity = count
+                self.part_types = [partial]
+                t_items, t_unplaceable = self._build_pack_items()
+                for item in t_items:
+                    item['part_index'] += first_index
+                for u in t_unplaceable:
+                    u.part_index += first_index
+                items.extend(t_items)
+                unplaceable.extend(t_unplaceable)
+        finally:
+            self.part_types = saved
+        return items, unplaceable
+    
+    def _repack_sheet(self, parts: List[NestedPart], sheet_index: int) -> Optional[SheetResult]:
+        """Przepakuj sztuki jednego arkusza; None gdy nie mieszczą się wszystkie"""
+        types = {t.name: t for t in self.part_types}
+        items = [types[p.source_part_name or p.name].piece(self.spacing, p.part_index) for p in parts]
+        items.sort(key=lambda x: x['area'], reverse=True)
+        
+        sheet, placed_indices = self._pack_single_sheet(items, sheet_index)
+        if len(placed_indices) != len(items):
+            return None
+        return sheet
+    
+    def _sheet_from_nested(self, parts: List[NestedPart], sheet_index: int) -> SheetResult:
+        """SheetResult z istniejących pozycji detali (bez przepakowania)"""
+        placed = [replace(p, sheet_index=sheet_index) for p in parts]
+        max_x = max((p.x + p.width + self.spacing for p in placed), default=0)
+        max_y = max((p.y + p.height + self.spacing for p in placed), default=0)
+        max_x = min(max_x, self.sheet_width)
+        max_y = min(max_y, self.sheet_height)
+        total_area = sum((p.width + self.spacing) * (p.height + self.spacing) for p in placed)
+        
+        return SheetResult(
+            sheet_index=sheet_index,
+            placed_parts=placed,
+            sheet_width=self.sheet_width,
+            sheet_height=self.sheet_height,
+            used_width=max_x,
+            used_height=max_y,
+            total_parts_area=sum(p.contour_area for p in placed),
+            used_sheet_area=self.sheet_width * max_y if max_y > 0 else 0,
+            efficiency=total_area / (max_x * max_y) if max_x > 0 and max_y > 0 else 0
+        )
+    
+    def reoptimize_async(self, on_done: Optional[Callable[[NestingResult], None]] = None
+                         ) -> threading.Thread:
+        """
+        Pełny nesting bieżących detali w wątku tła (na kopii nestera).
+        
+        Wynik przyjmowany (self.result + on_done) tylko gdy lista detali nie
+        zmieniła się w międzyczasie i jest lepszy od bieżącego.
+        """
+        self._stop_reoptimizer()
+        
+        revision = self._revision
+        # Bez cache - ma powstać nowy układ, nie wpis równy bieżącemu wynikowi
+        clone = FastNester(self.sheet_width, self.sheet_height, self.spacing,
+                           max_sheets=self.max_sheets, seed=self.seed,
+                           workers=self.workers)
+        clone.part_types = [copy.copy(t) for t in self.part_types]
+        self._reoptimizer = clone
+        run_kwargs = dict(self._last_run)
+        
+        def run():
+            result = clone.run_nesting(**run_kwargs)
+            if clone.stop_flag.is_set() or revision != self._revision:
+                return
+            if self.result is None or self._result_rank(result) < self._result_rank(self.result):
+                self.result = result
+                if on_done:
+                    on_done(result)
+        
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+    
+    @staticmethod
+    def _result_rank(result: NestingResult) -> tuple:
+        """Mniej = lepiej: nieumieszczone, arkusze, zajęta wysokość ostatniego arkusza"""
+        tail = min((s.used_height for s in result.sheets), default=0.0)
+        return (result.unplaced_count, result.sheets_used, round(tail, 3))
+    
+    def _stop_reoptimizer(self) -> None:
+        if self._reoptimizer is not None:
+            self._reoptimizer.stop()
+            self._reoptimizer = None
+    
+    def _build_pack_items(self, use_blocks: bool = True) -> Tuple[List[dict], List[UnplacedPart]]:
+        """
+        Zamień typy detali na elementy pakowania.
+        
+        Typy z dużą ilością (>= GRID_MIN_QUANTITY) grupowane są w bloki-siatki
+        (duże bloki, potem pasy jednego rzędu), więc liczba prostokątów
+        rośnie z liczbą typów, a nie sztuk.
+        
+        Returns:
+            (elementy mieszczące się na arkuszu, sztuki za duże na arkusz)
+        """
+        max_part_width = self.sheet_width - self.spacing
+        max_part_height = self.sheet_height - self.spacing
+        
+        items = []
+        unplaceable = []
+        
+        for t in self.part_types:
+            # Sprawdź czy mieści się (także po obrocie)
+            fits_normal = t.width <= max_part_width and t.height <= max_part_height
+            fits_rotated = t.height <= max_part_width and t.width <= max_part_height
+            
+            if not (fits_normal or fits_rotated):
+                reason = (f"Za duży ({t.width:.0f}x{t.height:.0f}mm > "
+                          f"arkusz {max_part_width:.0f}x{max_part_height:.0f}mm)")
+                for i in range(t.quantity):
+                    unplaceable.append(UnplacedPart(
+                        name=t.name,
+                        width=t.width,
+                        height=t.height,
+                        contour_area=t.contour_area,
+                        reason=reason,
+                        source_part_name=t.name,
+                        part_index=i
+                    ))
+                continue
+            
+            next_index = 0
+            if use_blocks and t.quantity >= GRID_MIN_QUANTITY:
+                next_index = self._add_grid_blocks(t, items)
+            
+            for i in range(next_index, t.quantity):
+                items.append(t.piece(self.spacing, i))
+        
+        return items, unplaceable
+    
+    def _add_grid_blocks(self, part_type: PartType, items: List[dict]) -> int:
+        """
+        Dodaj bloki-siatki dla typu detalu.
+        
+        Orientacja sztuk wybierana tak, by rząd najlepiej wypełniał szerokość
+        arkusza. Zwraca indeks pierwszej sztuki, która nie trafiła do bloku.
+        """
+        best = None
+        for rotated in (False, True):
+            piece_w = (part_type.height if rotated else part_type.width) + self.spacing
+            piece_h = (part_type.width if rotated else part_type.height) + self.spacing
+            cols = int(self.sheet_width // piece_w)
+            rows = int(self.sheet_height // piece_h)
+            if cols < 1 or rows < 1:
+                continue
+            waste = self.sheet_width - cols * piece_w
+            if best is None or waste < best[0]:
+                best = (waste, rotated, cols, rows, piece_h)
+        
+        if best is None:
+            return 0
+        
+        _, rotated, cols, rows, piece_h = best
+        big_rows = max(1, min(rows, int(self.sheet_height * GRID_BLOCK_HEIGHT_RATIO // piece_h)))
+        
+        next_index = 0
+        for ny in sorted({big_rows, 1}, reverse=True):
+            per_block = cols * ny
+            if per_block < 2:
+                continue
+            while part_type.quantity - next_index >= per_block:
+                items.append(part_type.block(self.spacing, next_index, cols, ny, rotated))
+                next_index += per_block
+        
+        return next_index
+    
+    def _unplaced_from_item(self, item: dict, reason: str) -> List[UnplacedPart]:
+        """UnplacedPart dla sztuki lub wszystkich sztuk bloku"""
+        nx, ny = item.get('block', (1, 1))
+        count = nx * ny
+        if 'block' in item:
+            p_w = item['width'] / nx - self.spacing
+            p_h = item['height'] / ny - self.spacing
+            if item['piece_rotated']:
+                p_w, p_h = p_h, p_w
+            area = item['piece_contour_area']
+        else:
+            p_w = item['width'] - self.spacing
+            p_h = item['height'] - self.spacing
+            area = item.get('contour_area', 0)
+        
+        first = item.get('part_index', 0)
+        return [UnplacedPart(
+            name=item['name'],
+            width=p_w,
+            height=p_h,
+            contour_area=area,
+            reason=reason,
+            source_part_name=item.get('source_name', item['name']),
+            part_index=first + k
+        ) for k in range(count)]
+    
+    def _pack_remnants(self, parts: List[dict], remnants: List['Remnant']
+                       ) -> Tuple[List[SheetResult], List[dict]]:
+        """
+        Pakuj elementy na resztki (od najmniejszej - duże resztki zostają
+        na większe detale).
+        
+        Returns:
+            (arkusze-resztki, elementy nieumieszczone na resztkach)
+        """
+        sheets = []
+        remaining = list(parts)
+        
+        for remnant in sorted(remnants, key=lambda r: (r.area, r.id or 0)):
+            if not remaining or self.stop_flag.is_set():
+                break
+            
+            # Resztka jest zużywana w całości - liczy się pole umieszczonych detali
+            dims = [(p['width'], p['height']) for p in remaining]
+            best_area, best_placements = 0.0, []
+            for pack_idx in range(len(PACKING_ALGORITHMS)):
+                placements, _ = _pack_rects(dims, remnant.width, remnant.height, pack_idx, 0)
+                area = sum(dims[rid][0] * dims[rid][1] for rid, *_ in placements)
+                if area > best_area:
+                    best_area, best_placements = area, placements
+            
+            if not best_placements:
+                continue
+            
+            sheet, placed_indices, _ = self._build_sheet_from_placements(
+                remaining, best_placements, len(sheets))
+            sheet.sheet_width = remnant.width
+            sheet.sheet_height = remnant.height
+            sheet.used_sheet_area = remnant.width * sheet.used_height
+            sheet.remnant_id = remnant.id
+            sheets.append(sheet)
+            
+            self._drop_placed(remaining, placed_indices)
+        
+        if sheets:
+            logger.info(f"→ Remnants: {len(sheets)} used, "
+                        f"{sum(len(s.placed_parts) for s in sheets)} parts placed")
+        return sheets, remaining
+    
+    @staticmethod
+    def _drop_placed(remaining: List[dict], placed_indices: Set[int]) -> None:
+        """
+        Usuń umieszczone elementy z listy w miejscu - jedno przejście
+        z przesuwaniem kolejnych elementów, bez budowania nowej listy.
+        Kolejność pozostałych elementów bez zmian (packery indeksują po pozycji).
+        """
+        write = 0
+        for read, item in enumerate(remaining):
+            if read not in placed_indices:
+                remaining[write] = item
+                write += 1
+        del remaining[write:]
+    
+    @staticmethod
+    def _prepend_remnant_sheets(result: NestingResult, remnant_sheets: List[SheetResult]) -> None:
+        """Arkusze-resztki przed pełnymi arkuszami - numeracja od nowa"""
+        result.sheets = remnant_sheets + result.sheets
+        result.placed_parts = [p for s in remnant_sheets for p in s.placed_parts] + result.placed_parts
+        for index, sheet in enumerate(result.sheets):
+            sheet.sheet_index = index
+            for part in sheet.placed_parts:
+                part.sheet_index = index
+        
+        result.sheets_used = len(result.sheets)
+        result.remnants_used = len(remnant_sheets)
+        total_parts_area = sum(s.total_parts_area for s in result.sheets)
+        total_used_area = sum(s.used_sheet_area for s in result.sheets)
+        result.total_efficiency = total_parts_area / total_used_area if total_used_area > 0 else 0
+    
+    def _run_fast_multisheet(self, parts: List[dict], callback: Optional[Callable],
+                             first_sheet_index: int = 0) -> NestingResult:
         """Szybki tryb z wieloma arkuszami"""
         logger.debug(f"→ Nesting FAST MULTI-SHEET: {len(parts)} parts...")
         start_time = time.time()
         
         result = NestingResult()
         remaining_parts = parts.copy()
-        sheet_index = 0
+        sheet_index = first_sheet_index
         
         while remaining_parts and sheet_index < self.max_sheets:
             if self.stop_flag.is_set():
@@ -489,7 +1354,7 @@ class FastNester:
             result.placed_parts.extend(sheet_result.placed_parts)
             
             # Usuń umieszczone detale
-            remaining_parts = [p for i, p in enumerate(remaining_parts) if i not in placed_indices]
+            self._drop_placed(remaining_parts, placed_indices)
             
             sheet_index += 1
             
@@ -502,15 +1367,7 @@ class FastNester:
         
         # Dodaj pozostałe jako nieumieszczone
         for p in remaining_parts:
-            result.unplaced_parts.append(UnplacedPart(
-                name=p['name'],
-                width=p['width'] - self.spacing,
-                height=p['height'] - self.spacing,
-                contour_area=p.get('contour_area', 0),
-                reason="Brak miejsca na arkuszach",
-                source_part_name=p.get('source_name', p['name']),
-                part_index=p.get('part_index', 0)
-            ))
+            result.unplaced_parts.extend(self._unplaced_from_item(p, "Brak miejsca na arkuszach"))
         
         result.sheets_used = len(result.sheets)
         result.unplaced_count = len(result.unplaced_parts)
@@ -550,7 +1407,7 @@ class FastNester:
             result.sheets.append(sheet_result)
             result.placed_parts.extend(sheet_result.placed_parts)
             
-            remaining_parts = [p for i, p in enumerate(remaining_parts) if i not in placed_indices]
+            self._drop_placed(remaining_parts, placed_indices)
             
             sheet_index += 1
             
@@ -561,15 +1418,7 @@ class FastNester:
                 callback(result.placed_parts, efficiency)
         
         for p in remaining_parts:
-            result.unplaced_parts.append(UnplacedPart(
-                name=p['name'],
-                width=p['width'] - self.spacing,
-                height=p['height'] - self.spacing,
-                contour_area=p.get('contour_area', 0),
-                reason="Brak miejsca na arkuszach",
-                source_part_name=p.get('source_name', p['name']),
-                part_index=p.get('part_index', 0)
-            ))
+            result.unplaced_parts.extend(self._unplaced_from_item(p, "Brak miejsca na arkuszach"))
         
         result.sheets_used = len(result.sheets)
         result.unplaced_count = len(result.unplaced_parts)
@@ -584,6 +1433,62 @@ class FastNester:
         
         return result
     
+    def _run_nfp_multisheet(self, parts: List[dict], callback: Optional[Callable],
+                            deep_analysis: bool = False) -> NestingResult:
+        """Nesting prawdziwych kształtów (NFP) z wieloma arkuszami"""
+        from .nfp_nester import NFPPlacer
+        
+        logger.info(f"→ Nesting NFP MULTI-SHEET: {len(parts)} parts (deep={deep_analysis})...")
+        start_time = time.time()
+        
+        placer = NFPPlacer(self.sheet_width, self.sheet_height, self.spacing,
+                           stop_flag=self.stop_flag)
+        
+        result = NestingResult()
+        remaining_parts = parts.copy()
+        sheet_index = 0
+        
+        while remaining_parts and sheet_index < self.max_sheets:
+            if self.stop_flag.is_set():
+                break
+            
+            if deep_analysis:
+                sheet_result, placed_indices = placer.pack_sheet_deep(remaining_parts, sheet_index)
+            else:
+                sheet_result, placed_indices = placer.pack_sheet(remaining_parts, sheet_index)
+            
+            if not sheet_result.placed_parts:
+                break
+            
+            result.sheets.append(sheet_result)
+            result.placed_parts.extend(sheet_result.placed_parts)
+            
+            self._drop_placed(remaining_parts, placed_indices)
+            
+            sheet_index += 1
+            
+            if callback:
+                total_placed = len(result.placed_parts)
+                total_parts = len(parts)
+                efficiency = total_placed / total_parts if total_parts > 0 else 0
+                callback(result.placed_parts, efficiency)
+        
+        for p in remaining_parts:
+            result.unplaced_parts.extend(self._unplaced_from_item(p, "Brak miejsca na arkuszach"))
+        
+        result.sheets_used = len(result.sheets)
+        result.unplaced_count = len(result.unplaced_parts)
+        
+        if result.sheets:
+            total_parts_area = sum(s.total_parts_area for s in result.sheets)
+            total_used_area = sum(s.used_sheet_area for s in result.sheets)
+            result.total_efficiency = total_parts_area / total_used_area if total_used_area > 0 else 0
+        
+        elapsed = time.time() - start_time
+        logger.info(f"→ NFP nesting: {result.sheets_used} sheets in {elapsed:.1f}s")
+        
+        return result
+    
     def _pack_single_sheet(self, parts: List[dict], sheet_index: int) -> Tuple[SheetResult, set]:
         """Pakuj detale na jeden arkusz (tryb szybki)"""
         best_result = None
@@ -594,16 +1499,15 @@ class FastNester:
             if self.stop_flag.is_set():
                 break
             
-            current_parts = parts.copy()
+            order = list(range(len(parts)))
             if attempt > 0:
-                fixed_count = max(1, len(current_parts) // 3)
-                fixed = current_parts[:fixed_count]
-                rest = current_parts[fixed_count:]
-                random.shuffle(rest)
-                current_parts = fixed + rest
+                fixed_count = max(1, len(order) // 3)
+                rest = order[fixed_count:]
+                self._rng.shuffle(rest)
+                order = order[:fixed_count] + rest
             
             sheet, placed_indices, efficiency = self._try_packing_sheet(
-                current_parts, sheet_index,
+                [parts[i] for i in order], sheet_index,
                 rectpack.MaxRectsBssf,
                 rectpack.SORT_AREA
             )
@@ -611,74 +1515,115 @@ class FastNester:
             if efficiency > best_efficiency:
                 best_efficiency = efficiency
                 best_result = sheet
-                best_placed_indices = placed_indices
+                # Indeksy w kolejności próby -> indeksy w `parts`
+                best_placed_indices = {order[i] for i in placed_indices}
         
         return best_result or SheetResult(sheet_index=sheet_index), best_placed_indices
     
     def _pack_single_sheet_deep(self, parts: List[dict], sheet_index: int) -> Tuple[SheetResult, set]:
         """Pakuj detale na jeden arkusz (tryb głęboki)"""
-        best_result = None
-        best_placed_indices = set()
-        best_efficiency = 0.0
-        best_algo = None
-        best_sort = None
+        combos = [(a, b) for a in range(len(PACKING_ALGORITHMS)) for b in range(len(SORT_ALGORITHMS))]
+        dims = [(p['width'], p['height']) for p in parts]
         
         # Faza 1: Wszystkie kombinacje
-        for pack_algo in PACKING_ALGORITHMS:
-            if self.stop_flag.is_set():
-                break
-            for sort_algo in SORT_ALGORITHMS:
+        phase1 = [(dims, pack_idx, sort_idx) for pack_idx, sort_idx in combos]
+        best = self._run_trials(phase1)
+        
+        # Faza 2: Tasowanie z najlepszym (permutacje losowane z góry - deterministycznie)
+        best_order = None
+        if best and not self.stop_flag.is_set():
+            trial_idx = best[0]
+            pack_idx, sort_idx = combos[trial_idx]
+            orders = []
+            for _ in range(self.DEEP_SHUFFLES):
+                order = list(range(len(parts)))
+                self._rng.shuffle(order)
+                orders.append(order)
+            phase2 = [([dims[i] for i in order], pack_idx, sort_idx) for order in orders]
+            best2 = self._run_trials(phase2)
+            if best2 and best2[2] > best[2]:
+                best = best2
+                best_order = orders[best2[0]]
+        
+        if not best:
+            return SheetResult(sheet_index=sheet_index), set()
+        
+        _, placements, _ = best
+        if best_order is not None:
+            placements = [(best_order[rid], x, y, w, h) for rid, x, y, w, h in placements]
+        
+        sheet, placed_indices, _ = self._build_sheet_from_placements(parts, placements, sheet_index)
+        return sheet, placed_indices
+    
+    def _run_trials(self, trials: List[tuple]) -> Optional[tuple]:
+        """
+        Wykonaj próby (dims, pack_algo_index, sort_algo_index) i zwróć najlepszą.
+        
+        Redukcja jak w pętli sekwencyjnej: wygrywa najwyższa efektywność,
+        przy remisie - próba o niższym indeksie (niezależnie od kolejności
+        ukończenia w procesach).
+        
+        Returns:
+            (trial_index, placements, efficiency) lub None
+        """
+        results = []
+        
+        if self._executor is not None:
+            futures = [
+                self._executor.submit(_pack_trial_worker,
+                                      (i, dims, self.sheet_width, self.sheet_height, pack_idx, sort_idx))
+                for i, (dims, pack_idx, sort_idx) in enumerate(trials)
+            ]
+            for future in futures:
                 if self.stop_flag.is_set():
+                    for f in futures:
+                        f.cancel()
                     break
-                
-                sheet, placed_indices, efficiency = self._try_packing_sheet(
-                    parts, sheet_index, pack_algo, sort_algo
-                )
-                
-                if efficiency > best_efficiency:
-                    best_efficiency = efficiency
-                    best_result = sheet
-                    best_placed_indices = placed_indices
-                    best_algo = pack_algo
-                    best_sort = sort_algo
-        
-        # Faza 2: Tasowanie z najlepszym
-        if best_algo and not self.stop_flag.is_set():
-            for i in range(30):
+                outcome = future.result()
+                if outcome is not None:
+                    results.append(outcome)
+        else:
+            for i, (dims, pack_idx, sort_idx) in enumerate(trials):
                 if self.stop_flag.is_set():
                     break
-                
-                shuffled = parts.copy()
-                random.shuffle(shuffled)
-                
-                sheet, placed_indices, efficiency = self._try_packing_sheet(
-                    shuffled, sheet_index, best_algo, best_sort
-                )
-                
-                if efficiency > best_efficiency:
-                    best_efficiency = efficiency
-                    best_result = sheet
-                    best_placed_indices = placed_indices
-        
-        return best_result or SheetResult(sheet_index=sheet_index), best_placed_indices
+                placements, efficiency = _pack_rects(dims, self.sheet_width, self.sheet_height,
+                                                     pack_idx, sort_idx)
+                results.append((i, placements, efficiency))
+        
+        best = None
+        for outcome in sorted(results, key=lambda r: r[0]):
+            if outcome[2] > 0 and (best is None or outcome[2] > best[2]):
+                best = outcome
+        return best
+    
+    def _start_pool(self) -> None:
+        """Uruchom pulę procesów dla równoległej głębokiej analizy"""
+        self._mp_stop_event = multiprocessing.Event()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_pack_worker,
+            initargs=(self._mp_stop_event,)
+        )
+        logger.info(f"→ Parallel deep analysis: {self.workers} workers")
+    
+    def _shutdown_pool(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        self._mp_stop_event = None
     
     def _try_packing_sheet(self, parts: List[dict], sheet_index: int,
                             pack_algo, sort_algo) -> Tuple[SheetResult, set, float]:
         """Wykonaj jedną próbę pakowania na arkusz"""
-        packer = rectpack.newPacker(
-            mode=rectpack.PackingMode.Offline,
-            pack_algo=pack_algo,
-            rotation=True,
-            sort_algo=sort_algo
-        )
-        
-        packer.add_bin(self.sheet_width, self.sheet_height)
-        
-        for i, p in enumerate(parts):
-            packer.add_rect(p['width'], p['height'], rid=i)
-        
-        packer.pack()
-        
+        dims = [(p['width'], p['height']) for p in parts]
+        placements, _ = _pack_rects(dims, self.sheet_width, self.sheet_height,
+                                    PACKING_ALGORITHMS.index(pack_algo),
+                                    SORT_ALGORITHMS.index(sort_algo))
+        return self._build_sheet_from_placements(parts, placements, sheet_index)
+    
+    def _build_sheet_from_placements(self, parts: List[dict], placements: List[tuple],
+                                     sheet_index: int) -> Tuple[SheetResult, set, float]:
+        """Zbuduj SheetResult z wyniku _pack_rects [(rid, x, y, w, h)]"""
         placed = []
         placed_indices = set()
         total_area = 0
@@ -686,17 +1631,20 @@ class FastNester:
         max_x = 0
         max_y = 0
         
-        for abin in packer:
-            for rect in abin:
-                orig = parts[rect.rid]
-                placed_indices.add(rect.rid)
-                
-                rotated = abs(rect.width - orig['width']) > 0.1
-                
-                orig_w = orig['width'] - self.spacing
-                orig_h = orig['height'] - self.spacing
-                
-                if rotated:
+        for rid, rect_x, rect_y, rect_w, rect_h in placements:
+            orig = parts[rid]
+            placed_indices.add(rid)
+            
+            rotated = abs(rect_w - orig['width']) > 0.1
+            
+            if 'block' in orig:
+                pieces = self._expand_block(orig, rect_x, rect_y, rotated)
+            else:
+                pieces = [(orig['width'] - self.spacing, orig['height'] - self.spacing,
+                           rect_x, rect_y, rotated, orig.get('part_index', 0))]
+            
+            for orig_w, orig_h, x, y, piece_rotated, part_index in pieces:
+                if piece_rotated:
                     placed_width = orig_h
                     placed_height = orig_w
                     rotation = 90.0
@@ -705,10 +1653,11 @@ class FastNester:
                     placed_height = orig_h
                     rotation = 0.0
                 
+                contour_area = orig.get('piece_contour_area', orig.get('contour_area', orig_w * orig_h))
                 nested = NestedPart(
                     name=orig['name'],
-                    x=rect.x,
-                    y=rect.y,
+                    x=x,
+                    y=y,
                     width=placed_width,
                     height=placed_height,
                     rotation=rotation,
@@ -716,18 +1665,18 @@ class FastNester:
                     holes=orig['holes'],
                     orig_width=orig_w,
                     orig_height=orig_h,
-                    contour_area=orig.get('contour_area', orig_w * orig_h),
-                    weight_kg=orig.get('weight_kg', 0.0),
+                    contour_area=contour_area,
+                    weight_kg=orig.get('piece_weight_kg', orig.get('weight_kg', 0.0)),
                     source_part_name=orig.get('source_name', orig['name']),
-                    part_index=orig.get('part_index', 0),
+                    part_index=part_index,
                     sheet_index=sheet_index
                 )
                 placed.append(nested)
-                
-                total_area += orig['area']
-                total_contour_area += orig.get('contour_area', orig_w * orig_h)
-                max_x = max(max_x, rect.x + rect.width)
-                max_y = max(max_y, rect.y + rect.height)
+                total_contour_area += contour_area
+            
+            total_area += orig['area']
+            max_x = max(max_x, rect_x + rect_w)
+            max_y = max(max_y, rect_y + rect_h)
         
         efficiency = total_area / (max_x * max_y) if max_x > 0 and max_y > 0 else 0
         
@@ -745,9 +1694,34 @@ class FastNester:
         
         return sheet, placed_indices, efficiency
     
+    def _expand_block(self, block: dict, rect_x: float, rect_y: float,
+                      block_rotated: bool) -> List[tuple]:
+        """
+        Rozwiń blok-siatkę na sztuki.
+        
+        Returns:
+            [(orig_w, orig_h, x, y, rotated, part_index)] - obrót bloku
+            transponuje siatkę i zmienia obrót sztuk
+        """
+        nx, ny = block['block']
+        orig_w = block['piece_width']
+        orig_h = block['piece_height']
+        rotated = block['piece_rotated'] != block_rotated
+        
+        cell_w = (orig_h if rotated else orig_w) + self.spacing
+        cell_h = (orig_w if rotated else orig_h) + self.spacing
+        cols, rows = (ny, nx) if block_rotated else (nx, ny)
+        
+        first = block.get('part_index', 0)
+        return [(orig_w, orig_h, rect_x + c * cell_w, rect_y + r * cell_h, rotated, first + r * cols + c)
+                for r in range(rows) for c in range(cols)]
+    
     def stop(self) -> None:
         """Zatrzymaj nesting"""
         self.stop_flag.set()
+        self._stop_reoptimizer()
+        if self._mp_stop_event is not None:
+            self._mp_stop_event.set()
     
     def export_dxf(self, filepath: str, sheet_index: int = 0) -> bool:
         """Eksportuj wynik do DXF (pojedynczy arkusz)"""
@@ -784,12 +1758,11 @@ class FastNester:
         )
         
         # Detale
-        for part in sheet.placed_parts:
-            contour = part.get_placed_contour()
+        for contour, holes in place_contours(sheet.placed_parts):
             if len(contour) >= 3:
                 msp.add_lwpolyline(contour, close=True, dxfattribs={'color': 3})
             
-            for hole in part.get_placed_holes():
+            for hole in holes:
                 if len(hole) >= 3:
                     msp.add_lwpolyline(hole, close=True, dxfattribs={'color': 1})
         
@@ -818,8 +1791,10 @@ class FastNester:
     
     def clear(self) -> None:
         """Wyczyść listę detali"""
-        self.parts.clear()
+        self._stop_reoptimizer()
+        self.part_types.clear()
         self.result = None
+        self._revision += 1
 
 
 # ============================================================
@@ -0,0 +1,302 @@
+"""
+Job Optimizer - Globalna optymalizacja nestingu całego zlecenia
+===============================================================
+Zamiast wypełniać arkusz 0, potem 1 itd. (FastNester._run_*_multisheet),
+przeszukuje kolejność i obroty WSZYSTKICH detali zlecenia naraz.
+
+Dekoder: rectpack w trybie online (Bin First Fit) - detale w kolejności
+z rozwiązania trafiają do pierwszego arkusza, w którym się mieszczą,
+nowe arkusze otwierane w miarę potrzeby.
+
+Rozwiązanie = (kolejność detali, obroty, algorytm dekodera).
+Start: najlepszy z - kolejność z wyniku zachłannego oraz malejące pole
+dla każdego algorytmu dekodera.
+
+Przeszukiwanie: symulowane wyżarzanie w zadanym budżecie czasu.
+Ruchy: zamiana dwóch detali, odwrócenie fragmentu kolejności, obrót
+detalu, przesunięcie detalu z ostatniego arkusza na wcześniejszą pozycję,
+zmiana algorytmu dekodera.
+
+Kryterium (leksykograficznie):
+1. Liczba nieumieszczonych detali
+2. Liczba arkuszy
+3. Wysokość zajęta na ostatnim arkuszu - im mniejsza, tym większy
+   użyteczny odpad (sheet_width × (sheet_height - used_height))
+4. Suma zajętych wysokości wszystkich arkuszy
+
+Każda poprawa raportowana przez callback(placed_parts, efficiency).
+"""
+
+import math
+import time
+import logging
+from typing import List, Tuple, Optional, Callable, TYPE_CHECKING
+
+from .fast_nester import NestingResult, DEFAULT_JOB_TIME_BUDGET_S
+
+if TYPE_CHECKING:
+    from .fast_nester import FastNester
+
+logger = logging.getLogger(__name__)
+
+try:
+    import rectpack
+    HAS_RECTPACK = True
+
+    # Algorytmy dekodera - wybór algorytmu jest częścią rozwiązania
+    DECODER_ALGORITHMS = [
+        rectpack.MaxRectsBl,
+        rectpack.MaxRectsBssf,
+        rectpack.MaxRectsBaf,
+        rectpack.GuillotineBafSas,
+    ]
+except ImportError:
+    HAS_RECTPACK = False
+    DECODER_ALGORITHMS = []
+
+# Temperatura wyżarzania (w jednostkach "arkuszy")
+START_TEMPERATURE = 0.3
+END_TEMPERATURE = 0.005
+
+Bins = List[List[Tuple[int, float, float, float, float]]]
+
+
+class JobOptimizer:
+    """
+    Optymalizacja kolejności i obrotów detali dla całego zlecenia.
+
+    Korzysta z parametrów arkusza, sygnału stop i generatora losowego
+    FastNestera oraz z jego budowania SheetResult.
+    """
+
+    def __init__(self, nester: 'FastNester', time_budget_s: float = DEFAULT_JOB_TIME_BUDGET_S,
+                 callback: Optional[Callable] = None):
+        self.nester = nester
+        self.time_budget_s = time_budget_s
+        self.callback = callback
+        self.evaluations = 0
+        self._piece_counts: List[int] = []
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def optimize(self, parts: List[dict], baseline: NestingResult) -> NestingResult:
+        """
+        Poszukaj lepszego rozkładu niż `baseline` (wynik zachłanny).
+
+        Returns:
+            Lepszy z: baseline, najlepsze znalezione rozwiązanie
+        """
+        if not HAS_RECTPACK or not parts:
+            return baseline
+
+        start = time.monotonic()
+        deadline = start + self.time_budget_s
+        rng = self.nester._rng
+        n = len(parts)
+
+        # Kryterium liczone w sztukach - blok-siatka to wiele sztuk
+        self._piece_counts = [p['block'][0] * p['block'][1] if 'block' in p else 1 for p in parts]
+        total_pieces = sum(self._piece_counts)
+
+        baseline_score = self._score_result(baseline, total_pieces)
+
+        # Start: najlepsze z rozwiązań heurystycznych
+        start_solutions = [self._initial_solution(parts, baseline)]
+        by_area = sorted(range(n), key=lambda i: parts[i]['area'], reverse=True)
+        for algo_index in range(len(DECODER_ALGORITHMS)):
+            start_solutions.append((by_area, [False] * n, algo_index))
+
+        current = None
+        for order, flips, algo_index in start_solutions:
+            bins = self._decode(parts, order, flips, algo_index)
+            score = self._score_bins(bins, total_pieces)
+            if current is None or score < current[0]:
+                current = (score, order, flips, algo_index, bins)
+
+        current_score, order, flips, algo_index, current_bins = current
+        current_energy = self._energy(current_score)
+
+        best = (current_score, current_bins)
+        best_overall = min(baseline_score, current_score)
+        if current_score < baseline_score:
+            self._report(parts, current_bins)
+
+        while not self.nester.stop_flag.is_set():
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            progress = (now - start) / self.time_budget_s if self.time_budget_s > 0 else 1.0
+            temperature = START_TEMPERATURE * (END_TEMPERATURE / START_TEMPERATURE) ** progress
+
+            new_order, new_flips, new_algo = self._neighbour(order, flips, algo_index, current_bins, rng)
+            new_bins = self._decode(parts, new_order, new_flips, new_algo)
+            new_score = self._score_bins(new_bins, total_pieces)
+            new_energy = self._energy(new_score)
+
+            delta = new_energy - current_energy
+            if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+                order, flips, algo_index = new_order, new_flips, new_algo
+                current_bins, current_score, current_energy = new_bins, new_score, new_energy
+
+                if current_score < best[0]:
+                    best = (current_score, current_bins)
+                    if current_score < best_overall:
+                        best_overall = current_score
+                        self._report(parts, current_bins)
+
+        elapsed = time.monotonic() - start
+        logger.info(f"→ Job optimization: {self.evaluations} evaluations in {elapsed:.1f}s, "
+                    f"baseline {baseline_score[:3]} → best {best[0][:3]}")
+
+        if best[0] < baseline_score:
+            return self._build_result(parts, best[1])
+        return baseline
+
+    # ------------------------------------------------------------------
+    # Rozwiązanie
+    # ------------------------------------------------------------------
+
+    def _initial_solution(self, parts: List[dict],
+                          baseline: NestingResult) -> Tuple[List[int], List[bool], int]:
+        """Kolejność i obroty jak w wyniku zachłannym, pozostałe detale na końcu"""
+        flips = [False] * len(parts)
+        order: List[int] = []
+        seen = set()
+
+        by_key = {}
+        for i, p in enumerate(parts):
+            by_key.setdefault((p.get('source_name', p['name']), p.get('part_index', 0)), []).append(i)
+
+        for placed in baseline.placed_parts:
+            candidates = by_key.get((placed.source_part_name or placed.name, placed.part_index), [])
+            for i in candidates:
+                if i not in seen:
+                    seen.add(i)
+                    order.append(i)
+                    flips[i] = (placed.rotation in (90, 270)) != parts[i].get('piece_rotated', False)
+                    break
+
+        order.extend(i for i in range(len(parts)) if i not in seen)
+        return order, flips, 0
+
+    def _neighbour(self, order: List[int], flips: List[bool], algo_index: int, bins: Bins,
+                   rng) -> Tuple[List[int], List[bool], int]:
+        """Losowy ruch w przestrzeni (kolejność, obroty, algorytm)"""
+        order = list(order)
+        flips = list(flips)
+        n = len(order)
+        move = rng.random()
+
+        if move < 0.05:
+            algo_index = rng.randrange(len(DECODER_ALGORITHMS))
+        elif n < 2:
+            flips[order[0]] = not flips[order[0]]
+        elif move < 0.35:
+            i, j = rng.randrange(n), rng.randrange(n)
+            order[i], order[j] = order[j], order[i]
+        elif move < 0.6 and len(bins) > 1:
+            # Detal z ostatniego (najsłabiej wypełnionego) arkusza - wcześniej w kolejce
+            tail = min(bins, key=self._bin_used_height)
+            rid = tail[rng.randrange(len(tail))][0]
+            order.remove(rid)
+            order.insert(rng.randrange(max(1, n // 2)), rid)
+        elif move < 0.8:
+            i, j = sorted((rng.randrange(n), rng.randrange(n)))
+            order[i:j + 1] = order[i:j + 1][::-1]
+        else:
+            rid = order[rng.randrange(n)]
+            flips[rid] = not flips[rid]
+
+        return order, flips, algo_index
+
+    def _decode(self, parts: List[dict], order: List[int], flips: List[bool],
+                algo_index: int = 0) -> Bins:
+        """Rozmieść detale w kolejności `order` (online, Bin First Fit)"""
+        self.evaluations += 1
+        sheet_w = self.nester.sheet_width
+        sheet_h = self.nester.sheet_height
+
+        packer = rectpack.newPacker(
+            mode=rectpack.PackingMode.Online,
+            bin_algo=rectpack.PackingBin.BFF,
+            pack_algo=DECODER_ALGORITHMS[algo_index],
+            rotation=False
+        )
+        packer.add_bin(sheet_w, sheet_h, count=self.nester.max_sheets)
+
+        for rid in order:
+            w = parts[rid]['width']
+            h = parts[rid]['height']
+            if flips[rid]:
+                w, h = h, w
+            if w > sheet_w or h > sheet_h:
+                w, h = h, w
+            packer.add_rect(w, h, rid=rid)
+
+        return [[(r.rid, r.x, r.y, r.width, r.height) for r in abin] for abin in packer]
+
+    # ------------------------------------------------------------------
+    # Ocena
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bin_used_height(placements) -> float:
+        return max((y + h for _, _, y, _, h in placements), default=0.0)
+
+    def _score_bins(self, bins: Bins, total_parts: int) -> tuple:
+        heights = [self._bin_used_height(b) for b in bins if b]
+        placed = sum(self._piece_counts[rid] for b in bins for rid, *_ in b)
+        return (total_parts - placed, len(heights), min(heights, default=0.0), sum(heights))
+
+    def _score_result(self, result: NestingResult, total_parts: int) -> tuple:
+        heights = [s.used_height for s in result.sheets]
+        return (total_parts - len(result.placed_parts), len(heights),
+                min(heights, default=0.0), sum(heights))
+
+    def _energy(self, score: tuple) -> float:
+        """Skalarna wersja kryterium dla wyżarzania"""
+        unplaced, sheets, tail_h, total_h = score
+        sheet_h = self.nester.sheet_height
+        return (unplaced * 10.0 + sheets + 0.9 * tail_h / sheet_h
+                + 0.09 * total_h / (max(sheets, 1) * sheet_h))
+
+    # ------------------------------------------------------------------
+    # Wynik
+    # ------------------------------------------------------------------
+
+    def _report(self, parts: List[dict], bins: Bins) -> None:
+        if not self.callback:
+            return
+        result = self._build_result(parts, bins)
+        self.callback(result.placed_parts, result.total_efficiency)
+
+    def _build_result(self, parts: List[dict], bins: Bins) -> NestingResult:
+        """Zbuduj NestingResult - arkusze od najpełniejszego, odpad na końcu"""
+        nester = self.nester
+        bins = sorted((b for b in bins if b), key=self._bin_used_height, reverse=True)
+
+        result = NestingResult()
+        placed_indices = set()
+        for sheet_index, placements in enumerate(bins):
+            sheet, indices, _ = nester._build_sheet_from_placements(parts, placements, sheet_index)
+            result.sheets.append(sheet)
+            result.placed_parts.extend(sheet.placed_parts)
+            placed_indices |= indices
+
+        for i, p in enumerate(parts):
+            if i in placed_indices:
+                continue
+            result.unplaced_parts.extend(nester._unplaced_from_item(p, "Brak miejsca na arkuszach"))
+
+        result.sheets_used = len(result.sheets)
+        result.unplaced_count = len(result.unplaced_parts)
+
+        if result.sheets:
+            total_parts_area = sum(s.total_parts_area for s in result.sheets)
+            total_used_area = sum(s.used_sheet_area for s in result.sheets)
+            result.total_efficiency = total_parts_area / total_used_area if total_used_area > 0 else 0
+
+        return result
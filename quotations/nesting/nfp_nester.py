@@ -0,0 +1,389 @@
+"""
+NFP Nester - Nesting prawdziwych kształtów (no-fit polygon)
+===========================================================
+Drugi silnik FastNestera: rozmieszcza detale na podstawie rzeczywistego
+konturu i otworów zamiast bounding boxa (patrz NESTING_ALGORITHMS.md).
+
+Algorytm (bottom-left fill):
+1. Dla każdego typu detalu i obrotu (0/90/180/270) przygotuj kontur
+   w jednostkach całkowitych (SCALE) i wersję powiększoną o odstęp.
+2. NFP(A, B) = obwiednia sumy Minkowskiego A ⊕ (-B) - pozycje punktu
+   odniesienia B, w których B nachodzi na A (pyclipper.MinkowskiSum).
+3. Dla otworów A liczony jest wewnętrzny obszar dopasowania (IFP) -
+   pozycje, w których B mieści się w całości w otworze (detal w otworze).
+4. Obszar dopuszczalny = prostokąt arkusza − ∪(NFP − IFP otworów).
+5. Wybierany jest wierzchołek minimalizujący górną krawędź detalu, potem x.
+
+NFP są cache'owane per (typ A, obrót A, typ B, obrót B), więc koszt
+liczenia sum Minkowskiego rośnie z liczbą typów detali, nie sztuk.
+
+Wynik: te same struktury co rectpack (SheetResult / NestedPart).
+"""
+
+import random
+import threading
+import logging
+from typing import List, Tuple, Optional, Dict
+
+from .fast_nester import NestedPart, SheetResult, SCALE, transform_contour
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyclipper
+    HAS_PYCLIPPER = True
+except ImportError:
+    HAS_PYCLIPPER = False
+    logger.warning("pyclipper not installed. Run: pip install pyclipper")
+
+DEFAULT_ROTATIONS = (0, 90, 180, 270)
+
+# Ile losowych kolejności próbuje tryb głęboki (poza heurystycznymi)
+DEEP_SHUFFLES = 2
+
+IntPath = List[Tuple[int, int]]
+
+
+def _to_int_path(points: List[Tuple[float, float]]) -> IntPath:
+    """Przelicz punkty [mm] na jednostki całkowite pyclippera"""
+    return [(int(round(x * SCALE)), int(round(y * SCALE))) for x, y in points]
+
+
+def _path_bbox(path: IntPath) -> Tuple[int, int, int, int]:
+    xs = [p[0] for p in path]
+    ys = [p[1] for p in path]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _difference(subject: List[IntPath], clip: List[IntPath]) -> List[IntPath]:
+    """subject − clip (wypełnienie nonzero)"""
+    if not subject:
+        return []
+    if not clip:
+        return subject
+    pc = pyclipper.Pyclipper()
+    pc.AddPaths(subject, pyclipper.PT_SUBJECT, True)
+    pc.AddPaths(clip, pyclipper.PT_CLIP, True)
+    return pc.Execute(pyclipper.CT_DIFFERENCE, pyclipper.PFT_NONZERO, pyclipper.PFT_NONZERO)
+
+
+class _ShapeVariant:
+    """Jeden obrót typu detalu w jednostkach całkowitych"""
+    __slots__ = ('rotation', 'width', 'height', 'path', 'holes', 'hole_bboxes',
+                 'inflated', 'neg_inflated', 'inflated_w', 'inflated_h')
+
+    def __init__(self, rotation: int, width: int, height: int, path: IntPath,
+                 holes: List[IntPath], inflated: IntPath):
+        self.rotation = rotation
+        self.width = width
+        self.height = height
+        self.path = path
+        self.holes = holes
+        self.hole_bboxes = [_path_bbox(h) for h in holes]
+        self.inflated = inflated
+        self.neg_inflated = [(-x, -y) for x, y in inflated]
+        bx0, by0, bx1, by1 = _path_bbox(inflated)
+        self.inflated_w = bx1 - bx0
+        self.inflated_h = by1 - by0
+
+
+class NFPPlacer:
+    """
+    Rozmieszczanie detali na arkuszu metodą no-fit polygon.
+
+    Przyjmuje słowniki detali w formacie FastNester.parts
+    ('width'/'height' zawierają już odstęp).
+    """
+
+    def __init__(self, sheet_width: float, sheet_height: float, spacing: float = 5.0,
+                 rotations: Tuple[int, ...] = DEFAULT_ROTATIONS,
+                 stop_flag: Optional[threading.Event] = None):
+        if not HAS_PYCLIPPER:
+            raise ImportError("pyclipper is required for NFP nesting")
+
+        self.sheet_width = sheet_width
+        self.sheet_height = sheet_height
+        self.spacing = spacing
+        self.rotations = tuple(rotations) or (0,)
+        self.stop_flag = stop_flag or threading.Event()
+
+        self._sheet_w_int = int(round(sheet_width * SCALE))
+        self._sheet_h_int = int(round(sheet_height * SCALE))
+        # Odstęp pomniejszony o 1 jednostkę - dokładne dopasowania dają
+        # niezerowe pole obszaru dopuszczalnego (clipper odrzuca linie)
+        self._inflate_delta = max(spacing * SCALE - 1, 0)
+
+        self._shapes: Dict[tuple, Dict[int, _ShapeVariant]] = {}
+        self._nfp_cache: Dict[tuple, Tuple[IntPath, Tuple[int, int, int, int], List[IntPath]]] = {}
+
+    # ------------------------------------------------------------------
+    # Przygotowanie kształtów
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _shape_key(part: dict) -> tuple:
+        """Klucz typu detalu - kopie jednego detalu dzielą listę konturu"""
+        contour = part.get('contour')
+        holes = part.get('holes')
+        return (id(contour) if contour else None, id(holes) if holes else None,
+                round(part['width'], 3), round(part['height'], 3))
+
+    def _get_shape(self, part: dict) -> Tuple[tuple, Dict[int, _ShapeVariant]]:
+        key = self._shape_key(part)
+        variants = self._shapes.get(key)
+        if variants is None:
+            variants = self._build_variants(part)
+            self._shapes[key] = variants
+        return key, variants
+
+    def _build_variants(self, part: dict) -> Dict[int, _ShapeVariant]:
+        w = part['width'] - self.spacing
+        h = part['height'] - self.spacing
+        contour = part.get('contour') or []
+        if len(contour) < 3:
+            contour = [(0, 0), (w, 0), (w, h), (0, h)]
+
+        variants: Dict[int, _ShapeVariant] = {}
+        seen = []
+        for rotation in self.rotations:
+            rot = int(rotation) % 360
+            path = pyclipper.CleanPolygon(_to_int_path(transform_contour(contour, rot, w, h)))
+            if len(path) < 3:
+                continue
+
+            # Symetryczne kształty (np. prostokąt 0° == 180°) - pomiń duplikaty
+            signature = frozenset(map(tuple, path))
+            if signature in seen:
+                continue
+            seen.append(signature)
+
+            holes = []
+            for hole in part.get('holes') or []:
+                if len(hole) >= 3:
+                    hole_path = pyclipper.CleanPolygon(_to_int_path(transform_contour(hole, rot, w, h)))
+                    if len(hole_path) >= 3:
+                        holes.append(hole_path)
+
+            inflated = path
+            if self._inflate_delta > 0:
+                po = pyclipper.PyclipperOffset(miter_limit=2.0)
+                po.AddPath(path, pyclipper.JT_MITER, pyclipper.ET_CLOSEDPOLYGON)
+                offset = po.Execute(self._inflate_delta)
+                if offset:
+                    inflated = max(offset, key=lambda p: abs(pyclipper.Area(p)))
+
+            w_rot, h_rot = (h, w) if rot in (90, 270) else (w, h)
+            variants[rot] = _ShapeVariant(
+                rotation=rot,
+                width=int(round(w_rot * SCALE)),
+                height=int(round(h_rot * SCALE)),
+                path=path,
+                holes=holes,
+                inflated=inflated,
+            )
+        return variants
+
+    # ------------------------------------------------------------------
+    # NFP
+    # ------------------------------------------------------------------
+
+    def _get_nfp(self, key_a: tuple, rot_a: int, key_b: tuple, rot_b: int):
+        """NFP (obwiednia, bbox) oraz IFP otworów A dla detalu B - w układzie A"""
+        cache_key = (key_a, rot_a, key_b, rot_b)
+        cached = self._nfp_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        a = self._shapes[key_a][rot_a]
+        b = self._shapes[key_b][rot_b]
+
+        paths = pyclipper.MinkowskiSum(b.neg_inflated, a.path, True)
+        positive = [p for p in paths if pyclipper.Area(p) > 0]
+        if positive:
+            outer = max(positive, key=pyclipper.Area)
+        else:
+            outer = max(paths, key=lambda p: abs(pyclipper.Area(p)))[::-1]
+
+        hole_ifps = []
+        for hole, (hx0, hy0, hx1, hy1) in zip(a.holes, a.hole_bboxes):
+            if hx1 - hx0 < b.inflated_w or hy1 - hy0 < b.inflated_h:
+                continue
+            for path in pyclipper.MinkowskiSum(b.neg_inflated, hole, True):
+                if pyclipper.Area(path) >= 0:
+                    continue
+                # Ujemne ścieżki to miejsca bez styku z krawędzią otworu -
+                # zostaw tylko te, gdzie B leży wewnątrz otworu
+                px, py = path[0]
+                if any(pyclipper.PointInPolygon((vx + px, vy + py), hole) == 1
+                       for vx, vy in b.inflated):
+                    hole_ifps.append(path[::-1])
+
+        entry = (outer, _path_bbox(outer), hole_ifps)
+        self._nfp_cache[cache_key] = entry
+        return entry
+
+    def _find_position(self, key_b: tuple, variant: _ShapeVariant,
+                       placed: List[Tuple[tuple, int, int, int]]) -> Optional[Tuple[int, int]]:
+        """Najniższa (potem najbardziej lewa) dopuszczalna pozycja dla wariantu B"""
+        w_lim = self._sheet_w_int - variant.width
+        h_lim = self._sheet_h_int - variant.height
+        if w_lim < 0 or h_lim < 0:
+            return None
+        # Detal równy szerokości arkusza - daj obszarowi minimalną grubość
+        w_lim = max(w_lim, 1)
+        h_lim = max(h_lim, 1)
+
+        ifp = [(0, 0), (w_lim, 0), (w_lim, h_lim), (0, h_lim)]
+
+        clip = []
+        holed = []
+        for key_a, rot_a, ax, ay in placed:
+            outer, (bx0, by0, bx1, by1), hole_ifps = self._get_nfp(key_a, rot_a, key_b, variant.rotation)
+            if bx1 + ax <= 0 or by1 + ay <= 0 or bx0 + ax >= w_lim or by0 + ay >= h_lim:
+                continue
+            moved = [(x + ax, y + ay) for x, y in outer]
+            if hole_ifps:
+                holed.append((moved, [[(x + ax, y + ay) for x, y in p] for p in hole_ifps]))
+            else:
+                clip.append(moved)
+
+        free = _difference([ifp], clip)
+        for outer, hole_ifps in holed:
+            if not free:
+                break
+            forbidden = _difference([outer], hole_ifps)
+            free = _difference(free, forbidden)
+
+        if not free:
+            return None
+
+        return min((pt for path in free for pt in path), key=lambda pt: (pt[1], pt[0]))
+
+    # ------------------------------------------------------------------
+    # Pakowanie arkusza
+    # ------------------------------------------------------------------
+
+    def pack_sheet(self, parts: List[dict], sheet_index: int,
+                   order: Optional[List[int]] = None) -> Tuple[SheetResult, set]:
+        """
+        Rozmieść detale na jednym arkuszu.
+
+        Returns:
+            (SheetResult, zbiór indeksów umieszczonych detali w `parts`)
+        """
+        if order is None:
+            order = list(range(len(parts)))
+
+        placed: List[Tuple[tuple, int, int, int]] = []
+        placed_parts: List[NestedPart] = []
+        placed_indices = set()
+        failed_keys = set()
+
+        for idx in order:
+            if self.stop_flag.is_set():
+                break
+
+            p = parts[idx]
+            key, variants = self._get_shape(p)
+            # Obszar dopuszczalny tylko maleje - ten sam typ znów się nie zmieści
+            if key in failed_keys:
+                continue
+
+            best = None
+            for variant in variants.values():
+                pos = self._find_position(key, variant, placed)
+                if pos is None:
+                    continue
+                score = (pos[1] + variant.height, pos[0])
+                if best is None or score < best[0]:
+                    best = (score, variant, pos)
+
+            if best is None:
+                failed_keys.add(key)
+                continue
+
+            _, variant, (ix, iy) = best
+            placed.append((key, variant.rotation, ix, iy))
+            placed_indices.add(idx)
+
+            orig_w = p['width'] - self.spacing
+            orig_h = p['height'] - self.spacing
+            placed_parts.append(NestedPart(
+                name=p['name'],
+                x=ix / SCALE,
+                y=iy / SCALE,
+                width=variant.width / SCALE,
+                height=variant.height / SCALE,
+                rotation=float(variant.rotation),
+                original_contour=p['contour'],
+                holes=p['holes'],
+                orig_width=orig_w,
+                orig_height=orig_h,
+                contour_area=p.get('contour_area', orig_w * orig_h),
+                weight_kg=p.get('weight_kg', 0.0),
+                source_part_name=p.get('source_name', p['name']),
+                part_index=p.get('part_index', 0),
+                sheet_index=sheet_index
+            ))
+
+        return self._build_sheet(placed_parts, sheet_index), placed_indices
+
+    def pack_sheet_deep(self, parts: List[dict], sheet_index: int) -> Tuple[SheetResult, set]:
+        """Kilka kolejności rozmieszczania - wybierz najlepszy arkusz"""
+        n = len(parts)
+        base = list(range(n))
+
+        def dims(i):
+            return parts[i]['width'], parts[i]['height']
+
+        orders = [
+            base,
+            sorted(base, key=lambda i: parts[i].get('contour_area', 0), reverse=True),
+            sorted(base, key=lambda i: max(dims(i)), reverse=True),
+            sorted(base, key=lambda i: min(dims(i)), reverse=True),
+        ]
+        rng = random.Random(sheet_index)
+        fixed = max(1, n // 3)
+        for _ in range(DEEP_SHUFFLES):
+            rest = base[fixed:]
+            rng.shuffle(rest)
+            orders.append(base[:fixed] + rest)
+
+        best_sheet = SheetResult(sheet_index=sheet_index)
+        best_indices = set()
+        best_score = None
+
+        for order in orders:
+            if self.stop_flag.is_set():
+                break
+            sheet, indices = self.pack_sheet(parts, sheet_index, order)
+            score = (sheet.total_parts_area, -sheet.used_height)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_sheet = sheet
+                best_indices = indices
+
+        return best_sheet, best_indices
+
+    def _build_sheet(self, placed_parts: List[NestedPart], sheet_index: int) -> SheetResult:
+        max_x = max((p.x + p.width for p in placed_parts), default=0.0)
+        max_y = max((p.y + p.height for p in placed_parts), default=0.0)
+        if placed_parts:
+            # Jak w rectpack: zajęty obszar obejmuje odstęp za ostatnim detalem
+            max_x = min(max_x + self.spacing, self.sheet_width)
+            max_y = min(max_y + self.spacing, self.sheet_height)
+
+        total_contour_area = sum(p.contour_area for p in placed_parts)
+        efficiency = total_contour_area / (max_x * max_y) if max_x > 0 and max_y > 0 else 0
+
+        return SheetResult(
+            sheet_index=sheet_index,
+            placed_parts=placed_parts,
+            sheet_width=self.sheet_width,
+            sheet_height=self.sheet_height,
+            used_width=max_x,
+            used_height=max_y,
+            total_parts_area=total_contour_area,
+            used_sheet_area=self.sheet_width * max_y if max_y > 0 else 0,
+            efficiency=efficiency
+        )
@@ -0,0 +1,230 @@
+"""
+Packed Nesting Result - znormalizowany zapis wyniku nestingu
+============================================================
+Arkusz z 200 takimi samymi detalami nie powinien zapisywać tego samego
+konturu 200 razy. Format "packed-v1" (słownik JSON) rozdziela:
+
+    shapes      - geometria raz na kształt: encode_geometry(kontur, otwory)
+    types       - typy detali: pola NestedPart poza pozycją + indeks kształtu
+    placements  - [[typ, x, y, obrót, arkusz, part_index], ...] w kolejności arkuszy
+                  (siódmy element tylko gdy sheet_index detalu różni się od arkusza)
+    sheets      - pola SheetResult bez placed_parts
+    placed_parts - None gdy NestingResult.placed_parts to detale z arkuszy,
+                   inaczej indeksy wierszy placements
+    pozostałe pola NestingResult, unplaced_parts, cost_breakdown
+
+Odczyt strumieniowy: iter_sheets() buduje arkusze po kolei, geometria
+dekodowana jest raz na kształt i współdzielona przez wszystkie instancje
+(jak w part_types - get_part_shape/place_contours korzystają z tego bufora).
+
+Użycie:
+    data = pack_nesting_result(result)           # -> json.dumps(data)
+    result = unpack_nesting_result(data)
+    for sheet in iter_sheets(data): ...
+"""
+
+from dataclasses import fields
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.geometry_codec import decode_geometry, encode_geometry, is_encoded
+
+from .fast_nester import (
+    NestingResult, SheetResult, NestedPart, UnplacedPart, PartCostBreakdown
+)
+
+PACKED_FORMAT = 'packed-v1'
+
+# Precyzja pozycji detali [miejsca po przecinku, mm]
+POSITION_PRECISION = 4
+
+_INSTANCE_FIELDS = ('x', 'y', 'rotation', 'sheet_index', 'part_index')
+_GEOMETRY_FIELDS = ('original_contour', 'holes')
+_TYPE_FIELDS = tuple(f.name for f in fields(NestedPart)
+                     if f.name not in _INSTANCE_FIELDS + _GEOMETRY_FIELDS)
+_SHEET_SKIP_FIELDS = ('placed_parts',)
+_RESULT_SKIP_FIELDS = ('sheets', 'placed_parts', 'unplaced_parts', 'cost_breakdown')
+
+
+def _fields_dict(obj, skip=()) -> Dict[str, Any]:
+    return {f.name: getattr(obj, f.name) for f in fields(obj) if f.name not in skip}
+
+
+def is_packed(data: Any) -> bool:
+    """Czy dane są w formacie packed-v1"""
+    return isinstance(data, dict) and data.get('format') == PACKED_FORMAT
+
+
+# ============================================================
+# Zapis
+# ============================================================
+
+def pack_nesting_result(result: NestingResult) -> Dict[str, Any]:
+    """NestingResult -> słownik JSON z geometrią raz na typ detalu"""
+    shapes: List[Any] = []
+    shape_by_id: Dict[Tuple[int, int], int] = {}
+    shape_by_code: Dict[str, int] = {}
+    types: List[Dict[str, Any]] = []
+    type_index: Dict[tuple, int] = {}
+    placements: List[list] = []
+    row_of: Dict[int, int] = {}
+
+    def shape_ref(part: NestedPart) -> int:
+        key = (id(part.original_contour), id(part.holes))
+        ref = shape_by_id.get(key)
+        if ref is None:
+            try:
+                code = encode_geometry(part.original_contour, part.holes)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                code = None
+            if code is not None and code in shape_by_code:
+                ref = shape_by_code[code]
+            else:
+                ref = len(shapes)
+                if code is None:
+                    shapes.append([[list(p) for p in part.original_contour],
+                                   [[list(p) for p in h] for h in part.holes]])
+                else:
+                    shape_by_code[code] = ref
+                    shapes.append(code)
+            shape_by_id[key] = ref
+        return ref
+
+    def type_ref(part: NestedPart) -> int:
+        shape = shape_ref(part)
+        values = tuple(getattr(part, name) for name in _TYPE_FIELDS)
+        key = (shape, values)
+        ref = type_index.get(key)
+        if ref is None:
+            ref = type_index[key] = len(types)
+            entry = dict(zip(_TYPE_FIELDS, values))
+            entry['shape'] = shape
+            types.append(entry)
+        return ref
+
+    def add(part: NestedPart, sheet_pos: int, sheet_index: Optional[int]):
+        row = [type_ref(part), round(part.x, POSITION_PRECISION),
+               round(part.y, POSITION_PRECISION), part.rotation, sheet_pos, part.part_index]
+        if part.sheet_index != sheet_index:
+            row.append(part.sheet_index)
+        row_of[id(part)] = len(placements)
+        placements.append(row)
+
+    sheets = []
+    on_sheets: List[NestedPart] = []
+    for pos, sheet in enumerate(result.sheets):
+        sheets.append(_fields_dict(sheet, _SHEET_SKIP_FIELDS))
+        for part in sheet.placed_parts:
+            add(part, pos, sheet.sheet_index)
+            on_sheets.append(part)
+
+    # placed_parts to zwykle te same obiekty co w arkuszach
+    placed_refs = None
+    if len(result.placed_parts) != len(on_sheets) or any(
+            a is not b for a, b in zip(result.placed_parts, on_sheets)):
+        placed_refs = []
+        for part in result.placed_parts:
+            if id(part) not in row_of:
+                add(part, -1, None)
+            placed_refs.append(row_of[id(part)])
+
+    data = _fields_dict(result, _RESULT_SKIP_FIELDS)
+    data.update({
+        'format': PACKED_FORMAT,
+        'shapes': shapes,
+        'types': types,
+        'placements': placements,
+        'sheets': sheets,
+        'placed_parts': placed_refs,
+        'unplaced_parts': [_fields_dict(u) for u in result.unplaced_parts],
+        'cost_breakdown': [_fields_dict(c) for c in result.cost_breakdown],
+    })
+    return data
+
+
+# ============================================================
+# Odczyt
+# ============================================================
+
+class _PartFactory:
+    """Tworzy NestedPart z wierszy placements; geometria dekodowana raz na kształt"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self._shapes = data['shapes']
+        self._decoded: Dict[int, tuple] = {}
+        self._types = data['types']
+        self._kwargs: Dict[int, Dict[str, Any]] = {}
+
+    def _geometry(self, ref: int) -> tuple:
+        geometry = self._decoded.get(ref)
+        if geometry is None:
+            shape = self._shapes[ref]
+            if is_encoded(shape):
+                contour, holes = decode_geometry(shape)
+            else:
+                contour, holes = shape
+            geometry = ([tuple(p) for p in contour], [[tuple(p) for p in h] for h in holes])
+            self._decoded[ref] = geometry
+        return geometry
+
+    def _type_kwargs(self, ref: int) -> Dict[str, Any]:
+        kwargs = self._kwargs.get(ref)
+        if kwargs is None:
+            entry = dict(self._types[ref])
+            contour, holes = self._geometry(entry.pop('shape'))
+            kwargs = self._kwargs[ref] = dict(entry, original_contour=contour, holes=holes)
+        return kwargs
+
+    def make(self, row: list, sheet_index: int) -> NestedPart:
+        return NestedPart(
+            x=row[1], y=row[2], rotation=row[3], part_index=row[5],
+            sheet_index=row[6] if len(row) > 6 else sheet_index,
+            **self._type_kwargs(row[0])
+        )
+
+
+def _iter_sheets(data: Dict[str, Any], factory: _PartFactory,
+                 parts_by_row: Optional[List[Optional[NestedPart]]] = None) -> Iterator[SheetResult]:
+    placements = data['placements']
+    row = 0
+    for pos, sheet_fields in enumerate(data['sheets']):
+        sheet = SheetResult(**sheet_fields)
+        while row < len(placements) and placements[row][4] == pos:
+            part = factory.make(placements[row], sheet.sheet_index)
+            sheet.placed_parts.append(part)
+            if parts_by_row is not None:
+                parts_by_row[row] = part
+            row += 1
+        yield sheet
+
+
+def iter_sheets(data: Dict[str, Any]) -> Iterator[SheetResult]:
+    """Arkusze z danych packed-v1, budowane po kolei (bez całego wyniku w pamięci)"""
+    return _iter_sheets(data, _PartFactory(data))
+
+
+def unpack_nesting_result(data: Dict[str, Any]) -> NestingResult:
+    """Słownik z pack_nesting_result -> NestingResult"""
+    factory = _PartFactory(data)
+    placements = data['placements']
+    parts_by_row: List[Optional[NestedPart]] = [None] * len(placements)
+    sheets = list(_iter_sheets(data, factory, parts_by_row))
+
+    refs = data.get('placed_parts')
+    if refs is None:
+        placed = [part for sheet in sheets for part in sheet.placed_parts]
+    else:
+        placed = []
+        for ref in refs:
+            if parts_by_row[ref] is None:
+                parts_by_row[ref] = factory.make(placements[ref], 0)
+            placed.append(parts_by_row[ref])
+
+    skip = set(_RESULT_SKIP_FIELDS) | {'format', 'shapes', 'types', 'placements'}
+    scalars = {k: v for k, v in data.items() if k not in skip}
+    return NestingResult(
+        sheets=sheets,
+        placed_parts=placed,
+        unplaced_parts=[UnplacedPart(**u) for u in data.get('unplaced_parts', [])],
+        cost_breakdown=[PartCostBreakdown(**c) for c in data.get('cost_breakdown', [])],
+        **scalars
+    )
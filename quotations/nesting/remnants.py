@@ -0,0 +1,414 @@
+"""
+Remnants - magazyn resztek materiału
+====================================
+Po nestingu FastNester zajmuje dolną część arkusza (used_height); reszta
+arkusza to odpad, który można wykorzystać w kolejnych zleceniach.
+
+extract_remnant wyznacza z arkusza:
+- obrys wolnego obszaru nad "linią horyzontu" detali (wielokąt schodkowy),
+- największy prostokąt w tym obszarze - to on jest pakowany przy
+  ponownym użyciu (FastNester pakuje bounding boxy).
+
+RemnantStore przechowuje resztki w lokalnej bazie SQLite per materiał
+i grubość. FastNester.run_nesting(remnants=...) zużywa je przed pełnymi
+arkuszami; record_nesting oznacza użyte resztki jako zużyte i zapisuje
+nowe odpady z wyniku.
+
+Ponowny nesting tego samego zlecenia (job) zastępuje zapis poprzedniego
+przebiegu: jego odpady są usuwane, a zużyte przez niego resztki wracają
+do magazynu - podgląd uruchomiony kilka razy nie zmienia stanu magazynu.
+
+Użycie:
+    store = get_remnant_store()
+    remnants = store.available("S235", 2.0, job="ZL-12/S235/2.0")
+    result = nester.run_nesting(remnants=remnants)
+    store.record_nesting(result, "S235", 2.0, job="ZL-12/S235/2.0")
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from .fast_nester import NestingResult, SheetResult
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[float, float]
+
+# Minimalne wymiary resztki wartej przechowania [mm]
+MIN_REMNANT_WIDTH_MM = 200.0
+MIN_REMNANT_HEIGHT_MM = 200.0
+
+# Odstęp resztki od wyciętych detali (linia cięcia odpadu) [mm]
+DEFAULT_CUT_MARGIN_MM = 10.0
+
+STATUS_AVAILABLE = 'available'
+STATUS_CONSUMED = 'consumed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS remnants (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    material TEXT NOT NULL,
+    thickness_mm REAL NOT NULL,
+    width_mm REAL NOT NULL,
+    height_mm REAL NOT NULL,
+    outline TEXT,
+    source TEXT,
+    status TEXT NOT NULL DEFAULT 'available',
+    created_at TEXT NOT NULL,
+    consumed_at TEXT,
+    job TEXT,
+    consumed_by TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_remnants_lookup ON remnants (material, thickness_mm, status);
+"""
+
+# Kolumny dodane później - uzupełniane w istniejących bazach
+_ADDED_COLUMNS = {
+    'job': 'TEXT',          # zlecenie, z którego pochodzi resztka
+    'consumed_by': 'TEXT',  # zlecenie, które zużyło resztkę
+}
+
+
+@dataclass
+class Remnant:
+    """
+    Resztka materiału.
+
+    width × height to prostokąt użyteczny (pakowany przez FastNester);
+    outline - pełny obrys odpadu we współrzędnych prostokąta (lewy dolny
+    róg prostokąta = (0, 0)).
+    """
+    material: str
+    thickness_mm: float
+    width: float
+    height: float
+    outline: List[Point] = field(default_factory=list)
+    source: str = ""
+    id: Optional[int] = None
+    status: str = STATUS_AVAILABLE
+    created_at: str = ""
+
+    @property
+    def area(self) -> float:
+        return self.width * self.height
+
+
+def _material_key(material: str) -> str:
+    return (material or "").strip().upper()
+
+
+def _thickness_key(thickness_mm: float) -> float:
+    return round(float(thickness_mm), 2)
+
+
+# ============================================================
+# Wyznaczanie resztki z arkusza
+# ============================================================
+
+def _skyline(sheet: SheetResult, margin: float) -> List[Tuple[float, float, float]]:
+    """Linia horyzontu detali: [(x0, x1, wysokość)] od lewej do prawej"""
+    width = sheet.sheet_width
+    boxes = [(max(p.x - margin, 0.0), min(p.x + p.width + margin, width), p.y + p.height + margin)
+             for p in sheet.placed_parts]
+    xs = sorted({0.0, width} | {b[0] for b in boxes} | {b[1] for b in boxes})
+    xs = [x for x in xs if 0.0 <= x <= width]
+
+    profile = []
+    for x0, x1 in zip(xs, xs[1:]):
+        if x1 - x0 <= 1e-9:
+            continue
+        top = max((b[2] for b in boxes if b[0] < x1 and b[1] > x0), default=0.0)
+        top = min(top, sheet.sheet_height)
+        if profile and abs(profile[-1][2] - top) <= 1e-9:
+            profile[-1] = (profile[-1][0], x1, top)
+        else:
+            profile.append((x0, x1, top))
+    return profile
+
+
+def _largest_rectangle(profile: List[Tuple[float, float, float]], sheet_height: float,
+                       min_width: float, min_height: float) -> Optional[Tuple[float, float, float, float]]:
+    """Największy prostokąt nad linią horyzontu: (x, y, szerokość, wysokość)"""
+    best = None
+    for level in sorted({top for _, _, top in profile}):
+        height = sheet_height - level
+        if height < min_height:
+            continue
+        run_start = None
+        for x0, x1, top in profile + [(None, None, float('inf'))]:
+            if top <= level:
+                if run_start is None:
+                    run_start = x0
+                run_end = x1
+                continue
+            if run_start is not None:
+                width = run_end - run_start
+                if width >= min_width and (best is None or width * height > best[2] * best[3]):
+                    best = (run_start, level, width, height)
+                run_start = None
+    return best
+
+
+def extract_remnant(sheet: SheetResult, material: str, thickness_mm: float,
+                    margin_mm: float = DEFAULT_CUT_MARGIN_MM,
+                    min_width_mm: float = MIN_REMNANT_WIDTH_MM,
+                    min_height_mm: float = MIN_REMNANT_HEIGHT_MM,
+                    source: str = "") -> Optional[Remnant]:
+    """
+    Resztka pozostająca na arkuszu po wycięciu detali.
+
+    Args:
+        sheet: Arkusz z wyniku nestingu (pełny arkusz lub resztka)
+        material, thickness_mm: Materiał arkusza
+        margin_mm: Odstęp linii cięcia odpadu od detali
+        min_width_mm, min_height_mm: Mniejsze resztki są pomijane
+        source: Opis pochodzenia (np. numer zlecenia)
+
+    Returns:
+        Remnant lub None (brak użytecznego prostokąta)
+    """
+    if sheet.sheet_width <= 0 or sheet.sheet_height <= 0:
+        return None
+
+    profile = _skyline(sheet, margin_mm)
+    rect = _largest_rectangle(profile, sheet.sheet_height, min_width_mm, min_height_mm)
+    if rect is None:
+        return None
+    rx, ry, rw, rh = rect
+
+    # Obrys wolnego obszaru (schodki od prawej do lewej), względem prostokąta
+    outline = [(0.0, sheet.sheet_height), (sheet.sheet_width, sheet.sheet_height)]
+    for x0, x1, top in reversed(profile):
+        outline.append((x1, top))
+        outline.append((x0, top))
+    outline = [(round(x - rx, 3), round(y - ry, 3)) for x, y in outline]
+
+    return Remnant(material=_material_key(material), thickness_mm=_thickness_key(thickness_mm),
+                   width=rw, height=rh, outline=_drop_collinear(outline), source=source)
+
+
+def _drop_collinear(points: List[Point]) -> List[Point]:
+    """Usuń powtórzone i współliniowe wierzchołki obrysu schodkowego"""
+    result: List[Point] = []
+    for p in points:
+        if result and p == result[-1]:
+            continue
+        if len(result) >= 2:
+            a, b = result[-2], result[-1]
+            if (a[0] == b[0] == p[0]) or (a[1] == b[1] == p[1]):
+                result[-1] = p
+                continue
+        result.append(p)
+    return result
+
+
+# ============================================================
+# Magazyn (SQLite)
+# ============================================================
+
+class RemnantStore:
+    """
+    Magazyn resztek w lokalnej bazie SQLite.
+
+    Bezpieczny dla wątków (połączenie na operację + blokada);
+    record_nesting wykonywany jest w jednej transakcji.
+    """
+
+    def __init__(self, db_path: Union[str, Path, None] = None):
+        self.db_path = Path(db_path) if db_path else _default_db_path()
+        self._lock = threading.Lock()
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Cannot create remnants dir {self.db_path.parent}: {e}")
+        with self._transaction() as conn:
+            conn.executescript(_SCHEMA)
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(remnants)")}
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE remnants ADD COLUMN {column} {kind}")
+
+    @contextmanager
+    def _transaction(self):
+        """Połączenie na czas operacji - commit przy sukcesie, rollback przy błędzie"""
+        with self._lock:
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Remnant:
+        return Remnant(
+            id=row['id'],
+            material=row['material'],
+            thickness_mm=row['thickness_mm'],
+            width=row['width_mm'],
+            height=row['height_mm'],
+            outline=[tuple(p) for p in json.loads(row['outline'] or '[]')],
+            source=row['source'] or "",
+            status=row['status'],
+            created_at=row['created_at'],
+        )
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, remnant: Remnant, job: Optional[str] = None) -> Remnant:
+        remnant.material = _material_key(remnant.material)
+        remnant.thickness_mm = _thickness_key(remnant.thickness_mm)
+        remnant.created_at = remnant.created_at or datetime.now().isoformat(timespec='seconds')
+        cursor = conn.execute(
+            "INSERT INTO remnants (material, thickness_mm, width_mm, height_mm, outline, source, "
+            "status, created_at, job) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (remnant.material, remnant.thickness_mm, remnant.width, remnant.height,
+             json.dumps(remnant.outline), remnant.source, STATUS_AVAILABLE, remnant.created_at, job))
+        remnant.id = cursor.lastrowid
+        remnant.status = STATUS_AVAILABLE
+        return remnant
+
+    def add(self, remnant: Remnant) -> Remnant:
+        """Zapisz resztkę (uzupełnia id)"""
+        with self._transaction() as conn:
+            return self._insert(conn, remnant)
+
+    def get(self, remnant_id: int) -> Optional[Remnant]:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT * FROM remnants WHERE id = ?", (remnant_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def available(self, material: str, thickness_mm: float,
+                  min_width: float = 0.0, min_height: float = 0.0,
+                  job: Optional[str] = None) -> List[Remnant]:
+        """
+        Dostępne resztki materiału (od najmniejszej).
+
+        min_width/min_height porównywane bez względu na orientację.
+        Dla zlecenia job - stan sprzed jego poprzedniego przebiegu: bez
+        odpadów tego zlecenia, razem z resztkami, które ono zużyło.
+        """
+        query = "SELECT * FROM remnants WHERE material = ? AND thickness_mm = ? AND status = ?"
+        params: list = [_material_key(material), _thickness_key(thickness_mm), STATUS_AVAILABLE]
+        if job is not None:
+            query = ("SELECT * FROM remnants WHERE material = ? AND thickness_mm = ? AND "
+                     "((status = ? AND (job IS NULL OR job != ?)) OR consumed_by = ?)")
+            params += [job, job]
+        with self._transaction() as conn:
+            rows = conn.execute(query + " ORDER BY width_mm * height_mm, id", params).fetchall()
+        remnants = [self._from_row(row) for row in rows]
+        return [r for r in remnants
+                if min(r.width, r.height) >= min(min_width, min_height)
+                and max(r.width, r.height) >= max(min_width, min_height)]
+
+    def consume(self, remnant_ids: List[int]) -> int:
+        """Oznacz resztki jako zużyte; zwraca liczbę zmienionych"""
+        with self._transaction() as conn:
+            return self._consume(conn, remnant_ids)
+
+    @staticmethod
+    def _consume(conn: sqlite3.Connection, remnant_ids: List[int], job: Optional[str] = None) -> int:
+        if not remnant_ids:
+            return 0
+        now = datetime.now().isoformat(timespec='seconds')
+        cursor = conn.executemany(
+            "UPDATE remnants SET status = ?, consumed_at = ?, consumed_by = ? WHERE id = ? AND status = ?",
+            [(STATUS_CONSUMED, now, job, rid, STATUS_AVAILABLE) for rid in remnant_ids])
+        return cursor.rowcount
+
+    @staticmethod
+    def _revert_job(conn: sqlite3.Connection, job: str) -> Tuple[int, int]:
+        """Cofnij poprzedni przebieg zlecenia; zwraca (przywrócone, usunięte)"""
+        restored = conn.execute(
+            "UPDATE remnants SET status = ?, consumed_at = NULL, consumed_by = NULL "
+            "WHERE consumed_by = ?", (STATUS_AVAILABLE, job)).rowcount
+        # Odpady zużyte już przez inne zlecenie zostają w historii
+        removed = conn.execute("DELETE FROM remnants WHERE job = ? AND status = ?",
+                               (job, STATUS_AVAILABLE)).rowcount
+        return restored, removed
+
+    def delete(self, remnant_id: int) -> bool:
+        """Usuń resztkę (np. złomowana)"""
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM remnants WHERE id = ?", (remnant_id,)).rowcount > 0
+
+    def count(self, material: Optional[str] = None, thickness_mm: Optional[float] = None) -> int:
+        """Liczba dostępnych resztek (opcjonalnie dla materiału i grubości)"""
+        query = "SELECT COUNT(*) FROM remnants WHERE status = ?"
+        params: list = [STATUS_AVAILABLE]
+        if material is not None:
+            query += " AND material = ?"
+            params.append(_material_key(material))
+        if thickness_mm is not None:
+            query += " AND thickness_mm = ?"
+            params.append(_thickness_key(thickness_mm))
+        with self._transaction() as conn:
+            return conn.execute(query, params).fetchone()[0]
+
+    def record_nesting(self, result: NestingResult, material: str, thickness_mm: float,
+                       source: str = "", job: Optional[str] = None,
+                       **extract_options) -> List[Remnant]:
+        """
+        Zapisz skutki nestingu: użyte resztki => zużyte, odpady arkuszy => nowe resztki.
+
+        Args:
+            result: Wynik FastNester.run_nesting
+            material, thickness_mm: Materiał nestingu
+            source: Opis pochodzenia nowych resztek
+            job: Identyfikator zlecenia - zapis zastępuje jego poprzedni przebieg
+                 (resztki pobierać przez available(..., job=job))
+            **extract_options: Opcje extract_remnant (margin_mm, min_width_mm, min_height_mm)
+
+        Returns:
+            Nowe resztki (z id)
+        """
+        new = [r for r in (extract_remnant(sheet, material, thickness_mm, source=source,
+                                           **extract_options)
+                           for sheet in result.sheets) if r is not None]
+        used = [s.remnant_id for s in result.sheets if s.remnant_id is not None]
+
+        with self._transaction() as conn:
+            if job is not None:
+                self._revert_job(conn, job)
+            self._consume(conn, used, job)
+            for remnant in new:
+                self._insert(conn, remnant, job)
+
+        logger.info(f"Remnants {_material_key(material)} {thickness_mm}mm: "
+                    f"{len(used)} consumed, {len(new)} stored")
+        return new
+
+
+def _default_db_path() -> Path:
+    try:
+        from config.settings import REMNANTS_DB
+    except ImportError:
+        REMNANTS_DB = Path(os.getenv("REMNANTS_DB", Path.home() / ".newerp" / "remnants.db"))
+    return Path(REMNANTS_DB)
+
+
+_default_store: Optional[RemnantStore] = None
+
+
+def get_remnant_store() -> RemnantStore:
+    """Współdzielony magazyn resztek (config.settings.REMNANTS_DB)"""
+    global _default_store
+    if _default_store is None:
+        _default_store = RemnantStore()
+    return _default_store
+
+
+__all__ = [
+    'Remnant',
+    'RemnantStore',
+    'extract_remnant',
+    'get_remnant_store',
+]
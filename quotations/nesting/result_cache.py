@@ -0,0 +1,323 @@
+"""
+Nesting Result Cache - trwały cache wyników nestingu
+====================================================
+Ta sama lista detali i ten sam arkusz są nestowane wielokrotnie przy
+poprawkach wyceny. Cache adresowany treścią zwraca gotowy układ od razu.
+
+Klucz: SHA-256 z parametrów arkusza (wymiary, odstęp, max_sheets), trybu
+(silnik, głęboka analiza, optymalizacja zlecenia, budżet czasu), seed oraz
+znormalizowanych typów detali (kontury, otwory, ilości).
+
+Zapis: jeden plik `<klucz>.json.gz` na wynik. Kontury zapisywane raz na typ
+detalu, umieszczone detale odwołują się do nich indeksem.
+
+Usuwanie: LRU wg czasu modyfikacji pliku (odczyt odświeża czas),
+najstarsze wpisy ponad max_entries są kasowane po każdym zapisie.
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import fields
+from pathlib import Path
+from typing import Optional, Union, Dict, List, Any, TYPE_CHECKING
+
+from .fast_nester import (
+    NestingResult, SheetResult, NestedPart, UnplacedPart, PartCostBreakdown
+)
+
+if TYPE_CHECKING:
+    from .fast_nester import FastNester
+
+logger = logging.getLogger(__name__)
+
+# Zmiana formatu pliku lub semantyki klucza => nowa wersja
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 200
+
+# Precyzja współrzędnych w kluczu [mm]
+KEY_PRECISION = 3
+
+CACHE_SUFFIX = ".json.gz"
+
+_GEOMETRY_FIELDS = ('original_contour', 'holes')
+_SHEET_SKIP_FIELDS = ('placed_parts',)
+_RESULT_SKIP_FIELDS = ('sheets', 'placed_parts', 'unplaced_parts', 'cost_breakdown')
+
+
+def _round_points(points) -> List[List[float]]:
+    return [[round(x, KEY_PRECISION), round(y, KEY_PRECISION)] for x, y in points]
+
+
+def nesting_cache_key(nester: 'FastNester', engine: str, deep_analysis: bool,
+                      optimize_job: bool, time_budget_s: float, remnants=None,
+                      incremental: bool = False) -> str:
+    """
+    Klucz cache dla bieżących detali, parametrów nestera i resztek.
+
+    incremental=True - wynik run_incremental (układ poprawiony z poprzedniego),
+    osobno od pełnego nestingu tych samych detali.
+    """
+    payload = {
+        'version': CACHE_FORMAT_VERSION,
+        'sheet': [round(nester.sheet_width, KEY_PRECISION), round(nester.sheet_height, KEY_PRECISION)],
+        'spacing': round(nester.spacing, KEY_PRECISION),
+        'max_sheets': nester.max_sheets,
+        'engine': engine,
+        'deep': bool(deep_analysis),
+        'optimize_job': bool(optimize_job),
+        'time_budget_s': round(time_budget_s, 3) if optimize_job else None,
+        'seed': nester.seed,
+        'parts': [
+            [t.name, round(t.width, KEY_PRECISION), round(t.height, KEY_PRECISION),
+             _round_points(t.contour), [_round_points(h) for h in t.holes],
+             round(t.contour_area, KEY_PRECISION), round(t.weight_kg, 6), t.quantity]
+            for t in nester.part_types
+        ],
+    }
+    if remnants:
+        # Bez resztek klucz jak dotąd (zapisane wpisy pozostają ważne)
+        payload['remnants'] = [[r.id, round(r.width, KEY_PRECISION), round(r.height, KEY_PRECISION)]
+                               for r in remnants]
+    if incremental:
+        payload['incremental'] = True
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# ============================================================
+# Serializacja NestingResult
+# ============================================================
+
+def _fields_dict(obj, skip=()) -> Dict[str, Any]:
+    return {f.name: getattr(obj, f.name) for f in fields(obj) if f.name not in skip}
+
+
+def result_to_dict(result: NestingResult) -> dict:
+    """NestingResult → słownik JSON (geometria deduplikowana per typ detalu)"""
+    shapes: List[list] = []
+    shape_index: Dict[tuple, int] = {}
+
+    def shape_ref(part: NestedPart) -> int:
+        key = (id(part.original_contour), id(part.holes))
+        if key not in shape_index:
+            shape_index[key] = len(shapes)
+            shapes.append([[list(p) for p in part.original_contour],
+                           [[list(p) for p in h] for h in part.holes]])
+        return shape_index[key]
+
+    def part_dict(part: NestedPart) -> dict:
+        d = _fields_dict(part, _GEOMETRY_FIELDS)
+        d['shape'] = shape_ref(part)
+        return d
+
+    sheets = []
+    location: Dict[int, List[int]] = {}
+    for si, sheet in enumerate(result.sheets):
+        d = _fields_dict(sheet, _SHEET_SKIP_FIELDS)
+        d['placed_parts'] = []
+        for pi, part in enumerate(sheet.placed_parts):
+            location[id(part)] = [si, pi]
+            d['placed_parts'].append(part_dict(part))
+        sheets.append(d)
+
+    # placed_parts to zwykle te same obiekty co w arkuszach - zapis referencji
+    placed = [location.get(id(p)) or part_dict(p) for p in result.placed_parts]
+
+    data = _fields_dict(result, _RESULT_SKIP_FIELDS)
+    data.update({
+        'version': CACHE_FORMAT_VERSION,
+        'shapes': shapes,
+        'sheets': sheets,
+        'placed_parts': placed,
+        'unplaced_parts': [_fields_dict(u) for u in result.unplaced_parts],
+        'cost_breakdown': [_fields_dict(c) for c in result.cost_breakdown],
+    })
+    return data
+
+
+def result_from_dict(data: dict) -> NestingResult:
+    """Słownik z result_to_dict → NestingResult"""
+    shapes = [([tuple(p) for p in contour], [[tuple(p) for p in h] for h in holes])
+              for contour, holes in data['shapes']]
+
+    def make_part(d: dict) -> NestedPart:
+        d = dict(d)
+        contour, holes = shapes[d.pop('shape')]
+        return NestedPart(original_contour=contour, holes=holes, **d)
+
+    sheets = []
+    for d in data['sheets']:
+        d = dict(d)
+        parts = [make_part(p) for p in d.pop('placed_parts')]
+        sheets.append(SheetResult(placed_parts=parts, **d))
+
+    placed = [sheets[ref[0]].placed_parts[ref[1]] if isinstance(ref, list) else make_part(ref)
+              for ref in data['placed_parts']]
+
+    scalars = {k: v for k, v in data.items()
+               if k not in _RESULT_SKIP_FIELDS and k not in ('version', 'shapes')}
+    return NestingResult(
+        sheets=sheets,
+        placed_parts=placed,
+        unplaced_parts=[UnplacedPart(**u) for u in data['unplaced_parts']],
+        cost_breakdown=[PartCostBreakdown(**c) for c in data['cost_breakdown']],
+        **scalars
+    )
+
+
+# ============================================================
+# Cache na dysku
+# ============================================================
+
+class NestingResultCache:
+    """
+    Cache wyników nestingu na dysku z usuwaniem LRU.
+
+    Bezpieczny dla wątków w obrębie procesu; zapis atomowy (plik tymczasowy
+    + os.replace), więc równoległe procesy nie widzą częściowych plików.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path, None] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._last_access_ns = 0
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Cannot create nesting cache dir {self.cache_dir}: {e}")
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[NestingResult]:
+        """Wynik dla klucza lub None (odczyt odświeża pozycję LRU)"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Corrupted nesting cache entry {path.name}: {e}")
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            if data.get('version') != CACHE_FORMAT_VERSION:
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            self._touch(path)
+
+        try:
+            result = result_from_dict(data)
+        except (KeyError, TypeError, IndexError) as e:
+            logger.warning(f"Invalid nesting cache entry {path.name}: {e}")
+            with self._lock:
+                self._remove(path)
+                self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: NestingResult) -> None:
+        """Zapisz wynik i usuń najstarsze wpisy ponad limit"""
+        data = result_to_dict(result)
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        with self._lock:
+            try:
+                with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=5) as f:
+                    json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+                os.replace(tmp, path)
+                self._touch(path)
+            except OSError as e:
+                logger.warning(f"Cannot write nesting cache entry: {e}")
+                self._remove(tmp)
+                return
+
+            self._evict()
+
+    def clear(self) -> None:
+        """Usuń wszystkie wpisy"""
+        with self._lock:
+            for path in self._entries():
+                self._remove(path)
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def _entries(self) -> List[Path]:
+        try:
+            return [p for p in self.cache_dir.iterdir() if p.name.endswith(CACHE_SUFFIX)]
+        except OSError:
+            return []
+
+    def _touch(self, path: Path) -> None:
+        """Czas dostępu LRU - ściśle rosnący (rozdzielczość mtime bywa gruba)"""
+        now = max(time.time_ns(), self._last_access_ns + 1000)
+        self._last_access_ns = now
+        try:
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+
+        def mtime(p: Path) -> int:
+            try:
+                return p.stat().st_mtime_ns
+            except OSError:
+                return 0
+
+        entries.sort(key=mtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _default_cache_dir() -> Path:
+    try:
+        from config.settings import CACHE_DIR
+    except ImportError:
+        CACHE_DIR = Path(os.getenv("CACHE_DIR", Path.home() / ".newerp_cache"))
+    return Path(CACHE_DIR) / "nesting"
+
+
+_default_cache: Optional[NestingResultCache] = None
+
+
+def get_default_cache() -> NestingResultCache:
+    """Współdzielony cache w katalogu CACHE_DIR/nesting"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = NestingResultCache()
+    return _default_cache
@@ -15,7 +15,7 @@ from .dxf_thumbnail import (
     clear_thumbnail_cache
 )
 
-from .dxf_loader import DXFPart, load_dxf, load_dxf_as_path
+from .dxf_loader import DXFPart, load_dxf, load_dxf_as_path, iter_load_dxf
 
 from .name_parser import (
     parse_filename, parse_filename_with_folder_context,
@@ -32,7 +32,7 @@ __all__ = [
     'can_generate_thumbnails',
     'clear_thumbnail_cache',
     # DXF Loader
-    'DXFPart', 'load_dxf', 'load_dxf_as_path',
+    'DXFPart', 'load_dxf', 'load_dxf_as_path', 'iter_load_dxf',
     # Name Parser
     'parse_filename', 'parse_filename_with_folder_context',
     'find_material', 'find_thickness', 'find_quantity',
@@ -9,7 +9,8 @@ Auto-detekcja warstw: IV_OUTER_PROFILE, 0, 2, Domyślne
 import math
 import logging
 import os
-from typing import List, Tuple, Optional, Dict
+from functools import partial
+from typing import List, Tuple, Optional, Dict, Iterable, Iterator, Callable
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
@@ -468,6 +469,37 @@ def load_dxf_as_path(filepath: str, scale: float = 10.0) -> Optional[List[Tuple[
     return part.get_scaled_contour(scale)
 
 
+def iter_load_dxf(
+    filepaths: Iterable[str],
+    arc_resolution: int = 8,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+    loader: Optional[object] = None
+) -> Iterator[Tuple[str, Optional[DXFPart]]]:
+    """
+    Wczytaj wiele plików DXF równolegle (pula procesów).
+    
+    Wyniki zwracane w kolejności ukończenia; dokumenty ezdxf nie wychodzą
+    poza procesy robocze.
+    
+    Args:
+        filepaths: Ścieżki plików DXF
+        arc_resolution: Rozdzielczość aproksymacji łuków
+        workers: Liczba procesów (domyślnie liczba CPU)
+        progress: callback(gotowe, wszystkie, ścieżka) po każdym pliku
+        loader: Własny BatchDXFLoader (np. żeby móc wywołać stop())
+    
+    Yields:
+        (ścieżka, DXFPart lub None w przypadku błędu)
+    """
+    from core.dxf.batch_loader import BatchDXFLoader
+    
+    if loader is None:
+        loader = BatchDXFLoader(workers=workers,
+                                extractor=partial(load_dxf, arc_resolution=arc_resolution))
+    yield from loader.load(filepaths, progress=progress)
+
+
 # ============================================================
 # Test
 # ============================================================
@@ -51,7 +51,8 @@ def get_dxf_thumbnail(
     img_size: Tuple[int, int] = (150, 150),
     bg_color: str = '#1a1a1a',
     line_color: str = '#ffffff',
-    use_cache: bool = True
+    use_cache: bool = True,
+    doc=None
 ) -> Optional['Image.Image']:
     """
     Generuje miniaturę z pliku DXF.
@@ -62,6 +63,7 @@ def get_dxf_thumbnail(
         bg_color: Kolor tła
         line_color: Kolor linii
         use_cache: Czy używać cache
+        doc: Już wczytany dokument ezdxf (bez ponownego odczytu pliku)
         
     Returns:
         PIL.Image lub None jeśli błąd
@@ -77,7 +79,8 @@ def get_dxf_thumbnail(
     
     try:
         # 1. Wczytaj DXF
-        doc = ezdxf.readfile(dxf_path)
+        if doc is None:
+            doc = ezdxf.readfile(dxf_path)
         msp = doc.modelspace()
         
         # Sprawdź czy są jakieś encje
@@ -190,7 +193,8 @@ def get_dxf_thumbnail_simple(
     dxf_path: str,
     img_size: Tuple[int, int] = (150, 150),
     bg_color: str = '#1a1a1a',
-    line_color: str = '#8b5cf6'
+    line_color: str = '#8b5cf6',
+    doc=None
 ) -> Optional['Image.Image']:
     """
     Prostsza metoda generowania miniatury - rysuje tylko kontury.
@@ -201,6 +205,7 @@ def get_dxf_thumbnail_simple(
         img_size: Rozmiar miniatury
         bg_color: Kolor tła (hex)
         line_color: Kolor linii (hex)
+        doc: Już wczytany dokument ezdxf (bez ponownego odczytu pliku)
     """
     if not HAS_PIL:
         return None
@@ -210,7 +215,8 @@ def get_dxf_thumbnail_simple(
         from PIL import ImageDraw
         
         # Wczytaj DXF
-        doc = ezdxf.readfile(dxf_path)
+        if doc is None:
+            doc = ezdxf.readfile(dxf_path)
         msp = doc.modelspace()
         
         # Zbierz wszystkie punkty
@@ -311,15 +317,18 @@ def generate_thumbnail(
     dxf_path: str,
     img_size: Tuple[int, int] = (150, 150),
     bg_color: str = '#1a1a1a',
-    line_color: str = '#8b5cf6'
+    line_color: str = '#8b5cf6',
+    doc=None
 ) -> Optional['Image.Image']:
     """
     Generuje miniaturę używając najlepszej dostępnej metody.
     
     1. Jeśli dostępny ezdxf.addons.drawing - użyj pełnego renderingu
     2. W przeciwnym razie - użyj prostej metody
+    
+    `doc` - już wczytany dokument ezdxf (bez ponownego odczytu pliku).
     """
     if can_generate_thumbnails():
-        return get_dxf_thumbnail(dxf_path, img_size, bg_color, line_color)
+        return get_dxf_thumbnail(dxf_path, img_size, bg_color, line_color, doc=doc)
     else:
-        return get_dxf_thumbnail_simple(dxf_path, img_size, bg_color, line_color)
+        return get_dxf_thumbnail_simple(dxf_path, img_size, bg_color, line_color, doc=doc)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark przeliczania kosztów zamówienia (CostEngine.recalculate_all).
+
+Dla każdego rozmiaru generowane są deterministyczne linie zamówienia
+(kilka materiałów i grubości), wynikiem jest najlepszy z kilku pomiarów.
+Skrypt kończy się kodem 1, gdy któryś rozmiar przekracza budżet czasu.
+
+Użycie:
+    python scripts/cost_engine_benchmark.py
+    python scripts/cost_engine_benchmark.py --runs 5 --compare 100 1000 10000
+"""
+
+import argparse
+import copy
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from orders.cost_engine import CostEngine
+from orders.cost_models import CostParams
+
+# Liczba linii zamówienia -> budżet pełnego przeliczenia [s]
+BUDGETS: Dict[int, float] = {
+    100: 0.1,
+    1_000: 0.2,
+    10_000: 1.0,
+}
+
+MATERIALS = {
+    '1.4301': [1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0],
+    'S235': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0],
+    'S355': [3.0, 4.0, 6.0, 8.0, 10.0],
+    'ALU': [1.0, 1.5, 2.0, 3.0, 5.0],
+}
+
+
+def generate_parts(count: int, seed: int = 42) -> List[Dict]:
+    """Deterministyczne linie zamówienia"""
+    rng = random.Random(seed)
+    materials = list(MATERIALS)
+    parts = []
+    for i in range(count):
+        material = rng.choice(materials)
+        width, height = rng.uniform(20, 1500), rng.uniform(20, 1200)
+        cutting_len = 2 * (width + height) * rng.uniform(1.0, 2.5)
+        parts.append({
+            'name': f'P-{i:05d}',
+            'material': material,
+            'thickness': rng.choice(MATERIALS[material]),
+            'quantity': rng.randint(1, 200),
+            'width': width,
+            'height': height,
+            'area_gross_mm2': width * height * rng.uniform(0.5, 1.0),
+            'cutting_len': cutting_len,
+            'engraving_len': cutting_len * 0.2 if rng.random() < 0.2 else 0,
+            'pierce_count': rng.randint(1, 60),
+            'bends': rng.randint(0, 6) if rng.random() < 0.3 else 0,
+        })
+    return parts
+
+
+def measure(count: int, runs: int = 3, engine: Optional[CostEngine] = None,
+            params: Optional[CostParams] = None) -> float:
+    """Najlepszy z `runs` czasów recalculate_all [s]"""
+    engine = engine or CostEngine()
+    params = params or CostParams()
+    parts = generate_parts(count)
+    best = float('inf')
+    for _ in range(max(1, runs)):
+        batch = copy.deepcopy(parts)
+        start = time.perf_counter()
+        engine.recalculate_all(batch, params)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_per_part(count: int, runs: int = 3) -> float:
+    """Czas liczenia części pojedynczo (calculate_part_cost) - punkt odniesienia [s]"""
+    engine, params = CostEngine(), CostParams()
+    parts = generate_parts(count)
+    best = float('inf')
+    for _ in range(max(1, runs)):
+        start = time.perf_counter()
+        for part in parts:
+            engine.calculate_part_cost(part, params)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark kalkulacji kosztów zamówienia")
+    parser.add_argument('sizes', nargs='*', type=int, help="Liczby linii (domyślnie z BUDGETS)")
+    parser.add_argument('--runs', type=int, default=3, help="Liczba pomiarów na rozmiar")
+    parser.add_argument('--compare', action='store_true',
+                        help="Pokaż też czas liczenia części pojedynczo")
+    args = parser.parse_args()
+
+    # Ostrzeżenia "Calculation too slow" zaciemniają wynik
+    logging.getLogger('orders.cost_engine').setLevel(logging.ERROR)
+
+    failed = False
+    for count in args.sizes or list(BUDGETS):
+        budget_s = BUDGETS.get(count, float('inf'))
+        elapsed = measure(count, runs=args.runs)
+        ok = elapsed <= budget_s
+        failed |= not ok
+        line = (f"[{'OK' if ok else 'PRZEKROCZONO'}] {count:>6} linii: {elapsed * 1000:8.1f} ms "
+                f"(budżet {budget_s * 1000:.0f} ms)")
+        if args.compare:
+            line += f", pojedynczo: {measure_per_part(count, runs=args.runs) * 1000:.1f} ms"
+        print(line)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
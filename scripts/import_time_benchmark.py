@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark czasu importu (zimny start) aplikacji NewERP.
+
+Każdy moduł importowany jest w osobnym procesie z `python -X importtime`,
+wynikiem jest najlepszy z kilku pomiarów skumulowanego czasu importu.
+Skrypt kończy się kodem 1, gdy moduł przekracza budżet czasu albo
+importuje przy starcie pakiet, który powinien być ładowany leniwie
+(np. klient Supabase).
+
+Użycie:
+    python scripts/import_time_benchmark.py
+    python scripts/import_time_benchmark.py --runs 5 --top 15 main_dashboard
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Moduł -> (budżet skumulowanego czasu importu [s], pakiety zabronione przy imporcie)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    'main_dashboard': (1.5, ('supabase', 'pricing')),
+    'mfg_app': (4.0, ()),
+    'quotations.gui.quotation_window': (2.0, ('supabase', 'pricing')),
+    'orders.gui.order_window': (1.5, ('supabase',)),
+}
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+@dataclass
+class ImportTiming:
+    """Wynik importu jednego modułu"""
+    module: str
+    total_s: float = 0.0
+    # (czas skumulowany [s], nazwa) bezpośrednich zależności modułu
+    slowest: List[Tuple[float, str]] = field(default_factory=list)
+    imported: List[str] = field(default_factory=list)
+    error: str = ""
+
+    def forbidden(self, packages: Tuple[str, ...]) -> List[str]:
+        """Zabronione pakiety zaimportowane przy starcie"""
+        return sorted({name for name in self.imported
+                       if name.split('.')[0] in packages})
+
+
+def parse_importtime(stderr: str, module: str) -> ImportTiming:
+    """Wynik `python -X importtime` -> ImportTiming"""
+    timing = ImportTiming(module=module)
+    # Zależności wypisywane są przed modułem, który je importuje
+    children: List[Tuple[float, str]] = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative_s, indent, name = int(match.group(2)) / 1e6, len(match.group(3)), match.group(4)
+        timing.imported.append(name)
+        if indent <= 1:
+            if name == module:
+                timing.total_s = cumulative_s
+                timing.slowest = sorted(children, reverse=True)
+            children = []
+        elif indent <= 3:
+            children.append((cumulative_s, name))
+    return timing
+
+
+def measure(module: str, runs: int = 3, timeout_s: float = 120.0) -> ImportTiming:
+    """Najlepszy z `runs` pomiarów importu modułu w świeżym interpreterze"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    best: Optional[ImportTiming] = None
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=str(PROJECT_ROOT), env=env, capture_output=True, text=True, timeout=timeout_s
+        )
+        timing = parse_importtime(proc.stderr, module)
+        if proc.returncode != 0:
+            lines = [l for l in proc.stderr.splitlines() if not l.startswith('import time:')]
+            timing.error = lines[-1] if lines else f"exit code {proc.returncode}"
+            return timing
+        if best is None or timing.total_s < best.total_s:
+            best = timing
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark czasu importu aplikacji")
+    parser.add_argument('modules', nargs='*', help="Moduły (domyślnie wszystkie z BUDGETS)")
+    parser.add_argument('--runs', type=int, default=3, help="Liczba pomiarów na moduł")
+    parser.add_argument('--top', type=int, default=10, help="Ile najwolniejszych zależności pokazać")
+    parser.add_argument('--skip-missing', action='store_true',
+                        help="Nie traktuj brakujących zależności jako błędu")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules or list(BUDGETS):
+        budget_s, forbidden = BUDGETS.get(module, (float('inf'), ()))
+        timing = measure(module, runs=args.runs)
+
+        if timing.error:
+            missing = 'ModuleNotFoundError' in timing.error or 'ImportError' in timing.error
+            status = "POMINIĘTO" if missing and args.skip_missing else "BŁĄD"
+            failed |= status == "BŁĄD"
+            print(f"[{status}] {module}: {timing.error}")
+            continue
+
+        violations = timing.forbidden(forbidden)
+        ok = timing.total_s <= budget_s and not violations
+        failed |= not ok
+        print(f"[{'OK' if ok else 'PRZEKROCZONO'}] {module}: {timing.total_s * 1000:.0f} ms "
+              f"(budżet {budget_s * 1000:.0f} ms)")
+        if violations:
+            print(f"    importowane przy starcie: {', '.join(violations)}")
+        for seconds, name in timing.slowest[:args.top]:
+            print(f"    {seconds * 1000:8.1f} ms  {name}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
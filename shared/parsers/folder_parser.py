@@ -24,7 +24,7 @@ import re
 import logging
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Callable, Dict, List, Optional, Tuple, Set
 from enum import Enum
 
 # Import parsera nazw
@@ -131,6 +131,12 @@ class ProductGroup:
     # Operacje
     has_bending: bool = False  # Czy wymaga gięcia (na podstawie 3D)
     
+    # Geometria z pliku DXF (FolderParser.load_geometry - jeden odczyt pliku)
+    dxf_part: Optional[object] = field(default=None, repr=False)
+    engraving: Optional[object] = field(default=None, repr=False)
+    toolpath_stats: Optional[object] = field(default=None, repr=False)
+    thumbnail: Optional[object] = field(default=None, repr=False)
+    
     @property
     def primary_2d(self) -> Optional[ParsedFile]:
         """Główny plik 2D (preferuj DXF)"""
@@ -462,6 +468,69 @@ class FolderParser:
             errors=errors
         )
     
+    def load_geometry(
+        self,
+        result: FolderScanResult,
+        thumbnail_size: Optional[Tuple[int, int]] = None,
+        thumbnail_colors: Tuple[str, str] = ('#1a1a1a', '#8b5cf6'),
+        with_toolpath: bool = False,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[int, int, str], None]] = None,
+        loader: Optional[object] = None
+    ) -> None:
+        """
+        Wczytaj geometrię plików DXF grup - każdy plik czytany raz.
+        
+        Pliki wczytywane równolegle (BatchDXFLoader, pula procesów). Z jednego
+        odczytu wypełnia dxf_part, wielokąt nestingu (get_polygon), engraving,
+        opcjonalnie miniaturę i toolpath_stats.
+        
+        Args:
+            result: Wynik scan_folder / scan_archive
+            thumbnail_size: Rozmiar miniatury (None = bez miniatur)
+            thumbnail_colors: (kolor tła, kolor linii) miniatury
+            with_toolpath: Czy liczyć statystyki ścieżki cięcia
+            workers: Liczba procesów (domyślnie liczba CPU)
+            progress: callback(gotowe, wszystkie, ścieżka) po każdym pliku
+            loader: Własny BatchDXFLoader (np. żeby móc wywołać stop())
+        """
+        try:
+            from core.dxf import BatchDXFLoader
+            from quotations.nesting.dxf_polygon import store_dxf_polygon
+        except ImportError as e:
+            logger.warning(f"DXF geometry unavailable: {e}")
+            return
+        
+        groups_by_path: Dict[str, List[ProductGroup]] = {}
+        for group in result.product_groups:
+            pf = group.primary_2d
+            if pf and pf.extension == '.dxf':
+                groups_by_path.setdefault(str(pf.path), []).append(group)
+        
+        if loader is None:
+            loader = BatchDXFLoader(
+                workers=workers,
+                thumbnail_size=thumbnail_size,
+                thumbnail_colors=thumbnail_colors,
+                with_toolpath=with_toolpath
+            )
+        
+        for path, geometry in loader.load(groups_by_path, progress=progress):
+            name = Path(path).name
+            if geometry is None:
+                result.errors.append(f"Błąd odczytu {name}: {loader.errors.get(path)}")
+                continue
+            if geometry.error:
+                result.errors.append(f"Błąd geometrii {name}: {geometry.error}")
+            
+            store_dxf_polygon(path, geometry.polygon)
+            for group in groups_by_path[path]:
+                group.dxf_part = geometry.part
+                group._polygon_cache = geometry.polygon
+                group.engraving = geometry.engraving
+                group.toolpath_stats = geometry.toolpath_stats
+                group.thumbnail = geometry.thumbnail
+    
     def scan_archive(
         self, 
         archive_path: str | Path,
@@ -0,0 +1,25 @@
+"""
+Wspólne fixture testów
+======================
+client - atrapa klienta Supabase w pamięci (supabase_memory.InMemorySupabase),
+nowa dla każdego testu.
+
+Atrapa importowana jako moduł z katalogu testów, nie przez pakiet `tests.`
+(nazwa koliduje z scripts/tests przy uruchomieniu `python -m pytest`
+z katalogu głównego).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from supabase_memory import InMemorySupabase
+
+
+@pytest.fixture
+def client() -> InMemorySupabase:
+    """Pusta baza Supabase w pamięci"""
+    return InMemorySupabase()
@@ -0,0 +1,319 @@
+"""
+Atrapa klienta Supabase w pamięci
+=================================
+Tabele jako słowniki wierszy (po 'id') z podzbiorem API PostgREST używanym
+przez repozytoria: select/insert/upsert/update/delete, filtry eq/neq/in_/
+gt/gte/lt/lte/ilike, or_ (składnia PostgREST z and(...)/or(...)), order,
+limit, range, select(count='exact') oraz rpc() dla funkcji
+zarejestrowanych przez register_rpc().
+
+Każde wykonane zapytanie trafia do `client.requests` (tabela, operacja,
+liczba wierszy, rozmiar wysłanego JSON) - testy sprawdzają nim ruch do bazy.
+
+Użycie:
+    client = InMemorySupabase()
+    client.seed('orders', [{'id': '1', 'name': 'A'}])
+    repo = OrderRepository(client)
+"""
+
+import copy
+import json
+import re
+import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Request:
+    """Zapytanie wykonane przez atrapę"""
+    table: str
+    operation: str
+    rows: int
+    payload_bytes: int
+
+
+class InMemorySupabase:
+    """Klient Supabase trzymający tabele w pamięci"""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[Any, Dict]] = {}
+        self.requests: List[Request] = []
+        self.functions: Dict[str, Callable[..., Any]] = {}
+
+    def table(self, name: str) -> 'InMemoryQuery':
+        return InMemoryQuery(self, name)
+
+    def register_rpc(self, name: str, function: Callable[..., Any]):
+        """Zarejestruj funkcję RPC: function(client, **params) -> data"""
+        self.functions[name] = function
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> 'InMemoryRpc':
+        return InMemoryRpc(self, name, params or {})
+
+    def seed(self, name: str, rows: List[Dict]):
+        """Wstaw wiersze bez rejestrowania zapytań"""
+        table = self.tables.setdefault(name, {})
+        for row in rows:
+            row = copy.deepcopy(row)
+            row.setdefault('id', str(uuid.uuid4()))
+            table[row['id']] = row
+
+    def rows(self, name: str) -> List[Dict]:
+        return list(self.tables.get(name, {}).values())
+
+    def reset_requests(self):
+        self.requests.clear()
+
+    def sent_bytes(self, table: Optional[str] = None) -> int:
+        """Suma rozmiarów wysłanych danych"""
+        return sum(r.payload_bytes for r in self.requests if table is None or r.table == table)
+
+    def operations(self, table: Optional[str] = None) -> List[str]:
+        return [r.operation for r in self.requests if table is None or r.table == table]
+
+
+class InMemoryQuery:
+    """Budowniczy zapytania: client.table(name).<operacja>.<filtry>.execute()"""
+
+    def __init__(self, client: InMemorySupabase, table: str):
+        self.client = client
+        self.table_name = table
+        self.operation = 'select'
+        self.columns: Optional[List[str]] = None
+        self.payload: Any = None
+        self.filters: List[Callable[[Dict], bool]] = []
+        self.ordering: List[tuple] = []
+        self.row_limit: Optional[int] = None
+        self.row_offset = 0
+        self.count: Optional[str] = None
+
+    # ---------- operacje ----------
+
+    def select(self, columns: str = '*', count: Optional[str] = None):
+        self.operation = 'select'
+        # Zasoby osadzone "tabela(kolumny)" - zwracane jako wartość kolumny tabela
+        names = [re.sub(r'\(.*\)$', '', c).strip() for c in _split_top_level(columns)]
+        names = [c for c in names if c]
+        self.columns = None if '*' in names else names
+        self.count = count
+        return self
+
+    def insert(self, rows):
+        return self._write('insert', rows)
+
+    def upsert(self, rows, **kwargs):
+        return self._write('upsert', rows)
+
+    def update(self, values: Dict):
+        return self._write('update', values)
+
+    def delete(self):
+        self.operation = 'delete'
+        return self
+
+    def _write(self, operation: str, payload):
+        self.operation = operation
+        self.payload = payload
+        return self
+
+    # ---------- filtry ----------
+
+    def _filter(self, predicate: Callable[[Dict], bool]):
+        self.filters.append(predicate)
+        return self
+
+    def eq(self, column: str, value):
+        return self._filter(lambda row: row.get(column) == value)
+
+    def neq(self, column: str, value):
+        return self._filter(lambda row: row.get(column) != value)
+
+    def in_(self, column: str, values):
+        values = set(values)
+        return self._filter(lambda row: row.get(column) in values)
+
+    def gt(self, column: str, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] > value)
+
+    def gte(self, column: str, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] >= value)
+
+    def lt(self, column: str, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] < value)
+
+    def lte(self, column: str, value):
+        return self._filter(lambda row: row.get(column) is not None and row[column] <= value)
+
+    def ilike(self, column: str, pattern: str):
+        return self._filter(_ilike_predicate(column, pattern))
+
+    def or_(self, filters: str):
+        return self._filter(_parse_logic('or', filters))
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None):
+        # Domyślnie jak PostgreSQL: NULL na końcu rosnąco, na początku malejąco
+        self.ordering.append((column, desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def limit(self, count: int):
+        self.row_limit = count
+        return self
+
+    def range(self, start: int, end: int):
+        self.row_offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    # ---------- wykonanie ----------
+
+    def _matching(self) -> List[Dict]:
+        rows = [row for row in self.client.tables.get(self.table_name, {}).values()
+                if all(f(row) for f in self.filters)]
+        # Stabilne sortowanie od ostatniego klucza
+        for column, desc, nullsfirst in reversed(self.ordering):
+            present = [row for row in rows if row.get(column) is not None]
+            nulls = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: row[column], reverse=desc)
+            rows = nulls + present if nullsfirst else present + nulls
+        return rows
+
+    def execute(self) -> SimpleNamespace:
+        table = self.client.tables.setdefault(self.table_name, {})
+        payload_bytes = len(json.dumps(self.payload, default=str)) if self.payload is not None else 0
+
+        total = None
+        if self.operation == 'select':
+            rows = self._matching()
+            total = len(rows)
+            rows = rows[self.row_offset:]
+            if self.row_limit is not None:
+                rows = rows[:self.row_limit]
+            if self.columns is not None:
+                rows = [{c: row.get(c) for c in self.columns} for row in rows]
+            data = copy.deepcopy(rows)
+
+        elif self.operation in ('insert', 'upsert'):
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            data = []
+            for row in copy.deepcopy(rows):
+                row.setdefault('id', str(uuid.uuid4()))
+                if row['id'] in table:
+                    if self.operation == 'insert':
+                        raise ValueError(f"duplicate key value violates unique constraint ({row['id']})")
+                    table[row['id']].update(row)
+                else:
+                    table[row['id']] = row
+                data.append(copy.deepcopy(table[row['id']]))
+
+        elif self.operation == 'update':
+            data = []
+            for row in self._matching():
+                row.update(copy.deepcopy(self.payload))
+                data.append(copy.deepcopy(row))
+
+        else:  # delete
+            data = [table.pop(row['id']) for row in self._matching()]
+
+        self.client.requests.append(Request(self.table_name, self.operation, len(data), payload_bytes))
+        count = total if self.count and total is not None else len(data)
+        return SimpleNamespace(data=data, count=count)
+
+
+# ---------- filtry logiczne PostgREST ----------
+
+_OPERATORS = {
+    'eq': lambda a, b: a == b,
+    'neq': lambda a, b: a != b,
+    'gt': lambda a, b: a > b,
+    'gte': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'lte': lambda a, b: a <= b,
+}
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Podziel po przecinkach poza nawiasami i cudzysłowami"""
+    parts, depth, quoted, current = [], 0, False, ''
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quoted and char == '\\':
+            current += text[i:i + 2]
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current.strip())
+            current = ''
+            i += 1
+            continue
+        current += char
+        i += 1
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+
+def _coerce(row_value, value: str):
+    """Wartość z filtra tekstowego w typie kolumny"""
+    if isinstance(row_value, bool):
+        return value == 'true'
+    if isinstance(row_value, (int, float)):
+        return float(value)
+    return value
+
+
+def _ilike_predicate(column: str, pattern: str) -> Callable[[Dict], bool]:
+    regex = re.compile('^' + '.*'.join(re.escape(p) for p in re.split(r'[%*]', pattern)) + '$',
+                       re.IGNORECASE | re.DOTALL)
+    return lambda row: row.get(column) is not None and bool(regex.match(str(row[column])))
+
+
+def _parse_condition(condition: str) -> Callable[[Dict], bool]:
+    match = re.match(r'^(and|or)\((.*)\)$', condition, re.DOTALL)
+    if match:
+        return _parse_logic(match.group(1), match.group(2))
+    column, op, value = condition.split('.', 2)
+    value = _unquote(value)
+    if op == 'ilike':
+        return _ilike_predicate(column, value)
+    compare = _OPERATORS[op]
+    return lambda row: row.get(column) is not None and compare(row[column], _coerce(row[column], value))
+
+
+def _parse_logic(kind: str, filters: str) -> Callable[[Dict], bool]:
+    predicates = [_parse_condition(c) for c in _split_top_level(filters)]
+    combine = any if kind == 'or' else all
+    return lambda row: combine(p(row) for p in predicates)
+
+
+class InMemoryRpc:
+    """Wywołanie funkcji RPC: client.rpc(name, params).execute()"""
+
+    def __init__(self, client: InMemorySupabase, name: str, params: Dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> SimpleNamespace:
+        function = self.client.functions.get(self.name)
+        if function is None:
+            raise RuntimeError(f"Could not find the function public.{self.name}")
+        data = copy.deepcopy(function(self.client, **self.params))
+        rows = len(data) if isinstance(data, list) else 1
+        self.client.requests.append(Request(f'rpc/{self.name}', 'rpc', rows,
+                                            len(json.dumps(self.params, default=str))))
+        return SimpleNamespace(data=data, count=rows)
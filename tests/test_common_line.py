@@ -0,0 +1,221 @@
+"""
+Testy wspólnych linii cięcia
+============================
+Wykrywanie wspólnych krawędzi detali na arkuszu i przepakowanie z odstępem kerf.
+
+Uruchom: python -m pytest tests/test_common_line.py
+"""
+
+import os
+import sys
+import math
+import random
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quotations.nesting.fast_nester import FastNester, NestedPart, SheetResult, HAS_RECTPACK
+from quotations.nesting.common_line import (
+    apply_common_lines, detect_common_lines, is_common_line_candidate, repack_common_line
+)
+
+L_SHAPE = [(0, 0), (300, 0), (300, 60), (60, 60), (60, 300), (0, 300)]
+CIRCLE = [(50 + 50 * math.cos(a * math.pi / 16), 50 + 50 * math.sin(a * math.pi / 16)) for a in range(32)]
+
+
+def rect(x: float, y: float, w: float, h: float, rotation: float = 0.0) -> NestedPart:
+    contour = [(0, 0), (w, 0), (w, h), (0, h)]
+    placed_w, placed_h = (h, w) if rotation == 90 else (w, h)
+    return NestedPart(name='R', x=x, y=y, width=placed_w, height=placed_h, rotation=rotation,
+                      original_contour=contour, orig_width=w, orig_height=h)
+
+
+def brute_force_common_length(parts, max_gap: float, min_length: float) -> float:
+    """Wspólne krawędzie prostokątów - porównanie każdej pary"""
+    total = 0.0
+    for i, a in enumerate(parts):
+        for b in parts[i + 1:]:
+            for p, q in ((a, b), (b, a)):
+                gap_x = q.x - (p.x + p.width)
+                if -1e-9 <= gap_x <= max_gap:
+                    overlap = min(p.y + p.height, q.y + q.height) - max(p.y, q.y)
+                    if overlap >= min_length:
+                        total += overlap
+                gap_y = q.y - (p.y + p.height)
+                if -1e-9 <= gap_y <= max_gap:
+                    overlap = min(p.x + p.width, q.x + q.width) - max(p.x, q.x)
+                    if overlap >= min_length:
+                        total += overlap
+    return total
+
+
+def test_shared_edges_of_adjacent_rectangles():
+    kerf = 0.2
+    parts = [rect(0, 0, 100, 50), rect(100 + kerf, 0, 100, 50),
+             rect(0, 50 + kerf, 200 + kerf, 40), rect(400, 0, 50, 50)]
+    sheet = SheetResult(sheet_index=0, placed_parts=parts)
+
+    report = detect_common_lines(sheet, kerf_mm=kerf)
+
+    # Pionowa krawędź 50 mm + dwie poziome po 100 mm
+    assert report.saved_cut_length_mm == pytest.approx(250.0)
+    assert report.original_pierce_count == 4
+    assert report.saved_pierce_count == 2
+    assert report.cut_length_mm == pytest.approx(report.original_cut_length_mm - 250.0)
+    assert {(e.part_a, e.part_b) for e in report.edges} <= {(0, 1), (1, 0), (0, 2), (2, 0), (1, 2), (2, 1)}
+
+
+def test_spacing_above_kerf_is_not_common():
+    parts = [rect(0, 0, 100, 50), rect(105, 0, 100, 50)]
+    report = detect_common_lines(SheetResult(sheet_index=0, placed_parts=parts), kerf_mm=0.2)
+    assert not report.has_common_lines
+    assert report.saved_pierce_count == 0
+
+
+def test_index_matches_brute_force():
+    rng = random.Random(5)
+    kerf = 0.2
+    parts = []
+    # Rzędy detali o losowych wymiarach, odstęp kerf lub 3 mm
+    y = 0.0
+    for _ in range(12):
+        x = 0.0
+        for _ in range(15):
+            w, h = rng.choice([40, 60, 80]), rng.choice([30, 50])
+            rotation = 90.0 if rng.random() < 0.3 else 0.0
+            part = rect(x, y, w, h, rotation)
+            parts.append(part)
+            x += part.width + (kerf if rng.random() < 0.7 else 3.0)
+        y += 80 + (kerf if rng.random() < 0.7 else 3.0)
+
+    report = detect_common_lines(SheetResult(sheet_index=0, placed_parts=parts), kerf_mm=kerf)
+
+    expected = brute_force_common_length(parts, kerf + 0.05, 10.0)
+    assert expected > 0
+    assert report.saved_cut_length_mm == pytest.approx(expected)
+
+
+def test_candidates():
+    straight = NestedPart(name='L', x=0, y=0, width=300, height=300, rotation=0,
+                          original_contour=L_SHAPE)
+    round_part = NestedPart(name='C', x=0, y=0, width=100, height=100, rotation=0,
+                            original_contour=CIRCLE)
+    assert is_common_line_candidate(rect(0, 0, 100, 50))
+    assert is_common_line_candidate(straight)
+    assert not is_common_line_candidate(round_part)
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_repack_with_kerf_spacing_creates_common_lines():
+    nester = FastNester(1000, 1000, spacing=5.0, seed=1)
+    nester.add_part_from_dict({'name': 'R', 'width': 100, 'height': 50}, quantity=20)
+    nester.add_part_from_dict({'name': 'S', 'width': 80, 'height': 80}, quantity=6)
+    sheet = nester.run_nesting().sheets[0]
+
+    assert not detect_common_lines(sheet).has_common_lines
+
+    repacked = repack_common_line(nester, sheet, kerf_mm=0.2)
+    assert repacked is not None
+    assert len(repacked.placed_parts) == len(sheet.placed_parts)
+
+    report = detect_common_lines(repacked, kerf_mm=0.2)
+    assert report.saved_cut_length_mm > 0
+    assert 0 < report.saved_pierce_count < report.original_pierce_count
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_repack_skips_curved_parts():
+    nester = FastNester(1000, 1000, spacing=5.0, seed=1)
+    nester.add_part_from_dict({'name': 'C', 'width': 100, 'height': 100, 'contour': CIRCLE}, quantity=4)
+    sheet = nester.run_nesting().sheets[0]
+    assert repack_common_line(nester, sheet) is None
+
+
+def test_report_feeds_costing_variants():
+    from costing.models.nesting_result import NestingResult, NestingSheet, PartInstance, ToolpathStats
+    from costing.services.costing_service import (
+        NestingCostingService, JobOverrides, create_default_pricing
+    )
+
+    kerf = 0.2
+    parts = [rect(0, 0, 100, 50), rect(100 + kerf, 0, 100, 50)]
+    report = detect_common_lines(SheetResult(sheet_index=0, placed_parts=parts), kerf_mm=kerf)
+
+    def costing(apply: bool):
+        sheet = NestingSheet(sheet_id="S1", material_id="S355", thickness_mm=3.0)
+        sheet.parts = [PartInstance(part_id="P", instance_id="I", qty_in_sheet=2,
+                                    occupied_area_mm2=5000,
+                                    toolpath_stats=ToolpathStats(cut_length_mm=300, pierce_count=1))]
+        sheet.calculate_metrics()
+        if apply:
+            report.apply_to(sheet)
+        service = NestingCostingService(use_detailed_motion_planning=False)
+        overrides = JobOverrides(include_piercing=True)
+        return service.compute_costing(NestingResult(sheets=[sheet]), overrides,
+                                       create_default_pricing()).sheet_costs[0]
+
+    plain, common = costing(False), costing(True)
+    assert common.cut_cost_a_pln == pytest.approx(plain.cut_cost_a_pln * (600 - 50) / 600)
+    assert common.pierce_cost_a_pln < plain.pierce_cost_a_pln
+    assert common.cut_time_s == pytest.approx(plain.cut_time_s * (600 - 50) / 600)
+    assert common.total_time_s < plain.total_time_s
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_nested_sheets_carry_savings_to_costing_sheet():
+    from costing.models.nesting_result import NestingSheet
+
+    nester = FastNester(1000, 1000, spacing=5.0, seed=1)
+    nester.add_part_from_dict({'name': 'R', 'width': 100, 'height': 50}, quantity=40)
+    result = nester.run_nesting()
+
+    without = NestingSheet(sheet_id="S1", material_id="S355", thickness_mm=3.0)
+    assert apply_common_lines(without, result.sheets).saved_cut_length_mm == 0
+    assert without.common_line_saved_cut_mm == 0
+
+    sheet = NestingSheet(sheet_id="S1", material_id="S355", thickness_mm=3.0)
+    report = apply_common_lines(sheet, result.sheets, nester=nester, kerf_mm=0.2)
+    assert report.saved_cut_length_mm > 0 and report.saved_pierce_count > 0
+    assert sheet.common_line_saved_cut_mm == report.saved_cut_length_mm
+    assert sheet.common_line_saved_pierces == report.saved_pierce_count
+    assert NestingSheet.from_dict(sheet.to_dict()).common_line_saved_pierces == report.saved_pierce_count
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_round_parts_get_no_costing_savings(tmp_path):
+    ezdxf = pytest.importorskip("ezdxf")
+    from costing.models.nesting_result import NestingSheet
+    from quotations.utils.dxf_loader import load_dxf
+
+    def outline(name, draw):
+        doc = ezdxf.new()
+        draw(doc.modelspace())
+        path = str(tmp_path / f"{name}.dxf")
+        doc.saveas(path)
+        part = load_dxf(path)
+        return {'name': name, 'width': part.width, 'height': part.height,
+                'contour': part.get_normalized_contour(), 'qty': 12}
+
+    def savings(sheet, part):
+        # Jak okno kalkulacji: nesting obrysów grupy, potem wspólne linie
+        nester = FastNester(1000, 1000)
+        nester.add_part_from_dict(part, quantity=part['qty'])
+        return apply_common_lines(sheet, nester.run_nesting().sheets, nester=nester)
+
+    disc = outline('disc', lambda msp: msp.add_circle((0, 0), 50))
+    plate = outline('plate', lambda msp: msp.add_lwpolyline(
+        [(0, 0), (100, 0), (100, 50), (0, 50)], close=True))
+
+    sheet = NestingSheet(sheet_id="S1", material_id="S355", thickness_mm=3.0)
+    report = savings(sheet, disc)
+    assert report.saved_cut_length_mm == 0 and report.saved_pierce_count == 0
+    assert sheet.common_line_saved_cut_mm == 0 and sheet.common_line_saved_pierces == 0
+
+    # Ten sam detal jako sam bounding box dostałby oszczędności
+    boxed = {'name': 'disc', 'width': disc['width'], 'height': disc['height'], 'qty': 12}
+    assert savings(NestingSheet(sheet_id="S2"), boxed).saved_cut_length_mm > 0
+
+    sheet = NestingSheet(sheet_id="S3", material_id="S355", thickness_mm=3.0)
+    assert savings(sheet, plate).saved_cut_length_mm > 0
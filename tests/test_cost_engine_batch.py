@@ -0,0 +1,130 @@
+"""
+Testy wsadowej kalkulacji kosztów CostEngine
+============================================
+Kalkulacja wsadowa musi dawać te same kwoty co calculate_part_cost
+dla każdej części i mieścić się w budżetach czasu dla 100/1k/10k linii.
+
+Uruchom: python -m pytest tests/test_cost_engine_batch.py
+"""
+
+import os
+import sys
+import copy
+import random
+from dataclasses import astuple
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip('numpy')
+
+from orders.cost_engine import CostEngine, _quantize_cents
+from orders.cost_models import AllocationModel, CostParams
+from scripts.cost_engine_benchmark import BUDGETS, generate_parts, measure
+
+
+def mixed_parts(count: int, seed: int = 7):
+    """Linie z brakującymi polami, ręcznymi kosztami i nietypowymi materiałami"""
+    rng = random.Random(seed)
+    parts = generate_parts(count, seed)
+    for part in parts:
+        part['material'] = rng.choice([part['material'], 'inox', 'dc01', 'X'])
+        part['additional'] = rng.choice([0, 0, 1.005, 2.675, -3.335])
+        if rng.random() < 0.2:
+            del part['area_gross_mm2']
+            part['weight_kg'] = rng.uniform(0, 20)
+        if rng.random() < 0.1:
+            part['quantity'] = None
+            part['pierce_count'] = 0
+        if rng.random() < 0.05:
+            part['_manual_lm_cost'] = True
+            part['lm_cost'] = rng.uniform(0, 100)
+        if rng.random() < 0.05:
+            part['_manual_bending_cost'] = True
+            part['bending_cost'] = rng.uniform(0, 100)
+    return parts
+
+
+def reference_totals(engine, parts, params):
+    """Sumy składników liczone część po części"""
+    totals = [Decimal('0')] * 5
+    for part in parts:
+        if part.get('_manual_lm_cost'):
+            continue
+        cost = engine.calculate_part_cost(part, params)
+        for i, value in enumerate((cost.material_cost, cost.cutting_cost, cost.engraving_cost,
+                                   cost.foil_cost, cost.piercing_cost)):
+            totals[i] += value * cost.quantity
+    return totals
+
+
+def test_quantize_cents_matches_decimal_rounding():
+    values = [0.0, 0.005, 0.015, 1.005, 2.675, 1.115, -3.335, 12.344999, 999999.995, 1e-9, -0.004]
+    values += [random.Random(1).uniform(-1000, 1000) for _ in range(1000)]
+
+    cents = _quantize_cents(np.array(values))
+
+    for value, c in zip(values, cents):
+        expected = Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        assert Decimal(c).scaleb(-2) == expected, value
+
+
+@pytest.mark.parametrize("include", [True, False])
+def test_batch_matches_per_part_calculation(include):
+    engine = CostEngine()
+    params = CostParams(include_material=include, include_foil_removal=include,
+                        include_piercing=include)
+    parts = mixed_parts(500)
+
+    batch = engine.calculate_parts_batch(parts, params)
+    single = [engine.calculate_part_cost(part, params) for part in parts]
+
+    assert [astuple(r) for r in batch] == [astuple(r) for r in single]
+
+
+def test_order_totals_and_recalculate_all():
+    engine = CostEngine()
+    params = CostParams(markup_percent=7.5)
+    parts = mixed_parts(300)
+    material, cutting, engraving, foil, piercing = reference_totals(engine, parts, params)
+    manual_lm = sum(Decimal(str(p['lm_cost'])) * int(p.get('quantity') or 1)
+                    for p in parts if p.get('_manual_lm_cost'))
+
+    result = engine.calculate_order_cost(parts, params)
+
+    assert result.total_material == material
+    assert result.total_cutting == cutting + manual_lm
+    assert (result.total_engraving, result.total_foil, result.total_piercing) == (engraving, foil, piercing)
+
+    updated, recalculated = engine.recalculate_all(copy.deepcopy(parts), params)
+    assert recalculated.grand_total == result.grand_total
+    for part, new in zip(parts, updated):
+        if part.get('_manual_lm_cost'):
+            assert new['lm_cost'] == part['lm_cost']
+            continue
+        cost = engine.calculate_part_cost(part, params)
+        assert new['lm_cost'] == float(cost.lm_cost)
+        assert new['cutting_cost'] == float(cost.cutting_cost)
+        assert new['foil_cost'] == float(cost.foil_cost)
+
+
+def test_sheet_allocation_replaces_weight_based_material():
+    engine = CostEngine()
+    params = CostParams(allocation_model=AllocationModel.PER_UNIT)
+    parts = generate_parts(4)
+    nesting = {'sheets': [{'material_cost': 100.0, 'efficiency': 0.8}]}
+
+    result = engine.calculate_order_cost(parts, params, nesting)
+
+    assert result.total_material == Decimal('25.00') * sum(p['quantity'] for p in parts)
+    assert result.total_sheets == 1
+    allocated = engine.calculate_parts_batch(parts, params, [Decimal('25.00')] * 4)
+    assert all(r.material_cost == Decimal('25.00') for r in allocated)
+
+
+@pytest.mark.parametrize("count", sorted(BUDGETS))
+def test_recalculation_within_budget(count):
+    assert measure(count, runs=3) <= BUDGETS[count]
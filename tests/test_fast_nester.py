@@ -0,0 +1,320 @@
+"""
+Testy FastNester
+================
+Silniki nestingu (rectpack / NFP) - poprawność rozmieszczenia i wykorzystanie arkusza.
+
+Uruchom: python -m pytest tests/test_fast_nester.py
+"""
+
+import os
+import sys
+import math
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quotations.nesting.fast_nester import (
+    FastNester, NestedPart, HAS_NUMPY, HAS_RECTPACK, ENGINE_NFP, ENGINE_RECTPACK,
+    get_part_shape, place_contours, transform_contour
+)
+from quotations.nesting.nfp_nester import HAS_PYCLIPPER
+from quotations.nesting.result_cache import NestingResultCache
+
+try:
+    from shapely.geometry import Polygon
+    HAS_SHAPELY = True
+except ImportError:
+    HAS_SHAPELY = False
+
+
+L_SHAPE = [(0, 0), (300, 0), (300, 60), (60, 60), (60, 300), (0, 300)]
+RING = [(200 + 200 * math.cos(a * math.pi / 16), 200 + 200 * math.sin(a * math.pi / 16)) for a in range(32)]
+RING_HOLE = [(200 + 150 * math.cos(a * math.pi / 16), 200 + 150 * math.sin(a * math.pi / 16)) for a in range(32)]
+
+
+def make_nester(sheet_w: float = 1000, sheet_h: float = 2000, spacing: float = 5.0) -> FastNester:
+    nester = FastNester(sheet_w, sheet_h, spacing=spacing)
+    nester.add_part_from_dict({'name': 'L', 'width': 300, 'height': 300,
+                               'contour': L_SHAPE, 'contour_area': 32400}, quantity=20)
+    nester.add_part_from_dict({'name': 'Ring', 'width': 400, 'height': 400,
+                               'contour': RING, 'holes': [RING_HOLE],
+                               'contour_area': math.pi * (200 ** 2 - 150 ** 2)}, quantity=4)
+    nester.add_part_from_dict({'name': 'Sq', 'width': 80, 'height': 80}, quantity=12)
+    return nester
+
+
+def assert_valid_layout(result, sheet_w: float, sheet_h: float, spacing: float):
+    """Detale w granicach arkusza i bez kolizji (z zachowaniem odstępu)"""
+    by_sheet = {}
+    for part in result.placed_parts:
+        poly = Polygon(part.get_placed_contour(), part.get_placed_holes())
+        min_x, min_y, max_x, max_y = poly.bounds
+        assert min_x >= -0.01 and min_y >= -0.01
+        assert max_x <= sheet_w + 0.01 and max_y <= sheet_h + 0.01
+        by_sheet.setdefault(part.sheet_index, []).append(poly)
+
+    for polys in by_sheet.values():
+        for i in range(len(polys)):
+            for j in range(i + 1, len(polys)):
+                assert polys[i].distance(polys[j]) >= spacing - 0.1
+
+
+def test_placed_contour_rotations():
+    """Obroty 0/90/180/270 zachowują bbox detalu w (x, y)"""
+    contour = [(0, 0), (100, 0), (100, 40), (0, 40)]
+    for rotation, (w, h) in [(0, (100, 40)), (90, (40, 100)), (180, (100, 40)), (270, (40, 100))]:
+        part = NestedPart(name="P", x=10, y=20, width=w, height=h, rotation=rotation,
+                          original_contour=contour, orig_width=100, orig_height=40)
+        xs = [p[0] for p in part.get_placed_contour()]
+        ys = [p[1] for p in part.get_placed_contour()]
+        assert (min(xs), min(ys), max(xs), max(ys)) == (10, 20, 10 + w, 20 + h)
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="numpy not installed")
+def test_batch_placed_contours_match_transform():
+    """Wsadowa transformacja NumPy identyczna z transform_contour i buforowana"""
+    holes = [RING_HOLE]
+    parts = [NestedPart(name="R", x=10.3 * i, y=7.1 * i, width=400, height=400, rotation=rotation,
+                        original_contour=RING, holes=holes, orig_width=400, orig_height=400)
+             for i, rotation in enumerate([0, 90, 180, 270, 90, 0, 45])]
+    parts.append(NestedPart(name="Sq", x=5, y=5, width=80, height=80, rotation=0))
+
+    placed = place_contours(parts)
+
+    for part, (contour, part_holes) in zip(parts[:-1], placed):
+        assert contour == transform_contour(RING, part.rotation, 400, 400, part.x, part.y)
+        assert part_holes == [transform_contour(RING_HOLE, part.rotation, 400, 400, part.x, part.y)]
+        assert part.get_placed_contour() is contour
+    assert placed[-1] == (parts[-1].get_placed_contour(), [])
+    assert get_part_shape(RING, holes) is get_part_shape(RING, holes)
+
+    # Przesunięcie detalu unieważnia bufor
+    parts[1].x += 100
+    assert parts[1].get_placed_contour() == transform_contour(RING, 90, 400, 400, parts[1].x, parts[1].y)
+    assert parts[1].get_placed_contour() is not placed[1][0]
+
+
+@pytest.mark.skipif(not (HAS_RECTPACK and HAS_PYCLIPPER and HAS_SHAPELY),
+                    reason="rectpack/pyclipper/shapely not installed")
+def test_nfp_engine_beats_bounding_box():
+    rect_result = make_nester().run_nesting(engine=ENGINE_RECTPACK)
+    nfp_result = make_nester().run_nesting(engine=ENGINE_NFP)
+
+    assert nfp_result.unplaced_count == 0
+    assert len(nfp_result.placed_parts) == 36
+    assert_valid_layout(nfp_result, 1000, 2000, 5.0)
+
+    rect_area = sum(s.used_sheet_area for s in rect_result.sheets)
+    nfp_area = sum(s.used_sheet_area for s in nfp_result.sheets)
+    assert nfp_area < rect_area
+
+
+@pytest.mark.skipif(not (HAS_PYCLIPPER and HAS_SHAPELY), reason="pyclipper/shapely not installed")
+def test_nfp_engine_places_parts_in_holes():
+    nester = FastNester(1000, 2000, spacing=5.0)
+    nester.add_part_from_dict({'name': 'Ring', 'width': 400, 'height': 400,
+                               'contour': RING, 'holes': [RING_HOLE]}, quantity=2)
+    nester.add_part_from_dict({'name': 'Sq', 'width': 80, 'height': 80}, quantity=8)
+    result = nester.run_nesting(engine=ENGINE_NFP, deep_analysis=True)
+
+    assert_valid_layout(result, 1000, 2000, 5.0)
+    holes = [Polygon(p.get_placed_holes()[0]) for p in result.placed_parts if p.name == 'Ring']
+    in_holes = [p for p in result.placed_parts
+                if p.name == 'Sq' and any(h.contains(Polygon(p.get_placed_contour())) for h in holes)]
+    assert in_holes
+
+
+def make_random_nester(**kwargs) -> FastNester:
+    import random
+    rnd = random.Random(1)
+    nester = FastNester(1500, 3000, spacing=5.0, seed=7, **kwargs)
+    for k in range(12):
+        nester.add_part_from_dict({'name': f'P{k}', 'width': rnd.uniform(50, 400),
+                                   'height': rnd.uniform(50, 400)}, quantity=rnd.randint(1, 10))
+    return nester
+
+
+def placement_signature(result):
+    return [(p.name, p.part_index, round(p.x, 2), round(p.y, 2), p.rotation, p.sheet_index)
+            for p in result.placed_parts]
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_parallel_deep_analysis_matches_sequential():
+    sequential = make_random_nester().run_nesting(deep_analysis=True)
+    parallel = make_random_nester(workers=2).run_nesting(deep_analysis=True, parallel=True)
+
+    assert placement_signature(parallel) == placement_signature(sequential)
+
+    # Każda sztuka umieszczona dokładnie raz
+    placed = [(p.name, p.part_index) for p in parallel.placed_parts]
+    assert len(placed) == len(set(placed))
+    assert len(placed) + parallel.unplaced_count == make_random_nester().part_count
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_job_optimization_not_worse_than_greedy():
+    greedy = make_random_nester().run_nesting()
+
+    improvements = []
+    nester = make_random_nester()
+    optimized = nester.run_nesting(optimize_job=True, time_budget_s=1.0,
+                                   callback=lambda parts, eff: improvements.append(eff))
+
+    assert optimized.sheets_used <= greedy.sheets_used
+    if optimized.sheets_used == greedy.sheets_used:
+        tail = min(s.used_height for s in optimized.sheets)
+        assert tail <= min(s.used_height for s in greedy.sheets) + 0.01
+
+    placed = [(p.name, p.part_index) for p in optimized.placed_parts]
+    assert len(placed) == len(set(placed)) == nester.part_count
+    assert all(p.sheet_index == s.sheet_index for s in optimized.sheets for p in s.placed_parts)
+
+
+@pytest.mark.skipif(not (HAS_RECTPACK and HAS_SHAPELY), reason="rectpack/shapely not installed")
+def test_high_quantity_parts_packed_as_grid_blocks():
+    nester = FastNester(1500, 3000, spacing=5.0)
+    nester.add_part_from_dict({'name': 'Washer', 'width': 40, 'height': 25}, quantity=2000)
+    nester.add_part_from_dict({'name': 'Plate', 'width': 300, 'height': 200}, quantity=3)
+
+    assert len(nester.part_types) == 2
+    assert nester.part_count == 2003
+
+    items, unplaceable = nester._build_pack_items()
+    assert not unplaceable
+    assert len(items) < 100
+    assert sum(p['block'][0] * p['block'][1] if 'block' in p else 1 for p in items) == 2003
+
+    result = nester.run_nesting()
+    placed = [(p.name, p.part_index) for p in result.placed_parts]
+    assert len(placed) == len(set(placed))
+    assert len(placed) + result.unplaced_count == 2003
+    assert_valid_layout(result, 1500, 3000, 5.0)
+
+
+def test_drop_placed_removes_in_place_keeping_order():
+    remaining = list('abcdefg')
+    same = remaining
+    FastNester._drop_placed(remaining, {0, 3, 6})
+    assert remaining is same and remaining == list('bcef')
+    FastNester._drop_placed(remaining, set())
+    assert remaining == list('bcef')
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_result_cache_returns_stored_layout(tmp_path):
+    cache = NestingResultCache(tmp_path, max_entries=2)
+
+    def nester(quantity=20, spacing=5.0):
+        n = make_nester(spacing=spacing)
+        n.seed = 3
+        n.cache = cache
+        n.part_types[0].quantity = quantity
+        return n
+
+    first = nester().run_nesting()
+    assert len(cache) == 1 and cache.misses == 1
+
+    calls = []
+    second = nester().run_nesting(callback=lambda parts, eff: calls.append(eff))
+    assert cache.hits == 1 and len(calls) == 1
+    assert placement_signature(second) == placement_signature(first)
+    assert second.placed_parts[0] is second.sheets[0].placed_parts[0]
+    assert second.placed_parts[0].get_placed_contour() == first.placed_parts[0].get_placed_contour()
+    assert second.unplaced_count == first.unplaced_count
+
+    # Inna ilość / odstęp / tryb => inny klucz; najstarszy wpis usunięty (LRU)
+    nester(quantity=19).run_nesting()
+    nester().run_nesting()
+    nester(spacing=4.0).run_nesting(deep_analysis=True)
+    assert len(cache) == 2
+    assert cache.hits == 2
+    assert nester(quantity=19).run_nesting() is not None and cache.hits == 2
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_incremental_result_stored_in_cache(tmp_path):
+    cache = NestingResultCache(tmp_path)
+
+    def incremental():
+        n = make_nester()
+        n.seed = 3
+        n.cache = cache
+        n.run_nesting()
+        assert n.set_quantity(n.part_types[0].name, n.part_types[0].quantity + 5)
+        return n.run_incremental()
+
+    first = incremental()
+    assert len(cache) == 2 and cache.hits == 0
+
+    # Ta sama zmiana ilości - wynik z cache bez przeliczania
+    second = incremental()
+    assert cache.hits == 2 and len(cache) == 2
+    assert placement_signature(second) == placement_signature(first)
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_full_run_after_incremental_renests(tmp_path):
+    cache = NestingResultCache(tmp_path)
+
+    def changed_nester(cache=None):
+        n = make_nester()
+        n.seed = 3
+        n.cache = cache
+        return n
+
+    n = changed_nester(cache)
+    n.run_nesting()
+    assert n.set_quantity(n.part_types[0].name, n.part_types[0].quantity + 5)
+    incremental = n.run_incremental()
+
+    # Pełny nesting tych samych detali - nowy układ, nie wpis przyrostowy
+    full_nester = changed_nester(cache)
+    full_nester.part_types[0].quantity += 5
+    full = full_nester.run_nesting()
+    fresh_nester = changed_nester()
+    fresh_nester.part_types[0].quantity += 5
+    fresh = fresh_nester.run_nesting()
+
+    assert cache.hits == 0 and len(cache) == 3
+    assert placement_signature(full) == placement_signature(fresh)
+    assert incremental is not full
+
+
+@pytest.mark.skipif(not (HAS_RECTPACK and HAS_SHAPELY), reason="rectpack/shapely not installed")
+def test_incremental_quantity_update_keeps_untouched_sheets():
+    nester = make_random_nester()
+    nester.sheet_width, nester.sheet_height = 1000, 1000
+    full = nester.run_nesting()
+    assert full.sheets_used > 2
+
+    # Więcej sztuk typu z ostatniego arkusza, mniej innego, usunięcie trzeciego
+    tail_name = full.sheets[-1].placed_parts[0].name
+    others = [t.name for t in nester.part_types if t.name != tail_name]
+    assert nester.set_quantity(tail_name, nester.part_types[int(tail_name[1:])].quantity + 7)
+    assert nester.set_quantity(others[0], 1)
+    assert nester.set_quantity(others[1], 0)
+    assert not nester.set_quantity('missing', 3)
+
+    updated = nester.run_incremental()
+    assert nester.result is updated
+
+    counts = {}
+    for p in updated.placed_parts + updated.unplaced_parts:
+        counts[p.source_part_name] = counts.get(p.source_part_name, 0) + 1
+    assert counts == {t.name: t.quantity for t in nester.part_types if t.quantity}
+
+    placed = [(p.name, p.part_index) for p in updated.placed_parts]
+    assert len(placed) == len(set(placed))
+    assert [s.sheet_index for s in updated.sheets] == list(range(updated.sheets_used))
+    assert all(p.sheet_index == s.sheet_index for s in updated.sheets for p in s.placed_parts)
+    assert_valid_layout(updated, 1000, 1000, nester.spacing)
+
+    # Arkusze bez usuniętych sztuk zachowują układ
+    changed = {others[0], others[1]}
+    for old, new in zip(full.sheets[:-1], updated.sheets):
+        if changed.isdisjoint(p.name for p in old.placed_parts):
+            assert [(p.name, p.part_index, p.x, p.y) for p in old.placed_parts] == \
+                   [(p.name, p.part_index, p.x, p.y) for p in new.placed_parts]
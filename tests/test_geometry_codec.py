@@ -0,0 +1,95 @@
+"""
+Testy kodeka geometrii
+======================
+Kontury kodowane różnicowo z kwantem 0.01 mm są kilkukrotnie mniejsze
+niż JSON, dekodują się do tych samych punktów, a stare listy z JSON
+czytane są bez zmian. Kontury arkuszy nestingu zapisane przez
+OrderRepository wracają z odczytu jako listy punktów.
+
+Uruchom: python -m pytest tests/test_geometry_codec.py
+"""
+
+import os
+import sys
+import json
+import math
+import random
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.geometry_codec import (
+    PREFIX, decode_geometry, decode_points, encode_geometry, encode_points, is_encoded
+)
+from orders.repository import OrderRepository
+
+
+def circle(cx, cy, r, n=400):
+    return [[cx + r * math.cos(2 * math.pi * i / n), cy + r * math.sin(2 * math.pi * i / n)]
+            for i in range(n)]
+
+
+def test_roundtrip_quantizes_to_hundredth_of_mm():
+    rng = random.Random(1)
+    contour = [[rng.uniform(-5000, 5000), rng.uniform(0, 3000)] for _ in range(500)]
+    holes = [circle(100, 100, 10, 36), [], circle(400.005, 200.015, 25.5, 72)]
+
+    data = encode_geometry(contour, holes)
+    decoded_contour, decoded_holes = decode_geometry(data)
+
+    assert is_encoded(data) and data.startswith(PREFIX)
+    assert len(decoded_contour) == len(contour)
+    assert [len(h) for h in decoded_holes] == [36, 0, 72]
+    for original, point in zip(contour + [p for h in holes for p in h],
+                               decoded_contour + [p for h in decoded_holes for p in h]):
+        assert abs(original[0] - point[0]) <= 0.005 + 1e-9
+        assert abs(original[1] - point[1]) <= 0.005 + 1e-9
+
+    # Ponowne kodowanie odkodowanych punktów daje ten sam napis
+    assert encode_geometry(decoded_contour, decoded_holes) == data
+
+
+def test_encoded_geometry_is_smaller_than_json():
+    contour = circle(750, 500, 480.25)
+    holes = [circle(750, 500, 20, 64), circle(300, 300, 8.5, 32)]
+
+    encoded = encode_geometry(contour, holes)
+    as_json = json.dumps({'contour': contour, 'holes': holes})
+
+    assert len(encoded) * 3 < len(as_json)
+
+
+def test_legacy_lists_and_empty_values():
+    legacy = [[0.123456, 1.5], [10, 0]]
+    assert decode_points(legacy) == legacy
+    assert decode_points(None) == []
+    assert decode_geometry(legacy) == ([], [])
+    assert decode_geometry(encode_geometry([], [])) == ([], [])
+    assert decode_points(encode_points([(1, 2), (3.004, 4.006)])) == [[1.0, 2.0], [3.0, 4.01]]
+
+
+def test_nesting_sheet_contours_roundtrip_through_repository(client):
+    contour = circle(60, 60, 50.004, n=64)
+    parts = [SimpleNamespace(name='Kolo', x=10.0 * i, y=0, width=100, height=100, rotation=0,
+                             quantity=1, contour=contour) for i in range(3)]
+    parts.append(SimpleNamespace(name='Bez konturu', x=0, y=200, width=50, height=50, rotation=0,
+                                 quantity=1, contour=[]))
+    result = SimpleNamespace(sheets=[SimpleNamespace(sheet_width=1500, sheet_height=3000,
+                                                     efficiency=0.4, placed_parts=parts)],
+                             total_efficiency=0.4)
+    repo = OrderRepository(client)
+    assert repo.save_nesting_result('order-1', result, 'S235', 2.0)
+
+    stored = json.loads(client.rows('nesting_results')[0]['nesting_data'])
+    stored_part = stored['sheets'][0]['placed_parts'][0]
+    assert is_encoded(stored_part['geometry']) and 'contour' not in stored_part
+
+    loaded = repo.get_nesting_result('order-1')
+    placed = loaded['sheets'][0]['placed_parts']
+    assert all('geometry' not in p for p in placed)
+    assert placed[3]['contour'] == []
+    for p in placed[:3]:
+        assert len(p['contour']) == len(contour)
+        for (x, y), (ex, ey) in zip(p['contour'], contour):
+            assert abs(x - ex) <= 0.005 + 1e-9 and abs(y - ey) <= 0.005 + 1e-9
@@ -0,0 +1,197 @@
+"""
+Testy przyrostowego przeliczania kosztów zamówienia
+===================================================
+Po serii edycji IncrementalCostModel daje ten sam wynik co pełne
+CostEngine.calculate_order_cost, licząc tylko zmienione linie.
+IncrementalLines (wycena wierszy w DetailedPartsPanel) dostaje tylko
+zmienione wiersze, niezależnie od ich numeracji.
+
+Uruchom: python -m pytest tests/test_incremental_cost.py
+"""
+
+import os
+import sys
+import copy
+import time
+import random
+from dataclasses import fields
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orders.cost_engine import CostEngine
+from orders.cost_events import Debouncer
+from orders.cost_models import AllocationModel, CostParams
+from orders.incremental_cost import IncrementalCostModel, IncrementalLines
+from scripts.cost_engine_benchmark import generate_parts
+
+
+class ManualScheduler:
+    """Planowanie wywołań bez zegara - fire() wykonuje oczekujące"""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def schedule(self, delay_ms, func):
+        self.next_id += 1
+        self.pending[self.next_id] = func
+        return self.next_id
+
+    def cancel(self, handle):
+        self.pending.pop(handle, None)
+
+    def fire(self):
+        pending, self.pending = self.pending, {}
+        for func in pending.values():
+            func()
+
+
+class CountingEngine(CostEngine):
+    """Silnik zapamiętujący liczbę części w kolejnych kalkulacjach"""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def calculate_batch(self, parts, params):
+        self.batch_sizes.append(len(parts))
+        return super().calculate_batch(parts, params)
+
+
+def assert_same_result(model, parts, nesting=None):
+    expected = CostEngine().calculate_order_cost(copy.deepcopy(parts), model.params, nesting)
+    result = model.recalculate()
+    for f in fields(expected):
+        if f.name != 'calculation_time_ms':
+            assert getattr(result, f.name) == getattr(expected, f.name), f.name
+
+
+def make_model(parts, engine=None, **params):
+    scheduler = ManualScheduler()
+    model = IncrementalCostModel(engine or CostEngine(), CostParams(**params),
+                                 key=lambda p: p['name'],
+                                 schedule=scheduler.schedule, cancel=scheduler.cancel)
+    model.set_parts(parts)
+    return model, scheduler
+
+
+def test_random_edits_match_full_recalculation():
+    rng = random.Random(3)
+    parts = generate_parts(200)
+    model, _ = make_model(parts, markup_percent=5.0)
+    assert_same_result(model, parts)
+
+    nesting = {'sheets': [{'material_cost': 4321.0, 'efficiency': 0.8}]}
+    for step in range(40):
+        action = rng.random()
+        if action < 0.6:
+            part = rng.choice(parts)
+            part['quantity'] = rng.randint(1, 50)
+            part['thickness'] = rng.choice([1.0, 2.0, 3.0])
+            if rng.random() < 0.2:
+                part['_manual_lm_cost'], part['lm_cost'] = True, rng.uniform(1, 50)
+            model.update_part(part)
+        elif action < 0.75:
+            model.remove_part(parts.pop(rng.randrange(len(parts))))
+        elif action < 0.85:
+            part = dict(generate_parts(1, seed=step)[0], name=f'new-{step}')
+            parts.append(part)
+            model.add_part(part)
+        elif action < 0.95:
+            model.set_params(markup_percent=rng.choice([0.0, 7.5, 12.0]),
+                             allocation_model=rng.choice(list(AllocationModel)))
+        else:
+            model.set_nesting_data(nesting)
+        assert_same_result(model, parts, model._nesting_data)
+
+
+def test_only_changed_lines_are_recalculated():
+    engine = CountingEngine()
+    parts = generate_parts(50)
+    model, _ = make_model(parts, engine)
+    model.recalculate()
+    assert engine.batch_sizes == [50]
+
+    for part in parts[:3]:
+        part['cutting_len'] += 100
+        model.update_part(part)
+    model.recalculate()
+    assert engine.batch_sizes[-1] == 3
+
+    # Narzut nie zmienia kosztów części
+    model.set_params(markup_percent=20.0)
+    model.recalculate()
+    assert engine.batch_sizes[-1] == 3 and len(engine.batch_sizes) == 2
+
+    model.set_params(include_piercing=False)
+    model.recalculate()
+    assert engine.batch_sizes[-1] == 50
+
+    # Bez zmian - brak przeliczenia
+    model.recalculate()
+    assert len(engine.batch_sizes) == 3
+
+
+def test_burst_of_edits_gives_one_notification():
+    parts = generate_parts(20)
+    model, scheduler = make_model(parts)
+    notifications = []
+    model.on_change(lambda result, changed: notifications.append(changed))
+    scheduler.fire()
+    assert len(notifications) == 1
+
+    for part in parts[:10]:
+        part['quantity'] += 1
+        model.update_part(part)
+    model.remove_part(parts[-1])
+
+    assert len(scheduler.pending) == 1 and model.pending
+    scheduler.fire()
+    assert len(notifications) == 2
+    assert notifications[-1] == {p['name'] for p in parts[:10]} | {parts[-1]['name']}
+    assert not model.pending
+
+
+def test_debouncer_with_timer_coalesces_calls():
+    calls = []
+    debouncer = Debouncer(lambda: calls.append(time.perf_counter()), delay_ms=30)
+    for _ in range(5):
+        debouncer.trigger()
+        time.sleep(0.005)
+    time.sleep(0.15)
+    assert len(calls) == 1
+
+    debouncer.trigger()
+    assert debouncer.flush() is True
+    assert debouncer.flush() is False
+    assert len(calls) == 2
+
+
+def test_lines_keyed_by_row_not_number():
+    """Wiersze jak w DetailedPartsPanel: przenumerowanie nie gubi zmian"""
+    rows = [{'nr': i + 1, 'name': f'Detal_{i}', 'quantity': 1} for i in range(6)]
+    scheduler = ManualScheduler()
+    batches = []
+    lines = IncrementalLines(lambda dirty: batches.append([r['name'] for r in dirty]),
+                             schedule=scheduler.schedule, cancel=scheduler.cancel)
+    lines.set_parts(rows)
+    scheduler.fire()
+    assert batches == [[r['name'] for r in rows]]
+
+    rows[2]['thickness'] = 3.0
+    lines.update_part(rows[2])
+    removed = rows.pop(0)
+    lines.remove_part(removed)
+    for nr, row in enumerate(rows, start=1):
+        row['nr'] = nr
+    rows[3]['thickness'] = 4.0
+    lines.update_part(rows[3])
+    scheduler.fire()
+    assert batches[-1] == ['Detal_2', 'Detal_4']
+
+    # Zmiana bez wpływu na koszty wierszy - samo podsumowanie
+    lines.mark_order_dirty()
+    scheduler.fire()
+    assert batches[-1] == []
+    assert lines.recalculate() is None and len(batches) == 3
@@ -0,0 +1,112 @@
+"""
+Testy paginacji po kluczu (keyset) i projekcji kolumn
+=====================================================
+Strony po (created_at, id) od najnowszych: każdy rekord dokładnie raz,
+także przy równych created_at; liczba wszystkich wyników tylko na
+pierwszej stronie, w tym samym zapytaniu co dane.
+
+Uruchom: python -m pytest tests/test_keyset_pagination.py
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.base_repository import BaseRepository
+from core.filters import FilterOperator, QueryParams, decode_cursor, encode_cursor, keyset_condition
+from orders.repository import OrderRepository
+from products.repository import ProductRepository
+
+
+def make_rows(count, **extra):
+    # Co trzeci rekord z tym samym created_at co poprzedni - rozstrzyga id
+    return [dict({
+        'id': f"{(i * 7919) % 10007:05d}",
+        'created_at': f"2026-03-{1 + (i - i % 3) // 30:02d}T10:{(i - i % 3) % 60:02d}:00.5+00:00",
+        'updated_at': '2026-10-01T00:00:00+00:00',
+        'name': f"Rekord {i}",
+        'metadata': {'heavy': 'x' * 200},
+    }, **extra) for i in range(count)]
+
+
+def collect(fetch_page):
+    items, totals, cursor = [], [], None
+    while True:
+        page = fetch_page(cursor)
+        items.extend(page.items)
+        totals.append(page.total)
+        if not page.has_more:
+            return items, totals
+        cursor = page.next_cursor
+
+
+def expected_order(rows):
+    return [r['id'] for r in sorted(rows, key=lambda r: (r['created_at'], r['id']), reverse=True)]
+
+
+def test_cursor_roundtrip_and_condition():
+    row = {'created_at': '2026-03-01T10:00:00.5+00:00', 'id': 'a,b'}
+    cursor = encode_cursor(row, ('created_at', 'id'))
+    assert decode_cursor(cursor, ('created_at', 'id')) == ['2026-03-01T10:00:00.5+00:00', 'a,b']
+    assert keyset_condition(['created_at', 'id'], ['2026', 'a'], desc=False) == \
+        'created_at.gt."2026",and(created_at.eq."2026",id.gt."a")'
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor', ('created_at', 'id'))
+
+
+def test_order_pages_cover_all_rows_once_with_projection(client):
+    rows = make_rows(250, status='RECEIVED', client='Klient')
+    client.seed('orders', rows)
+    repo = OrderRepository(client)
+    repo._get_available_columns()
+    client.reset_requests()
+
+    items, totals = collect(lambda cursor: repo.get_page(limit=40, cursor=cursor, count='exact'))
+
+    assert [r['id'] for r in items] == expected_order(rows)
+    assert totals == [250] + [None] * 6
+    assert 'metadata' not in items[0] and items[0]['client'] == 'Klient'
+    # Jedno zapytanie na stronę - bez osobnego liczenia
+    assert client.operations('orders') == ['select'] * 7
+
+
+def test_product_pages_match_count_with_search(client):
+    rows = make_rows(120, is_active=True, category='BLACHY')
+    for i, row in enumerate(rows):
+        if i % 4 == 0:
+            row['description'] = 'wspornik kątowy'
+        if i % 10 == 0:
+            row['is_active'] = False
+    client.seed('products_catalog', rows)
+    repo = ProductRepository(client)
+
+    items, totals = collect(lambda cursor: repo.list_page(
+        filters={'category': 'BLACHY'}, search='WSPORNIK', limit=7, cursor=cursor, count='exact'))
+
+    matching = [r for r in rows if r['is_active'] and r.get('description')]
+    assert [r['id'] for r in items] == expected_order(matching)
+    assert totals[0] == len(matching) == repo.count(filters={'category': 'BLACHY'}, search='wspornik')
+    assert 'metadata' not in items[0]
+
+
+class NoteRepository(BaseRepository):
+    TABLE_NAME = 'notes'
+    LIST_COLUMNS = ['id', 'name', 'created_at']
+
+
+def test_base_repository_list_page(client):
+    rows = make_rows(55, is_active=True, kind='A')
+    rows[3]['kind'] = 'B'
+    client.seed('notes', rows)
+    repo = NoteRepository(client)
+    params = lambda: QueryParams().add_filter('kind', FilterOperator.EQ, 'A')
+
+    items, totals = collect(lambda cursor: repo.list_page(params(), cursor=cursor, limit=20, count='exact'))
+
+    assert [r['id'] for r in items] == expected_order([r for r in rows if r['kind'] == 'A'])
+    assert totals == [54, None, None]
+    assert set(items[0]) == {'id', 'name', 'created_at'}
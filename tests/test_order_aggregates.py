@@ -0,0 +1,124 @@
+"""
+Testy agregatów zamówień dla dashboardu
+=======================================
+Liczniki statusów, przychód per okres i sumy per klient liczone przez
+RPC w bazie (fallback: projekcja kolumn stronami) oraz cache odświeżany
+przyrostowo po znaczniku updated_at.
+
+Uruchom: python -m pytest tests/test_order_aggregates.py
+"""
+
+import os
+import sys
+import random
+from collections import Counter
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orders.aggregates import OrderAggregateCache, aggregate_orders, period_start
+from orders.repository import OrderRepository
+
+STATUSES = ['RECEIVED', 'CONFIRMED', 'PLANNED', 'IN_PROGRESS', 'DONE', 'INVOICED']
+
+
+def make_orders(count, start=0, year=2026):
+    rng = random.Random(start)
+    orders = []
+    for i in range(start, start + count):
+        stamp = f"{year}-{1 + i % 9:02d}-01T08:00:{i % 60:02d}.{i:06d}+00:00"
+        orders.append({
+            'id': f"order-{i:05d}",
+            'name': f"Zamówienie {i}",
+            'status': rng.choice(STATUSES),
+            'total_cost': round(rng.uniform(100, 5000), 2),
+            'customer_id': f"cust-{i % 7}" if i % 3 else None,
+            'client': f"Klient {i % 5}",
+            'date_in': None if i % 4 == 0 else stamp[:10],
+            'created_at': stamp,
+            'updated_at': stamp,
+        })
+    return orders
+
+
+def status_counts_rpc(client):
+    return [{'status': s, 'order_count': n}
+            for s, n in Counter(r['status'] for r in client.rows('orders')).items()]
+
+
+def test_status_counts_computed_by_rpc(client):
+    client.seed('orders', make_orders(50))
+    client.register_rpc('get_order_status_counts', status_counts_rpc)
+
+    counts = OrderRepository(client).get_status_counts()
+
+    assert counts == Counter(r['status'] for r in client.rows('orders'))
+    assert client.operations('orders') == []
+
+
+def test_fallback_scans_projected_columns_in_pages(client):
+    orders = make_orders(2300)
+    client.seed('orders', orders)
+    repo = OrderRepository(client)
+
+    assert repo.get_status_counts() == Counter(r['status'] for r in orders)
+    assert client.operations('orders') == ['select'] * 3
+
+    aggregates = repo.get_dashboard_aggregates('month')
+    assert aggregates.order_count == 2300
+    assert aggregates.watermark == max(r['updated_at'] for r in orders)
+
+    revenue = Counter()
+    for r in orders:
+        revenue[period_start(r['date_in'] or r['created_at'], 'month')] += r['total_cost']
+    assert {k: v['revenue'] for k, v in aggregates.revenue_by_period.items()} == pytest.approx(revenue)
+    assert sum(c['order_count'] for c in aggregates.customer_totals.values()) == 2300
+
+    periods = repo.get_revenue_by_period('quarter', date_from='2026-04-01', date_to='2026-06-30')
+    assert [p['period'] for p in periods] == ['2026-04-01']
+    top = repo.get_customer_totals(limit=3)
+    assert len(top) == 3 and top[0]['revenue'] >= top[1]['revenue'] >= top[2]['revenue']
+
+
+def test_cache_adds_new_orders_without_reaggregating(client):
+    client.seed('orders', make_orders(300))
+    cache = OrderAggregateCache(OrderRepository(client))
+    cache.get()
+
+    client.seed('orders', make_orders(20, start=300, year=2027))
+    client.reset_requests()
+    aggregates = cache.refresh()
+
+    assert cache.full_refreshes == 1 and cache.incremental_refreshes == 1
+    # Pobrane tylko nowe zamówienia
+    assert sum(r.rows for r in client.requests if r.table == 'orders') == 20 + 1
+
+    expected = aggregate_orders(client.rows('orders'))
+    assert aggregates.status_counts == expected.status_counts
+    assert aggregates.order_count == 320
+    assert aggregates.watermark == expected.watermark
+    for key, values in expected.customer_totals.items():
+        assert aggregates.customer_totals[key]['revenue'] == pytest.approx(values['revenue'])
+
+    # Bez zmian - tylko sprawdzenie znacznika
+    cache.refresh()
+    assert cache.full_refreshes == 1 and cache.incremental_refreshes == 2
+
+
+def test_update_or_delete_triggers_full_refresh(client):
+    client.seed('orders', make_orders(100))
+    repo = OrderRepository(client)
+    cache = OrderAggregateCache(repo)
+    cache.get()
+
+    order = client.tables['orders']['order-00010']
+    client.seed('orders', [dict(order, status='INVOICED', updated_at='2027-12-01T00:00:00+00:00')])
+    assert cache.refresh().status_counts == Counter(r['status'] for r in client.rows('orders'))
+    assert cache.full_refreshes == 2
+
+    client.tables['orders'].pop('order-00020')
+    aggregates = cache.refresh()
+    assert cache.full_refreshes == 3
+    assert aggregates.order_count == 99
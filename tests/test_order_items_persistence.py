@@ -0,0 +1,172 @@
+"""
+Testy różnicowego zapisu pozycji zamówienia
+===========================================
+OrderRepository.update wysyła tylko nowe, zmienione i usunięte wiersze
+order_items, a geometrię (product_snapshot) tylko gdy się zmieniła.
+Baza zastąpiona atrapą tabel Supabase w pamięci (tests/supabase_memory.py).
+
+Uruchom: python -m pytest tests/test_order_items_persistence.py
+"""
+
+import os
+import sys
+import json
+import random
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.geometry_codec import decode_geometry
+from orders.item_changeset import ROW_ID_KEY
+from orders.repository import OrderRepository
+
+ORDER_ID = 'order-1'
+
+
+def make_items(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        w, h = rng.uniform(50, 900), rng.uniform(50, 600)
+        items.append({
+            'name': f'P-{i:04d}',
+            'material': rng.choice(['S235', '1.4301', 'ALU']),
+            'thickness_mm': rng.choice([1.0, 2.0, 3.0]),
+            'quantity': rng.randint(1, 20),
+            'width': w,
+            'height': h,
+            'weight_kg': w * h * 1e-5,
+            'unit_cost': rng.uniform(1, 100),
+            'total_cost': 0.0,
+            'filepath': f'/dxf/P-{i:04d}.dxf',
+            'contour': [[rng.uniform(0, w), rng.uniform(0, h)] for _ in range(60)],
+            'holes': [[[1.0, 1.0], [2.0, 1.0], [2.0, 2.0]]],
+        })
+    return items
+
+
+def quantized(points):
+    """Punkty po zaokrągleniu kodeka do 0.01 mm"""
+    return [[round(x * 100) / 100, round(y * 100) / 100] for x, y in points]
+
+
+def order_data(items):
+    return {'id': ORDER_ID, 'name': 'Zamówienie testowe', 'status': 'RECEIVED', 'items': items}
+
+
+@pytest.fixture
+def repo(client):
+    return OrderRepository(client)
+
+
+def saved_items(client):
+    return sorted(client.rows('order_items'), key=lambda r: r['custom_name'])
+
+
+def test_create_then_unchanged_save_sends_nothing(client, repo):
+    items = make_items(50)
+    assert repo.create(order_data(items)) == ORDER_ID
+    assert len(client.rows('order_items')) == 50
+    assert all(item[ROW_ID_KEY] for item in items)
+
+    client.reset_requests()
+    assert repo.update(ORDER_ID, order_data(items))
+    assert client.operations('order_items') == []
+
+
+def test_update_sends_only_changes(client, repo):
+    items = make_items(1500)
+    repo.create(order_data(items))
+    full_bytes = client.sent_bytes('order_items')
+    loaded = repo.get_by_id(ORDER_ID)['items']
+
+    loaded[3]['quantity'] += 1                      # zmiana bez geometrii
+    loaded[7]['contour'] = [[0, 0], [10, 0], [10, 10]]  # zmiana geometrii
+    removed = loaded.pop(10)
+    loaded.append(dict(make_items(1, seed=9)[0], name='NOWY'))
+
+    client.reset_requests()
+    repo.update(ORDER_ID, order_data(loaded))
+
+    ops = client.operations('order_items')
+    assert sorted(ops) == ['delete', 'insert', 'upsert', 'upsert']
+    assert client.sent_bytes('order_items') < full_bytes / 100
+
+    rows = {r['id']: r for r in client.rows('order_items')}
+    assert len(rows) == 1500
+    assert removed[ROW_ID_KEY] not in rows
+    assert rows[loaded[3][ROW_ID_KEY]]['qty'] == loaded[3]['quantity']
+    snapshot = json.loads(rows[loaded[7][ROW_ID_KEY]]['product_snapshot'])
+    assert decode_geometry(snapshot['geometry'])[0] == [[0, 0], [10, 0], [10, 10]]
+
+    # Odczyt po zapisie zwraca te same pozycje
+    reread = {i['name']: i for i in OrderRepository(client).get_by_id(ORDER_ID)['items']}
+    for item in loaded:
+        assert reread[item['name']]['quantity'] == item['quantity']
+        assert reread[item['name']]['contour'] == quantized(item['contour'])
+
+
+def test_new_repository_matches_items_without_row_ids(client, repo):
+    items = make_items(30)
+    repo.create(order_data(items))
+    ids_before = {r['id'] for r in client.rows('order_items')}
+
+    # Pozycje z GUI bez id wierszy (np. po set_parts), nowa instancja repozytorium
+    fresh = make_items(30)
+    fresh[0]['quantity'] = 99
+    client.reset_requests()
+    OrderRepository(client).update(ORDER_ID, order_data(fresh))
+
+    assert {r['id'] for r in client.rows('order_items')} == ids_before
+    assert client.operations('order_items') == ['select', 'upsert']
+    assert saved_items(client)[0]['qty'] == 99
+    # Geometria bez zmian - wysłane tylko kolumny skalarne jednego wiersza
+    assert client.sent_bytes('order_items') < 1000
+
+
+def test_failed_save_reloads_state_on_next_update(client, repo, monkeypatch):
+    items = make_items(10)
+    repo.create(order_data(items))
+    items[0]['quantity'] = 42
+
+    def broken(changes):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(repo, '_apply_item_changes', broken)
+    repo.update(ORDER_ID, order_data(items))
+    assert ORDER_ID not in repo._items_state
+
+    monkeypatch.undo()
+    client.reset_requests()
+    repo.update(ORDER_ID, order_data(items))
+    assert client.operations('order_items') == ['select', 'upsert']
+    assert len(client.rows('order_items')) == 10
+    assert saved_items(client)[0]['qty'] == 42
+
+
+def test_list_reads_skip_geometry_and_legacy_rows_are_read(client, repo, monkeypatch):
+    items = make_items(5)
+    repo.create(order_data(items))
+    # Stary wiersz z konturem jako lista punktów w JSON
+    client.seed('order_items', [{
+        'id': 'legacy', 'order_id': ORDER_ID, 'custom_name': 'STARY', 'qty': 2,
+        'thickness_mm': 2.0, 'unit_price': 1.0, 'total_price': 2.0,
+        'documentation_path': '', 'notes': '', 'created_at': '0',
+        'product_snapshot': json.dumps({'name': 'STARY', 'material': 'S235',
+                                        'contour': [[0.123, 0], [5, 0], [5, 5]], 'holes': []}),
+    }])
+
+    def fail(value):
+        raise AssertionError("geometry decoded")
+
+    monkeypatch.setattr('orders.repository.decode_geometry', fail)
+    items = OrderRepository(client).get_by_id(ORDER_ID, with_geometry=False)['items']
+    assert all('contour' not in i for i in items if i['name'] != 'STARY')
+    assert next(i for i in items if i['name'] == 'STARY')['contour'][0] == [0.123, 0]
+
+    # Zapis pozycji bez dekodowania nie zmienia geometrii
+    client.reset_requests()
+    OrderRepository(client).update(ORDER_ID, order_data(items))
+    assert client.operations('order_items') == ['select']
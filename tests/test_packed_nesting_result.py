@@ -0,0 +1,132 @@
+"""
+Testy zapisu wyniku nestingu w formacie packed-v1
+=================================================
+Geometria zapisywana raz na typ detalu, pozycje w zwartej tablicy;
+odczyt odtwarza NestingResult/SheetResult ze współdzieloną geometrią.
+
+Uruchom: python -m pytest tests/test_packed_nesting_result.py
+"""
+
+import os
+import sys
+import json
+import math
+import time
+from dataclasses import fields, replace
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quotations.nesting.fast_nester import FastNester, HAS_RECTPACK, NestedPart
+from quotations.nesting.packed_result import (
+    is_packed, iter_sheets, pack_nesting_result, unpack_nesting_result
+)
+from orders.repository import OrderRepository
+
+pytestmark = pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+
+WASHER = [(30 + 30 * math.cos(a * math.pi / 32), 30 + 30 * math.sin(a * math.pi / 32)) for a in range(64)]
+WASHER_HOLE = [(30 + 12 * math.cos(a * math.pi / 16), 30 + 12 * math.sin(a * math.pi / 16)) for a in range(32)]
+
+
+@pytest.fixture(scope='module')
+def result():
+    nester = FastNester(1000, 1000, spacing=4.0)
+    nester.add_part_from_dict({'name': 'Washer', 'width': 60, 'height': 60, 'contour': WASHER,
+                               'holes': [WASHER_HOLE], 'contour_area': 2500}, quantity=400)
+    nester.add_part_from_dict({'name': 'Plate', 'width': 300, 'height': 200}, quantity=3)
+    return nester.run_nesting()
+
+
+def per_instance_json(result) -> str:
+    """Dotychczasowy układ: każdy detal z własną kopią geometrii"""
+    return json.dumps([[{f.name: getattr(p, f.name) for f in fields(NestedPart)}
+                        for p in sheet.placed_parts] for sheet in result.sheets])
+
+
+def test_roundtrip_restores_sheets_and_parts(result):
+    data = json.loads(json.dumps(pack_nesting_result(result)))
+    assert is_packed(data)
+    assert len(data['types']) < 10 and len(data['placements']) == len(result.placed_parts)
+
+    loaded = unpack_nesting_result(data)
+
+    assert loaded.sheets_used == result.sheets_used
+    assert loaded.total_efficiency == result.total_efficiency
+    assert [len(s.placed_parts) for s in loaded.sheets] == [len(s.placed_parts) for s in result.sheets]
+    for sheet, original in zip(loaded.sheets, result.sheets):
+        assert sheet.sheet_index == original.sheet_index
+        assert sheet.efficiency == original.efficiency
+        for part, expected in zip(sheet.placed_parts, original.placed_parts):
+            assert (part.name, part.rotation, part.width, part.height, part.sheet_index) == \
+                   (expected.name, expected.rotation, expected.width, expected.height, expected.sheet_index)
+            assert part.x == pytest.approx(expected.x, abs=1e-4)
+            assert part.y == pytest.approx(expected.y, abs=1e-4)
+            assert len(part.original_contour) == len(expected.original_contour)
+    assert loaded.placed_parts[0] is loaded.sheets[0].placed_parts[0]
+
+    # Instancje typu dzielą geometrię
+    washers = [p for p in loaded.placed_parts if p.name == 'Washer']
+    assert all(p.original_contour is washers[0].original_contour for p in washers)
+
+
+def test_storage_an_order_of_magnitude_smaller(result):
+    packed = json.dumps(pack_nesting_result(result))
+    legacy = per_instance_json(result)
+    assert len(packed) * 10 < len(legacy)
+
+    start = time.perf_counter()
+    unpack_nesting_result(json.loads(packed))
+    packed_s = time.perf_counter() - start
+    start = time.perf_counter()
+    json.loads(legacy)
+    legacy_s = time.perf_counter() - start
+    assert packed_s < legacy_s * 3
+
+
+def test_streaming_and_detached_placed_parts(result):
+    sheets = iter_sheets(pack_nesting_result(result))
+    first = next(sheets)
+    assert len(first.placed_parts) == len(result.sheets[0].placed_parts)
+
+    # placed_parts niebędące obiektami z arkuszy zapisywane jako osobne wiersze
+    detached = replace(result, placed_parts=[replace(p) for p in result.placed_parts[:5]])
+    loaded = unpack_nesting_result(pack_nesting_result(detached))
+    assert [p.name for p in loaded.placed_parts] == [p.name for p in detached.placed_parts]
+    assert len(loaded.sheets) == len(result.sheets)
+
+
+def test_repository_saves_and_loads_packed(result, client):
+    repo = OrderRepository(client)
+    assert repo.save_nesting_result('order-1', result, 'S235', 2.0)
+
+    stored = json.loads(client.rows('nesting_results')[0]['nesting_data'])
+    assert is_packed(stored)
+    loaded = repo.load_nesting_result('order-1')
+    assert len(loaded.placed_parts) == len(result.placed_parts)
+
+
+def test_repository_readers_accept_packed_and_legacy(result, client):
+    repo = OrderRepository(client)
+    assert repo.save_nesting_result('order-1', result, 'S235', 2.0)
+
+    # Czytelnicy nesting_results dostają arkusze jako słowniki
+    data = repo.get_nesting_result('order-1')
+    assert not is_packed(data)
+    assert data['sheets_used'] == len(result.sheets)
+    assert [len(s['placed_parts']) for s in data['sheets']] == [len(s.placed_parts) for s in result.sheets]
+    first = data['sheets'][0]['placed_parts'][0]
+    assert (first['x'], first['y']) == pytest.approx((result.sheets[0].placed_parts[0].x,
+                                                      result.sheets[0].placed_parts[0].y))
+
+    # Starszy zapis per-arkusz - get_nesting_result bez zmian, load_nesting_result odtwarza wynik
+    client.tables['nesting_results'].clear()
+    client.seed('nesting_results', [{'context_id': 'order-2', 'created_at': '2026-01-01T00:00:00',
+                                     'nesting_data': json.dumps(data)}])
+    assert repo.get_nesting_result('order-2') == data
+    legacy = repo.load_nesting_result('order-2')
+    assert len(legacy.placed_parts) == len(result.placed_parts)
+    assert [len(s.placed_parts) for s in legacy.sheets] == [len(s.placed_parts) for s in result.sheets]
+    assert legacy.sheets[1].placed_parts[0].sheet_index == 1
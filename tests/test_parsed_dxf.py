@@ -0,0 +1,149 @@
+"""
+Testy ParsedDXF
+===============
+Jeden odczyt pliku DXF - te same dane co osobne parsery, bez ponownego czytania.
+
+Uruchom: python -m pytest tests/test_parsed_dxf.py
+"""
+
+import os
+import sys
+import shutil
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ezdxf = pytest.importorskip("ezdxf")
+
+from core.dxf import ParsedDXF, UnifiedDXFReader, BatchDXFLoader, DXFGeometry
+from costing.toolpath.dxf_extractor import (
+    extract_toolpath_stats, extract_motion_segments, extract_engraving_info
+)
+from quotations.nesting.dxf_polygon import DXFPolygonExtractor, get_dxf_polygon, clear_polygon_cache
+from quotations.utils.dxf_loader import iter_load_dxf, load_dxf
+from shared.parsers.folder_parser import FolderParser
+
+TEST_DXF_DIR = Path(__file__).parent.parent / "costing" / "tests" / "test_dxfs"
+
+pytestmark = pytest.mark.skipif(not TEST_DXF_DIR.exists(), reason="test DXF files not available")
+
+
+def count_readfile(monkeypatch) -> list:
+    calls = []
+    readfile = ezdxf.readfile
+
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return readfile(*args, **kwargs)
+
+    monkeypatch.setattr(ezdxf, "readfile", counting)
+    return calls
+
+
+def test_derived_data_matches_separate_parsers(monkeypatch):
+    path = str(sorted(TEST_DXF_DIR.glob("*.dxf"))[0])
+
+    part = UnifiedDXFReader().read(path)
+    polygon = DXFPolygonExtractor().extract(path)
+    stats = extract_toolpath_stats(path)
+    segments = extract_motion_segments(path)
+    engraving = extract_engraving_info(path)
+
+    calls = count_readfile(monkeypatch)
+    parsed = ParsedDXF.load(path)
+
+    assert parsed.part.outer_contour.points == part.outer_contour.points
+    assert len(parsed.part.holes) == len(part.holes)
+    assert [(p.x, p.y) for p in parsed.polygon.vertices] == [(p.x, p.y) for p in polygon.vertices]
+    assert parsed.toolpath_stats() == stats
+    assert parsed.motion_segments() == segments
+    assert parsed.engraving_info() == engraving
+    assert parsed.thumbnail((64, 64)) is not None
+
+    assert calls == [path]
+
+    parsed.release()
+    assert parsed.toolpath_stats() == stats
+    with pytest.raises(RuntimeError):
+        parsed.toolpath_stats(tolerance_mm=0.05)
+
+
+def test_missing_file_is_reported():
+    parsed = ParsedDXF.load("/nonexistent/part.dxf")
+    assert not parsed.is_valid
+    assert parsed.part is None
+    assert "not found" in parsed.error
+
+
+def test_folder_geometry_reads_each_file_once(tmp_path, monkeypatch):
+    sources = sorted(TEST_DXF_DIR.glob("*.dxf"))[:3]
+    for source in sources:
+        shutil.copy(source, tmp_path / source.name)
+
+    parser = FolderParser()
+    result = parser.scan_folder(tmp_path)
+    clear_polygon_cache()
+
+    calls = count_readfile(monkeypatch)
+    parser.load_geometry(result, thumbnail_size=(64, 64), with_toolpath=True, workers=1)
+
+    groups = [g for g in result.product_groups if g.primary_2d]
+    assert len(calls) == len(groups) == len(sources)
+    for group in groups:
+        assert group.dxf_part is not None and group.dxf_part.width > 0
+        assert group.engraving is not None
+        assert group.toolpath_stats.cut_length_mm > 0
+        assert group.thumbnail is not None
+        assert group.get_polygon() is get_dxf_polygon(group.primary_2d.path)
+
+    # Nesting NFP korzysta z wielokątów wczytanych przy imporcie
+    assert len(calls) == len(sources)
+    clear_polygon_cache()
+
+
+def test_batch_loader_streams_all_files_in_parallel():
+    paths = [str(p) for p in sorted(TEST_DXF_DIR.glob("*.dxf"))[:6]] + ["/nonexistent/part.dxf"]
+    progress = []
+
+    loader = BatchDXFLoader(workers=2)
+    results = dict(loader.load(paths, progress=lambda done, total, path: progress.append((done, total))))
+
+    assert sorted(results) == sorted(paths)
+    assert progress == [(i, len(paths)) for i in range(1, len(paths) + 1)]
+    assert all(isinstance(g, DXFGeometry) for g in results.values())
+    assert not results["/nonexistent/part.dxf"].ok
+
+    for path in paths[:-1]:
+        geometry = results[path]
+        assert geometry.ok and geometry.polygon is not None
+        assert geometry.part.width == pytest.approx(UnifiedDXFReader().read(path).width)
+
+
+def test_batch_loader_stop_skips_remaining_files():
+    paths = [str(p) for p in sorted(TEST_DXF_DIR.glob("*.dxf"))]
+    loader = BatchDXFLoader(workers=2, with_polygon=False, with_engraving=False)
+
+    loaded = []
+    for path, _ in loader.load(paths):
+        loaded.append(path)
+        loader.stop()
+
+    assert 1 <= len(loaded) < len(paths)
+
+    # Flaga zostaje do reset() - stop() przed startem nie ginie
+    assert list(loader.load(paths)) == []
+    loader.reset()
+    assert len(list(loader.load(paths[:2]))) == 2
+
+
+def test_iter_load_dxf_returns_legacy_parts():
+    paths = [str(p) for p in sorted(TEST_DXF_DIR.glob("*.dxf"))[:4]]
+
+    parts = dict(iter_load_dxf(paths, workers=2))
+
+    assert sorted(parts) == sorted(paths)
+    for path, part in parts.items():
+        assert part.outer_contour == load_dxf(path).outer_contour
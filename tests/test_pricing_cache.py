@@ -0,0 +1,149 @@
+"""
+Testy indeksowanego cache cen
+=============================
+Wyszukiwanie najbliższej grubości przez bisect, zapamiętane typy materiałów
+i podmiana snapshotu przy przeładowaniu.
+
+Uruchom: python -m pytest tests/test_pricing_cache.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.pricing_cache import (
+    DEFAULT_RATES, PricingDataCache, reset_pricing_cache, resolve_material_type
+)
+
+
+class FakeQuery:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, *args):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class FakeClient:
+    """Atrapa klienta Supabase: table(name).select().limit().execute().data"""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name):
+        return FakeQuery(self.tables.get(name, []))
+
+
+def rows(table, entries):
+    return [dict(id=f"{table}-{i}", **entry) for i, entry in enumerate(entries)]
+
+
+TABLES = {
+    'material_prices': rows('mp', [
+        {'material': 'S235', 'thickness': 2.0, 'price_per_kg': 5.0, 'format': '1500x3000'},
+        {'material': 'S235', 'thickness': 3.0, 'price_per_kg': 5.5, 'format': '1250x2500'},
+    ]),
+    'cutting_prices': rows('cp', [
+        {'material': 'S235', 'thickness': t, 'gas': 'O2', 'price_per_meter': t}
+        for t in (1.0, 2.0, 4.0, 8.0)
+    ] + [{'material': 'S235', 'thickness': 2.0, 'gas': 'N', 'price_per_meter': 20.0}]),
+    'piercing_rates': rows('pr', [
+        {'material_type': 'stainless', 'thickness': t, 'cost_per_pierce': t / 10}
+        for t in (1.0, 3.0, 6.0)
+    ]),
+    'current_foil_rates': rows('fr', [
+        {'material_type': 'stainless', 'max_thickness': 2.0, 'price_per_meter': 0.2},
+        {'material_type': 'stainless', 'max_thickness': 5.0, 'price_per_meter': 0.5},
+    ]),
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_pricing_cache()
+    yield
+    reset_pricing_cache()
+
+
+def make_cache(tables=TABLES) -> PricingDataCache:
+    cache = PricingDataCache()
+    cache._get_client = lambda: FakeClient(tables)
+    cache.reload()
+    assert cache.is_loaded
+    return cache
+
+
+def test_material_and_cutting_price_lookups():
+    cache = make_cache()
+
+    assert cache.get_material_price('S235', 2.0) == 5.0
+    # Inny format - ta sama grubość
+    assert cache.get_material_price('S235', 3.0) == 5.5
+    assert cache.get_material_price('S235', 3.005) == 5.5
+    # Brak grubości - domyślna stawka typu
+    assert cache.get_material_price('S235', 10.0) == DEFAULT_RATES['material_pln_per_kg']['steel']
+
+    assert cache.get_cutting_price('S235', 2.0, 'N') == 20.0
+    assert cache.get_cutting_price('S235', 4.0, 'N') == 4.0
+    assert cache.get_cutting_price('S235', 5.0) == 4.0
+    assert cache.get_cutting_price('S235', 7.0) == 8.0
+    assert cache.get_cutting_price('S235', 0.1) == 1.0
+    assert cache.get_cutting_price('S235', 99.0) == 8.0
+    assert cache.get_cutting_price('DC01', 2.0) == DEFAULT_RATES['cutting_pln_per_m']
+
+
+def test_piercing_and_foil_rates():
+    cache = make_cache()
+
+    assert cache.get_piercing_rate('1.4301', 3.0) == pytest.approx(0.3)
+    assert cache.get_piercing_rate('1.4301', 5.0) == pytest.approx(0.6)
+    assert cache.get_piercing_rate('S235', 3.0) == DEFAULT_RATES['piercing_pln_per_pierce']
+
+    assert cache.get_foil_rate('1.4301', 1.5) == 0.2
+    assert cache.get_foil_rate('1.4301', 2.0) == 0.2
+    assert cache.get_foil_rate('1.4301', 4.0) == 0.5
+    assert cache.get_foil_rate('1.4301', 6.0) is None
+    assert cache.get_foil_rate('S235', 1.0) is None
+
+
+def test_material_type_resolution_is_memoized():
+    resolve_material_type.cache_clear()
+    assert resolve_material_type('1.4301') == 'stainless'
+    assert resolve_material_type(' s235 ') == 'steel'
+    assert resolve_material_type('NIEZNANY') == 'steel'
+    resolve_material_type('1.4301')
+    assert resolve_material_type.cache_info().hits == 1
+
+
+def test_reload_swaps_snapshot_and_keeps_old_data_for_readers():
+    cache = make_cache()
+    old_snapshot = cache._snapshot
+
+    tables = dict(TABLES, cutting_prices=rows('cp', [
+        {'material': 'S235', 'thickness': 2.0, 'gas': 'N', 'price_per_meter': 30.0}
+    ]))
+    cache._get_client = lambda: FakeClient(tables)
+    cache.reload()
+
+    assert cache._snapshot is not old_snapshot
+    assert cache.get_cutting_price('S235', 6.0) == 30.0
+    assert len(cache.cutting_prices) == 1
+    # Stary snapshot nie jest modyfikowany
+    assert len(old_snapshot.cutting_prices) == 5
+
+    # Nieudane przeładowanie zostawia poprzednie dane
+    cache._get_client = lambda: None
+    cache.reload()
+    assert cache.get_cutting_price('S235', 2.0, 'N') == 30.0
+    assert cache.get_stats()['cutting_prices_count'] == 1
@@ -0,0 +1,154 @@
+"""
+Testy magazynu resztek
+======================
+Wyznaczanie odpadu z arkusza, zapis w SQLite i zużywanie resztek przez FastNester.
+
+Uruchom: python -m pytest tests/test_remnants.py
+"""
+
+import os
+import sys
+import sqlite3
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quotations.nesting.fast_nester import FastNester, NestedPart, SheetResult, HAS_RECTPACK
+from quotations.nesting.remnants import Remnant, RemnantStore, extract_remnant
+from quotations.nesting.result_cache import NestingResultCache
+
+
+def part(x: float, y: float, w: float, h: float) -> NestedPart:
+    return NestedPart(name='P', x=x, y=y, width=w, height=h, rotation=0)
+
+
+def make_nester(quantity: int = 10, cache=None) -> FastNester:
+    nester = FastNester(1500, 3000, spacing=5.0, seed=1, cache=cache)
+    nester.add_part_from_dict({'name': 'A', 'width': 300, 'height': 200}, quantity=quantity)
+    return nester
+
+
+def test_remnant_above_skyline():
+    sheet = SheetResult(sheet_index=0, sheet_width=1500, sheet_height=3000,
+                        placed_parts=[part(0, 0, 1000, 800), part(1000, 0, 500, 300)])
+
+    remnant = extract_remnant(sheet, "s235 ", 2.0, margin_mm=10)
+
+    # Pełna szerokość nad najwyższym detalem
+    assert (remnant.width, remnant.height) == pytest.approx((1500, 3000 - 810))
+    assert remnant.material == "S235"
+    assert (0.0, 0.0) in remnant.outline
+    # Schodek nad niższym detalem
+    assert (1000 + 10 - 0, 310 - 810) in remnant.outline
+
+    full = SheetResult(sheet_index=0, sheet_width=1500, sheet_height=3000,
+                       placed_parts=[part(0, 0, 1500, 2900)])
+    assert extract_remnant(full, "S235", 2.0) is None
+
+
+def test_store_lifecycle(tmp_path):
+    store = RemnantStore(tmp_path / "remnants.db")
+    small = store.add(Remnant("S235", 2.0, 400, 300))
+    large = store.add(Remnant("s235", 2.004, 1500, 1200, outline=[(0, 0), (1500, 0)]))
+    store.add(Remnant("DC01", 2.0, 1500, 1200))
+
+    available = store.available("S235", 2.0)
+    assert [r.id for r in available] == [small.id, large.id]
+    assert available[1].outline == [(0, 0), (1500, 0)]
+    assert [r.id for r in store.available("S235", 2.0, min_width=1000, min_height=500)] == [large.id]
+
+    assert store.consume([small.id]) == 1
+    assert store.consume([small.id]) == 0
+    assert store.get(small.id).status == "consumed"
+    assert store.count("S235", 2.0) == 1
+    assert store.delete(large.id)
+    assert store.count("S235") == 0
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_nester_uses_remnants_before_full_sheets(tmp_path):
+    store = RemnantStore(tmp_path / "remnants.db")
+    store.add(Remnant("S235", 2.0, 700, 450))
+    store.add(Remnant("S235", 2.0, 150, 150))  # Za mała na detal
+    remnants = store.available("S235", 2.0)
+
+    nester = make_nester()
+    result = nester.run_nesting(remnants=remnants)
+
+    assert result.remnants_used == 1
+    first = result.sheets[0]
+    assert first.remnant_id == remnants[1].id
+    assert (first.sheet_width, first.sheet_height) == (700, 450)
+    assert len(first.placed_parts) == 4
+    for p in first.placed_parts:
+        assert p.x + p.width <= 700 and p.y + p.height <= 450
+        assert p.sheet_index == 0
+    assert all(p.sheet_index == 1 for p in result.sheets[1].placed_parts)
+    assert len(result.placed_parts) == 10
+
+    # Resztka wyceniana proporcjonalnie do pola
+    result.calculate_costs(full_sheet_cost=900.0)
+    assert first.sheet_cost == pytest.approx(900.0 * 700 * 450 / (1500 * 3000))
+    assert result.sheets[1].sheet_cost == pytest.approx(900.0)
+
+    new = store.record_nesting(result, "S235", 2.0, source="test")
+    assert store.get(first.remnant_id).status == "consumed"
+    assert len(new) == 1 and new[0].width == 1500
+    assert [r.id for r in store.available("S235", 2.0)] == [remnants[0].id, new[0].id]
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_remnants_are_part_of_cache_key(tmp_path):
+    cache = NestingResultCache(tmp_path / "cache")
+    plain = make_nester(cache=cache).run_nesting()
+    with_remnant = make_nester(cache=cache).run_nesting(
+        remnants=[Remnant("S235", 2.0, 700, 450, id=1)])
+
+    assert plain.remnants_used == 0
+    assert with_remnant.remnants_used == 1
+    assert len(cache) == 2
+
+    cached = make_nester(cache=cache).run_nesting(remnants=[Remnant("S235", 2.0, 700, 450, id=1)])
+    assert cached.sheets[0].remnant_id == 1
+
+
+@pytest.mark.skipif(not HAS_RECTPACK, reason="rectpack not installed")
+def test_repeated_nesting_of_job_keeps_inventory(tmp_path):
+    store = RemnantStore(tmp_path / "remnants.db")
+    offcut = store.add(Remnant("S235", 2.0, 700, 450))
+    other = store.add(Remnant("S235", 2.0, 150, 150))
+
+    def run(job):
+        result = make_nester().run_nesting(remnants=store.available("S235", 2.0, job=job))
+        return result, store.record_nesting(result, "S235", 2.0, job=job)
+
+    first, stored = run("ZL-1")
+    assert first.sheets[0].remnant_id == offcut.id
+    inventory = sorted(r.id for r in store.available("S235", 2.0))
+    assert inventory == sorted([other.id] + [r.id for r in stored])
+
+    # Podgląd powtórzony - ten sam stan magazynu, resztka nadal do użycia
+    again, stored = run("ZL-1")
+    assert again.sheets[0].remnant_id == offcut.id
+    assert store.count("S235", 2.0) == len(inventory)
+    assert store.get(offcut.id).status == "consumed"
+    assert sorted(r.id for r in store.available("S235", 2.0)) == sorted([other.id] + [r.id for r in stored])
+
+    # Inne zlecenie widzi odpady pierwszego, ale nie zużytą resztkę
+    assert offcut.id not in [r.id for r in store.available("S235", 2.0, job="ZL-2")]
+
+
+def test_store_adds_job_columns_to_existing_db(tmp_path):
+    path = tmp_path / "remnants.db"
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute("CREATE TABLE remnants (id INTEGER PRIMARY KEY AUTOINCREMENT, material TEXT NOT NULL, "
+                     "thickness_mm REAL NOT NULL, width_mm REAL NOT NULL, height_mm REAL NOT NULL, "
+                     "outline TEXT, source TEXT, status TEXT NOT NULL DEFAULT 'available', "
+                     "created_at TEXT NOT NULL, consumed_at TEXT)")
+    conn.close()
+
+    store = RemnantStore(path)
+    remnant = store.add(Remnant("S235", 2.0, 400, 300))
+    assert [r.id for r in store.available("S235", 2.0, job="ZL-1")] == [remnant.id]
@@ -0,0 +1,103 @@
+"""
+Testy leniwego lokatora usług i czasu importu
+=============================================
+ServiceLocator tworzy repozytoria przy pierwszym użyciu; moduły GUI nie
+importują klienta Supabase przy starcie.
+
+Uruchom: python -m pytest tests/test_service_locator.py
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.service_locator import ServiceLocator, get_locator, PRICING_REPOSITORY, SUPABASE
+from scripts.import_time_benchmark import BUDGETS, measure, parse_importtime
+
+
+def test_service_created_once_on_first_use():
+    calls = []
+    locator = ServiceLocator()
+    locator.register('client', lambda: calls.append('client') or object())
+    locator.register('repo', lambda: ('repo', locator.get('client')))
+
+    assert not locator.is_created('repo')
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(locator.get('repo'))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == ['client']
+    assert all(r is results[0] for r in results)
+    assert locator.is_created('repo') and locator.is_created('client')
+
+
+def test_failed_factory_is_remembered_until_reset():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        raise ValueError("Brak konfiguracji")
+
+    locator = ServiceLocator()
+    locator.register('client', factory)
+
+    assert locator.try_get('client') is None
+    with pytest.raises(ValueError):
+        locator.get('client')
+    assert len(attempts) == 1
+
+    locator.reset('client')
+    assert locator.try_get('client') is None
+    assert len(attempts) == 2
+
+    fake = object()
+    locator.provide('client', fake)
+    assert locator.get('client') is fake
+    with pytest.raises(KeyError):
+        locator.get('unknown')
+
+
+def test_default_services_are_registered_lazily():
+    locator = get_locator()
+    assert {SUPABASE, PRICING_REPOSITORY} <= set(locator.names())
+    assert not locator.is_created(PRICING_REPOSITORY)
+
+
+def test_parse_importtime():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   tkinter",
+        "import time:        50 |        300 |     supabase._sync",
+        "import time:        20 |        320 |   supabase",
+        "import time:        10 |        430 | app",
+        "import time:         5 |          5 | atexit",
+    ])
+    timing = parse_importtime(stderr, 'app')
+
+    assert timing.total_s == pytest.approx(430e-6)
+    assert timing.slowest == [(320e-6, 'supabase'), (100e-6, 'tkinter')]
+    assert timing.forbidden(('supabase',)) == ['supabase', 'supabase._sync']
+
+
+@pytest.mark.parametrize("module", ['main_dashboard', 'quotations.gui.quotation_window'])
+def test_gui_modules_do_not_import_clients_at_startup(module):
+    timing = measure(module, runs=1)
+    if 'ModuleNotFoundError' in timing.error:
+        pytest.skip(timing.error)
+
+    assert not timing.error
+    assert timing.forbidden(BUDGETS[module][1]) == []
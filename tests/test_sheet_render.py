@@ -0,0 +1,85 @@
+"""
+Testy bufora geometrii podglądu arkuszy
+=======================================
+Upraszczanie konturów per poziom szczegółowości i trafianie detali kliknięciem.
+
+Uruchom: python -m pytest tests/test_sheet_render.py
+"""
+
+import os
+import sys
+import math
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quotations.nesting.fast_nester import NestedPart
+from quotations.gui.sheet_render import (
+    SheetGeometry, _segment_distance, level_tolerance, lod_level, simplify_polygon,
+    to_canvas_coords
+)
+
+CIRCLE = [(100 + 100 * math.cos(a * math.pi / 180), 100 + 100 * math.sin(a * math.pi / 180))
+          for a in range(360)]
+HOLE = [(80 + 10 * math.cos(a * math.pi / 36), 100 + 10 * math.sin(a * math.pi / 36)) for a in range(72)]
+
+
+def distance_to_polygon(p, polygon) -> float:
+    return min(_segment_distance(p, polygon[i - 1], polygon[i]) for i in range(len(polygon)))
+
+
+def circle_part(x: float, y: float, rotation: float = 0.0) -> NestedPart:
+    return NestedPart(name='C', x=x, y=y, width=200, height=200, rotation=rotation,
+                      original_contour=CIRCLE, holes=[HOLE], orig_width=200, orig_height=200)
+
+
+def test_lod_level_grows_when_zooming_out():
+    levels = [lod_level(scale) for scale in (50, 10, 1, 0.2, 0.05)]
+    assert levels[0] == 0
+    assert levels == sorted(levels)
+    assert levels[-1] > levels[1]
+    for scale in (2, 0.3, 0.07):
+        # Tolerancja poziomu nie przekracza pół piksela
+        assert level_tolerance(lod_level(scale)) * scale <= 0.5 + 1e-9
+
+
+@pytest.mark.parametrize("tolerance", [0.05, 0.4, 3.2])
+def test_simplified_circle_stays_within_tolerance(tolerance):
+    simplified = simplify_polygon(CIRCLE, tolerance)
+
+    assert 3 <= len(simplified) < len(CIRCLE)
+    assert all(p in CIRCLE for p in simplified)
+    for p in CIRCLE:
+        assert distance_to_polygon(p, simplified) <= tolerance + 1e-9
+
+
+def test_rectangles_and_tiny_polygons_are_kept():
+    square = [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+    assert simplify_polygon(square, 1.0) == square[:4]
+    tiny = [(0, 0), (0.01, 0), (0.01, 0.01), (0, 0.01)]
+    assert len(simplify_polygon(tiny, 5.0)) == 3
+
+
+def test_geometry_levels_and_hit_test():
+    parts = [circle_part(0, 0), circle_part(300, 0, rotation=90),
+             NestedPart(name='R', x=600, y=0, width=100, height=50, rotation=0)]
+    geometry = SheetGeometry(parts)
+
+    full = geometry.vertex_count(0)
+    coarse = geometry.vertex_count(lod_level(0.2))
+    assert full == 2 * (360 + 72) + 4
+    assert coarse < full / 4
+    assert geometry.parts[0].at_level(5) is geometry.parts[0].at_level(5)
+
+    assert geometry.hit_test(100, 100).part is parts[0]
+    assert geometry.hit_test(400, 100).part is parts[1]
+    assert geometry.hit_test(650, 25).part is parts[2]
+    # Narożnik bbox koła poza konturem
+    assert geometry.hit_test(2, 2) is None
+
+
+def test_canvas_coords_flip_y_axis():
+    flat = to_canvas_coords([(0, 0), (100, 50)], 2.0, 10.0, 20.0, 1000.0)
+    assert flat == [10.0, 2020.0, 210.0, 1920.0]